@@ -6,6 +6,32 @@ from configs import dify_config
 from dify_app import DifyApp
 
 
+# extensions not initialized in processes of a role, the other roles initialize them all
+EXTENSIONS_SKIPPED_BY_ROLE = {
+    "worker": {
+        "ext_app_metrics",
+        "ext_blueprints",
+        "ext_commands",
+        "ext_compress",
+        "ext_login",
+        "ext_migrate",
+        "ext_proxy_fix",
+    },
+    "beat": {
+        "ext_app_metrics",
+        "ext_blueprints",
+        "ext_code_based_extension",
+        "ext_commands",
+        "ext_compress",
+        "ext_hosting_provider",
+        "ext_login",
+        "ext_mail",
+        "ext_migrate",
+        "ext_proxy_fix",
+    },
+}
+
+
 # ----------------------------
 # Application Factory Function
 # ----------------------------
@@ -85,9 +111,13 @@ def initialize_extensions(app: DifyApp):
         ext_blueprints,
         ext_commands,
     ]
+    skipped_extensions = EXTENSIONS_SKIPPED_BY_ROLE.get(dify_config.PROCESS_ROLE, set())
     for ext in extensions:
         short_name = ext.__name__.split(".")[-1]
-        is_enabled = ext.is_enabled() if hasattr(ext, "is_enabled") else True
+        if short_name in skipped_extensions:
+            is_enabled = False
+        else:
+            is_enabled = ext.is_enabled() if hasattr(ext, "is_enabled") else True
         if not is_enabled:
             if dify_config.DEBUG:
                 logging.info(f"Skipped {short_name}")
@@ -1,22 +1,38 @@
 import base64
 import json
 import logging
+import os
 import secrets
-from typing import Optional
+import threading
+import time
+import uuid
+from typing import Optional, Union
 
 import click
 from flask import current_app
+from sqlalchemy import and_, func, not_, or_
 from werkzeug.exceptions import NotFound
 
 from configs import dify_config
 from constants.languages import languages
+from core.app.apps.base_app_queue_manager import PublishFrom
+from core.app.apps.chat.generate_response_converter import ChatAppGenerateResponseConverter
+from core.app.apps.message_based_app_queue_manager import MessageBasedAppQueueManager
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.app.entities.queue_entities import QueueLLMChunkEvent
+from core.app.entities.task_entities import ChatbotAppStreamResponse, MessageStreamResponse
+from core.helper import workflow_payload_storage
+from core.model_runtime.entities.llm_entities import LLMResultChunk, LLMResultChunkDelta
+from core.model_runtime.entities.message_entities import AssistantPromptMessage
 from core.rag.datasource.vdb.vector_factory import Vector
 from core.rag.datasource.vdb.vector_type import VectorType
 from core.rag.models.document import Document
 from events.app_event import app_was_created
 from extensions.ext_database import db
 from extensions.ext_redis import redis_client
+from libs.helper import StreamLatency
 from libs.helper import email as email_validate
+from libs.import_time import get_self_us_by_package, get_total_us, measure_import_time
 from libs.password import hash_password, password_pattern, valid_password
 from libs.rsa import generate_key_pair
 from models import Tenant
@@ -24,6 +40,7 @@ from models.dataset import Dataset, DatasetCollectionBinding, DocumentSegment
 from models.dataset import Document as DatasetDocument
 from models.model import Account, App, AppAnnotationSetting, AppMode, Conversation, MessageAnnotation
 from models.provider import Provider, ProviderModel
+from models.workflow import WorkflowNodeExecution, WorkflowRun, set_payload
 from services.account_service import RegisterService, TenantService
 
 
@@ -640,3 +657,159 @@ where sites.id is null limit 1000"""
                 break
 
     click.echo(click.style("Fix for missing app-related sites completed successfully!", fg="green"))
+
+
+@click.command("offload-workflow-payloads", help="Move large workflow payloads from the database to the storage.")
+@click.option("--batch-size", default=100, show_default=True, help="Number of records loaded at a time.")
+def offload_workflow_payloads(batch_size: int):
+    """
+    Offload the workflow run outputs and node execution inputs, process data and outputs stored before
+    WORKFLOW_PAYLOAD_OFFLOAD_THRESHOLD was set, or lowered.
+    """
+    threshold = dify_config.WORKFLOW_PAYLOAD_OFFLOAD_THRESHOLD
+    if not threshold:
+        click.echo(click.style("WORKFLOW_PAYLOAD_OFFLOAD_THRESHOLD is not set, nothing to offload.", fg="yellow"))
+        return
+
+    click.echo(click.style(f"Offloading workflow payloads over {threshold} bytes.", fg="green"))
+
+    payload_columns: list[tuple[type[Union[WorkflowRun, WorkflowNodeExecution]], tuple[str, ...]]] = [
+        (WorkflowRun, ("outputs",)),
+        (WorkflowNodeExecution, ("inputs", "process_data", "outputs")),
+    ]
+    for model, columns in payload_columns:
+        large_payload_condition = or_(
+            *[
+                and_(
+                    func.octet_length(getattr(model, column)) > threshold,
+                    not_(getattr(model, column).startswith(workflow_payload_storage.REFERENCE_PREFIX, autoescape=True)),
+                )
+                for column in columns
+            ]
+        )
+
+        offloaded_count = 0
+        last_id = None
+        while True:
+            query = db.session.query(model.id).filter(large_payload_condition)
+            if last_id:
+                query = query.filter(model.id > last_id)
+            record_ids = [record_id for (record_id,) in query.order_by(model.id).limit(batch_size).all()]
+            if not record_ids:
+                break
+
+            for record in db.session.query(model).filter(model.id.in_(record_ids)).all():
+                for column in columns:
+                    set_payload(record, column, getattr(record, column))
+            db.session.commit()
+            db.session.expunge_all()
+
+            offloaded_count += len(record_ids)
+            last_id = record_ids[-1]
+            click.echo(f"Offloaded payloads of {offloaded_count} {model.__tablename__}.")
+
+    click.echo(click.style("Offloading workflow payloads completed.", fg="green"))
+
+
+@click.command("benchmark-import-time", help="Measure the time a process of a role takes to import the app.")
+@click.option(
+    "--role",
+    type=click.Choice(["all", "api", "worker", "beat"]),
+    default="api",
+    show_default=True,
+    help="Process role the app is created for.",
+)
+@click.option("--top", default=20, show_default=True, help="Number of slowest packages listed.")
+@click.option("--budget", default=0, show_default=True, help="Fail over this import time in milliseconds, 0 for none.")
+def benchmark_import_time(role: str, top: int, budget: int):
+    """
+    Import the app in a new interpreter with `-X importtime`, as the workers of the role do on boot, and list the
+    slowest packages. With a budget, fail when the import time exceeds it, to catch regressions in CI.
+    """
+    import_times = measure_import_time("import app", env={**os.environ, "PROCESS_ROLE": role})
+    total_ms = get_total_us(import_times) / 1000
+
+    click.echo(f"Importing the app for role {role} took {total_ms:.0f} ms, {len(import_times)} modules.")
+    for package, self_us in list(get_self_us_by_package(import_times).items())[:top]:
+        click.echo(f"{self_us / 1000:>10.1f} ms  {package}")
+
+    if budget and total_ms > budget:
+        raise click.ClickException(f"Import time {total_ms:.0f} ms exceeds the budget of {budget} ms.")
+
+
+@click.command("benchmark-streaming", help="Measure the latency of a chat response streamed from a fake LLM.")
+@click.option("--chunks", default=1000, show_default=True, help="Number of text chunks generated by the fake LLM.")
+@click.option(
+    "--interval-ms", default=0.0, show_default=True, help="Time the fake LLM takes to generate a chunk in milliseconds."
+)
+@click.option(
+    "--coalesce/--no-coalesce", default=None, help="Merge queued text chunks, defaults to APP_STREAM_COALESCE_ENABLED."
+)
+def benchmark_streaming(chunks: int, interval_ms: float, coalesce: Optional[bool]):
+    """
+    Publish the chunks of a fake LLM to an app queue from a thread, as the runner of a chat app does, and turn them
+    into server-sent events, as the task pipeline and the response converter do, then report the time to first byte
+    and the time between the events.
+    """
+    coalesce_enabled = dify_config.APP_STREAM_COALESCE_ENABLED
+    if coalesce is not None:
+        dify_config.APP_STREAM_COALESCE_ENABLED = coalesce
+
+    task_id = str(uuid.uuid4())
+    message_id = str(uuid.uuid4())
+    conversation_id = str(uuid.uuid4())
+    queue_manager = MessageBasedAppQueueManager(
+        task_id=task_id,
+        user_id="benchmark",
+        invoke_from=InvokeFrom.SERVICE_API,
+        conversation_id=conversation_id,
+        app_mode=AppMode.CHAT.value,
+        message_id=message_id,
+    )
+
+    def generate_chunks():
+        for index in range(chunks):
+            if interval_ms:
+                time.sleep(interval_ms / 1000)
+            chunk = LLMResultChunk(
+                model="fake",
+                prompt_messages=[],
+                delta=LLMResultChunkDelta(index=index, message=AssistantPromptMessage(content=f"token{index} ")),
+            )
+            queue_manager.publish(QueueLLMChunkEvent(chunk=chunk), PublishFrom.APPLICATION_MANAGER)
+        queue_manager.stop_listen()
+
+    def stream_responses():
+        for message in queue_manager.listen():
+            if isinstance(message.event, QueueLLMChunkEvent):
+                yield ChatbotAppStreamResponse(
+                    conversation_id=conversation_id,
+                    message_id=message_id,
+                    created_at=int(time.time()),
+                    stream_response=MessageStreamResponse.model_construct(
+                        task_id=task_id, id=message_id, answer=message.event.chunk.delta.message.content
+                    ),
+                )
+
+    try:
+        latency = StreamLatency()
+        producer = threading.Thread(target=generate_chunks, daemon=True)
+        producer.start()
+        frames = []
+        for frame in ChatAppGenerateResponseConverter.convert(stream_responses(), InvokeFrom.SERVICE_API):
+            latency.record_chunk()
+            frames.append(frame)
+        total_ms = (time.perf_counter() - latency.started_at) * 1000
+        producer.join()
+    finally:
+        dify_config.APP_STREAM_COALESCE_ENABLED = coalesce_enabled
+
+    answer = "".join(json.loads(frame.removeprefix("data: "))["answer"] for frame in frames)
+    if answer != "".join(f"token{index} " for index in range(chunks)):
+        raise click.ClickException("The streamed answer does not match the chunks of the fake LLM.")
+
+    summary = latency.get_summary()
+    click.echo(f"Streamed {chunks} chunks in {len(frames)} events in {total_ms:.0f} ms.")
+    for key, value in summary.items():
+        if key != "chunks":
+            click.echo(f"{key}: {value}")
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -26,3 +28,9 @@ class DeploymentConfig(BaseSettings):
         description="Deployment environment (e.g., 'PRODUCTION', 'DEVELOPMENT'), default to PRODUCTION",
         default="PRODUCTION",
     )
+
+    PROCESS_ROLE: Literal["all", "api", "worker", "beat"] = Field(
+        description="Role of the process (e.g., 'api', 'worker', 'beat'), Celery worker and beat processes skip the"
+        " extensions they do not use, 'all' initializes every extension",
+        default="all",
+    )
@@ -55,6 +55,34 @@ class SecurityConfig(BaseSettings):
     )
 
 
+class AgentConfig(BaseSettings):
+    """
+    Configuration for agent apps
+    """
+
+    AGENT_MAX_PARALLEL_TOOL_CALLS: PositiveInt = Field(
+        description="Maximum number of tool calls of one LLM turn invoked concurrently by a function calling agent"
+        " with parallel tool calls enabled, also the upper bound of the per-app setting",
+        default=4,
+    )
+
+    AGENT_TOOL_CALL_TIMEOUT: PositiveFloat = Field(
+        description="Default timeout in seconds of a single tool call invoked concurrently, the tool call is"
+        " reported to the model as failed once it is exceeded",
+        default=120,
+    )
+
+    AGENT_HISTORY_MAX_MESSAGES: PositiveInt = Field(
+        description="Maximum number of latest conversation messages loaded to organize the history of an agent",
+        default=500,
+    )
+
+    AGENT_HISTORY_CACHE_TTL: NonNegativeInt = Field(
+        description="Time in seconds the organized agent history of a conversation is cached in redis, 0 to disable",
+        default=3600,
+    )
+
+
 class AppExecutionConfig(BaseSettings):
     """
     Configuration parameters for application execution
@@ -68,6 +96,33 @@ class AppExecutionConfig(BaseSettings):
         description="Maximum number of concurrent active requests per app (0 for unlimited)",
         default=0,
     )
+    APP_RATE_LIMIT_LOCAL_TOKEN_THRESHOLD: NonNegativeInt = Field(
+        description="Apps whose maximum concurrent active requests is at or above this value reserve request slots"
+        " in batches per process instead of one Redis round trip per request (0 to disable)",
+        default=0,
+    )
+    APP_RATE_LIMIT_LOCAL_TOKEN_BATCH_SIZE: PositiveInt = Field(
+        description="Number of request slots reserved at once per process when the local token cache is used",
+        default=10,
+    )
+    TTS_AUTO_PLAY_WORKER_POOL_SIZE: PositiveInt = Field(
+        description="Number of threads per process synthesizing the audio of auto-played messages,"
+        " shared by all the messages",
+        default=8,
+    )
+    TTS_AUTO_PLAY_MAX_PENDING_SEGMENTS: PositiveInt = Field(
+        description="Maximum number of text segments of a message being synthesized or buffered at a time",
+        default=3,
+    )
+    APP_STREAM_COALESCE_ENABLED: bool = Field(
+        description="Merge consecutive text chunks waiting in the queue of a streamed response into a single event",
+        default=True,
+    )
+    APP_STREAM_COALESCE_WINDOW_MS: NonNegativeInt = Field(
+        description="Time in milliseconds to wait for more text chunks to merge into an event of a streamed response,"
+        " 0 to merge only the chunks already queued, which adds no latency",
+        default=0,
+    )
 
 
 class CodeExecutionSandboxConfig(BaseSettings):
@@ -228,6 +283,17 @@ class FileUploadConfig(BaseSettings):
         default=10,
     )
 
+    FILE_DOWNLOAD_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum size in bytes of files downloaded from the storage or remote URLs for processing,"
+        " enforced while streaming, 0 for no limit",
+        default=500 * 1024 * 1024,
+    )
+
+    FILE_DOWNLOAD_SPOOL_MAX_MEMORY_SIZE: NonNegativeInt = Field(
+        description="Size in bytes above which streamed file downloads are spooled to a temporary file on disk",
+        default=10 * 1024 * 1024,
+    )
+
 
 class HttpConfig(BaseSettings):
     """
@@ -398,6 +464,52 @@ class ModelLoadBalanceConfig(BaseSettings):
     )
 
 
+class ModelProviderClientPoolConfig(BaseSettings):
+    """
+    Configuration for the reuse of model provider SDK clients
+    """
+
+    MODEL_PROVIDER_CLIENT_POOL_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum number of model provider SDK clients kept per process for reuse across invocations"
+        " (0 to disable)",
+        default=128,
+    )
+
+    MODEL_PROVIDER_CLIENT_POOL_IDLE_TIMEOUT: PositiveInt = Field(
+        description="Time (in seconds) after which an unused model provider SDK client is evicted",
+        default=300,
+    )
+
+
+class ProviderCredentialsConfig(BaseSettings):
+    """
+    Configuration for the caching of model provider credentials
+    """
+
+    PROVIDER_CREDENTIALS_CACHE_TTL: NonNegativeInt = Field(
+        description="Time (in seconds) decrypted model provider credentials are kept in the memory of each process"
+        " (0 to disable)",
+        default=60,
+    )
+
+
+class ProviderUsageConfig(BaseSettings):
+    """
+    Configuration for the accounting of provider usage
+    """
+
+    PROVIDER_USAGE_WRITE_BEHIND_ENABLED: bool = Field(
+        description="Accumulate the quota used on hosted providers and the last used time of providers in Redis,"
+        " and write them to the database from a scheduled task, requires Celery Beat",
+        default=False,
+    )
+
+    PROVIDER_USAGE_FLUSH_INTERVAL: PositiveInt = Field(
+        description="Interval (in seconds) at which the accumulated provider usage is written to the database",
+        default=30,
+    )
+
+
 class BillingConfig(BaseSettings):
     """
     Configuration for platform billing features
@@ -408,6 +520,21 @@ class BillingConfig(BaseSettings):
         default=False,
     )
 
+    BILLING_API_TIMEOUT: PositiveFloat = Field(
+        description="Timeout (in seconds) for requests to the billing API",
+        default=10.0,
+    )
+
+    BILLING_API_POOL_SIZE: PositiveInt = Field(
+        description="Maximum number of pooled connections to the billing API per process",
+        default=32,
+    )
+
+    BILLING_FEATURES_CACHE_TTL: NonNegativeInt = Field(
+        description="Time (in seconds) the billing features of a workspace are cached in Redis, 0 to disable",
+        default=300,
+    )
+
 
 class UpdateConfig(BaseSettings):
     """
@@ -445,6 +572,17 @@ class WorkflowConfig(BaseSettings):
         default=200 * 1024,
     )
 
+    WORKFLOW_PAYLOAD_OFFLOAD_THRESHOLD: NonNegativeInt = Field(
+        description="Size in bytes above which workflow run and node execution inputs, process data and outputs"
+        " are stored compressed in the storage instead of the database, 0 to disable",
+        default=0,
+    )
+
+    WORKFLOW_PAYLOAD_PREVIEW_LENGTH: NonNegativeInt = Field(
+        description="Number of characters of an offloaded workflow payload kept in the database as a preview",
+        default=1024,
+    )
+
 
 class WorkflowNodeExecutionConfig(BaseSettings):
     """
@@ -456,6 +594,55 @@ class WorkflowNodeExecutionConfig(BaseSettings):
         default=100,
     )
 
+    WORKFLOW_NODE_EXECUTION_WRITE_BEHIND_ENABLED: bool = Field(
+        description="Buffer node execution records of a workflow run in memory and write them to the database"
+        " in batches, instead of one transaction per node start and finish",
+        default=False,
+    )
+
+    WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE: PositiveInt = Field(
+        description="Number of buffered node execution changes that triggers a write, in write-behind mode",
+        default=100,
+    )
+
+    WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL: PositiveFloat = Field(
+        description="Maximum time in seconds node execution changes stay buffered, in write-behind mode",
+        default=1.0,
+    )
+
+
+class DocumentExtractorConfig(BaseSettings):
+    """
+    Configuration for the workflow document extractor node
+    """
+
+    DOCUMENT_EXTRACTOR_CACHE_ENABLED: bool = Field(
+        description="Cache extracted text by upload file id or file content hash in local disk",
+        default=True,
+    )
+
+    DOCUMENT_EXTRACTOR_CACHE_TTL: PositiveInt = Field(
+        description="Seconds an extracted text is cached after it is written. Default to 1 day.",
+        default=24 * 60 * 60,
+    )
+
+    DOCUMENT_EXTRACTOR_LOCAL_CACHE_DIR: str = Field(
+        description="Directory of the extracted text cache,"
+        " defaults to a directory under the system temp dir",
+        default="",
+    )
+
+    DOCUMENT_EXTRACTOR_LOCAL_CACHE_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum total size in bytes of the extracted text cache, 0 to disable the cache."
+        " Default to 512 MB.",
+        default=512 * 1024 * 1024,
+    )
+
+    DOCUMENT_EXTRACTOR_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of files of an array input extracted concurrently, 1 to extract serially",
+        default=4,
+    )
+
 
 class AuthConfig(BaseSettings):
     """
@@ -497,6 +684,29 @@ class AuthConfig(BaseSettings):
         default=86400,
     )
 
+    API_TOKEN_CACHE_TTL: NonNegativeInt = Field(
+        description="Time (in seconds) service API tokens are cached in Redis, 0 to disable the caching",
+        default=600,
+    )
+
+    API_TOKEN_CACHE_MISS_TTL: NonNegativeInt = Field(
+        description="Time (in seconds) invalid service API tokens are cached in Redis, kept short since every"
+        " distinct invalid token adds a key, 0 to cache them in process only",
+        default=10,
+    )
+
+    API_TOKEN_CACHE_LOCAL_TTL: NonNegativeInt = Field(
+        description="Time (in seconds) service API tokens are cached in process, which is also the delay for a"
+        " deleted token to be rejected by every process, 0 to disable",
+        default=10,
+    )
+
+    API_TOKEN_LAST_USED_UPDATE_INTERVAL: PositiveInt = Field(
+        description="Interval (in seconds) at which the last used time of service API tokens is written to the"
+        " database",
+        default=60,
+    )
+
 
 class ModerationConfig(BaseSettings):
     """
@@ -613,6 +823,21 @@ class RagEtlConfig(BaseSettings):
         default="false",
     )
 
+    PDF_PLAINTEXT_CACHE_ENABLED: bool = Field(
+        description="Cache the text extracted from uploaded PDF files in storage, deleted with the files",
+        default=True,
+    )
+
+    PDF_PARALLEL_EXTRACT_PAGE_THRESHOLD: NonNegativeInt = Field(
+        description="Minimum page count for extracting a PDF with a process pool, 0 to always extract serially",
+        default=0,
+    )
+
+    PDF_PARALLEL_EXTRACT_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of processes used to extract the pages of a single PDF",
+        default=4,
+    )
+
 
 class DataSetConfig(BaseSettings):
     """
@@ -683,6 +908,18 @@ class VisionFormatConfig(BaseSettings):
         default="base64",
     )
 
+    MULTIMODAL_ENCODED_FILE_CACHE_SIZE: NonNegativeInt = Field(
+        description="Maximum total size in bytes of the in-process cache of base64 encoded files sent to models,"
+        " 0 to disable",
+        default=64 * 1024 * 1024,
+    )
+
+    MULTIMODAL_IMAGE_DOWNSCALE_ENABLED: bool = Field(
+        description="Downscale base64 encoded images to the resolution models use for the requested detail level"
+        " before sending them",
+        default=False,
+    )
+
 
 class CeleryBeatConfig(BaseSettings):
     CELERY_BEAT_SCHEDULER_TIME: int = Field(
@@ -691,6 +928,23 @@ class CeleryBeatConfig(BaseSettings):
     )
 
 
+class SchemaSnapshotConfig(BaseSettings):
+    """
+    Configuration for the snapshot of the model provider and builtin tool schemas
+    """
+
+    SCHEMA_SNAPSHOT_ENABLED: bool = Field(
+        description="Load the model provider, model and builtin tool schemas from a snapshot instead of parsing"
+        " their YAML files in each process, ignored in debug mode",
+        default=True,
+    )
+
+    SCHEMA_SNAPSHOT_PATH: str = Field(
+        description="Path of the schema snapshot, relative to the api directory",
+        default=".schema_snapshot.json",
+    )
+
+
 class PositionConfig(BaseSettings):
     POSITION_PROVIDER_PINS: str = Field(
         description="Comma-separated list of pinned model providers",
@@ -776,11 +1030,13 @@ class LoginConfig(BaseSettings):
 
 class FeatureConfig(
     # place the configs in alphabet order
+    AgentConfig,
     AppExecutionConfig,
     AuthConfig,  # Changed from OAuthConfig to AuthConfig
     BillingConfig,
     CodeExecutionSandboxConfig,
     DataSetConfig,
+    DocumentExtractorConfig,
     EndpointConfig,
     FileAccessConfig,
     FileUploadConfig,
@@ -791,9 +1047,13 @@ class FeatureConfig(
     LoggingConfig,
     MailConfig,
     ModelLoadBalanceConfig,
+    ModelProviderClientPoolConfig,
     ModerationConfig,
     PositionConfig,
+    ProviderCredentialsConfig,
+    ProviderUsageConfig,
     RagEtlConfig,
+    SchemaSnapshotConfig,
     SecurityConfig,
     ToolConfig,
     UpdateConfig,
@@ -68,6 +68,46 @@ class StorageConfig(BaseSettings):
         deprecated=True,
     )
 
+    STORAGE_BULK_OPERATION_MAX_WORKERS: PositiveInt = Field(
+        description="Maximum number of concurrent requests of bulk storage operations"
+        " on backends without a batch API.",
+        default=8,
+    )
+
+    STORAGE_LOCAL_CACHE_ENABLED: bool = Field(
+        description="Enable a local disk cache in front of the storage, serving repeated reads of objects"
+        " from the local disk.",
+        default=False,
+    )
+
+    STORAGE_LOCAL_CACHE_DIR: Optional[str] = Field(
+        description="Directory of the local storage cache. Defaults to a directory in the system temp directory.",
+        default=None,
+    )
+
+    STORAGE_LOCAL_CACHE_MAX_SIZE: NonNegativeInt = Field(
+        description="Maximum total size in bytes of the local storage cache,"
+        " least recently used objects are evicted above it.",
+        default=1024 * 1024 * 1024,
+    )
+
+    STORAGE_LOCAL_CACHE_IMMUTABLE_PREFIXES: str = Field(
+        description="Comma-separated key prefixes of objects that are never overwritten,"
+        " cached until they are evicted or deleted.",
+        default="upload_files/,tools/,image_files/,plaintext_files/,extracted_texts/,workflow_payloads/",
+    )
+
+    STORAGE_LOCAL_CACHE_TTL: NonNegativeInt = Field(
+        description="Time in seconds other objects are served from the local storage cache,"
+        " 0 to cache only objects with immutable prefixes."
+        " Objects overwritten by other nodes are stale for up to this time.",
+        default=0,
+    )
+
+    @computed_field
+    def STORAGE_LOCAL_CACHE_IMMUTABLE_PREFIX_LIST(self) -> list[str]:
+        return [prefix.strip() for prefix in self.STORAGE_LOCAL_CACHE_IMMUTABLE_PREFIXES.split(",") if prefix.strip()]
+
 
 class VectorStoreConfig(BaseSettings):
     VECTOR_STORE: Optional[str] = Field(
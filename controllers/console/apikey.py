@@ -12,6 +12,7 @@ from libs.helper import TimestampField
 from libs.login import login_required
 from models.dataset import Dataset
 from models.model import ApiToken, App
+from services.api_token_service import ApiTokenService
 
 from . import api
 from .wraps import account_initialization_required, setup_required
@@ -154,6 +155,7 @@ class BaseApiKeyResource(Resource):
 
         db.session.query(ApiToken).filter(ApiToken.id == api_key_id).delete()
         db.session.commit()
+        ApiTokenService.delete_cache(key.type, key.token)
 
         sync_remove_api_token(api_key_id)
         return {"result": "success"}, 204
@@ -22,6 +22,11 @@ from fields.conversation_fields import (
 from libs.helper import DatetimeString
 from libs.login import login_required
 from models import Conversation, EndUser, Message, MessageAnnotation
+from models.loaders import (
+    CONVERSATION_LIST_RELATIONS,
+    CONVERSATION_WITH_SUMMARY_LIST_RELATIONS,
+    prefetch_conversations,
+)
 from models.model import AppMode
 
 
@@ -91,6 +96,7 @@ class CompletionConversationApi(Resource):
         query = query.order_by(Conversation.created_at.desc())
 
         conversations = db.paginate(query, page=args["page"], per_page=args["limit"], error_out=False)
+        prefetch_conversations(conversations.items, CONVERSATION_LIST_RELATIONS)
 
         return conversations
 
@@ -256,6 +262,7 @@ class ChatConversationApi(Resource):
                 query = query.order_by(Conversation.created_at.desc())
 
         conversations = db.paginate(query, page=args["page"], per_page=args["limit"], error_out=False)
+        prefetch_conversations(conversations.items, CONVERSATION_WITH_SUMMARY_LIST_RELATIONS)
 
         return conversations
 
@@ -25,8 +25,9 @@ from core.model_runtime.errors.invoke import InvokeError
 from extensions.ext_database import db
 from fields.conversation_fields import annotation_fields, message_detail_fields
 from libs.helper import uuid_value
-from libs.infinite_scroll_pagination import InfiniteScrollPagination
+from libs.infinite_scroll_pagination import get_keyset, paginate_by_keyset
 from libs.login import login_required
+from models.loaders import MESSAGE_DETAIL_LIST_RELATIONS, prefetch_messages
 from models.model import AppMode, Conversation, Message, MessageAnnotation, MessageFeedback
 from services.annotation_service import AppAnnotationService
 from services.errors.conversation import ConversationNotExistsError
@@ -62,55 +63,24 @@ class ChatMessageListApi(Resource):
         if not conversation:
             raise NotFound("Conversation Not Exists.")
 
+        base_query = db.session.query(Message).filter(Message.conversation_id == conversation.id)
+        sort_columns = (Message.created_at, Message.id)
+
+        after = None
         if args["first_id"]:
-            first_message = (
-                db.session.query(Message)
-                .filter(Message.conversation_id == conversation.id, Message.id == args["first_id"])
-                .first()
-            )
+            first_message = base_query.filter(Message.id == args["first_id"]).first()
 
             if not first_message:
                 raise NotFound("First message not found")
 
-            history_messages = (
-                db.session.query(Message)
-                .filter(
-                    Message.conversation_id == conversation.id,
-                    Message.created_at < first_message.created_at,
-                    Message.id != first_message.id,
-                )
-                .order_by(Message.created_at.desc())
-                .limit(args["limit"])
-                .all()
-            )
-        else:
-            history_messages = (
-                db.session.query(Message)
-                .filter(Message.conversation_id == conversation.id)
-                .order_by(Message.created_at.desc())
-                .limit(args["limit"])
-                .all()
-            )
-
-        has_more = False
-        if len(history_messages) == args["limit"]:
-            current_page_first_message = history_messages[-1]
-            rest_count = (
-                db.session.query(Message)
-                .filter(
-                    Message.conversation_id == conversation.id,
-                    Message.created_at < current_page_first_message.created_at,
-                    Message.id != current_page_first_message.id,
-                )
-                .count()
-            )
+            after = get_keyset(first_message, sort_columns)
 
-            if rest_count > 0:
-                has_more = True
+        pagination = paginate_by_keyset(base_query, sort_columns, args["limit"], after=after)
 
-        history_messages = list(reversed(history_messages))
+        pagination.data = list(reversed(pagination.data))
+        prefetch_messages(pagination.data, MESSAGE_DETAIL_LIST_RELATIONS)
 
-        return InfiniteScrollPagination(data=history_messages, limit=args["limit"], has_more=has_more)
+        return pagination
 
 
 class MessageFeedbackApi(Resource):
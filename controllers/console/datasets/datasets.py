@@ -25,6 +25,7 @@ from fields.document_fields import document_status_fields
 from libs.login import login_required
 from models import ApiToken, Dataset, Document, DocumentSegment, UploadFile
 from models.dataset import DatasetPermissionEnum
+from services.api_token_service import ApiTokenService
 from services.dataset_service import DatasetPermissionService, DatasetService, DocumentService
 
 
@@ -599,6 +600,7 @@ class DatasetApiDeleteApi(Resource):
 
         db.session.query(ApiToken).filter(ApiToken.id == api_key_id).delete()
         db.session.commit()
+        ApiTokenService.delete_cache(key.type, key.token)
 
         return {"result": "success"}, 204
 
@@ -1,12 +1,10 @@
 import logging
-from argparse import ArgumentTypeError
 from datetime import UTC, datetime
 
 from flask import request
 from flask_login import current_user
 from flask_restful import Resource, fields, marshal, marshal_with, reqparse
 from sqlalchemy import asc, desc
-from transformers.hf_argparser import string_to_bool
 from werkzeug.exceptions import Forbidden, NotFound
 
 import services
@@ -147,10 +145,7 @@ class DatasetDocumentListApi(Resource):
         search = request.args.get("keyword", default=None, type=str)
         sort = request.args.get("sort", default="-created_at", type=str)
         # "yes", "true", "t", "y", "1" convert to True, while others convert to False.
-        try:
-            fetch = string_to_bool(request.args.get("fetch", default="false"))
-        except (ArgumentTypeError, ValueError, Exception) as e:
-            fetch = False
+        fetch = request.args.get("fetch", default="false").lower() in {"yes", "true", "t", "y", "1"}
         dataset = DatasetService.get_dataset(dataset_id)
         if not dataset:
             raise NotFound("Dataset not found.")
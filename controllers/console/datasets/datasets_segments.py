@@ -1,7 +1,6 @@
 import uuid
 from datetime import UTC, datetime
 
-import pandas as pd
 from flask import request
 from flask_login import current_user
 from flask_restful import Resource, marshal, reqparse
@@ -375,6 +374,8 @@ class DatasetDocumentSegmentBatchImportApi(Resource):
         if not file.filename.endswith(".csv"):
             raise ValueError("Invalid file type. Only CSV files are allowed")
 
+        import pandas as pd
+
         try:
             # Skip the first row
             df = pd.read_csv(file)
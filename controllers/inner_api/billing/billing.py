@@ -0,0 +1,22 @@
+from flask_restful import Resource, reqparse
+
+from controllers.console.wraps import setup_required
+from controllers.inner_api import api
+from controllers.inner_api.wraps import inner_api_only
+from services.feature_service import FeatureService
+
+
+class BillingFeaturesInvalidation(Resource):
+    @setup_required
+    @inner_api_only
+    def post(self):
+        parser = reqparse.RequestParser()
+        parser.add_argument("tenant_id", type=str, required=True, location="json")
+        args = parser.parse_args()
+
+        FeatureService.invalidate_features(args["tenant_id"])
+
+        return {"result": "success"}
+
+
+api.add_resource(BillingFeaturesInvalidation, "/billing/features/invalidate")
@@ -1,5 +1,4 @@
 from collections.abc import Callable
-from datetime import UTC, datetime
 from enum import Enum
 from functools import wraps
 from typing import Optional
@@ -14,7 +13,8 @@ from configs import dify_config
 from extensions.ext_database import db
 from libs.login import _get_user
 from models.account import Account, Tenant, TenantAccountJoin, TenantStatus
-from models.model import ApiToken, App, EndUser
+from models.model import App, EndUser
+from services.api_token_service import ApiTokenService
 from services.feature_service import FeatureService
 
 
@@ -112,7 +112,7 @@ def cloud_edition_billing_resource_check(resource: str, api_token_type: str):
     def interceptor(view):
         def decorated(*args, **kwargs):
             api_token = validate_and_get_api_token(api_token_type)
-            features = FeatureService.get_features(api_token.tenant_id)
+            features = FeatureService.get_features(api_token.tenant_id, refresh=True)
 
             if features.billing.enabled:
                 members = features.members
@@ -211,20 +211,11 @@ def validate_and_get_api_token(scope=None):
     if auth_scheme != "bearer":
         raise Unauthorized("Authorization scheme must be 'Bearer'")
 
-    api_token = (
-        db.session.query(ApiToken)
-        .filter(
-            ApiToken.token == auth_token,
-            ApiToken.type == scope,
-        )
-        .first()
-    )
-
+    api_token = ApiTokenService.get_api_token(scope, auth_token)
     if not api_token:
         raise Unauthorized("Access token is invalid")
 
-    api_token.last_used_at = datetime.now(UTC).replace(tzinfo=None)
-    db.session.commit()
+    ApiTokenService.record_usage(api_token)
 
     return api_token
 
@@ -0,0 +1,82 @@
+import json
+from json import JSONDecodeError
+
+from configs import dify_config
+from core.model_runtime.entities import AssistantPromptMessage, PromptMessage, PromptMessageRole, ToolPromptMessage
+from extensions.ext_redis import redis_client
+
+
+class AgentHistoryCache:
+    """
+    Cache of the assistant and tool prompt messages organized from the agent thoughts of finished messages,
+    keyed by message id, so a new turn only organizes the messages added since the last one.
+
+    User prompts are not cached, they may embed signed file urls that expire.
+    """
+
+    def __init__(self, conversation_id: str):
+        self.cache_key = f"agent_history:conversation_id:{conversation_id}"
+
+    @property
+    def enabled(self) -> bool:
+        return dify_config.AGENT_HISTORY_CACHE_TTL > 0
+
+    def get(self) -> dict[str, list[PromptMessage]]:
+        """
+        Get cached prompt messages by message id.
+
+        :return:
+        """
+        if not self.enabled:
+            return {}
+
+        cached_history = redis_client.get(self.cache_key)
+        if not cached_history:
+            return {}
+
+        try:
+            cached_history = json.loads(cached_history.decode("utf-8"))
+            return {
+                message_id: [self._load_prompt_message(prompt_message) for prompt_message in prompt_messages]
+                for message_id, prompt_messages in cached_history.items()
+            }
+        except (JSONDecodeError, ValueError):
+            return {}
+
+    def set(self, history: dict[str, list[PromptMessage]]) -> None:
+        """
+        Cache prompt messages by message id, replacing the cached ones.
+
+        :param history: prompt messages by message id
+        :return:
+        """
+        if not self.enabled:
+            return
+
+        redis_client.setex(
+            self.cache_key,
+            dify_config.AGENT_HISTORY_CACHE_TTL,
+            json.dumps(
+                {
+                    message_id: [prompt_message.model_dump(mode="json") for prompt_message in prompt_messages]
+                    for message_id, prompt_messages in history.items()
+                }
+            ),
+        )
+
+    def delete(self) -> None:
+        """
+        Delete cached prompt messages.
+
+        :return:
+        """
+        redis_client.delete(self.cache_key)
+
+    @staticmethod
+    def _load_prompt_message(prompt_message: dict) -> PromptMessage:
+        role = PromptMessageRole.value_of(prompt_message.get("role"))
+        if role == PromptMessageRole.ASSISTANT:
+            return AssistantPromptMessage.model_validate(prompt_message)
+        if role == PromptMessageRole.TOOL:
+            return ToolPromptMessage.model_validate(prompt_message)
+        raise ValueError(f"unexpected cached prompt message role {role.value}")
@@ -5,6 +5,8 @@ from collections.abc import Mapping, Sequence
 from datetime import UTC, datetime
 from typing import Optional, Union, cast
 
+from configs import dify_config
+from core.agent.agent_history_cache import AgentHistoryCache
 from core.agent.entities import AgentEntity, AgentToolEntity
 from core.app.app_config.features.file_upload.manager import FileUploadConfigManager
 from core.app.apps.agent_chat.app_config_manager import AgentChatAppConfig
@@ -44,7 +46,7 @@ from core.tools.tool.tool import Tool
 from core.tools.tool_manager import ToolManager
 from extensions.ext_database import db
 from factories import file_factory
-from models.model import Conversation, Message, MessageAgentThought, MessageFile
+from models.model import AppModelConfig, Conversation, Message, MessageAgentThought, MessageFile
 from models.tools import ToolConversationVariables
 
 logger = logging.getLogger(__name__)
@@ -427,84 +429,135 @@ class BaseAgentRunner(AppRunner):
             if isinstance(prompt_message, SystemPromptMessage):
                 result.append(prompt_message)
 
-        messages: list[Message] = (
-            db.session.query(Message)
+        # only the latest messages are needed, older ones are dropped by the history prompt transform anyway
+        messages = (
+            db.session.query(
+                Message.id,
+                Message.query,
+                Message.answer,
+                Message.parent_message_id,
+            )
             .filter(
                 Message.conversation_id == self.message.conversation_id,
             )
             .order_by(Message.created_at.desc())
+            .limit(dify_config.AGENT_HISTORY_MAX_MESSAGES)
             .all()
         )
 
-        messages = list(reversed(extract_thread_messages(messages)))
-
+        messages = [message for message in reversed(extract_thread_messages(messages)) if message.id != self.message.id]
+        if not messages:
+            db.session.close()
+            return result
+
+        message_ids = [message.id for message in messages]
+        history_cache = AgentHistoryCache(self.message.conversation_id)
+        cached_history = history_cache.get()
+
+        # prefetch files and agent thoughts of all the messages in one query each
+        message_files: dict[str, list[MessageFile]] = {}
+        for message_file in db.session.query(MessageFile).filter(MessageFile.message_id.in_(message_ids)).all():
+            message_files.setdefault(message_file.message_id, []).append(message_file)
+
+        agent_thoughts: dict[str, list[MessageAgentThought]] = {}
+        uncached_message_ids = [message_id for message_id in message_ids if message_id not in cached_history]
+        if uncached_message_ids:
+            for agent_thought in (
+                db.session.query(MessageAgentThought)
+                .filter(MessageAgentThought.message_id.in_(uncached_message_ids))
+                .order_by(MessageAgentThought.position.asc())
+                .all()
+            ):
+                agent_thoughts.setdefault(agent_thought.message_id, []).append(agent_thought)
+
+        history: dict[str, list[PromptMessage]] = {}
         for message in messages:
-            if message.id == self.message.id:
-                continue
+            result.append(self.organize_agent_user_prompt(message, message_files.get(message.id, [])))
+            if message.id in cached_history:
+                assistant_prompt_messages = cached_history[message.id]
+            else:
+                assistant_prompt_messages = self._organize_agent_thoughts(message, agent_thoughts.get(message.id, []))
+            result.extend(assistant_prompt_messages)
+            # messages still being answered may get more thoughts, only cache the finished ones
+            if message.answer:
+                history[message.id] = assistant_prompt_messages
 
-            result.append(self.organize_agent_user_prompt(message))
-            agent_thoughts: list[MessageAgentThought] = message.agent_thoughts
-            if agent_thoughts:
-                for agent_thought in agent_thoughts:
-                    tools = agent_thought.tool
-                    if tools:
-                        tools = tools.split(";")
-                        tool_calls: list[AssistantPromptMessage.ToolCall] = []
-                        tool_call_response: list[ToolPromptMessage] = []
-                        try:
-                            tool_inputs = json.loads(agent_thought.tool_input)
-                        except Exception as e:
-                            tool_inputs = {tool: {} for tool in tools}
-                        try:
-                            tool_responses = json.loads(agent_thought.observation)
-                        except Exception as e:
-                            tool_responses = dict.fromkeys(tools, agent_thought.observation)
-
-                        for tool in tools:
-                            # generate a uuid for tool call
-                            tool_call_id = str(uuid.uuid4())
-                            tool_calls.append(
-                                AssistantPromptMessage.ToolCall(
-                                    id=tool_call_id,
-                                    type="function",
-                                    function=AssistantPromptMessage.ToolCall.ToolCallFunction(
-                                        name=tool,
-                                        arguments=json.dumps(tool_inputs.get(tool, {})),
-                                    ),
-                                )
-                            )
-                            tool_call_response.append(
-                                ToolPromptMessage(
-                                    content=tool_responses.get(tool, agent_thought.observation),
-                                    name=tool,
-                                    tool_call_id=tool_call_id,
-                                )
-                            )
+        if history.keys() != cached_history.keys():
+            history_cache.set(history)
 
-                        result.extend(
-                            [
-                                AssistantPromptMessage(
-                                    content=agent_thought.thought,
-                                    tool_calls=tool_calls,
+        db.session.close()
+
+        return result
+
+    def _organize_agent_thoughts(
+        self, message: Message, agent_thoughts: list[MessageAgentThought]
+    ) -> list[PromptMessage]:
+        """
+        Organize the assistant and tool prompt messages of a history message
+        """
+        result = []
+        if agent_thoughts:
+            for agent_thought in agent_thoughts:
+                tools = agent_thought.tool
+                if tools:
+                    tools = tools.split(";")
+                    tool_calls: list[AssistantPromptMessage.ToolCall] = []
+                    tool_call_response: list[ToolPromptMessage] = []
+                    try:
+                        tool_inputs = json.loads(agent_thought.tool_input)
+                    except Exception as e:
+                        tool_inputs = {tool: {} for tool in tools}
+                    try:
+                        tool_responses = json.loads(agent_thought.observation)
+                    except Exception as e:
+                        tool_responses = dict.fromkeys(tools, agent_thought.observation)
+
+                    for tool in tools:
+                        # generate a uuid for tool call
+                        tool_call_id = str(uuid.uuid4())
+                        tool_calls.append(
+                            AssistantPromptMessage.ToolCall(
+                                id=tool_call_id,
+                                type="function",
+                                function=AssistantPromptMessage.ToolCall.ToolCallFunction(
+                                    name=tool,
+                                    arguments=json.dumps(tool_inputs.get(tool, {})),
                                 ),
-                                *tool_call_response,
-                            ]
+                            )
+                        )
+                        tool_call_response.append(
+                            ToolPromptMessage(
+                                content=tool_responses.get(tool, agent_thought.observation),
+                                name=tool,
+                                tool_call_id=tool_call_id,
+                            )
                         )
-                    if not tools:
-                        result.append(AssistantPromptMessage(content=agent_thought.thought))
-            else:
-                if message.answer:
-                    result.append(AssistantPromptMessage(content=message.answer))
 
-        db.session.close()
+                    result.extend(
+                        [
+                            AssistantPromptMessage(
+                                content=agent_thought.thought,
+                                tool_calls=tool_calls,
+                            ),
+                            *tool_call_response,
+                        ]
+                    )
+                if not tools:
+                    result.append(AssistantPromptMessage(content=agent_thought.thought))
+        else:
+            if message.answer:
+                result.append(AssistantPromptMessage(content=message.answer))
 
         return result
 
-    def organize_agent_user_prompt(self, message: Message) -> UserPromptMessage:
-        files = db.session.query(MessageFile).filter(MessageFile.message_id == message.id).all()
+    def organize_agent_user_prompt(
+        self, message: Message, files: Optional[list[MessageFile]] = None
+    ) -> UserPromptMessage:
+        if files is None:
+            files = db.session.query(MessageFile).filter(MessageFile.message_id == message.id).all()
         if not files:
             return UserPromptMessage(content=message.query)
-        file_extra_config = FileUploadConfigManager.convert(message.app_model_config.to_dict())
+        file_extra_config = self._get_history_file_upload_config()
         if not file_extra_config:
             return UserPromptMessage(content=message.query)
 
@@ -526,3 +579,19 @@ class BaseAgentRunner(AppRunner):
                 )
             )
         return UserPromptMessage(content=prompt_message_contents)
+
+    def _get_history_file_upload_config(self):
+        """
+        Get the file upload config of the history messages, the one of the conversation's app model config
+        """
+        if not hasattr(self, "_history_file_upload_config"):
+            app_model_config = (
+                db.session.query(AppModelConfig)
+                .join(Conversation, Conversation.app_model_config_id == AppModelConfig.id)
+                .filter(Conversation.id == self.message.conversation_id)
+                .first()
+            )
+            self._history_file_upload_config = (
+                FileUploadConfigManager.convert(app_model_config.to_dict()) if app_model_config else None
+            )
+        return self._history_file_upload_config
@@ -80,3 +80,6 @@ class AgentEntity(BaseModel):
     prompt: Optional[AgentPromptEntity] = None
     tools: list[AgentToolEntity] = None
     max_iteration: int = 5
+    parallel_tool_calls: bool = False
+    max_parallel_tool_calls: Optional[int] = None
+    tool_call_timeout: Optional[float] = None
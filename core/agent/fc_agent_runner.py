@@ -1,12 +1,19 @@
 import json
 import logging
-from collections.abc import Generator
+import threading
+import time
+from collections.abc import Generator, Mapping
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from copy import deepcopy
 from typing import Any, Optional, Union
 
+from flask import current_app
+
+from configs import dify_config
 from core.agent.base_agent_runner import BaseAgentRunner
 from core.app.apps.base_app_queue_manager import PublishFrom
 from core.app.entities.queue_entities import QueueAgentThoughtEvent, QueueMessageEndEvent, QueueMessageFileEvent
+from core.callback_handler.agent_tool_callback_handler import DifyAgentCallbackHandler
 from core.file import file_manager
 from core.model_runtime.entities import (
     AssistantPromptMessage,
@@ -23,10 +30,13 @@ from core.model_runtime.entities import (
     UserPromptMessage,
 )
 from core.model_runtime.entities.message_entities import ImagePromptMessageContent
+from core.ops.ops_trace_manager import TraceQueueManager
 from core.prompt.agent_history_prompt_transform import AgentHistoryPromptTransform
 from core.tools.entities.tool_entities import ToolInvokeMeta
+from core.tools.tool.tool import Tool
 from core.tools.tool_engine import ToolEngine
-from models.model import Message
+from extensions.ext_database import db
+from models.model import Message, MessageFile
 
 logger = logging.getLogger(__name__)
 
@@ -219,53 +229,28 @@ class FunctionCallAgentRunner(BaseAgentRunner):
 
             # call tools
             tool_responses = []
-            for tool_call_id, tool_call_name, tool_call_args in tool_calls:
-                tool_instance = tool_instances.get(tool_call_name)
-                if not tool_instance:
-                    tool_response = {
-                        "tool_call_id": tool_call_id,
-                        "tool_call_name": tool_call_name,
-                        "tool_response": f"there is not a tool named {tool_call_name}",
-                        "meta": ToolInvokeMeta.error_instance(f"there is not a tool named {tool_call_name}").to_dict(),
-                    }
-                else:
-                    # invoke tool
-                    tool_invoke_response, message_files, tool_invoke_meta = ToolEngine.agent_invoke(
-                        tool=tool_instance,
-                        tool_parameters=tool_call_args,
-                        user_id=self.user_id,
-                        tenant_id=self.tenant_id,
-                        message=self.message,
-                        invoke_from=self.application_generate_entity.invoke_from,
-                        agent_tool_callback=self.agent_callback,
-                        trace_manager=trace_manager,
-                    )
-                    # publish files
-                    for message_file_id, save_as in message_files:
-                        if save_as:
-                            self.variables_pool.set_file(tool_name=tool_call_name, value=message_file_id, name=save_as)
-
-                        # publish message file
-                        self.queue_manager.publish(
-                            QueueMessageFileEvent(message_file_id=message_file_id), PublishFrom.APPLICATION_MANAGER
+            for tool_response, message_files in self._invoke_tools(tool_instances, tool_calls, trace_manager):
+                # publish files
+                for message_file_id, save_as in message_files:
+                    if save_as:
+                        self.variables_pool.set_file(
+                            tool_name=tool_response["tool_call_name"], value=message_file_id, name=save_as
                         )
-                        # add message file ids
-                        message_file_ids.append(message_file_id)
 
-                    tool_response = {
-                        "tool_call_id": tool_call_id,
-                        "tool_call_name": tool_call_name,
-                        "tool_response": tool_invoke_response,
-                        "meta": tool_invoke_meta.to_dict(),
-                    }
+                    # publish message file
+                    self.queue_manager.publish(
+                        QueueMessageFileEvent(message_file_id=message_file_id), PublishFrom.APPLICATION_MANAGER
+                    )
+                    # add message file ids
+                    message_file_ids.append(message_file_id)
 
                 tool_responses.append(tool_response)
                 if tool_response["tool_response"] is not None:
                     self._current_thoughts.append(
                         ToolPromptMessage(
                             content=tool_response["tool_response"],
-                            tool_call_id=tool_call_id,
-                            name=tool_call_name,
+                            tool_call_id=tool_response["tool_call_id"],
+                            name=tool_response["tool_call_name"],
                         )
                     )
 
@@ -311,6 +296,165 @@ class FunctionCallAgentRunner(BaseAgentRunner):
             PublishFrom.APPLICATION_MANAGER,
         )
 
+    def _invoke_tools(
+        self,
+        tool_instances: Mapping[str, Tool],
+        tool_calls: list[tuple[str, str, dict[str, Any]]],
+        trace_manager: Optional[TraceQueueManager] = None,
+    ) -> list[tuple[dict, list[tuple[str, str]]]]:
+        """
+        Invoke the tool calls of one LLM turn, concurrently if parallel tool calls are enabled for the app.
+
+        Results are returned in the order of the tool calls whatever order the tools finish in,
+        so the prompt and the saved agent thought do not depend on tool latency.
+
+        Returns:
+            List[Tuple[Dict, List[Tuple[str, str]]]]: [(tool_response, [(message_file_id, save_as)])]
+        """
+        agent = self.app_config.agent
+        if not agent or not agent.parallel_tool_calls or len(tool_calls) <= 1:
+            return [
+                self._invoke_tool(
+                    tool_instances,
+                    tool_call_id,
+                    tool_call_name,
+                    tool_call_args,
+                    self.message,
+                    self.agent_callback,
+                    trace_manager,
+                )
+                for tool_call_id, tool_call_name, tool_call_args in tool_calls
+            ]
+
+        max_workers = min(
+            agent.max_parallel_tool_calls or dify_config.AGENT_MAX_PARALLEL_TOOL_CALLS,
+            dify_config.AGENT_MAX_PARALLEL_TOOL_CALLS,
+            len(tool_calls),
+        )
+        timeout = agent.tool_call_timeout or dify_config.AGENT_TOOL_CALL_TIMEOUT
+        flask_app = current_app._get_current_object()
+        # workers load the message in their own session, the instance of this thread is not shared with them
+        message_id = self.message.id
+        callback_color = self.agent_callback.color
+        # the timeout of a tool call starts when a worker picks it up, not when it is queued
+        started_at: dict[int, float] = {}
+        # tool calls that returned, and tool calls given up on, guarded by the lock so a call is never both
+        lock = threading.Lock()
+        finished: set[int] = set()
+        timed_out: set[int] = set()
+
+        def invoke(index: int, tool_call_id: str, tool_call_name: str, tool_call_args: dict[str, Any]):
+            started_at[index] = time.monotonic()
+            with flask_app.app_context():
+                message = db.session.get(Message, message_id)
+                result = self._invoke_tool(
+                    tool_instances,
+                    tool_call_id,
+                    tool_call_name,
+                    tool_call_args,
+                    message,
+                    DifyAgentCallbackHandler(color=callback_color),
+                    trace_manager,
+                )
+                with lock:
+                    if index not in timed_out:
+                        finished.add(index)
+                        return result
+                # the files of a timed out tool call are not in the prompt nor in the answer
+                _, message_files = result
+                if message_files:
+                    db.session.query(MessageFile).filter(
+                        MessageFile.id.in_([message_file_id for message_file_id, _ in message_files])
+                    ).delete(synchronize_session=False)
+                    db.session.commit()
+                return result
+
+        results: list[Optional[tuple[dict, list[tuple[str, str]]]]] = [None] * len(tool_calls)
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent_tool_call")
+        try:
+            futures = {executor.submit(invoke, index, *tool_call): index for index, tool_call in enumerate(tool_calls)}
+            pending = set(futures)
+            while pending:
+                now = time.monotonic()
+                deadlines = [started_at[futures[f]] + timeout for f in pending if futures[f] in started_at]
+                done, pending = wait(
+                    pending,
+                    timeout=max(min(deadlines) - now, 0) if deadlines else timeout,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    results[futures[future]] = future.result()
+
+                now = time.monotonic()
+                for future in list(pending):
+                    index = futures[future]
+                    if index not in started_at or now - started_at[index] < timeout:
+                        continue
+                    with lock:
+                        if index in finished:
+                            # returned just now, its result is collected by the next wait
+                            continue
+                        timed_out.add(index)
+                    # the worker thread cannot be interrupted, it deletes the message files it creates
+                    # once it finishes, and its result is dropped
+                    pending.discard(future)
+                    tool_call_id, tool_call_name, _ = tool_calls[index]
+                    logger.warning(f"Tool {tool_call_name} timed out after {timeout} seconds")
+                    error = f"tool invoke error: tool call timed out after {timeout} seconds"
+                    results[index] = (
+                        {
+                            "tool_call_id": tool_call_id,
+                            "tool_call_name": tool_call_name,
+                            "tool_response": error,
+                            "meta": ToolInvokeMeta.error_instance(error).to_dict(),
+                        },
+                        [],
+                    )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
+
+    def _invoke_tool(
+        self,
+        tool_instances: Mapping[str, Tool],
+        tool_call_id: str,
+        tool_call_name: str,
+        tool_call_args: dict[str, Any],
+        message: Message,
+        agent_callback: DifyAgentCallbackHandler,
+        trace_manager: Optional[TraceQueueManager] = None,
+    ) -> tuple[dict, list[tuple[str, str]]]:
+        """
+        Invoke a single tool call, returns the tool response and the message files it created
+        """
+        tool_instance = tool_instances.get(tool_call_name)
+        if not tool_instance:
+            return {
+                "tool_call_id": tool_call_id,
+                "tool_call_name": tool_call_name,
+                "tool_response": f"there is not a tool named {tool_call_name}",
+                "meta": ToolInvokeMeta.error_instance(f"there is not a tool named {tool_call_name}").to_dict(),
+            }, []
+
+        # invoke tool
+        tool_invoke_response, message_files, tool_invoke_meta = ToolEngine.agent_invoke(
+            tool=tool_instance,
+            tool_parameters=tool_call_args,
+            user_id=self.user_id,
+            tenant_id=self.tenant_id,
+            message=message,
+            invoke_from=self.application_generate_entity.invoke_from,
+            agent_tool_callback=agent_callback,
+            trace_manager=trace_manager,
+        )
+        return {
+            "tool_call_id": tool_call_id,
+            "tool_call_name": tool_call_name,
+            "tool_response": tool_invoke_response,
+            "meta": tool_invoke_meta.to_dict(),
+        }, message_files
+
     def check_tool_calls(self, llm_result_chunk: LLMResultChunk) -> bool:
         """
         Check if there is any tool call in llm result chunk
@@ -76,6 +76,9 @@ class AgentConfigManager:
                     prompt=agent_prompt_entity,
                     tools=agent_tools,
                     max_iteration=agent_dict.get("max_iteration", 5),
+                    parallel_tool_calls=agent_dict.get("parallel_tool_calls", False),
+                    max_parallel_tool_calls=agent_dict.get("max_parallel_tool_calls"),
+                    tool_call_timeout=agent_dict.get("tool_call_timeout"),
                 )
 
         return None
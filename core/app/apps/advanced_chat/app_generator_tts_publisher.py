@@ -4,7 +4,10 @@ import logging
 import queue
 import re
 import threading
+from collections import deque
+from typing import Optional
 
+from configs import dify_config
 from core.app.entities.queue_entities import (
     QueueAgentMessageEvent,
     QueueLLMChunkEvent,
@@ -14,6 +17,23 @@ from core.app.entities.queue_entities import (
 from core.model_manager import ModelManager
 from core.model_runtime.entities.model_entities import ModelType
 
+logger = logging.getLogger(__name__)
+
+# TTS requests of every message of the process share the pool
+_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=dify_config.TTS_AUTO_PLAY_WORKER_POOL_SIZE, thread_name_prefix="tts"
+                )
+    return _executor
+
 
 class AudioTrunk:
     def __init__(self, status: str, audio):
@@ -21,36 +41,44 @@ class AudioTrunk:
         self.status = status
 
 
-def _invoice_tts(text_content: str, model_instance, tenant_id: str, voice: str):
-    if not text_content or text_content.isspace():
-        return
-    return model_instance.invoke_tts(
-        content_text=text_content.strip(), user="responding_tts", tenant_id=tenant_id, voice=voice
-    )
+class _AudioSegment:
+    """
+    Audio of a text segment, streamed by a worker of the pool as it is synthesized.
+    """
 
+    END = object()
 
-def _process_future(future_queue, audio_queue):
-    while True:
-        try:
-            future = future_queue.get()
-            if future is None:
-                break
-            for audio in future.result():
-                audio_base64 = base64.b64encode(bytes(audio))
-                audio_queue.put(AudioTrunk("responding", audio=audio_base64))
-        except Exception as e:
-            logging.getLogger(__name__).warning(e)
-            break
-    audio_queue.put(AudioTrunk("finish", b""))
+    def __init__(self):
+        self.chunks: queue.Queue = queue.Queue()
+
+
+def _invoice_tts(text_content: str, model_instance, tenant_id: str, voice: str, segment: _AudioSegment):
+    try:
+        if not text_content or text_content.isspace():
+            return
+        for audio in model_instance.invoke_tts(
+            content_text=text_content.strip(), user="responding_tts", tenant_id=tenant_id, voice=voice
+        ):
+            segment.chunks.put(base64.b64encode(bytes(audio)))
+    except Exception as e:
+        logger.warning(e)
+    finally:
+        segment.chunks.put(_AudioSegment.END)
 
 
 class AppGeneratorTTSPublisher:
+    """
+    Synthesizes the text of a streamed message sentence by sentence.
+
+    Text segments are synthesized by a pool shared by all the messages of the process, and their audio is
+    returned in order by check_and_get_audio. At most TTS_AUTO_PLAY_MAX_PENDING_SEGMENTS segments of a
+    message are synthesized or buffered at a time, text is accumulated until one of them is consumed.
+    """
+
     def __init__(self, tenant_id: str, voice: str):
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
         self.tenant_id = tenant_id
         self.msg_text = ""
-        self._audio_queue = queue.Queue()
-        self._msg_queue = queue.Queue()
         self.match = re.compile(r"[。.!?]")
         self.model_manager = ModelManager()
         self.model_instance = self.model_manager.get_default_model_instance(
@@ -62,76 +90,86 @@ class AppGeneratorTTSPublisher:
         if not voice or voice not in values:
             self.voice = self.voices[0].get("value")
         self.MAX_SENTENCE = 2
-        self._last_audio_event = None
-        self._runtime_thread = threading.Thread(target=self._runtime).start()
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=3)
+        self.last_message = None
+        # sentences in msg_text, and the end of the last one
+        self._sentence_count = 0
+        self._sentence_end = 0
+        self._segments: deque[_AudioSegment] = deque()
+        self._closed = False
 
     def publish(self, message):
         try:
-            self._msg_queue.put(message)
+            if message is None:
+                self._closed = True
+                self._submit_pending()
+                return
+
+            if isinstance(message.event, QueueAgentMessageEvent | QueueLLMChunkEvent):
+                text = message.event.chunk.delta.message.content
+            elif isinstance(message.event, QueueTextChunkEvent):
+                text = message.event.text
+            elif isinstance(message.event, QueueNodeSucceededEvent):
+                text = message.event.outputs.get("output", "")
+            else:
+                text = ""
+            self.last_message = message
+            if text:
+                self._append_text(text)
         except Exception as e:
             self.logger.warning(e)
 
-    def _runtime(self):
-        future_queue = queue.Queue()
-        threading.Thread(target=_process_future, args=(future_queue, self._audio_queue)).start()
-        while True:
+    def check_and_get_audio(self) -> AudioTrunk | None:
+        """
+        Get the next audio chunk without waiting.
+
+        :return: the next chunk, a finish trunk once all the text is synthesized, or None if the next chunk
+            is not synthesized yet
+        """
+        while self._segments:
             try:
-                message = self._msg_queue.get()
-                if message is None:
-                    if self.msg_text and len(self.msg_text.strip()) > 0:
-                        futures_result = self.executor.submit(
-                            _invoice_tts, self.msg_text, self.model_instance, self.tenant_id, self.voice
-                        )
-                        future_queue.put(futures_result)
-                    break
-                elif isinstance(message.event, QueueAgentMessageEvent | QueueLLMChunkEvent):
-                    self.msg_text += message.event.chunk.delta.message.content
-                elif isinstance(message.event, QueueTextChunkEvent):
-                    self.msg_text += message.event.text
-                elif isinstance(message.event, QueueNodeSucceededEvent):
-                    self.msg_text += message.event.outputs.get("output", "")
-                self.last_message = message
-                sentence_arr, text_tmp = self._extract_sentence(self.msg_text)
-                if len(sentence_arr) >= min(self.MAX_SENTENCE, 7):
-                    self.MAX_SENTENCE += 1
-                    text_content = "".join(sentence_arr)
-                    futures_result = self.executor.submit(
-                        _invoice_tts, text_content, self.model_instance, self.tenant_id, self.voice
-                    )
-                    future_queue.put(futures_result)
-                    if text_tmp:
-                        self.msg_text = text_tmp
-                    else:
-                        self.msg_text = ""
-
-            except Exception as e:
-                self.logger.warning(e)
-                break
-        future_queue.put(None)
+                chunk = self._segments[0].chunks.get_nowait()
+            except queue.Empty:
+                return None
+            if chunk is _AudioSegment.END:
+                self._segments.popleft()
+                self._submit_pending()
+                continue
+            return AudioTrunk("responding", audio=chunk)
 
-    def check_and_get_audio(self) -> AudioTrunk | None:
-        try:
-            if self._last_audio_event and self._last_audio_event.status == "finish":
-                if self.executor:
-                    self.executor.shutdown(wait=False)
-                return self.last_message
-            audio = self._audio_queue.get_nowait()
-            if audio and audio.status == "finish":
-                self.executor.shutdown(wait=False)
-                self._runtime_thread = None
-            if audio:
-                self._last_audio_event = audio
-            return audio
-        except queue.Empty:
-            return None
-
-    def _extract_sentence(self, org_text):
-        tx = self.match.finditer(org_text)
-        start = 0
-        result = []
-        for i in tx:
-            end = i.regs[0][1]
-            result.append(org_text[start:end])
-            start = end
-        return result, org_text[start:]
+        if self._closed and not self.msg_text:
+            return AudioTrunk("finish", b"")
+        return None
+
+    def _append_text(self, text: str):
+        offset = len(self.msg_text)
+        self.msg_text += text
+        # the sentence delimiters are single characters, so only the new text needs to be scanned
+        for match in self.match.finditer(text):
+            self._sentence_count += 1
+            self._sentence_end = offset + match.end()
+
+        if self._sentence_count >= min(self.MAX_SENTENCE, 7) and self._has_capacity():
+            self.MAX_SENTENCE += 1
+            self._submit(self._sentence_end)
+
+    def _submit_pending(self):
+        if self._closed:
+            if self.msg_text and self._has_capacity():
+                self._submit(len(self.msg_text))
+        elif self._sentence_count >= min(self.MAX_SENTENCE, 7) and self._has_capacity():
+            self.MAX_SENTENCE += 1
+            self._submit(self._sentence_end)
+
+    def _has_capacity(self) -> bool:
+        return len(self._segments) < dify_config.TTS_AUTO_PLAY_MAX_PENDING_SEGMENTS
+
+    def _submit(self, end: int):
+        text_content, self.msg_text = self.msg_text[:end], self.msg_text[end:]
+        self._sentence_count = 0
+        self._sentence_end = 0
+        if not text_content.strip():
+            return
+
+        segment = _AudioSegment()
+        self._segments.append(segment)
+        _get_executor().submit(_invoice_tts, text_content, self.model_instance, self.tenant_id, self.voice, segment)
@@ -187,6 +187,23 @@ class AgentChatAppConfigManager(BaseAppConfigManager):
         ]:
             raise ValueError("strategy in agent_mode must be in the specified strategy list")
 
+        if not isinstance(config["agent_mode"].get("parallel_tool_calls", False), bool):
+            raise ValueError("parallel_tool_calls in agent_mode must be of boolean type")
+
+        max_parallel_tool_calls = config["agent_mode"].get("max_parallel_tool_calls")
+        if max_parallel_tool_calls is not None and (
+            not isinstance(max_parallel_tool_calls, int)
+            or isinstance(max_parallel_tool_calls, bool)
+            or max_parallel_tool_calls < 1
+        ):
+            raise ValueError("max_parallel_tool_calls in agent_mode must be a positive integer")
+
+        tool_call_timeout = config["agent_mode"].get("tool_call_timeout")
+        if tool_call_timeout is not None and (
+            not isinstance(tool_call_timeout, int | float) or isinstance(tool_call_timeout, bool) or tool_call_timeout <= 0
+        ):
+            raise ValueError("tool_call_timeout in agent_mode must be a positive number")
+
         if not config["agent_mode"].get("tools"):
             config["agent_mode"]["tools"] = []
 
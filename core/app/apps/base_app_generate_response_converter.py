@@ -1,3 +1,4 @@
+import json
 import logging
 from abc import ABC, abstractmethod
 from collections.abc import Generator, Mapping
@@ -8,6 +9,11 @@ from core.app.entities.task_entities import AppBlockingResponse, AppStreamRespon
 from core.errors.error import ModelCurrentlyNotSupportError, ProviderTokenNotInitError, QuotaExceededError
 from core.model_runtime.errors.invoke import InvokeError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class AppGenerateResponseConverter(ABC):
     _blocking_response_type: type[AppBlockingResponse]
@@ -69,6 +75,22 @@ class AppGenerateResponseConverter(ABC):
     ) -> Generator[str, None, None]:
         raise NotImplementedError
 
+    @classmethod
+    def _dump_stream_chunk(cls, response_chunk: dict[str, Any]) -> str:
+        """
+        Serialize a chunk of a stream response, with orjson when installed.
+        :param response_chunk: response chunk
+        :return:
+        """
+        if orjson is not None:
+            try:
+                return orjson.dumps(response_chunk).decode("utf-8")
+            except TypeError:
+                # e.g. non-str keys or integers beyond 64 bits, which json handles
+                pass
+
+        return json.dumps(response_chunk)
+
     @classmethod
     def _get_simple_metadata(cls, metadata: dict[str, Any]):
         """
@@ -3,7 +3,7 @@ import time
 from abc import abstractmethod
 from collections.abc import Generator
 from enum import Enum
-from typing import Any
+from typing import Any, Optional
 
 from sqlalchemy.orm import DeclarativeMeta
 
@@ -11,12 +11,25 @@ from configs import dify_config
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.app.entities.queue_entities import (
     AppQueueEvent,
+    QueueAgentMessageEvent,
     QueueErrorEvent,
+    QueueLLMChunkEvent,
+    QueueMessage,
     QueuePingEvent,
     QueueStopEvent,
+    QueueTextChunkEvent,
 )
 from extensions.ext_redis import redis_client
 
+# seconds between two checks of the stop flag of a task while listening to its queue
+STOP_FLAG_CHECK_INTERVAL = 0.5
+
+# events published for each generated token, made of plain entities only
+TEXT_CHUNK_EVENT_TYPES = (QueueLLMChunkEvent, QueueAgentMessageEvent, QueueTextChunkEvent)
+
+# no message taken from the queue ahead of time
+_NO_PENDING_MESSAGE = object()
+
 
 class PublishFrom(Enum):
     APPLICATION_MANAGER = 1
@@ -50,18 +63,32 @@ class AppQueueManager:
         listen_timeout = dify_config.APP_MAX_EXECUTION_TIME
         start_time = time.time()
         last_ping_time = 0
+        last_stop_check_time = 0.0
+        # message taken from the queue while merging text chunks, but not merged
+        pending_message: Any = _NO_PENDING_MESSAGE
         while True:
             try:
-                message = self._q.get(timeout=1)
+                if pending_message is _NO_PENDING_MESSAGE:
+                    message = self._q.get(timeout=1)
+                else:
+                    message, pending_message = pending_message, _NO_PENDING_MESSAGE
                 if message is None:
                     break
 
+                if dify_config.APP_STREAM_COALESCE_ENABLED and isinstance(message.event, TEXT_CHUNK_EVENT_TYPES):
+                    message, pending_message = self._coalesce_text_chunks(message)
+
                 yield message
             except queue.Empty:
                 continue
             finally:
                 elapsed_time = time.time() - start_time
-                if elapsed_time >= listen_timeout or self._is_stopped():
+                # the stop flag is read from redis, so it is not checked for each message
+                is_stopped = False
+                if elapsed_time - last_stop_check_time >= STOP_FLAG_CHECK_INTERVAL:
+                    last_stop_check_time = elapsed_time
+                    is_stopped = self._is_stopped()
+                if elapsed_time >= listen_timeout or is_stopped:
                     # publish two messages to make sure the client can receive the stop signal
                     # and stop listening after the stop signal processed
                     self.publish(
@@ -72,6 +99,30 @@ class AppQueueManager:
                     self.publish(QueuePingEvent(), PublishFrom.TASK_PIPELINE)
                     last_ping_time = elapsed_time // 10
 
+    def _coalesce_text_chunks(self, message: QueueMessage) -> tuple[QueueMessage, Any]:
+        """
+        Merge the text chunks following a text chunk message in the queue into it,
+        waiting for them up to APP_STREAM_COALESCE_WINDOW_MS milliseconds
+        :param message: text chunk message
+        :return: merged message, and the next message taken from the queue if it could not be merged
+        """
+        deadline = time.monotonic() + dify_config.APP_STREAM_COALESCE_WINDOW_MS / 1000
+        while True:
+            try:
+                timeout = deadline - time.monotonic()
+                next_message = self._q.get(timeout=timeout) if timeout > 0 else self._q.get_nowait()
+            except queue.Empty:
+                return message, _NO_PENDING_MESSAGE
+
+            if next_message is None:
+                return message, next_message
+
+            merged_event = merge_text_chunk_events(message.event, next_message.event)
+            if merged_event is None:
+                return message, next_message
+
+            message = message.model_copy(update={"event": merged_event})
+
     def stop_listen(self) -> None:
         """
         Stop listen to queue
@@ -95,7 +146,9 @@ class AppQueueManager:
         :param pub_from:
         :return:
         """
-        self._check_for_sqlalchemy_models(event.model_dump())
+        # text chunks are published for each token, and cannot hold models
+        if not isinstance(event, TEXT_CHUNK_EVENT_TYPES):
+            self._check_for_sqlalchemy_models(event.model_dump())
         self._publish(event, pub_from)
 
     @abstractmethod
@@ -171,5 +224,50 @@ class AppQueueManager:
                 )
 
 
+def merge_text_chunk_events(event: AppQueueEvent, next_event: AppQueueEvent) -> Optional[AppQueueEvent]:
+    """
+    Merge two consecutive text chunk events into one
+    :param event: text chunk event
+    :param next_event: event following it
+    :return: merged event, or None if the events cannot be merged
+    """
+    if type(event) is not type(next_event):
+        return None
+
+    if isinstance(event, QueueTextChunkEvent) and isinstance(next_event, QueueTextChunkEvent):
+        if (
+            event.from_variable_selector != next_event.from_variable_selector
+            or event.in_iteration_id != next_event.in_iteration_id
+        ):
+            return None
+
+        return next_event.model_copy(update={"text": event.text + next_event.text})
+
+    if isinstance(event, QueueLLMChunkEvent | QueueAgentMessageEvent) and isinstance(
+        next_event, QueueLLMChunkEvent | QueueAgentMessageEvent
+    ):
+        delta, next_delta = event.chunk.delta, next_event.chunk.delta
+        # only plain text deltas are merged, the usage and finish reason are sent with the last chunk
+        if (
+            not isinstance(delta.message.content, str)
+            or not isinstance(next_delta.message.content, str)
+            or delta.message.tool_calls
+            or next_delta.message.tool_calls
+            or delta.usage
+            or delta.finish_reason
+        ):
+            return None
+
+        merged_message = next_delta.message.model_copy(
+            update={"content": delta.message.content + next_delta.message.content}
+        )
+        merged_chunk = next_event.chunk.model_copy(
+            update={"delta": next_delta.model_copy(update={"message": merged_message})}
+        )
+        return next_event.model_copy(update={"chunk": merged_chunk})
+
+    return None
+
+
 class GenerateTaskStoppedError(Exception):
     pass
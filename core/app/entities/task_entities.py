@@ -93,6 +93,16 @@ class MessageStreamResponse(StreamResponse):
     answer: str
     from_variable_selector: Optional[list[str]] = None
 
+    def to_dict(self) -> dict:
+        # sent for each text chunk, its fields are plain values
+        return {
+            "event": self.event.value,
+            "task_id": self.task_id,
+            "id": self.id,
+            "answer": self.answer,
+            "from_variable_selector": self.from_variable_selector,
+        }
+
 
 class MessageAudioStreamResponse(StreamResponse):
     """
@@ -169,6 +179,10 @@ class AgentMessageStreamResponse(StreamResponse):
     id: str
     answer: str
 
+    def to_dict(self) -> dict:
+        # sent for each text chunk, its fields are plain values
+        return {"event": self.event.value, "task_id": self.task_id, "id": self.id, "answer": self.answer}
+
 
 class WorkflowStartStreamResponse(StreamResponse):
     """
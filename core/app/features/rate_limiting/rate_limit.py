@@ -1,23 +1,48 @@
 import logging
+import threading
 import time
 import uuid
 from collections.abc import Generator, Mapping
 from datetime import timedelta
 from typing import Any, Optional, Union
 
+from configs import dify_config
 from core.errors.error import AppInvokeQuotaExceededError
 from extensions.ext_redis import redis_client
 
 logger = logging.getLogger(__name__)
 
+# Evict timed out requests, then add as many of the given request ids as the limit allows, in one round trip.
+# KEYS[1]: active requests sorted set, scored by enter time
+# ARGV: now, max alive time, max active requests, key ttl, request ids...
+# Returns the number of request ids added, always a prefix of the given ids.
+_ACQUIRE_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - tonumber(ARGV[2]))
+local free = tonumber(ARGV[3]) - redis.call('ZCARD', key)
+local granted = 0
+for i = 5, #ARGV do
+    if granted >= free then
+        break
+    end
+    redis.call('ZADD', key, now, ARGV[i])
+    granted = granted + 1
+end
+redis.call('EXPIRE', key, tonumber(ARGV[4]))
+return granted
+"""
+
 
 class RateLimit:
     _MAX_ACTIVE_REQUESTS_KEY = "dify:rate_limit:{}:max_active_requests"
-    _ACTIVE_REQUESTS_KEY = "dify:rate_limit:{}:active_requests"
+    _ACTIVE_REQUESTS_KEY = "dify:rate_limit:{}:active_requests_by_time"
     _UNLIMITED_REQUEST_ID = "unlimited_request_id"
     _REQUEST_MAX_ALIVE_TIME = 10 * 60  # 10 minutes
-    _ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL = 5 * 60  # recalculate request_count from request_detail every 5 minutes
+    _ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL = 5 * 60  # sync max_active_requests from redis every 5 minutes
+    _ACTIVE_REQUESTS_KEY_TTL = 24 * 60 * 60
     _instance_dict = {}
+    _acquire_script = None
 
     def __new__(cls: type["RateLimit"], client_id: str, max_active_requests: int):
         if client_id not in cls._instance_dict:
@@ -34,6 +59,11 @@ class RateLimit:
         self.active_requests_key = self._ACTIVE_REQUESTS_KEY.format(client_id)
         self.max_active_requests_key = self._MAX_ACTIVE_REQUESTS_KEY.format(client_id)
         self.last_recalculate_time = float("-inf")
+        # slots reserved in redis by this process and handed out without a round trip, see _enter_with_local_token
+        self._local_lock = threading.Lock()
+        self._local_free_tokens: list[tuple[str, float]] = []
+        # slots handed out by lease id, a new one per request so a repeated exit cannot release a reused slot
+        self._local_leased_tokens: dict[str, tuple[str, float]] = {}
         self.flush_cache(use_local_value=True)
 
     def flush_cache(self, use_local_value=False):
@@ -49,40 +79,38 @@ class RateLimit:
                 self.max_active_requests = int(redis_client.get(self.max_active_requests_key).decode("utf-8"))
                 redis_client.expire(self.max_active_requests_key, timedelta(days=1))
 
-        # flush max active requests (in-transit request list)
-        if not redis_client.exists(self.active_requests_key):
-            return
-        request_details = redis_client.hgetall(self.active_requests_key)
-        redis_client.expire(self.active_requests_key, timedelta(days=1))
-        timeout_requests = [
-            k
-            for k, v in request_details.items()
-            if time.time() - float(v.decode("utf-8")) > RateLimit._REQUEST_MAX_ALIVE_TIME
-        ]
-        if timeout_requests:
-            redis_client.hdel(self.active_requests_key, *timeout_requests)
+        # timed out requests (in-transit request set) are evicted by redis on every enter
+        with redis_client.pipeline() as pipe:
+            pipe.zremrangebyscore(self.active_requests_key, "-inf", time.time() - RateLimit._REQUEST_MAX_ALIVE_TIME)
+            pipe.expire(self.active_requests_key, timedelta(days=1))
+            pipe.execute()
 
     def enter(self, request_id: Optional[str] = None) -> str:
         if time.time() - self.last_recalculate_time > RateLimit._ACTIVE_REQUESTS_COUNT_FLUSH_INTERVAL:
             self.flush_cache()
         if self.max_active_requests <= 0:
             return RateLimit._UNLIMITED_REQUEST_ID
+        if self._use_local_tokens():
+            return self._enter_with_local_token()
         if not request_id:
             request_id = RateLimit.gen_request_key()
 
-        active_requests_count = redis_client.hlen(self.active_requests_key)
-        if active_requests_count >= self.max_active_requests:
-            raise AppInvokeQuotaExceededError(
-                "Too many requests. Please try again later. The current maximum "
-                "concurrent requests allowed is {}.".format(self.max_active_requests)
-            )
-        redis_client.hset(self.active_requests_key, request_id, str(time.time()))
+        if not self._acquire([request_id]):
+            self._raise_quota_exceeded()
         return request_id
 
     def exit(self, request_id: str):
         if request_id == RateLimit._UNLIMITED_REQUEST_ID:
             return
-        redis_client.hdel(self.active_requests_key, request_id)
+        with self._local_lock:
+            lease = self._local_leased_tokens.pop(request_id, None)
+            if lease is not None:
+                if len(self._local_free_tokens) < self._local_token_batch_size():
+                    self._local_free_tokens.append(lease)
+                    return
+                request_id = lease[0]
+        # a lease id exited twice is not a member, its slot is not released again
+        redis_client.zrem(self.active_requests_key, request_id)
 
     @staticmethod
     def gen_request_key() -> str:
@@ -94,6 +122,67 @@ class RateLimit:
         else:
             return RateLimitGenerator(rate_limit=self, generator=generator, request_id=request_id)
 
+    def _acquire(self, request_ids: list[str]) -> int:
+        if RateLimit._acquire_script is None:
+            RateLimit._acquire_script = redis_client.register_script(_ACQUIRE_SCRIPT)
+        return int(
+            RateLimit._acquire_script(
+                keys=[self.active_requests_key],
+                args=[
+                    time.time(),
+                    RateLimit._REQUEST_MAX_ALIVE_TIME,
+                    self.max_active_requests,
+                    RateLimit._ACTIVE_REQUESTS_KEY_TTL,
+                    *request_ids,
+                ],
+            )
+        )
+
+    def _use_local_tokens(self) -> bool:
+        threshold = dify_config.APP_RATE_LIMIT_LOCAL_TOKEN_THRESHOLD
+        return 0 < threshold <= self.max_active_requests
+
+    @staticmethod
+    def _local_token_batch_size() -> int:
+        return dify_config.APP_RATE_LIMIT_LOCAL_TOKEN_BATCH_SIZE
+
+    def _enter_with_local_token(self) -> str:
+        """
+        Hand out a slot reserved earlier by this process, reserving a new batch in redis when none is left.
+
+        Reserved slots count against the limit in redis like any other request, so the limit still holds
+        across processes, at the cost of up to one batch of idle slots per process. Idle slots are given
+        back before redis would evict them as timed out.
+        """
+        with self._local_lock:
+            now = time.time()
+            stale_tokens = [
+                token
+                for token, leased_at in self._local_free_tokens
+                if now - leased_at > RateLimit._REQUEST_MAX_ALIVE_TIME / 2
+            ]
+            if stale_tokens:
+                self._local_free_tokens = [item for item in self._local_free_tokens if item[0] not in stale_tokens]
+                redis_client.zrem(self.active_requests_key, *stale_tokens)
+
+            if not self._local_free_tokens:
+                tokens = [RateLimit.gen_request_key() for _ in range(self._local_token_batch_size())]
+                granted = self._acquire(tokens)
+                self._local_free_tokens.extend((token, now) for token in tokens[:granted])
+
+            if not self._local_free_tokens:
+                self._raise_quota_exceeded()
+
+            lease_id = RateLimit.gen_request_key()
+            self._local_leased_tokens[lease_id] = self._local_free_tokens.pop()
+            return lease_id
+
+    def _raise_quota_exceeded(self):
+        raise AppInvokeQuotaExceededError(
+            "Too many requests. Please try again later. The current maximum "
+            "concurrent requests allowed is {}.".format(self.max_active_requests)
+        )
+
 
 class RateLimitGenerator:
     def __init__(self, rate_limit: RateLimit, generator: Generator[str, None, None], request_id: str):
@@ -430,7 +430,8 @@ class EasyUIBasedGenerateTaskPipeline(BasedGenerateTaskPipeline, MessageCycleMan
         :param message_id: message id
         :return:
         """
-        return AgentMessageStreamResponse(
+        # built for each text chunk, from values that are already valid
+        return AgentMessageStreamResponse.model_construct(
             task_id=self._application_generate_entity.task_id, id=message_id, answer=answer
         )
 
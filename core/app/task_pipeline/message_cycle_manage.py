@@ -166,7 +166,8 @@ class MessageCycleManage:
         :param message_id: message id
         :return:
         """
-        return MessageStreamResponse(
+        # built for each text chunk, from values that are already valid
+        return MessageStreamResponse.model_construct(
             task_id=self._application_generate_entity.task_id,
             id=message_id,
             answer=answer,
@@ -33,6 +33,7 @@ from core.app.entities.task_entities import (
     WorkflowStartStreamResponse,
     WorkflowTaskState,
 )
+from core.app.task_pipeline.workflow_node_execution_writer import WorkflowNodeExecutionWriter
 from core.file import FILE_MODEL_IDENTITY, File
 from core.model_runtime.utils.encoders import jsonable_encoder
 from core.ops.entities.trace_entity import TraceTaskName
@@ -54,6 +55,7 @@ from models.workflow import (
     WorkflowNodeExecutionTriggeredFrom,
     WorkflowRun,
     WorkflowRunStatus,
+    set_payload,
 )
 
 
@@ -64,6 +66,7 @@ class WorkflowCycleManage:
     _task_state: WorkflowTaskState
     _workflow_system_variables: dict[SystemVariableKey, Any]
     _wip_workflow_node_executions: dict[str, WorkflowNodeExecution]
+    _workflow_node_execution_writer: Optional[WorkflowNodeExecutionWriter]
 
     def _handle_workflow_run_start(self) -> WorkflowRun:
         max_sequence = (
@@ -137,12 +140,13 @@ class WorkflowCycleManage:
         :param conversation_id: conversation id
         :return:
         """
+        self._flush_workflow_node_executions()
         workflow_run = self._refetch_workflow_run(workflow_run.id)
 
         outputs = WorkflowEntry.handle_special_values(outputs)
 
         workflow_run.status = WorkflowRunStatus.SUCCEEDED.value
-        workflow_run.outputs = json.dumps(outputs or {})
+        set_payload(workflow_run, "outputs", json.dumps(outputs or {}))
         workflow_run.elapsed_time = time.perf_counter() - start_at
         workflow_run.total_tokens = total_tokens
         workflow_run.total_steps = total_steps
@@ -186,12 +190,13 @@ class WorkflowCycleManage:
         :param conversation_id: conversation id
         :return:
         """
+        self._flush_workflow_node_executions()
         workflow_run = self._refetch_workflow_run(workflow_run.id)
 
         outputs = WorkflowEntry.handle_special_values(outputs)
 
         workflow_run.status = WorkflowRunStatus.PARTIAL_SUCCESSED.value
-        workflow_run.outputs = json.dumps(outputs or {})
+        set_payload(workflow_run, "outputs", json.dumps(outputs or {}))
         workflow_run.elapsed_time = time.perf_counter() - start_at
         workflow_run.total_tokens = total_tokens
         workflow_run.total_steps = total_steps
@@ -236,6 +241,7 @@ class WorkflowCycleManage:
         :param error: error message
         :return:
         """
+        self._flush_workflow_node_executions()
         workflow_run = self._refetch_workflow_run(workflow_run.id)
 
         workflow_run.status = status.value
@@ -291,34 +297,37 @@ class WorkflowCycleManage:
         self, workflow_run: WorkflowRun, event: QueueNodeStartedEvent
     ) -> WorkflowNodeExecution:
         # init workflow node execution
+        workflow_node_execution = WorkflowNodeExecution()
+        workflow_node_execution.tenant_id = workflow_run.tenant_id
+        workflow_node_execution.app_id = workflow_run.app_id
+        workflow_node_execution.workflow_id = workflow_run.workflow_id
+        workflow_node_execution.triggered_from = WorkflowNodeExecutionTriggeredFrom.WORKFLOW_RUN.value
+        workflow_node_execution.workflow_run_id = workflow_run.id
+        workflow_node_execution.predecessor_node_id = event.predecessor_node_id
+        workflow_node_execution.index = event.node_run_index
+        workflow_node_execution.node_execution_id = event.node_execution_id
+        workflow_node_execution.node_id = event.node_id
+        workflow_node_execution.node_type = event.node_type.value
+        workflow_node_execution.title = event.node_data.title
+        workflow_node_execution.status = WorkflowNodeExecutionStatus.RUNNING.value
+        workflow_node_execution.created_by_role = workflow_run.created_by_role
+        workflow_node_execution.created_by = workflow_run.created_by
+        workflow_node_execution.execution_metadata = json.dumps(
+            {
+                NodeRunMetadataKey.PARALLEL_MODE_RUN_ID: event.parallel_mode_run_id,
+                NodeRunMetadataKey.ITERATION_ID: event.in_iteration_id,
+            }
+        )
+        workflow_node_execution.created_at = datetime.now(UTC).replace(tzinfo=None)
 
-        with Session(db.engine, expire_on_commit=False) as session:
-            workflow_node_execution = WorkflowNodeExecution()
-            workflow_node_execution.tenant_id = workflow_run.tenant_id
-            workflow_node_execution.app_id = workflow_run.app_id
-            workflow_node_execution.workflow_id = workflow_run.workflow_id
-            workflow_node_execution.triggered_from = WorkflowNodeExecutionTriggeredFrom.WORKFLOW_RUN.value
-            workflow_node_execution.workflow_run_id = workflow_run.id
-            workflow_node_execution.predecessor_node_id = event.predecessor_node_id
-            workflow_node_execution.index = event.node_run_index
-            workflow_node_execution.node_execution_id = event.node_execution_id
-            workflow_node_execution.node_id = event.node_id
-            workflow_node_execution.node_type = event.node_type.value
-            workflow_node_execution.title = event.node_data.title
-            workflow_node_execution.status = WorkflowNodeExecutionStatus.RUNNING.value
-            workflow_node_execution.created_by_role = workflow_run.created_by_role
-            workflow_node_execution.created_by = workflow_run.created_by
-            workflow_node_execution.execution_metadata = json.dumps(
-                {
-                    NodeRunMetadataKey.PARALLEL_MODE_RUN_ID: event.parallel_mode_run_id,
-                    NodeRunMetadataKey.ITERATION_ID: event.in_iteration_id,
-                }
-            )
-            workflow_node_execution.created_at = datetime.now(UTC).replace(tzinfo=None)
-
-            session.add(workflow_node_execution)
-            session.commit()
-            session.refresh(workflow_node_execution)
+        if self._workflow_node_execution_writer:
+            workflow_node_execution.id = str(uuid4())
+            self._workflow_node_execution_writer.add(workflow_node_execution)
+        else:
+            with Session(db.engine, expire_on_commit=False) as session:
+                session.add(workflow_node_execution)
+                session.commit()
+                session.refresh(workflow_node_execution)
 
         self._wip_workflow_node_executions[workflow_node_execution.node_execution_id] = workflow_node_execution
         return workflow_node_execution
@@ -340,30 +349,36 @@ class WorkflowCycleManage:
         finished_at = datetime.now(UTC).replace(tzinfo=None)
         elapsed_time = (finished_at - event.start_at).total_seconds()
 
-        db.session.query(WorkflowNodeExecution).filter(WorkflowNodeExecution.id == workflow_node_execution.id).update(
-            {
-                WorkflowNodeExecution.status: WorkflowNodeExecutionStatus.SUCCEEDED.value,
-                WorkflowNodeExecution.inputs: json.dumps(inputs) if inputs else None,
-                WorkflowNodeExecution.process_data: json.dumps(process_data) if event.process_data else None,
-                WorkflowNodeExecution.outputs: json.dumps(outputs) if outputs else None,
-                WorkflowNodeExecution.execution_metadata: execution_metadata,
-                WorkflowNodeExecution.finished_at: finished_at,
-                WorkflowNodeExecution.elapsed_time: elapsed_time,
-            }
-        )
+        set_payload(workflow_node_execution, "inputs", json.dumps(inputs) if inputs else None)
+        set_payload(workflow_node_execution, "process_data", json.dumps(process_data) if process_data else None)
+        set_payload(workflow_node_execution, "outputs", json.dumps(outputs) if outputs else None)
 
-        db.session.commit()
-        db.session.close()
-        process_data = WorkflowEntry.handle_special_values(event.process_data)
+        if not self._workflow_node_execution_writer:
+            db.session.query(WorkflowNodeExecution).filter(
+                WorkflowNodeExecution.id == workflow_node_execution.id
+            ).update(
+                {
+                    WorkflowNodeExecution.status: WorkflowNodeExecutionStatus.SUCCEEDED.value,
+                    WorkflowNodeExecution.inputs: workflow_node_execution.inputs,
+                    WorkflowNodeExecution.process_data: workflow_node_execution.process_data,
+                    WorkflowNodeExecution.outputs: workflow_node_execution.outputs,
+                    WorkflowNodeExecution.execution_metadata: execution_metadata,
+                    WorkflowNodeExecution.finished_at: finished_at,
+                    WorkflowNodeExecution.elapsed_time: elapsed_time,
+                }
+            )
+
+            db.session.commit()
+            db.session.close()
 
         workflow_node_execution.status = WorkflowNodeExecutionStatus.SUCCEEDED.value
-        workflow_node_execution.inputs = json.dumps(inputs) if inputs else None
-        workflow_node_execution.process_data = json.dumps(process_data) if process_data else None
-        workflow_node_execution.outputs = json.dumps(outputs) if outputs else None
         workflow_node_execution.execution_metadata = execution_metadata
         workflow_node_execution.finished_at = finished_at
         workflow_node_execution.elapsed_time = elapsed_time
 
+        if self._workflow_node_execution_writer:
+            self._workflow_node_execution_writer.update(workflow_node_execution)
+
         self._wip_workflow_node_executions.pop(workflow_node_execution.node_execution_id)
 
         return workflow_node_execution
@@ -386,39 +401,47 @@ class WorkflowCycleManage:
         execution_metadata = (
             json.dumps(jsonable_encoder(event.execution_metadata)) if event.execution_metadata else None
         )
-        db.session.query(WorkflowNodeExecution).filter(WorkflowNodeExecution.id == workflow_node_execution.id).update(
-            {
-                WorkflowNodeExecution.status: (
-                    WorkflowNodeExecutionStatus.FAILED.value
-                    if not isinstance(event, QueueNodeExceptionEvent)
-                    else WorkflowNodeExecutionStatus.EXCEPTION.value
-                ),
-                WorkflowNodeExecution.error: event.error,
-                WorkflowNodeExecution.inputs: json.dumps(inputs) if inputs else None,
-                WorkflowNodeExecution.process_data: json.dumps(process_data) if process_data else None,
-                WorkflowNodeExecution.outputs: json.dumps(outputs) if outputs else None,
-                WorkflowNodeExecution.finished_at: finished_at,
-                WorkflowNodeExecution.elapsed_time: elapsed_time,
-                WorkflowNodeExecution.execution_metadata: execution_metadata,
-            }
-        )
 
-        db.session.commit()
-        db.session.close()
-        process_data = WorkflowEntry.handle_special_values(event.process_data)
+        set_payload(workflow_node_execution, "inputs", json.dumps(inputs) if inputs else None)
+        set_payload(workflow_node_execution, "process_data", json.dumps(process_data) if process_data else None)
+        set_payload(workflow_node_execution, "outputs", json.dumps(outputs) if outputs else None)
+
+        if not self._workflow_node_execution_writer:
+            db.session.query(WorkflowNodeExecution).filter(
+                WorkflowNodeExecution.id == workflow_node_execution.id
+            ).update(
+                {
+                    WorkflowNodeExecution.status: (
+                        WorkflowNodeExecutionStatus.FAILED.value
+                        if not isinstance(event, QueueNodeExceptionEvent)
+                        else WorkflowNodeExecutionStatus.EXCEPTION.value
+                    ),
+                    WorkflowNodeExecution.error: event.error,
+                    WorkflowNodeExecution.inputs: workflow_node_execution.inputs,
+                    WorkflowNodeExecution.process_data: workflow_node_execution.process_data,
+                    WorkflowNodeExecution.outputs: workflow_node_execution.outputs,
+                    WorkflowNodeExecution.finished_at: finished_at,
+                    WorkflowNodeExecution.elapsed_time: elapsed_time,
+                    WorkflowNodeExecution.execution_metadata: execution_metadata,
+                }
+            )
+
+            db.session.commit()
+            db.session.close()
+
         workflow_node_execution.status = (
             WorkflowNodeExecutionStatus.FAILED.value
             if not isinstance(event, QueueNodeExceptionEvent)
             else WorkflowNodeExecutionStatus.EXCEPTION.value
         )
         workflow_node_execution.error = event.error
-        workflow_node_execution.inputs = json.dumps(inputs) if inputs else None
-        workflow_node_execution.process_data = json.dumps(process_data) if process_data else None
-        workflow_node_execution.outputs = json.dumps(outputs) if outputs else None
         workflow_node_execution.finished_at = finished_at
         workflow_node_execution.elapsed_time = elapsed_time
         workflow_node_execution.execution_metadata = execution_metadata
 
+        if self._workflow_node_execution_writer:
+            self._workflow_node_execution_writer.update(workflow_node_execution)
+
         self._wip_workflow_node_executions.pop(workflow_node_execution.node_execution_id)
 
         return workflow_node_execution
@@ -783,6 +806,31 @@ class WorkflowCycleManage:
         elif isinstance(value, File):
             return value.to_dict()
 
+    def _flush_workflow_node_executions(self, wait: bool = True) -> None:
+        """
+        Write the node executions buffered in write-behind mode
+        :param wait: wait until they are written
+        :return:
+        """
+        if self._workflow_node_execution_writer:
+            self._workflow_node_execution_writer.flush(wait=wait)
+
+    def _flush_due_workflow_node_executions(self) -> None:
+        """
+        Write the node executions buffered in write-behind mode if the flush interval has passed
+        :return:
+        """
+        if self._workflow_node_execution_writer:
+            self._workflow_node_execution_writer.flush_if_due()
+
+    def _close_workflow_node_execution_writer(self) -> None:
+        """
+        Write the node executions buffered in write-behind mode, when the run ends or the pipeline fails
+        :return:
+        """
+        if self._workflow_node_execution_writer:
+            self._workflow_node_execution_writer.close()
+
     def _refetch_workflow_run(self, workflow_run_id: str) -> WorkflowRun:
         """
         Refetch workflow run
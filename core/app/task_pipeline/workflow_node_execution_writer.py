@@ -0,0 +1,153 @@
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
+
+from flask import Flask, current_app
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from configs import dify_config
+from extensions.ext_database import db
+from models.workflow import WorkflowNodeExecution
+
+logger = logging.getLogger(__name__)
+
+# columns changed when a node execution finishes
+_FINISH_COLUMNS = (
+    "status",
+    "error",
+    "inputs",
+    "process_data",
+    "outputs",
+    "execution_metadata",
+    "finished_at",
+    "elapsed_time",
+)
+
+
+class WorkflowNodeExecutionWriter:
+    """
+    Write-behind persistence of the node executions of one workflow run.
+
+    Started and finished node executions are buffered and written in batches, one bulk insert and one
+    bulk update per batch, once the buffer reaches the batch size or the oldest change reaches the flush
+    interval. Writes run on a single background thread in submission order, so the stream responses,
+    which are built from the in-memory records, never wait for the database. A node that finishes before
+    its start was written is inserted once with its final state.
+
+    Callers must assign the record ids, and call flush(wait=True) before anything reads the records back
+    from the database, and close() when the run ends, on failure paths too. Both raise the error of the
+    first batch that failed to be written since the last wait.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, flush_interval: Optional[float] = None):
+        self._batch_size = batch_size or dify_config.WORKFLOW_NODE_EXECUTION_FLUSH_BATCH_SIZE
+        self._flush_interval = flush_interval or dify_config.WORKFLOW_NODE_EXECUTION_FLUSH_INTERVAL
+        self._pending_inserts: dict[str, WorkflowNodeExecution] = {}
+        self._pending_updates: dict[str, WorkflowNodeExecution] = {}
+        self._first_pending_at: Optional[float] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: list[Future] = []
+
+    def add(self, workflow_node_execution: WorkflowNodeExecution) -> None:
+        """
+        Buffer a started node execution.
+        """
+        self._pending_inserts[workflow_node_execution.id] = workflow_node_execution
+        self._mark_pending()
+        self.flush_if_due()
+
+    def update(self, workflow_node_execution: WorkflowNodeExecution) -> None:
+        """
+        Buffer a finished node execution.
+        """
+        if workflow_node_execution.id not in self._pending_inserts:
+            self._pending_updates[workflow_node_execution.id] = workflow_node_execution
+        self._mark_pending()
+        self.flush_if_due()
+
+    def flush_if_due(self) -> None:
+        """
+        Submit the buffered changes if there are enough of them or they have waited long enough.
+        """
+        if self._first_pending_at is None:
+            return
+        pending_count = len(self._pending_inserts) + len(self._pending_updates)
+        if pending_count >= self._batch_size or time.monotonic() - self._first_pending_at >= self._flush_interval:
+            self.flush()
+
+    def flush(self, wait: bool = False) -> None:
+        """
+        Submit the buffered changes.
+
+        :param wait: wait until every submitted change is written
+        :raises Exception: with wait, if a submitted batch failed to be written
+        """
+        if self._pending_inserts or self._pending_updates:
+            inserts = [_to_insert_row(execution) for execution in self._pending_inserts.values()]
+            updates = [_to_update_row(execution) for execution in self._pending_updates.values()]
+            self._pending_inserts = {}
+            self._pending_updates = {}
+            self._first_pending_at = None
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="node_execution_writer")
+            flask_app = current_app._get_current_object()  # type: ignore
+            # keep the failed batches until the next wait raises their error
+            self._futures = [future for future in self._futures if not future.done() or future.exception()]
+            self._futures.append(self._executor.submit(_write, flask_app, inserts, updates))
+
+        if wait:
+            self._wait()
+
+    def close(self) -> None:
+        """
+        Write the buffered changes and stop the background thread.
+        """
+        try:
+            self.flush(wait=True)
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _mark_pending(self) -> None:
+        if self._first_pending_at is None:
+            self._first_pending_at = time.monotonic()
+
+    def _wait(self) -> None:
+        futures, self._futures = self._futures, []
+        # wait for every batch before raising, so none is still being written when the caller moves on
+        errors = [error for error in (future.exception() for future in futures) if error is not None]
+        if errors:
+            raise errors[0]
+
+
+def _to_insert_row(workflow_node_execution: WorkflowNodeExecution) -> dict[str, Any]:
+    # leave unset columns out so that server defaults apply
+    return {
+        column.key: getattr(workflow_node_execution, column.key)
+        for column in WorkflowNodeExecution.__table__.columns
+        if getattr(workflow_node_execution, column.key) is not None
+    }
+
+
+def _to_update_row(workflow_node_execution: WorkflowNodeExecution) -> dict[str, Any]:
+    row = {column: getattr(workflow_node_execution, column) for column in _FINISH_COLUMNS}
+    row["id"] = workflow_node_execution.id
+    return row
+
+
+def _write(flask_app: Flask, inserts: list[dict[str, Any]], updates: list[dict[str, Any]]) -> None:
+    with flask_app.app_context():
+        try:
+            with Session(db.engine) as session:
+                if inserts:
+                    session.execute(insert(WorkflowNodeExecution), inserts)
+                if updates:
+                    session.execute(update(WorkflowNodeExecution), updates)
+                session.commit()
+        except Exception:
+            logger.exception(f"Failed to write {len(inserts)} new and {len(updates)} finished workflow node executions")
+            raise
@@ -0,0 +1,57 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Optional
+
+from configs import dify_config
+
+
+class EncodedFileCache:
+    """
+    In-process LRU cache of base64 encoded files, bounded by the total size of the cached strings.
+
+    Shared by every thread of the process, so a file sent to models again, by the memory of a conversation
+    or by an LLM node in an iteration, is downloaded and encoded once.
+    """
+
+    def __init__(self, max_size: Optional[int] = None):
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, str] = OrderedDict()
+        self._size = 0
+
+    @property
+    def max_size(self) -> int:
+        if self._max_size is not None:
+            return self._max_size
+        return dify_config.MULTIMODAL_ENCODED_FILE_CACHE_SIZE
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            encoded_string = self._entries.get(key)
+            if encoded_string is not None:
+                self._entries.move_to_end(key)
+            return encoded_string
+
+    def set(self, key: Hashable, encoded_string: str) -> None:
+        max_size = self.max_size
+        if len(encoded_string) > max_size:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = encoded_string
+            self._size += len(encoded_string)
+            while self._size > max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+encoded_file_cache = EncodedFileCache()
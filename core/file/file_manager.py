@@ -1,8 +1,13 @@
 import base64
+import io
+import logging
+from collections.abc import Iterable
+from tempfile import SpooledTemporaryFile
+from typing import Optional
 
 from configs import dify_config
 from core.file import file_repository
-from core.helper import ssrf_proxy
+from core.helper import file_stream, ssrf_proxy
 from core.model_runtime.entities import (
     AudioPromptMessageContent,
     DocumentPromptMessageContent,
@@ -13,10 +18,21 @@ from extensions.ext_database import db
 from extensions.ext_storage import storage
 
 from . import helpers
+from .encoded_file_cache import encoded_file_cache
 from .enums import FileAttribute
 from .models import File, FileTransferMethod, FileType
 from .tool_file_parser import ToolFileParser
 
+logger = logging.getLogger(__name__)
+
+# longest side of downscaled images, and shortest side for high detail, by detail level
+_IMAGE_MAX_SIDE = {
+    ImagePromptMessageContent.DETAIL.LOW: 512,
+    ImagePromptMessageContent.DETAIL.HIGH: 2048,
+}
+_IMAGE_HIGH_DETAIL_MAX_SHORT_SIDE = 768
+_DOWNSCALABLE_IMAGE_FORMATS = {"JPEG", "PNG", "WEBP"}
+
 
 def get_attr(*, file: File, attr: FileAttribute):
     match attr:
@@ -48,7 +64,7 @@ def to_prompt_message_content(
             if dify_config.MULTIMODAL_SEND_IMAGE_FORMAT == "url":
                 data = _to_url(f)
             else:
-                data = _to_base64_data_string(f)
+                data = _to_base64_data_string(f, image_detail=image_detail_config)
 
             return ImagePromptMessageContent(data=data, detail=image_detail_config)
         case FileType.AUDIO:
@@ -77,59 +93,135 @@ def to_prompt_message_content(
             raise ValueError(f"file type {f.type} is not supported")
 
 
-def download(f: File, /):
+def download(f: File, /) -> bytes:
+    """
+    Download the whole content of a file into memory, with the size limit of download_to_file.
+    Prefer download_to_file for callers that can read a file object.
+    """
     if f.transfer_method == FileTransferMethod.TOOL_FILE:
         tool_file = file_repository.get_tool_file(session=db.session(), file=f)
-        return _download_file_content(tool_file.file_key)
+        return file_stream.read(storage.load(tool_file.file_key, stream=True))
     elif f.transfer_method == FileTransferMethod.LOCAL_FILE:
         upload_file = file_repository.get_upload_file(session=db.session(), file=f)
-        return _download_file_content(upload_file.key)
+        return file_stream.read(storage.load(upload_file.key, stream=True))
     # remote file
-    response = ssrf_proxy.get(f.remote_url, follow_redirects=True)
-    response.raise_for_status()
-    return response.content
+    return ssrf_proxy.download_bytes(f.remote_url, follow_redirects=True)
 
 
-def _download_file_content(path: str, /):
+def download_to_file(f: File, /, *, max_size: Optional[int] = None) -> SpooledTemporaryFile:
     """
-    Download and return the contents of a file as bytes.
-
-    This function loads the file from storage and ensures it's in bytes format.
+    Stream the content of a file into a spooled temporary file, kept in memory while it is small
+    and written to disk above FILE_DOWNLOAD_SPOOL_MAX_MEMORY_SIZE.
 
-    Args:
-        path (str): The path to the file in storage.
+    :param max_size: size limit in bytes, FILE_DOWNLOAD_MAX_SIZE by default, 0 for no limit
+    :return: the file content, the caller must close it
+    :raises FileTooLargeError: once the content exceeds max_size
+    """
+    if f.transfer_method == FileTransferMethod.TOOL_FILE:
+        tool_file = file_repository.get_tool_file(session=db.session(), file=f)
+        return file_stream.spool(storage.load(tool_file.file_key, stream=True), max_size=max_size)
+    elif f.transfer_method == FileTransferMethod.LOCAL_FILE:
+        upload_file = file_repository.get_upload_file(session=db.session(), file=f)
+        return file_stream.spool(storage.load(upload_file.key, stream=True), max_size=max_size)
+    # remote file
+    return ssrf_proxy.download(f.remote_url, follow_redirects=True, max_size=max_size)
 
-    Returns:
-        bytes: The contents of the file as a bytes object.
 
-    Raises:
-        ValueError: If the loaded file is not a bytes object.
+def _get_encoded_string(f: File, /, *, image_detail: Optional[ImagePromptMessageContent.DETAIL] = None):
     """
-    data = storage.load(path, stream=False)
-    if not isinstance(data, bytes):
-        raise ValueError(f"file {path} is not a bytes object")
-    return data
+    Get the base64 encoded content of a file, downscaled to the detail level for images if enabled.
 
+    Encoded storage files are cached by file id and detail level, remote files are downloaded every time
+    since their content may change.
+    """
+    downscale = f.type == FileType.IMAGE and image_detail is not None and dify_config.MULTIMODAL_IMAGE_DOWNSCALE_ENABLED
+    cache_key = None
+    if f.transfer_method != FileTransferMethod.REMOTE_URL and f.related_id and encoded_file_cache.max_size:
+        cache_key = (f.tenant_id, f.transfer_method.value, f.related_id, image_detail if downscale else None)
+        encoded_string = encoded_file_cache.get(cache_key)
+        if encoded_string is not None:
+            return encoded_string
 
-def _get_encoded_string(f: File, /):
     match f.transfer_method:
         case FileTransferMethod.REMOTE_URL:
             response = ssrf_proxy.get(f.remote_url, follow_redirects=True)
             response.raise_for_status()
-            data = response.content
+            chunks: Iterable[bytes] = [response.content]
         case FileTransferMethod.LOCAL_FILE:
             upload_file = file_repository.get_upload_file(session=db.session(), file=f)
-            data = _download_file_content(upload_file.key)
+            chunks = storage.load(upload_file.key, stream=True)
         case FileTransferMethod.TOOL_FILE:
             tool_file = file_repository.get_tool_file(session=db.session(), file=f)
-            data = _download_file_content(tool_file.file_key)
+            chunks = storage.load(tool_file.file_key, stream=True)
+
+    if downscale:
+        chunks = [_downscale_image(b"".join(chunks), image_detail)]  # type: ignore
 
-    encoded_string = base64.b64encode(data).decode("utf-8")
+    encoded_string = _b64encode_stream(chunks)
+    if cache_key is not None:
+        encoded_file_cache.set(cache_key, encoded_string)
     return encoded_string
 
 
-def _to_base64_data_string(f: File, /):
-    encoded_string = _get_encoded_string(f)
+def _b64encode_stream(chunks: Iterable[bytes], /) -> str:
+    """
+    Base64 encode a stream of chunks, without joining them into a copy of the whole content first.
+    """
+    parts = []
+    remainder = b""
+    for chunk in chunks:
+        data = remainder + chunk
+        # encode whole 3 byte groups only, so that no padding ends up in the middle of the output
+        end = len(data) - len(data) % 3
+        parts.append(base64.b64encode(data[:end]).decode("ascii"))
+        remainder = data[end:]
+    parts.append(base64.b64encode(remainder).decode("ascii"))
+    return "".join(parts)
+
+
+def _downscale_image(data: bytes, detail: ImagePromptMessageContent.DETAIL, /) -> bytes:
+    """
+    Shrink an image to the largest resolution models process for the detail level.
+
+    Returns the original bytes if the image does not need to shrink, cannot be handled,
+    or would not get smaller.
+    """
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image_format = image.format
+            if image_format not in _DOWNSCALABLE_IMAGE_FORMATS or getattr(image, "is_animated", False):
+                return data
+
+            width, height = image.size
+            scale = _IMAGE_MAX_SIDE[detail] / max(width, height)
+            if detail == ImagePromptMessageContent.DETAIL.HIGH:
+                scale = min(scale, _IMAGE_HIGH_DETAIL_MAX_SHORT_SIDE / min(width, height))
+            if scale >= 1:
+                return data
+
+            # the scale does not depend on the orientation, but the target size does
+            resized = ImageOps.exif_transpose(image)
+            width, height = resized.size
+            resized = resized.resize(
+                (max(1, round(width * scale)), max(1, round(height * scale))), Image.Resampling.LANCZOS
+            )
+            if image_format == "JPEG" and resized.mode not in ("RGB", "L"):
+                resized = resized.convert("RGB")
+
+            output = io.BytesIO()
+            resized.save(output, format=image_format, quality=85)
+    except Exception:
+        logger.warning("Failed to downscale image, sending it as it is", exc_info=True)
+        return data
+
+    downscaled = output.getvalue()
+    return downscaled if len(downscaled) < len(data) else data
+
+
+def _to_base64_data_string(f: File, /, *, image_detail: Optional[ImagePromptMessageContent.DETAIL] = None):
+    encoded_string = _get_encoded_string(f, image_detail=image_detail)
     return f"data:{f.mime_type};base64,{encoded_string}"
 
 
@@ -0,0 +1,84 @@
+"""
+Streaming of file contents into spooled temporary files.
+
+Chunks are kept in memory up to FILE_DOWNLOAD_SPOOL_MAX_MEMORY_SIZE bytes and written to a temporary file on
+disk above it, and FILE_DOWNLOAD_MAX_SIZE is enforced while reading, so large files neither sit in memory
+whole nor get read to the end before being rejected.
+"""
+
+from collections.abc import Iterable
+from tempfile import SpooledTemporaryFile
+from typing import IO, Optional
+
+from configs import dify_config
+
+CHUNK_SIZE = 64 * 1024
+
+
+class FileTooLargeError(ValueError):
+    """Raised when a streamed file exceeds the maximum size."""
+
+    pass
+
+
+def get_max_size(max_size: Optional[int] = None) -> int:
+    """
+    :return: the given limit, or FILE_DOWNLOAD_MAX_SIZE, 0 means no limit
+    """
+    return dify_config.FILE_DOWNLOAD_MAX_SIZE if max_size is None else max_size
+
+
+def check_size(size: int, max_size: Optional[int] = None) -> None:
+    max_size = get_max_size(max_size)
+    if max_size and size > max_size:
+        raise FileTooLargeError(f"File size exceeds the limit of {max_size} bytes")
+
+
+def spool(chunks: Iterable[bytes], *, max_size: Optional[int] = None) -> SpooledTemporaryFile:
+    """
+    Write chunks to a spooled temporary file.
+
+    :param chunks: file content
+    :param max_size: size limit in bytes, FILE_DOWNLOAD_MAX_SIZE by default, 0 for no limit
+    :return: the file, positioned at the start, the caller must close it
+    :raises FileTooLargeError: once the content exceeds max_size
+    """
+    file = SpooledTemporaryFile(max_size=dify_config.FILE_DOWNLOAD_SPOOL_MAX_MEMORY_SIZE)  # noqa: SIM115
+    try:
+        size = 0
+        for chunk in chunks:
+            size += len(chunk)
+            check_size(size, max_size)
+            file.write(chunk)
+        file.seek(0)
+    except BaseException:
+        file.close()
+        raise
+    return file
+
+
+def read(chunks: Iterable[bytes], *, max_size: Optional[int] = None) -> bytes:
+    """
+    Read chunks into bytes, for callers that need the whole content in memory.
+
+    :param chunks: file content
+    :param max_size: size limit in bytes, FILE_DOWNLOAD_MAX_SIZE by default, 0 for no limit
+    :raises FileTooLargeError: once the content exceeds max_size
+    """
+    parts = []
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+        check_size(size, max_size)
+        parts.append(chunk)
+    return b"".join(parts)
+
+
+def get_size(file: IO[bytes]) -> int:
+    """
+    Get the size of a seekable file, keeping its position.
+    """
+    position = file.tell()
+    size = file.seek(0, 2)
+    file.seek(position)
+    return size
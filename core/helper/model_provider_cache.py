@@ -1,9 +1,13 @@
-import json
+import hashlib
+import threading
 from enum import Enum
-from json import JSONDecodeError
 from typing import Optional
 
-from extensions.ext_redis import redis_client
+from cachetools import TTLCache
+
+from configs import dify_config
+
+LOCAL_CACHE_MAX_SIZE = 10000
 
 
 class ProviderCredentialsCacheType(Enum):
@@ -13,8 +17,26 @@ class ProviderCredentialsCacheType(Enum):
 
 
 class ProviderCredentialsCache:
-    def __init__(self, tenant_id: str, identity_id: str, cache_type: ProviderCredentialsCacheType):
-        self.cache_key = f"{cache_type.value}_credentials:tenant_id:{tenant_id}:id:{identity_id}"
+    """
+    Decrypted model provider credentials, cached in the memory of the process for
+    PROVIDER_CREDENTIALS_CACHE_TTL seconds. They are never written to redis.
+
+    The cached credentials are bound to a hash of the encrypted config they were decrypted from, so a
+    process reading a changed config from the database decrypts it again, even before the TTL expires.
+    """
+
+    _lock = threading.Lock()
+    _cache: TTLCache = TTLCache(maxsize=LOCAL_CACHE_MAX_SIZE, ttl=dify_config.PROVIDER_CREDENTIALS_CACHE_TTL or 1)
+
+    def __init__(
+        self,
+        tenant_id: str,
+        identity_id: str,
+        cache_type: ProviderCredentialsCacheType,
+        encrypted_config: Optional[str] = None,
+    ):
+        self.cache_key = (cache_type.value, tenant_id, identity_id)
+        self.config_hash = hashlib.sha256(encrypted_config.encode()).hexdigest() if encrypted_config else None
 
     def get(self) -> Optional[dict]:
         """
@@ -22,18 +44,20 @@ class ProviderCredentialsCache:
 
         :return:
         """
-        cached_provider_credentials = redis_client.get(self.cache_key)
-        if cached_provider_credentials:
-            try:
-                cached_provider_credentials = cached_provider_credentials.decode("utf-8")
-                cached_provider_credentials = json.loads(cached_provider_credentials)
-            except JSONDecodeError:
-                return None
-
-            return cached_provider_credentials
-        else:
+        if not dify_config.PROVIDER_CREDENTIALS_CACHE_TTL:
             return None
 
+        with self._lock:
+            cached = self._cache.get(self.cache_key)
+        if not cached:
+            return None
+
+        config_hash, credentials = cached
+        if config_hash != self.config_hash:
+            return None
+
+        return dict(credentials)
+
     def set(self, credentials: dict) -> None:
         """
         Cache model provider credentials.
@@ -41,7 +65,11 @@ class ProviderCredentialsCache:
         :param credentials: provider credentials
         :return:
         """
-        redis_client.setex(self.cache_key, 86400, json.dumps(credentials))
+        if not dify_config.PROVIDER_CREDENTIALS_CACHE_TTL:
+            return
+
+        with self._lock:
+            self._cache[self.cache_key] = (self.config_hash, dict(credentials))
 
     def delete(self) -> None:
         """
@@ -49,4 +77,5 @@ class ProviderCredentialsCache:
 
         :return:
         """
-        redis_client.delete(self.cache_key)
+        with self._lock:
+            self._cache.pop(self.cache_key, None)
@@ -0,0 +1,196 @@
+"""
+Snapshot of the YAML schemas of the model providers, models and builtin tools.
+
+Every process otherwise parses the ~1000 YAML files of these schemas on first use. The snapshot holds their
+parsed content in a single JSON file, built at image build time with `python -m core.helper.schema_snapshot`,
+or by the first process that finds it missing or stale. It is bound to a fingerprint of the paths, sizes and
+modification times of the YAML files, so an edited, added or removed file invalidates it.
+
+With DEBUG enabled, or SCHEMA_SNAPSHOT_ENABLED disabled, the YAML files are always parsed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Optional
+
+import yaml
+
+from configs import dify_config
+
+logger = logging.getLogger(__name__)
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SCHEMA_DIRS = ("core/model_runtime/model_providers", "core/tools/provider/builtin")
+SNAPSHOT_VERSION = 1
+
+MISSING = object()
+
+_lock = threading.Lock()
+_loaded = False
+# relative path => JSON of the parsed content
+_files: Optional[dict[str, str]] = None
+
+
+def get(file_path: str) -> Any:
+    """
+    Get the parsed content of a YAML file from the snapshot.
+
+    :param file_path: path of the YAML file
+    :return: the parsed content, or MISSING if the file is not in the snapshot or the snapshot is not used
+    """
+    files = _get_files()
+    if files is None:
+        return MISSING
+
+    content = files.get(os.path.relpath(os.path.abspath(file_path), ROOT_PATH))
+    if content is None:
+        return MISSING
+
+    # parsed again on each call, as the callers modify the returned content
+    return json.loads(content)
+
+
+def build() -> dict:
+    """
+    Parse the YAML files of the schemas into a snapshot.
+
+    Files that cannot be parsed, or whose content does not survive a JSON round trip, are left out of the
+    snapshot and are parsed when used.
+    """
+    stats = _get_file_stats()
+    content_hash = hashlib.sha256()
+    files = {}
+    for relative_path, _, _ in stats:
+        with open(os.path.join(ROOT_PATH, relative_path), "rb") as f:
+            raw = f.read()
+        content_hash.update(relative_path.encode())
+        content_hash.update(raw)
+        try:
+            data = yaml.safe_load(raw)
+            content = json.dumps(data, ensure_ascii=False)
+            if json.loads(content) != data:
+                continue
+        except Exception:
+            continue
+        files[relative_path] = content
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "fingerprint": _get_fingerprint(stats),
+        "content_hash": content_hash.hexdigest(),
+        "files": files,
+    }
+
+
+def save(snapshot: dict, snapshot_path: Optional[str] = None) -> str:
+    """
+    Write a snapshot atomically, as several processes may build it at once.
+
+    :return: path of the snapshot
+    """
+    snapshot_path = snapshot_path or get_snapshot_path()
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(snapshot_path), prefix=".schema_snapshot.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, snapshot_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return snapshot_path
+
+
+def get_snapshot_path() -> str:
+    return os.path.join(ROOT_PATH, dify_config.SCHEMA_SNAPSHOT_PATH)
+
+
+def reset() -> None:
+    """
+    Forget the loaded snapshot, it is loaded again on next use.
+    """
+    global _loaded, _files
+    with _lock:
+        _loaded = False
+        _files = None
+
+
+def _get_files() -> Optional[dict[str, str]]:
+    global _loaded, _files
+    if _loaded:
+        return _files
+
+    with _lock:
+        if not _loaded:
+            if dify_config.SCHEMA_SNAPSHOT_ENABLED and not dify_config.DEBUG:
+                _files = _load_or_build()
+            _loaded = True
+    return _files
+
+
+def _load_or_build() -> Optional[dict[str, str]]:
+    snapshot_path = get_snapshot_path()
+    fingerprint = _get_fingerprint(_get_file_stats())
+    try:
+        with open(snapshot_path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        if snapshot.get("version") == SNAPSHOT_VERSION and snapshot.get("fingerprint") == fingerprint:
+            return snapshot["files"]
+        logger.info("Schema snapshot %s is stale, rebuilding it", snapshot_path)
+    except FileNotFoundError:
+        logger.info("Schema snapshot %s not found, building it", snapshot_path)
+    except Exception:
+        logger.warning("Failed to load schema snapshot %s, rebuilding it", snapshot_path, exc_info=True)
+
+    try:
+        snapshot = build()
+    except Exception:
+        logger.exception("Failed to build schema snapshot, parsing the schemas instead")
+        return None
+
+    try:
+        save(snapshot, snapshot_path)
+    except OSError:
+        logger.warning("Failed to save schema snapshot %s", snapshot_path, exc_info=True)
+    return snapshot["files"]
+
+
+def _get_file_stats() -> list[tuple[str, int, int]]:
+    stats = []
+    for schema_dir in SCHEMA_DIRS:
+        for dir_path, dir_names, file_names in os.walk(os.path.join(ROOT_PATH, schema_dir)):
+            dir_names[:] = [dir_name for dir_name in dir_names if dir_name != "__pycache__"]
+            for file_name in file_names:
+                if not file_name.endswith((".yaml", ".yml")):
+                    continue
+                file_path = os.path.join(dir_path, file_name)
+                stat = os.stat(file_path)
+                stats.append((os.path.relpath(file_path, ROOT_PATH), stat.st_size, stat.st_mtime_ns))
+    return sorted(stats)
+
+
+def _get_fingerprint(stats: list[tuple[str, int, int]]) -> str:
+    return hashlib.sha256(json.dumps(stats).encode()).hexdigest()
+
+
+if __name__ == "__main__":
+    start_at = time.perf_counter()
+    built_snapshot = build()
+    build_time = time.perf_counter() - start_at
+    path = save(built_snapshot)
+
+    start_at = time.perf_counter()
+    with open(path, encoding="utf-8") as snapshot_file:
+        loaded_files = json.load(snapshot_file)["files"]
+    for loaded_content in loaded_files.values():
+        json.loads(loaded_content)
+    load_time = time.perf_counter() - start_at
+
+    print(
+        f"Saved {len(built_snapshot['files'])} schemas to {path} (content hash {built_snapshot['content_hash']}),"
+        f" parsing the YAML files took {build_time:.2f}s, loading the snapshot {load_time:.2f}s"
+    )
@@ -4,13 +4,20 @@ Proxy requests to avoid SSRF
 
 import logging
 import time
+from collections.abc import Callable, Iterable
+from functools import partial
+from tempfile import SpooledTemporaryFile
+from typing import Optional, TypeVar
 
 import httpx
 
 from configs import dify_config
+from core.helper import file_stream
 
 SSRF_DEFAULT_MAX_RETRIES = dify_config.SSRF_DEFAULT_MAX_RETRIES
 
+T = TypeVar("T")
+
 proxy_mounts = (
     {
         "http://": httpx.HTTPTransport(proxy=dify_config.SSRF_PROXY_HTTP_URL),
@@ -30,7 +37,16 @@ class MaxRetriesExceededError(Exception):
     pass
 
 
-def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
+def _create_client() -> httpx.Client:
+    if dify_config.SSRF_PROXY_ALL_URL:
+        return httpx.Client(proxy=dify_config.SSRF_PROXY_ALL_URL)
+    elif proxy_mounts:
+        return httpx.Client(mounts=proxy_mounts)
+    else:
+        return httpx.Client()
+
+
+def _prepare_kwargs(kwargs: dict) -> dict:
     if "allow_redirects" in kwargs:
         allow_redirects = kwargs.pop("allow_redirects")
         if "follow_redirects" not in kwargs:
@@ -43,20 +59,18 @@ def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
             read=dify_config.SSRF_DEFAULT_READ_TIME_OUT,
             write=dify_config.SSRF_DEFAULT_WRITE_TIME_OUT,
         )
+    return kwargs
+
+
+def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
+    kwargs = _prepare_kwargs(kwargs)
 
     retries = 0
     stream = kwargs.pop("stream", False)
     while retries <= max_retries:
         try:
-            if dify_config.SSRF_PROXY_ALL_URL:
-                with httpx.Client(proxy=dify_config.SSRF_PROXY_ALL_URL) as client:
-                    response = client.request(method=method, url=url, **kwargs)
-            elif proxy_mounts:
-                with httpx.Client(mounts=proxy_mounts) as client:
-                    response = client.request(method=method, url=url, **kwargs)
-            else:
-                with httpx.Client() as client:
-                    response = client.request(method=method, url=url, **kwargs)
+            with _create_client() as client:
+                response = client.request(method=method, url=url, **kwargs)
 
             if response.status_code not in STATUS_FORCELIST:
                 return response
@@ -73,6 +87,59 @@ def make_request(method, url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
     raise MaxRetriesExceededError(f"Reached maximum retries ({max_retries}) for URL {url}")
 
 
+def download(
+    url, max_retries=SSRF_DEFAULT_MAX_RETRIES, *, max_size: Optional[int] = None, **kwargs
+) -> SpooledTemporaryFile:
+    """
+    GET a URL into a spooled temporary file, streaming the response body instead of buffering it.
+
+    Failed requests are retried like make_request, from the start of the body.
+
+    :param max_size: size limit in bytes, FILE_DOWNLOAD_MAX_SIZE by default, 0 for no limit
+    :return: the response body, the caller must close it
+    :raises httpx.HTTPStatusError: on error responses
+    :raises FileTooLargeError: if the body, or its announced length, exceeds max_size
+    """
+    return _download(url, max_retries, partial(file_stream.spool, max_size=max_size), max_size, kwargs)
+
+
+def download_bytes(url, max_retries=SSRF_DEFAULT_MAX_RETRIES, *, max_size: Optional[int] = None, **kwargs) -> bytes:
+    """
+    GET a URL into bytes, with the size limit of download enforced while reading.
+    """
+    return _download(url, max_retries, partial(file_stream.read, max_size=max_size), max_size, kwargs)
+
+
+def _download(
+    url, max_retries: int, collect: Callable[[Iterable[bytes]], T], max_size: Optional[int], kwargs: dict
+) -> T:
+    kwargs = _prepare_kwargs(kwargs)
+
+    retries = 0
+    while retries <= max_retries:
+        try:
+            with _create_client() as client, client.stream("GET", url, **kwargs) as response:
+                if response.status_code not in STATUS_FORCELIST:
+                    response.raise_for_status()
+                    content_length = response.headers.get("Content-Length")
+                    if content_length and content_length.isdigit():
+                        file_stream.check_size(int(content_length), max_size)
+                    return collect(response.iter_bytes(file_stream.CHUNK_SIZE))
+                else:
+                    logging.warning(
+                        f"Received status code {response.status_code} for URL {url} which is in the force list"
+                    )
+
+        except httpx.RequestError as e:
+            logging.warning(f"Request to URL {url} failed on attempt {retries + 1}: {e}")
+
+        retries += 1
+        if retries <= max_retries:
+            time.sleep(BACKOFF_FACTOR * (2 ** (retries - 1)))
+
+    raise MaxRetriesExceededError(f"Reached maximum retries ({max_retries}) for URL {url}")
+
+
 def get(url, max_retries=SSRF_DEFAULT_MAX_RETRIES, **kwargs):
     return make_request("GET", url, max_retries=max_retries, **kwargs)
 
@@ -0,0 +1,122 @@
+"""
+Storage of large workflow run and node execution payloads (inputs, process data, outputs).
+
+Payloads over WORKFLOW_PAYLOAD_OFFLOAD_THRESHOLD bytes are gzip compressed into the storage, and the
+database column keeps a small JSON reference with a truncated preview instead:
+
+    {"dify_offloaded_payload": {"key": "...", "size": 123456, "preview": "..."}}
+
+Readers go through load(), which returns stored payloads as they are and fetches offloaded ones, or
+load_many() to fetch the offloaded payloads of a list in one bulk call.
+"""
+
+import gzip
+import json
+import logging
+from collections.abc import Sequence
+from typing import Optional
+from uuid import uuid4
+
+from configs import dify_config
+from extensions.ext_storage import storage
+
+logger = logging.getLogger(__name__)
+
+OFFLOADED_PAYLOAD_KEY = "dify_offloaded_payload"
+STORAGE_PREFIX = "workflow_payloads"
+
+# every reference starts with it, also usable to find offloaded payloads in SQL
+REFERENCE_PREFIX = f'{{"{OFFLOADED_PAYLOAD_KEY}"'
+
+
+def offload(tenant_id: str, payload: Optional[str]) -> Optional[str]:
+    """
+    Move a payload to the storage if it is over the threshold.
+
+    :param tenant_id: tenant id
+    :param payload: JSON payload
+    :return: the payload, or a reference to it if it was offloaded
+    """
+    threshold = dify_config.WORKFLOW_PAYLOAD_OFFLOAD_THRESHOLD
+    if not payload or not threshold or is_offloaded(payload):
+        return payload
+
+    data = payload.encode("utf-8")
+    if len(data) <= threshold:
+        return payload
+
+    key = f"{STORAGE_PREFIX}/{tenant_id}/{uuid4()}.json.gz"
+    try:
+        storage.save(key, gzip.compress(data))
+    except Exception:
+        # keeping the payload in the database is better than losing it
+        logger.exception(f"Failed to offload workflow payload of {len(data)} bytes")
+        return payload
+
+    return json.dumps(
+        {
+            OFFLOADED_PAYLOAD_KEY: {
+                "key": key,
+                "size": len(data),
+                "preview": payload[: dify_config.WORKFLOW_PAYLOAD_PREVIEW_LENGTH],
+            }
+        }
+    )
+
+
+def load(payload: Optional[str]) -> Optional[str]:
+    """
+    Get a payload, fetching it from the storage if it was offloaded.
+
+    :param payload: payload or reference, as stored in the database
+    :return: JSON payload
+    """
+    reference = get_reference(payload)
+    if not reference:
+        return payload
+    return gzip.decompress(storage.load_once(reference["key"])).decode("utf-8")
+
+
+def load_many(payloads: Sequence[Optional[str]]) -> list[Optional[str]]:
+    """
+    Get payloads, fetching the offloaded ones from the storage in one bulk call.
+
+    :param payloads: payloads or references, as stored in the database
+    :return: JSON payloads, in the order of the given ones
+    """
+    references = [get_reference(payload) for payload in payloads]
+    contents = storage.load_many([reference["key"] for reference in references if reference])
+    return [
+        gzip.decompress(contents[reference["key"]]).decode("utf-8") if reference else payload
+        for payload, reference in zip(payloads, references)
+    ]
+
+
+def is_offloaded(payload: Optional[str]) -> bool:
+    return bool(payload) and payload.startswith(REFERENCE_PREFIX)  # type: ignore
+
+
+def get_reference(payload: Optional[str]) -> Optional[dict]:
+    """
+    :return: key, size and preview of an offloaded payload, None if the payload is stored in the database
+    """
+    if not is_offloaded(payload):
+        return None
+    try:
+        reference = json.loads(payload)  # type: ignore
+    except ValueError:
+        return None
+    if not isinstance(reference, dict) or len(reference) != 1:
+        return None
+    return reference.get(OFFLOADED_PAYLOAD_KEY)
+
+
+def delete(*payloads: Optional[str]) -> None:
+    """
+    Delete the offloaded payloads among the given ones from the storage, in one bulk call.
+    """
+    keys = [reference["key"] for reference in map(get_reference, payloads) if reference]
+    try:
+        storage.delete_many(keys)
+    except Exception:
+        logger.exception(f"Failed to delete {len(keys)} offloaded workflow payloads")
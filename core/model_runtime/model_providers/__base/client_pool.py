@@ -0,0 +1,102 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from configs import dify_config
+
+T = TypeVar("T")
+
+
+class ProviderClientPool:
+    """
+    Pool of model provider SDK clients, so that invocations with the same credentials reuse the HTTP
+    connections of a client instead of opening new ones.
+
+    Clients are keyed by provider, endpoint and a fingerprint of the client kwargs, which include the
+    credentials. At most MODEL_PROVIDER_CLIENT_POOL_MAX_SIZE clients are kept, the least recently used ones
+    are evicted first, as are clients unused for MODEL_PROVIDER_CLIENT_POOL_IDLE_TIMEOUT seconds.
+
+    Evicted clients are not closed, as a streamed response may still be read from them, their connections
+    are released when they are garbage collected.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key => (client, last used time), in least recently used order
+        self._clients: OrderedDict[tuple, tuple[Any, float]] = OrderedDict()
+        self._stats: defaultdict[str, dict[str, int]] = defaultdict(lambda: {"created": 0, "reused": 0, "evicted": 0})
+
+    def get_client(self, provider: str, factory: Callable[..., T], **kwargs) -> T:
+        """
+        Get a client of the pool, or create it.
+
+        :param provider: provider name
+        :param factory: client class, or function creating the client from kwargs
+        :param kwargs: client kwargs
+        :return: client
+        """
+        max_size = dify_config.MODEL_PROVIDER_CLIENT_POOL_MAX_SIZE
+        if not max_size:
+            return factory(**kwargs)
+
+        key = self._get_key(provider, factory, kwargs)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            pooled = self._clients.pop(key, None)
+            if pooled is not None:
+                self._clients[key] = (pooled[0], now)
+                self._stats[provider]["reused"] += 1
+                return pooled[0]
+
+        client = factory(**kwargs)
+
+        with self._lock:
+            # another thread may have created the client meanwhile, keep a single one
+            pooled = self._clients.pop(key, None)
+            if pooled is not None:
+                client = pooled[0]
+                self._stats[provider]["reused"] += 1
+            else:
+                self._stats[provider]["created"] += 1
+            self._clients[key] = (client, now)
+            while len(self._clients) > max_size:
+                evicted_key, _ = self._clients.popitem(last=False)
+                self._stats[evicted_key[0]]["evicted"] += 1
+
+        return client
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Get the number of clients created, reused and evicted per provider.
+        """
+        with self._lock:
+            return {provider: dict(stats) for provider, stats in self._stats.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+            self._stats.clear()
+
+    def _evict_idle(self, now: float) -> None:
+        idle_timeout = dify_config.MODEL_PROVIDER_CLIENT_POOL_IDLE_TIMEOUT
+        while self._clients:
+            key, (_, last_used_at) = next(iter(self._clients.items()))
+            if now - last_used_at < idle_timeout:
+                break
+            del self._clients[key]
+            self._stats[key[0]]["evicted"] += 1
+
+    @staticmethod
+    def _get_key(provider: str, factory: Callable, kwargs: dict) -> tuple:
+        endpoint = kwargs.get("base_url") or kwargs.get("azure_endpoint") or ""
+        fingerprint = hashlib.sha256(
+            repr((factory.__module__, factory.__qualname__, sorted(kwargs.items()))).encode()
+        ).hexdigest()
+        return provider, str(endpoint), fingerprint
+
+
+provider_client_pool = ProviderClientPool()
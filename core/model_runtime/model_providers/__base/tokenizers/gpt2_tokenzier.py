@@ -2,8 +2,6 @@ from os.path import abspath, dirname, join
 from threading import Lock
 from typing import Any
 
-from transformers import GPT2Tokenizer as TransformerGPT2Tokenizer
-
 _tokenizer = None
 _lock = Lock()
 
@@ -27,6 +25,9 @@ class GPT2Tokenizer:
         global _tokenizer, _lock
         with _lock:
             if _tokenizer is None:
+                # transformers takes seconds to import, only the processes counting tokens with it pay for it
+                from transformers import GPT2Tokenizer as TransformerGPT2Tokenizer
+
                 base_path = abspath(__file__)
                 gpt2_tokenizer_path = join(dirname(base_path), "gpt2")
                 _tokenizer = TransformerGPT2Tokenizer.from_pretrained(gpt2_tokenizer_path)
@@ -43,6 +43,7 @@ from core.model_runtime.errors.invoke import (
     InvokeServerUnavailableError,
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
+from core.model_runtime.model_providers.__base.client_pool import provider_client_pool
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
 
 ANTHROPIC_BLOCK_MODE_PROMPT = """You should always follow the instructions and output a valid {{block}} object.
@@ -114,7 +115,7 @@ class AnthropicLargeLanguageModel(LargeLanguageModel):
             model_parameters["max_tokens"] = model_parameters.pop("max_tokens_to_sample")
 
         # init model client
-        client = Anthropic(**credentials_kwargs)
+        client = provider_client_pool.get_client("anthropic", Anthropic, **credentials_kwargs)
 
         extra_model_kwargs = {}
         if stop:
@@ -5,6 +5,7 @@ from openai import AzureOpenAI
 
 from core.model_runtime.entities.model_entities import AIModelEntity
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
+from core.model_runtime.model_providers.__base.client_pool import provider_client_pool
 from core.model_runtime.model_providers.__base.speech2text_model import Speech2TextModel
 from core.model_runtime.model_providers.azure_openai._common import _CommonAzureOpenAI
 from core.model_runtime.model_providers.azure_openai._constant import SPEECH2TEXT_BASE_MODELS, AzureBaseModel
@@ -56,7 +57,7 @@ class AzureOpenAISpeech2TextModel(_CommonAzureOpenAI, Speech2TextModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = AzureOpenAI(**credentials_kwargs)
+        client = provider_client_pool.get_client("azure_openai", AzureOpenAI, **credentials_kwargs)
 
         response = client.audio.transcriptions.create(model=model, file=file)
 
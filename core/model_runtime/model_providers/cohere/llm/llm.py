@@ -45,6 +45,7 @@ from core.model_runtime.errors.invoke import (
     InvokeServerUnavailableError,
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
+from core.model_runtime.model_providers.__base.client_pool import provider_client_pool
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
 
 logger = logging.getLogger(__name__)
@@ -191,7 +192,9 @@ class CohereLargeLanguageModel(LargeLanguageModel):
         :return: full response or stream response chunk generator result
         """
         # initialize client
-        client = cohere.Client(credentials.get("api_key"), base_url=credentials.get("base_url"))
+        client = provider_client_pool.get_client(
+            "cohere", cohere.Client, api_key=credentials.get("api_key"), base_url=credentials.get("base_url")
+        )
 
         if stop:
             model_parameters["end_sequences"] = stop
@@ -338,7 +341,9 @@ class CohereLargeLanguageModel(LargeLanguageModel):
         :return: full response or stream response chunk generator result
         """
         # initialize client
-        client = cohere.Client(credentials.get("api_key"), base_url=credentials.get("base_url"))
+        client = provider_client_pool.get_client(
+            "cohere", cohere.Client, api_key=credentials.get("api_key"), base_url=credentials.get("base_url")
+        )
 
         if stop:
             model_parameters["stop_sequences"] = stop
@@ -645,7 +650,9 @@ class CohereLargeLanguageModel(LargeLanguageModel):
         :return: number of tokens
         """
         # initialize client
-        client = cohere.Client(credentials.get("api_key"), base_url=credentials.get("base_url"))
+        client = provider_client_pool.get_client(
+            "cohere", cohere.Client, api_key=credentials.get("api_key"), base_url=credentials.get("base_url")
+        )
 
         response = client.tokenize(text=text, model=model)
 
@@ -13,6 +13,7 @@ from core.model_runtime.errors.invoke import (
     InvokeServerUnavailableError,
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
+from core.model_runtime.model_providers.__base.client_pool import provider_client_pool
 from core.model_runtime.model_providers.__base.rerank_model import RerankModel
 
 
@@ -47,7 +48,9 @@ class CohereRerankModel(RerankModel):
             return RerankResult(model=model, docs=docs)
 
         # initialize client
-        client = cohere.Client(credentials.get("api_key"), base_url=credentials.get("base_url"))
+        client = provider_client_pool.get_client(
+            "cohere", cohere.Client, api_key=credentials.get("api_key"), base_url=credentials.get("base_url")
+        )
         response = client.rerank(
             query=query,
             documents=docs,
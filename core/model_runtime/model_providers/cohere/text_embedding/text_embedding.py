@@ -17,6 +17,7 @@ from core.model_runtime.errors.invoke import (
     InvokeServerUnavailableError,
 )
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
+from core.model_runtime.model_providers.__base.client_pool import provider_client_pool
 from core.model_runtime.model_providers.__base.text_embedding_model import TextEmbeddingModel
 
 
@@ -128,7 +129,9 @@ class CohereTextEmbeddingModel(TextEmbeddingModel):
             return []
 
         # initialize client
-        client = cohere.Client(credentials.get("api_key"), base_url=credentials.get("base_url"))
+        client = provider_client_pool.get_client(
+            "cohere", cohere.Client, api_key=credentials.get("api_key"), base_url=credentials.get("base_url")
+        )
 
         response = client.tokenize(text=text, model=model, offline=False, request_options=RequestOptions(max_retries=0))
 
@@ -158,7 +161,9 @@ class CohereTextEmbeddingModel(TextEmbeddingModel):
         :return: embeddings and used tokens
         """
         # initialize client
-        client = cohere.Client(credentials.get("api_key"), base_url=credentials.get("base_url"))
+        client = provider_client_pool.get_client(
+            "cohere", cohere.Client, api_key=credentials.get("api_key"), base_url=credentials.get("base_url")
+        )
 
         # call embedding model
         response = client.embed(
@@ -26,6 +26,7 @@ from core.model_runtime.entities import (
 from core.model_runtime.entities.llm_entities import LLMMode, LLMResult, LLMResultChunk, LLMResultChunkDelta
 from core.model_runtime.entities.model_entities import AIModelEntity, FetchFrom, I18nObject, ModelType, PriceConfig
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
+from core.model_runtime.model_providers.__base.client_pool import provider_client_pool
 from core.model_runtime.model_providers.__base.large_language_model import LargeLanguageModel
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
 
@@ -406,7 +407,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = provider_client_pool.get_client("openai", OpenAI, **credentials_kwargs)
 
         extra_model_kwargs = {}
 
@@ -577,7 +578,7 @@ class OpenAILargeLanguageModel(_CommonOpenAI, LargeLanguageModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = provider_client_pool.get_client("openai", OpenAI, **credentials_kwargs)
 
         response_format = model_parameters.get("response_format")
         if response_format:
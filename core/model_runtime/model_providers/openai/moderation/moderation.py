@@ -5,6 +5,7 @@ from openai.types import ModerationCreateResponse
 
 from core.model_runtime.entities.model_entities import ModelPropertyKey
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
+from core.model_runtime.model_providers.__base.client_pool import provider_client_pool
 from core.model_runtime.model_providers.__base.moderation_model import ModerationModel
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
 
@@ -28,7 +29,7 @@ class OpenAIModerationModel(_CommonOpenAI, ModerationModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = provider_client_pool.get_client("openai", OpenAI, **credentials_kwargs)
 
         # chars per chunk
         length = self._get_max_characters_per_chunk(model, credentials)
@@ -5,6 +5,7 @@ from openai import OpenAI
 from core.model_runtime.entities.common_entities import I18nObject
 from core.model_runtime.entities.model_entities import AIModelEntity, FetchFrom, ModelType
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
+from core.model_runtime.model_providers.__base.client_pool import provider_client_pool
 from core.model_runtime.model_providers.__base.speech2text_model import Speech2TextModel
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
 
@@ -55,7 +56,7 @@ class OpenAISpeech2TextModel(_CommonOpenAI, Speech2TextModel):
         credentials_kwargs = self._to_credential_kwargs(credentials)
 
         # init model client
-        client = OpenAI(**credentials_kwargs)
+        client = provider_client_pool.get_client("openai", OpenAI, **credentials_kwargs)
 
         response = client.audio.transcriptions.create(model=model, file=file)
 
@@ -5,6 +5,7 @@ from openai import OpenAI
 
 from core.model_runtime.errors.invoke import InvokeBadRequestError
 from core.model_runtime.errors.validate import CredentialsValidateFailedError
+from core.model_runtime.model_providers.__base.client_pool import provider_client_pool
 from core.model_runtime.model_providers.__base.tts_model import TTSModel
 from core.model_runtime.model_providers.openai._common import _CommonOpenAI
 
@@ -68,7 +69,7 @@ class OpenAIText2SpeechModel(_CommonOpenAI, TTSModel):
         try:
             # doc: https://platform.openai.com/docs/guides/text-to-speech
             credentials_kwargs = self._to_credential_kwargs(credentials)
-            client = OpenAI(**credentials_kwargs)
+            client = provider_client_pool.get_client("openai", OpenAI, **credentials_kwargs)
             model_support_voice = [
                 x.get("value") for x in self.get_tts_model_voices(model=model, credentials=credentials)
             ]
@@ -112,7 +113,7 @@ class OpenAIText2SpeechModel(_CommonOpenAI, TTSModel):
         """
         # transform credentials to kwargs for model instance
         credentials_kwargs = self._to_credential_kwargs(credentials)
-        client = OpenAI(**credentials_kwargs)
+        client = provider_client_pool.get_client("openai", OpenAI, **credentials_kwargs)
         response = client.audio.speech.create(model=model, voice=voice, input=sentence.strip())
         if isinstance(response.read(), bytes):
             return response.read()
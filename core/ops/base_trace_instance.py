@@ -24,3 +24,10 @@ class BaseTraceInstance(ABC):
         Subclasses must implement specific tracing logic for activities.
         """
         ...
+
+    def flush(self):  # noqa: B027
+        """
+        Wait until the traces buffered by the client are sent, called once per batch of traces.
+        Subclasses whose client sends traces in the background must override it.
+        """
+        pass
@@ -58,3 +58,6 @@ class LangSmithConfig(BaseTracingConfig):
 
 OPS_FILE_PATH = "ops_trace/"
 OPS_TRACE_FAILED_KEY = "FAILED_OPS_TRACE"
+OPS_TRACE_BATCH_KEY_PREFIX = "ops_trace_batch:"
+# batches not processed within it are dropped
+OPS_TRACE_BATCH_TTL = 24 * 60 * 60
@@ -111,6 +111,11 @@ class TaskData(BaseModel):
     trace_info: Any
 
 
+class TaskBatchData(BaseModel):
+    app_id: str
+    tasks: list[TaskData]
+
+
 trace_info_info_map = {
     "WorkflowTraceInfo": WorkflowTraceInfo,
     "MessageTraceInfo": MessageTraceInfo,
@@ -6,6 +6,7 @@ from typing import Optional
 
 from langfuse import Langfuse  # type: ignore
 
+from core.helper import workflow_payload_storage
 from core.ops.base_trace_instance import BaseTraceInstance
 from core.ops.entities.config_entity import LangfuseConfig
 from core.ops.entities.trace_entity import (
@@ -64,6 +65,9 @@ class LangFuseDataTrace(BaseTraceInstance):
         if isinstance(trace_info, GenerateNameTraceInfo):
             self.generate_name_trace(trace_info)
 
+    def flush(self):
+        self.langfuse_client.flush()
+
     def workflow_trace(self, trace_info: WorkflowTraceInfo):
         trace_id = trace_info.workflow_run_id
         user_id = trace_info.metadata.get("user_id")
@@ -146,13 +150,20 @@ class LangFuseDataTrace(BaseTraceInstance):
             node_name = node_execution.title
             node_type = node_execution.node_type
             status = node_execution.status
+            process_data = (
+                json.loads(workflow_payload_storage.load(node_execution.process_data))
+                if node_execution.process_data
+                else {}
+            )
             if node_type == "llm":
+                inputs = process_data.get("prompts", {})
+            else:
                 inputs = (
-                    json.loads(node_execution.process_data).get("prompts", {}) if node_execution.process_data else {}
+                    json.loads(workflow_payload_storage.load(node_execution.inputs)) if node_execution.inputs else {}
                 )
-            else:
-                inputs = json.loads(node_execution.inputs) if node_execution.inputs else {}
-            outputs = json.loads(node_execution.outputs) if node_execution.outputs else {}
+            outputs = (
+                json.loads(workflow_payload_storage.load(node_execution.outputs)) if node_execution.outputs else {}
+            )
             created_at = node_execution.created_at or datetime.now()
             elapsed_time = node_execution.elapsed_time
             finished_at = created_at + timedelta(seconds=elapsed_time)
@@ -169,7 +180,6 @@ class LangFuseDataTrace(BaseTraceInstance):
                     "status": status,
                 }
             )
-            process_data = json.loads(node_execution.process_data) if node_execution.process_data else {}
             model_provider = process_data.get("model_provider", None)
             model_name = process_data.get("model_name", None)
             if model_provider is not None and model_name is not None:
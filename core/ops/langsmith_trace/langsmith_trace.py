@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 from langsmith import Client
 from langsmith.schemas import RunBase
 
+from core.helper import workflow_payload_storage
 from core.ops.base_trace_instance import BaseTraceInstance
 from core.ops.entities.config_entity import LangSmithConfig
 from core.ops.entities.trace_entity import (
@@ -61,6 +62,11 @@ class LangSmithDataTrace(BaseTraceInstance):
         if isinstance(trace_info, GenerateNameTraceInfo):
             self.generate_name_trace(trace_info)
 
+    def flush(self):
+        # runs with a dotted order are queued and sent in batches by the background thread of the client
+        if self.langsmith_client.tracing_queue is not None:
+            self.langsmith_client.tracing_queue.join()
+
     def workflow_trace(self, trace_info: WorkflowTraceInfo):
         trace_id = trace_info.message_id or trace_info.workflow_run_id
         message_dotted_order = (
@@ -151,13 +157,20 @@ class LangSmithDataTrace(BaseTraceInstance):
             node_name = node_execution.title
             node_type = node_execution.node_type
             status = node_execution.status
+            process_data = (
+                json.loads(workflow_payload_storage.load(node_execution.process_data))
+                if node_execution.process_data
+                else {}
+            )
             if node_type == "llm":
+                inputs = process_data.get("prompts", {})
+            else:
                 inputs = (
-                    json.loads(node_execution.process_data).get("prompts", {}) if node_execution.process_data else {}
+                    json.loads(workflow_payload_storage.load(node_execution.inputs)) if node_execution.inputs else {}
                 )
-            else:
-                inputs = json.loads(node_execution.inputs) if node_execution.inputs else {}
-            outputs = json.loads(node_execution.outputs) if node_execution.outputs else {}
+            outputs = (
+                json.loads(workflow_payload_storage.load(node_execution.outputs)) if node_execution.outputs else {}
+            )
             created_at = node_execution.created_at or datetime.now()
             elapsed_time = node_execution.elapsed_time
             finished_at = created_at + timedelta(seconds=elapsed_time)
@@ -179,7 +192,6 @@ class LangSmithDataTrace(BaseTraceInstance):
                 }
             )
 
-            process_data = json.loads(node_execution.process_data) if node_execution.process_data else {}
             if process_data and process_data.get("model_mode") == "chat":
                 run_type = LangSmithRunType.llm
                 metadata.update(
@@ -12,7 +12,8 @@ from flask import current_app
 
 from core.helper.encrypter import decrypt_token, encrypt_token, obfuscated_token
 from core.ops.entities.config_entity import (
-    OPS_FILE_PATH,
+    OPS_TRACE_BATCH_KEY_PREFIX,
+    OPS_TRACE_BATCH_TTL,
     LangfuseConfig,
     LangSmithConfig,
     TracingProviderEnum,
@@ -23,6 +24,7 @@ from core.ops.entities.trace_entity import (
     MessageTraceInfo,
     ModerationTraceInfo,
     SuggestedQuestionTraceInfo,
+    TaskBatchData,
     TaskData,
     ToolTraceInfo,
     TraceTaskName,
@@ -32,10 +34,10 @@ from core.ops.langfuse_trace.langfuse_trace import LangFuseDataTrace
 from core.ops.langsmith_trace.langsmith_trace import LangSmithDataTrace
 from core.ops.utils import get_message_data
 from extensions.ext_database import db
-from extensions.ext_storage import storage
+from extensions.ext_redis import redis_client
 from models.model import App, AppModelConfig, Conversation, Message, MessageAgentThought, MessageFile, TraceAppConfig
 from models.workflow import WorkflowAppLog, WorkflowRun
-from tasks.ops_trace_task import process_trace_tasks
+from tasks.ops_trace_task import process_trace_batch
 
 provider_config_map = {
     TracingProviderEnum.LANGFUSE.value: {
@@ -741,19 +743,31 @@ class TraceQueueManager:
             trace_manager_timer.start()
 
     def send_to_celery(self, tasks: list[TraceTask]):
+        """
+        Send the collected tasks as one batch per app, stored in redis and processed by one celery task.
+        """
         with self.flask_app.app_context():
+            batches: dict[str, list[TaskData]] = {}
             for task in tasks:
-                file_id = uuid4().hex
-                trace_info = task.execute()
+                try:
+                    trace_info = task.execute()
+                except Exception:
+                    logging.exception(f"Error executing trace task, trace_type {task.trace_type}")
+                    continue
                 task_data = TaskData(
                     app_id=task.app_id,
                     trace_info_type=type(trace_info).__name__,
                     trace_info=trace_info.model_dump() if trace_info else None,
                 )
-                file_path = f"{OPS_FILE_PATH}{task.app_id}/{file_id}.json"
-                storage.save(file_path, task_data.model_dump_json().encode("utf-8"))
-                file_info = {
-                    "file_id": file_id,
-                    "app_id": task.app_id,
+                batches.setdefault(task.app_id, []).append(task_data)
+
+            for app_id, batch in batches.items():
+                batch_key = f"{OPS_TRACE_BATCH_KEY_PREFIX}{app_id}:{uuid4().hex}"
+                batch_data = TaskBatchData(app_id=app_id, tasks=batch)
+                redis_client.setex(batch_key, OPS_TRACE_BATCH_TTL, batch_data.model_dump_json())
+                batch_info = {
+                    "app_id": app_id,
+                    "batch_key": batch_key,
+                    "created_at": time.time(),
                 }
-                process_trace_tasks.delay(file_info)
+                process_trace_batch.delay(batch_info)
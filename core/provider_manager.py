@@ -37,6 +37,7 @@ from models.provider import (
     TenantPreferredModelProvider,
 )
 from services.feature_service import FeatureService
+from services.provider_usage_service import ProviderUsageService
 
 
 class ProviderManager:
@@ -93,6 +94,17 @@ class ProviderManager:
             tenant_id, provider_name_to_provider_records_dict
         )
 
+        # Get the quota used on hosted providers and not written to the provider records yet
+        pending_quota_used = ProviderUsageService.get_pending_quota_used(
+            tenant_id,
+            [
+                (provider_record.provider_name, provider_record.quota_type)
+                for provider_records in provider_name_to_provider_records_dict.values()
+                for provider_record in provider_records
+                if provider_record.provider_type == ProviderType.SYSTEM.value
+            ],
+        )
+
         # Get all provider model records of the workspace
         provider_name_to_provider_model_records_dict = self._get_all_provider_models(tenant_id)
 
@@ -133,7 +145,9 @@ class ProviderManager:
             )
 
             # Convert to system configuration
-            system_configuration = self._to_system_configuration(tenant_id, provider_entity, provider_records)
+            system_configuration = self._to_system_configuration(
+                tenant_id, provider_entity, provider_records, pending_quota_used
+            )
 
             # Get preferred provider type
             preferred_provider_type_record = provider_name_to_preferred_model_provider_records_dict.get(provider_name)
@@ -563,6 +577,7 @@ class ProviderManager:
                 tenant_id=tenant_id,
                 identity_id=custom_provider_record.id,
                 cache_type=ProviderCredentialsCacheType.PROVIDER,
+                encrypted_config=custom_provider_record.encrypted_config,
             )
 
             # Get cached provider credentials
@@ -615,7 +630,10 @@ class ProviderManager:
                 continue
 
             provider_model_credentials_cache = ProviderCredentialsCache(
-                tenant_id=tenant_id, identity_id=provider_model_record.id, cache_type=ProviderCredentialsCacheType.MODEL
+                tenant_id=tenant_id,
+                identity_id=provider_model_record.id,
+                cache_type=ProviderCredentialsCacheType.MODEL,
+                encrypted_config=provider_model_record.encrypted_config,
             )
 
             # Get cached provider model credentials
@@ -658,7 +676,11 @@ class ProviderManager:
         return CustomConfiguration(provider=custom_provider_configuration, models=custom_model_configurations)
 
     def _to_system_configuration(
-        self, tenant_id: str, provider_entity: ProviderEntity, provider_records: list[Provider]
+        self,
+        tenant_id: str,
+        provider_entity: ProviderEntity,
+        provider_records: list[Provider],
+        pending_quota_used: Optional[dict[tuple[str, str], int]] = None,
     ) -> SystemConfiguration:
         """
         Convert to system configuration.
@@ -666,6 +688,7 @@ class ProviderManager:
         :param tenant_id: workspace id
         :param provider_entity: provider entity
         :param provider_records: provider records
+        :param pending_quota_used: quota used and not written to the provider records yet
         :return:
         """
         # Get hosting configuration
@@ -705,14 +728,16 @@ class ProviderManager:
                     continue
             else:
                 provider_record = quota_type_to_provider_records_dict[provider_quota.quota_type]
+                quota_used = provider_record.quota_used + (pending_quota_used or {}).get(
+                    (provider_record.provider_name, provider_record.quota_type), 0
+                )
 
                 quota_configuration = QuotaConfiguration(
                     quota_type=provider_quota.quota_type,
                     quota_unit=provider_hosting_configuration.quota_unit,
-                    quota_used=provider_record.quota_used,
+                    quota_used=quota_used,
                     quota_limit=provider_record.quota_limit,
-                    is_valid=provider_record.quota_limit > provider_record.quota_used
-                    or provider_record.quota_limit == -1,
+                    is_valid=provider_record.quota_limit > quota_used or provider_record.quota_limit == -1,
                     restrict_models=provider_quota.restrict_models,
                 )
 
@@ -732,6 +757,7 @@ class ProviderManager:
                     tenant_id=tenant_id,
                     identity_id=provider_record.id,
                     cache_type=ProviderCredentialsCacheType.PROVIDER,
+                    encrypted_config=provider_record.encrypted_config,
                 )
 
                 # Get cached provider credentials
@@ -872,6 +898,7 @@ class ProviderManager:
                             tenant_id=load_balancing_model_config.tenant_id,
                             identity_id=load_balancing_model_config.id,
                             cache_type=ProviderCredentialsCacheType.LOAD_BALANCING_MODEL,
+                            encrypted_config=load_balancing_model_config.encrypted_config,
                         )
 
                         # Get cached provider model credentials
@@ -128,8 +128,7 @@ class Jieba(BaseKeyword):
             db.session.commit()
         else:
             file_key = "keyword_files/" + self.dataset.tenant_id + "/" + self.dataset.id + ".txt"
-            if storage.exists(file_key):
-                storage.delete(file_key)
+            # save overwrites the existing file
             storage.save(file_key, json.dumps(keyword_table_dict, cls=SetEncoder).encode("utf-8"))
 
     def _get_dataset_keyword_table(self) -> Optional[dict]:
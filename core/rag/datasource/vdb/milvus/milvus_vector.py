@@ -128,6 +128,18 @@ class MilvusVector(BaseVector):
 
         return len(result) > 0
 
+    def texts_exist(self, ids: list[str]) -> set[str]:
+        if not ids or not self._client.has_collection(self._collection_name):
+            return set()
+
+        result = self._client.query(
+            collection_name=self._collection_name,
+            filter=f'metadata["doc_id"] in {ids}',
+            output_fields=[Field.METADATA_KEY.value],
+        )
+
+        return {r[Field.METADATA_KEY.value]["doc_id"] for r in result}
+
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
         # Set search parameters.
         results = self._client.search(
@@ -119,6 +119,13 @@ class PGVector(BaseVector):
             cur.execute(f"SELECT id FROM {self.table_name} WHERE id = %s", (id,))
             return cur.fetchone() is not None
 
+    def texts_exist(self, ids: list[str]) -> set[str]:
+        if not ids:
+            return set()
+        with self._get_cursor() as cur:
+            cur.execute(f"SELECT id FROM {self.table_name} WHERE id IN %s", (tuple(ids),))
+            return {str(record[0]) for record in cur}
+
     def get_by_ids(self, ids: list[str]) -> list[Document]:
         with self._get_cursor() as cur:
             cur.execute(f"SELECT meta, text FROM {self.table_name} WHERE id IN %s", (tuple(ids),))
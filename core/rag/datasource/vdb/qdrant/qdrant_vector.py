@@ -315,6 +315,22 @@ class QdrantVector(BaseVector):
 
         return len(response) > 0
 
+    def texts_exist(self, ids: list[str]) -> set[str]:
+        if not ids:
+            return set()
+        all_collection_name = []
+        collections_response = self._client.get_collections()
+        collection_list = collections_response.collections
+        for collection in collection_list:
+            all_collection_name.append(collection.name)
+        if self._collection_name not in all_collection_name:
+            return set()
+        response = self._client.retrieve(
+            collection_name=self._collection_name, ids=ids, with_payload=False, with_vectors=False
+        )
+
+        return {str(record.id) for record in response}
+
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
         from qdrant_client.http import models
 
@@ -26,6 +26,15 @@ class BaseVector(ABC):
     def text_exists(self, id: str) -> bool:
         raise NotImplementedError
 
+    def texts_exist(self, ids: list[str]) -> set[str]:
+        """
+        Return the subset of ``ids`` that already exist in the store.
+
+        Stores that can check many ids in one request should override this;
+        the default falls back to one ``text_exists`` call per id.
+        """
+        return {id for id in ids if self.text_exists(id)}
+
     @abstractmethod
     def delete_by_ids(self, ids: list[str]) -> None:
         raise NotImplementedError
@@ -50,13 +59,11 @@ class BaseVector(ABC):
         raise NotImplementedError
 
     def _filter_duplicate_texts(self, texts: list[Document]) -> list[Document]:
-        for text in texts.copy():
-            doc_id = text.metadata["doc_id"]
-            exists_duplicate_node = self.text_exists(doc_id)
-            if exists_duplicate_node:
-                texts.remove(text)
+        if not texts:
+            return texts
 
-        return texts
+        existing_ids = self.texts_exist(self._get_uuids(texts))
+        return [text for text in texts if text.metadata["doc_id"] not in existing_ids]
 
     def _get_uuids(self, texts: list[Document]) -> list[str]:
         return [text.metadata["doc_id"] for text in texts]
@@ -153,6 +153,8 @@ class Vector:
     def add_texts(self, documents: list[Document], **kwargs):
         if kwargs.get("duplicate_check", False):
             documents = self._filter_duplicate_texts(documents)
+            if not documents:
+                return
 
         embeddings = self._embeddings.embed_documents([document.page_content for document in documents])
         self._vector_processor.create(texts=documents, embeddings=embeddings, **kwargs)
@@ -160,6 +162,9 @@ class Vector:
     def text_exists(self, id: str) -> bool:
         return self._vector_processor.text_exists(id)
 
+    def texts_exist(self, ids: list[str]) -> set[str]:
+        return self._vector_processor.texts_exist(ids)
+
     def delete_by_ids(self, ids: list[str]) -> None:
         self._vector_processor.delete_by_ids(ids)
 
@@ -192,13 +197,11 @@ class Vector:
         return CacheEmbedding(embedding_model)
 
     def _filter_duplicate_texts(self, texts: list[Document]) -> list[Document]:
-        for text in texts.copy():
-            doc_id = text.metadata["doc_id"]
-            exists_duplicate_node = self.text_exists(doc_id)
-            if exists_duplicate_node:
-                texts.remove(text)
+        if not texts:
+            return texts
 
-        return texts
+        existing_ids = self.texts_exist([text.metadata["doc_id"] for text in texts])
+        return [text for text in texts if text.metadata["doc_id"] not in existing_ids]
 
     def __getattr__(self, name):
         if self._vector_processor is not None:
@@ -163,6 +163,33 @@ class WeaviateVector(BaseVector):
 
         return True
 
+    def texts_exist(self, ids: list[str]) -> set[str]:
+        if not ids:
+            return set()
+        collection_name = self._collection_name
+        schema = self._default_schema(self._collection_name)
+
+        # check whether the index already exists
+        if not self._client.schema.contains(schema):
+            return set()
+        result = (
+            self._client.query.get(collection_name, ["doc_id"])
+            .with_where(
+                {
+                    "operator": "Or",
+                    "operands": [{"path": ["doc_id"], "operator": "Equal", "valueText": id} for id in ids],
+                }
+            )
+            .with_limit(len(ids))
+            .do()
+        )
+
+        if "errors" in result:
+            raise ValueError(f"Error during query: {result['errors']}")
+
+        entries = result["data"]["Get"][collection_name]
+        return {entry["doc_id"] for entry in entries}
+
     def delete_by_ids(self, ids: list[str]) -> None:
         # check whether the index already exists
         schema = self._default_schema(self._collection_name)
@@ -3,8 +3,6 @@
 import csv
 from typing import Optional
 
-import pandas as pd
-
 from core.rag.extractor.extractor_base import BaseExtractor
 from core.rag.extractor.helpers import detect_file_encodings
 from core.rag.models.document import Document
@@ -55,6 +53,8 @@ class CSVExtractor(BaseExtractor):
         return docs
 
     def _read_from_file(self, csvfile) -> list[Document]:
+        import pandas as pd
+
         docs = []
         try:
             # load csv file into pandas dataframe
@@ -1,14 +1,29 @@
 """Abstract interface for document loader implementations."""
 
+import logging
 import os
-from typing import Optional
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Optional
 
-import pandas as pd
 from openpyxl import load_workbook
+from openpyxl.packaging.relationship import get_dependents, get_rels_path
+from openpyxl.utils.cell import range_boundaries
+from openpyxl.xml.constants import REL_NS, SHEET_MAIN_NS
+from openpyxl.xml.functions import iterparse
 
 from core.rag.extractor.extractor_base import BaseExtractor
 from core.rag.models.document import Document
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_SHEET_DATA_TAG = f"{{{SHEET_MAIN_NS}}}sheetData"
+_ROW_TAG = f"{{{SHEET_MAIN_NS}}}row"
+_HYPERLINK_TAG = f"{{{SHEET_MAIN_NS}}}hyperlink"
+_HYPERLINK_REL_TYPE = f"{REL_NS}/hyperlink"
+
 
 class ExcelExtractor(BaseExtractor):
     """Load Excel files.
@@ -26,53 +41,118 @@ class ExcelExtractor(BaseExtractor):
 
     def extract(self) -> list[Document]:
         """Load from Excel file in xls or xlsx format using Pandas and openpyxl."""
-        documents = []
+        return list(self.load())
+
+    def load(self) -> Iterator[Document]:
+        """Lazily load rows as documents, one sheet row at a time."""
         file_extension = os.path.splitext(self._file_path)[-1].lower()
 
         if file_extension == ".xlsx":
-            wb = load_workbook(self._file_path, data_only=True)
-            for sheet_name in wb.sheetnames:
-                sheet = wb[sheet_name]
-                data = sheet.values
+            yield from self._load_xlsx()
+        elif file_extension == ".xls":
+            yield from self._load_xls()
+        else:
+            raise ValueError(f"Unsupported file extension: {file_extension}")
+
+    def _load_xlsx(self) -> Iterator[Document]:
+        # read-only mode streams rows from the archive instead of building every cell object up front
+        wb = load_workbook(self._file_path, read_only=True, data_only=True)
+        try:
+            for sheet in wb.worksheets:
+                # the stored dimension is often wrong for files written by third-party tools
+                sheet.reset_dimensions()
+                hyperlinks = self._load_hyperlinks(sheet)
+
+                rows = sheet.iter_rows(values_only=True)
                 try:
-                    cols = next(data)
+                    header = next(rows)
                 except StopIteration:
                     continue
-                df = pd.DataFrame(data, columns=cols)
 
-                df.dropna(how="all", inplace=True)
-
-                for index, row in df.iterrows():
+                # +2 to account for header and 1-based index
+                for row_index, values in enumerate(rows, start=2):
                     page_content = []
-                    for col_index, (k, v) in enumerate(row.items()):
-                        if pd.notna(v):
-                            cell = sheet.cell(
-                                row=index + 2, column=col_index + 1
-                            )  # +2 to account for header and 1-based index
-                            if cell.hyperlink:
-                                value = f"[{v}]({cell.hyperlink.target})"
-                                page_content.append(f'"{k}":"{value}"')
-                            else:
-                                page_content.append(f'"{k}":"{v}"')
-                    documents.append(
-                        Document(page_content=";".join(page_content), metadata={"source": self._file_path})
-                    )
+                    for col_index, v in enumerate(values, start=1):
+                        if v is None:
+                            continue
+                        # rows are not padded to the sheet width, so the header may be shorter than the row
+                        k = header[col_index - 1] if col_index <= len(header) else None
+                        target = hyperlinks.get((row_index, col_index))
+                        if target:
+                            page_content.append(f'"{k}":"[{v}]({target})"')
+                        else:
+                            page_content.append(f'"{k}":"{v}"')
+                    if page_content:
+                        yield Document(page_content=";".join(page_content), metadata={"source": self._file_path})
+        finally:
+            wb.close()
 
-        elif file_extension == ".xls":
-            excel_file = pd.ExcelFile(self._file_path, engine="xlrd")
-            for sheet_name in excel_file.sheet_names:
-                df = excel_file.parse(sheet_name=sheet_name)
-                df.dropna(how="all", inplace=True)
+    def _load_xls(self) -> Iterator[Document]:
+        import pandas as pd
 
-                for _, row in df.iterrows():
-                    page_content = []
-                    for k, v in row.items():
-                        if pd.notna(v):
-                            page_content.append(f'"{k}":"{v}"')
-                    documents.append(
-                        Document(page_content=";".join(page_content), metadata={"source": self._file_path})
-                    )
-        else:
-            raise ValueError(f"Unsupported file extension: {file_extension}")
+        excel_file = pd.ExcelFile(self._file_path, engine="xlrd")
+        for sheet_name in excel_file.sheet_names:
+            df = excel_file.parse(sheet_name=sheet_name)
+            df.dropna(how="all", inplace=True)
+
+            for page_content in self._format_rows(df):
+                yield Document(page_content=page_content, metadata={"source": self._file_path})
+
+    @staticmethod
+    def _format_rows(df: "pd.DataFrame") -> Iterator[str]:
+        """Format every row as `"column":"value"` pairs, building the cell strings column by column."""
+        import pandas as pd
 
-        return documents
+        formatted = pd.DataFrame(
+            {
+                index: ('"' + str(k) + '":"' + column.astype(str) + '"').where(column.notna(), "")
+                for index, (k, column) in enumerate(df.items())
+            },
+            index=df.index,
+        )
+        for cells in formatted.itertuples(index=False, name=None):
+            yield ";".join(cell for cell in cells if cell)
+
+    @staticmethod
+    def _load_hyperlinks(sheet) -> dict[tuple[int, int], str]:
+        """
+        Build a (row, column) -> target map from the sheet's hyperlink list.
+
+        Read-only worksheets do not bind hyperlinks to cells, and the hyperlink list is
+        stored after the cell data, so it is collected in a separate pass that discards rows.
+        It relies on openpyxl internals, so the cells are loaded without hyperlinks if it fails.
+        """
+        try:
+            return ExcelExtractor._parse_hyperlinks(sheet)
+        except Exception:
+            logger.warning(f"Failed to load the hyperlinks of sheet {sheet.title}", exc_info=True)
+            return {}
+
+    @staticmethod
+    def _parse_hyperlinks(sheet) -> dict[tuple[int, int], str]:
+        archive = sheet.parent._archive
+        rels_path = get_rels_path(sheet._worksheet_path)
+        if rels_path not in archive.namelist():
+            return {}
+        targets = {rel.Id: rel.Target for rel in get_dependents(archive, rels_path) if rel.Type == _HYPERLINK_REL_TYPE}
+        if not targets:
+            return {}
+
+        hyperlinks = {}
+        sheet_data = None
+        with sheet._get_source() as src:
+            for event, element in iterparse(src, events=("start", "end")):
+                if event == "start":
+                    if element.tag == _SHEET_DATA_TAG:
+                        sheet_data = element
+                    continue
+                if element.tag == _ROW_TAG and sheet_data is not None:
+                    sheet_data.clear()
+                elif element.tag == _HYPERLINK_TAG:
+                    target = targets.get(element.get(f"{{{REL_NS}}}id"))
+                    if target:
+                        min_col, min_row, max_col, max_row = range_boundaries(element.get("ref"))
+                        for row in range(min_row, max_row + 1):
+                            for col in range(min_col, max_col + 1):
+                                hyperlinks[(row, col)] = target
+        return hyperlinks
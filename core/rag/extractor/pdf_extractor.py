@@ -1,13 +1,23 @@
 """Abstract interface for document loader implementations."""
 
-from collections.abc import Iterator
+import json
+import logging
+import multiprocessing
+import tempfile
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Optional
 
+from configs import dify_config
 from core.rag.extractor.blob.blob import Blob
 from core.rag.extractor.extractor_base import BaseExtractor
 from core.rag.models.document import Document
 from extensions.ext_storage import storage
 
+logger = logging.getLogger(__name__)
+
 
 class PdfExtractor(BaseExtractor):
     """Load pdf files.
@@ -15,6 +25,7 @@ class PdfExtractor(BaseExtractor):
 
     Args:
         file_path: Path to the file to load.
+        file_cache_key: Storage key of the extracted text cache, see get_plaintext_cache_key. Not cached if None.
     """
 
     def __init__(self, file_path: str, file_cache_key: Optional[str] = None):
@@ -23,26 +34,56 @@ class PdfExtractor(BaseExtractor):
         self._file_cache_key = file_cache_key
 
     def extract(self) -> list[Document]:
-        plaintext_file_key = ""
-        plaintext_file_exists = False
-        if self._file_cache_key:
+        blob = Blob.from_path(self._file_path)
+        pages = self.extract_pages(blob, cache_key=self._file_cache_key)
+        return [
+            Document(page_content=content, metadata={"source": blob.source, "page": page_number})
+            for page_number, content in enumerate(pages)
+        ]
+
+    @classmethod
+    def extract_pages(cls, blob: Blob, cache_key: Optional[str] = None) -> list[str]:
+        """
+        Extract the text of every page, reading from and filling the plaintext cache in storage when a
+        cache key is given.
+
+        The cache is keyed by upload file, so dataset indexing and indexing estimates share the result
+        for the same file, and it is deleted with the file by delete_plaintext_caches.
+        """
+        if not cache_key or not dify_config.PDF_PLAINTEXT_CACHE_ENABLED:
+            return [document.page_content for document in cls.parse(blob)]
+
+        try:
+            if storage.exists(cache_key):
+                return json.loads(storage.load_once(cache_key))
+        except Exception:
+            logger.exception(f"Failed to load pdf plaintext cache {cache_key}")
+
+        pages = [document.page_content for document in cls.parse(blob)]
+
+        try:
+            storage.save(cache_key, json.dumps(pages, ensure_ascii=False).encode("utf-8"))
+        except Exception:
+            logger.exception(f"Failed to save pdf plaintext cache {cache_key}")
+
+        return pages
+
+    @staticmethod
+    def get_plaintext_cache_key(upload_file_id: str) -> str:
+        return f"plaintext_files/pdf/{upload_file_id}.json"
+
+    @classmethod
+    def delete_plaintext_caches(cls, upload_file_ids: Iterable[str]) -> None:
+        """
+        Delete the plaintext caches of upload files, if any.
+        """
+        for upload_file_id in upload_file_ids:
+            cache_key = cls.get_plaintext_cache_key(upload_file_id)
             try:
-                text = storage.load(self._file_cache_key).decode("utf-8")
-                plaintext_file_exists = True
-                return [Document(page_content=text)]
-            except FileNotFoundError:
-                pass
-        documents = list(self.load())
-        text_list = []
-        for document in documents:
-            text_list.append(document.page_content)
-        text = "\n\n".join(text_list)
-
-        # save plaintext file for caching
-        if not plaintext_file_exists and plaintext_file_key:
-            storage.save(plaintext_file_key, text.encode("utf-8"))
-
-        return documents
+                if storage.exists(cache_key):
+                    storage.delete(cache_key)
+            except Exception:
+                logger.exception(f"Failed to delete pdf plaintext cache {cache_key}")
 
     def load(
         self,
@@ -51,19 +92,87 @@ class PdfExtractor(BaseExtractor):
         blob = Blob.from_path(self._file_path)
         yield from self.parse(blob)
 
-    def parse(self, blob: Blob) -> Iterator[Document]:
+    @classmethod
+    def parse(cls, blob: Blob) -> Iterator[Document]:
         """Lazily parse the blob."""
         import pypdfium2
 
+        threshold = dify_config.PDF_PARALLEL_EXTRACT_PAGE_THRESHOLD
+        max_workers = dify_config.PDF_PARALLEL_EXTRACT_MAX_WORKERS
+
         with blob.as_bytes_io() as file_path:
             pdf_reader = pypdfium2.PdfDocument(file_path, autoclose=True)
             try:
-                for page_number, page in enumerate(pdf_reader):
-                    text_page = page.get_textpage()
-                    content = text_page.get_text_range()
-                    text_page.close()
-                    page.close()
+                page_count = len(pdf_reader)
+                if threshold and max_workers > 1 and page_count >= threshold:
+                    contents = iter(_extract_pages_in_parallel(blob, page_count, max_workers))
+                else:
+                    contents = _iter_page_contents(pdf_reader)
+                for page_number, content in enumerate(contents):
                     metadata = {"source": blob.source, "page": page_number}
                     yield Document(page_content=content, metadata=metadata)
             finally:
                 pdf_reader.close()
+
+
+def _iter_page_contents(pages) -> Iterator[str]:
+    for page in pages:
+        text_page = page.get_textpage()
+        content = text_page.get_text_range()
+        text_page.close()
+        page.close()
+        yield content
+
+
+# shared by the parallel extractions of a process, created on first use
+_executor_lock = threading.Lock()
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor(max_workers: int) -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn instead of fork, the parent may be a gevent worker with live threads and connections
+            _executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def _extract_pages_in_parallel(blob: Blob, page_count: int, max_workers: int) -> list[str]:
+    """Split the pages into contiguous ranges and extract them in a process pool, keeping page order."""
+    if blob.data is None and blob.path:
+        return _extract_file_pages_in_parallel(str(blob.path), page_count, max_workers)
+
+    # the workers read the file from disk, instead of receiving a copy of the content each
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf_file:
+        pdf_file.write(blob.as_bytes())
+        pdf_file.flush()
+        return _extract_file_pages_in_parallel(pdf_file.name, page_count, max_workers)
+
+
+def _extract_file_pages_in_parallel(file_path: str, page_count: int, max_workers: int) -> list[str]:
+    global _executor
+    chunk_size = -(-page_count // max_workers)
+    starts = list(range(0, page_count, chunk_size))
+    ends = [min(start + chunk_size, page_count) for start in starts]
+
+    executor = _get_executor(max_workers)
+    try:
+        results = executor.map(_extract_page_range, [file_path] * len(starts), starts, ends)
+        return [content for chunk in results for content in chunk]
+    except BrokenProcessPool:
+        # a worker died, the next extraction starts a new pool
+        with _executor_lock:
+            if _executor is executor:
+                _executor = None
+        raise
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> list[str]:
+    import pypdfium2
+
+    pdf_reader = pypdfium2.PdfDocument(file_path)
+    try:
+        return list(_iter_page_contents(pdf_reader[page_number] for page_number in range(start, end)))
+    finally:
+        pdf_reader.close()
@@ -6,7 +6,6 @@ import threading
 import uuid
 from typing import Optional
 
-import pandas as pd
 from flask import Flask, current_app
 from werkzeug.datastructures import FileStorage
 
@@ -107,6 +106,8 @@ class QAIndexProcessor(BaseIndexProcessor):
         if not file.filename.endswith(".csv"):
             raise ValueError("Invalid file type. Only CSV files are allowed")
 
+        import pandas as pd
+
         try:
             # Skip the first row
             df = pd.read_csv(file)
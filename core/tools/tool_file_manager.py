@@ -8,9 +8,10 @@ from mimetypes import guess_extension, guess_type
 from typing import Optional, Union
 from uuid import uuid4
 
-from httpx import get
+from httpx import stream
 
 from configs import dify_config
+from core.helper import file_stream
 from extensions.ext_database import db
 from extensions.ext_storage import storage
 from models.model import MessageFile
@@ -92,11 +93,11 @@ class ToolFileManager:
         conversation_id: str | None,
         file_url: str,
     ) -> ToolFile:
-        # try to download image
+        # try to download image, streamed with the download size limit
         try:
-            response = get(file_url)
-            response.raise_for_status()
-            blob = response.content
+            with stream("GET", file_url) as response:
+                response.raise_for_status()
+                file = file_stream.spool(response.iter_bytes(file_stream.CHUNK_SIZE))
         except Exception as e:
             logger.exception(f"Failed to download file from {file_url}")
             raise
@@ -106,7 +107,9 @@ class ToolFileManager:
         unique_name = uuid4().hex
         filename = f"{unique_name}{extension}"
         filepath = f"tools/{tenant_id}/{filename}"
-        storage.save(filepath, blob)
+        with file:
+            size = file_stream.get_size(file)
+            storage.save_stream(filepath, file)
 
         tool_file = ToolFile(
             user_id=user_id,
@@ -116,7 +119,7 @@ class ToolFileManager:
             mimetype=mimetype,
             original_url=file_url,
             name=filename,
-            size=len(blob),
+            size=size,
         )
 
         db.session.add(tool_file)
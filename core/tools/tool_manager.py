@@ -648,5 +648,8 @@ class ToolManager:
             raise ValueError(f"provider type {provider_type} not found")
 
 
-# preload builtin tool providers
-Thread(target=ToolManager.load_builtin_providers_cache, name="pre_load_builtin_providers_cache", daemon=True).start()
+# preload builtin tool providers in the processes listing them, the others load them on first use
+if dify_config.PROCESS_ROLE in {"all", "api"}:
+    Thread(
+        target=ToolManager.load_builtin_providers_cache, name="pre_load_builtin_providers_cache", daemon=True
+    ).start()
@@ -1,5 +1,6 @@
 import hashlib
 import json
+import logging
 import mimetypes
 import os
 import re
@@ -20,6 +21,9 @@ from regex import regex
 from core.helper import ssrf_proxy
 from core.rag.extractor import extract_processor
 from core.rag.extractor.extract_processor import ExtractProcessor
+from extensions.ext_database import db
+from extensions.ext_storage import storage
+from models.model import UploadFile
 
 FULL_TEMPLATE = """
 TITLE: {title}
@@ -372,3 +376,21 @@ def get_image_upload_file_ids(content):
             image_upload_file_id = content_match.group(1)
             image_upload_file_ids.append(image_upload_file_id)
     return image_upload_file_ids
+
+
+def delete_image_upload_files(image_upload_file_ids: list[str]) -> None:
+    """
+    Delete the image files of segments, from the storage in one bulk call, and their records.
+    The caller commits the session.
+    """
+    if not image_upload_file_ids:
+        return
+    image_files = db.session.query(UploadFile).filter(UploadFile.id.in_(image_upload_file_ids)).all()
+    try:
+        storage.delete_many([image_file.key for image_file in image_files if image_file.key])
+    except Exception:
+        logging.exception(
+            "Delete image_files failed when storage deleted, image_upload_file_ids: {}".format(image_upload_file_ids)
+        )
+    for image_file in image_files:
+        db.session.delete(image_file)
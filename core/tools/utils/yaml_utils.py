@@ -5,6 +5,8 @@ from typing import Any
 import yaml
 from yaml import YAMLError
 
+from core.helper import schema_snapshot
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,6 +20,11 @@ def load_yaml_file(file_path: str, ignore_error: bool = True, default_value: Any
     :param default_value: the value returned when errors ignored
     :return: an object of the YAML content
     """
+    if file_path:
+        snapshot_content = schema_snapshot.get(file_path)
+        if snapshot_content is not schema_snapshot.MISSING:
+            return snapshot_content or default_value
+
     if not file_path or not Path(file_path).exists():
         if ignore_error:
             return default_value
@@ -0,0 +1,162 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import IO, Optional
+
+from configs import dify_config
+from core.file import File, FileTransferMethod
+from core.helper.file_stream import CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractedTextCache:
+    """
+    Local disk cache of text extracted from files.
+
+    Entries expire DOCUMENT_EXTRACTOR_CACHE_TTL seconds after they are written, so the text of
+    deleted files is not kept, and the least recently read entries are evicted once the total
+    size exceeds the limit. An entry's modification time is its write time and its access time
+    is its last read.
+    """
+
+    def __init__(self, local_dir: Optional[str] = None, local_max_size: Optional[int] = None):
+        self._local_dir = local_dir
+        self._local_max_size = local_max_size
+        # size of the directory as known by this process, rescanned only once it exceeds the limit
+        self._lock = threading.Lock()
+        self._local_size: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return dify_config.DOCUMENT_EXTRACTOR_CACHE_ENABLED
+
+    @property
+    def local_dir(self) -> str:
+        return (
+            self._local_dir
+            or dify_config.DOCUMENT_EXTRACTOR_LOCAL_CACHE_DIR
+            or os.path.join(tempfile.gettempdir(), "dify_document_extractor_cache")
+        )
+
+    @property
+    def local_max_size(self) -> int:
+        if self._local_max_size is not None:
+            return self._local_max_size
+        return dify_config.DOCUMENT_EXTRACTOR_LOCAL_CACHE_MAX_SIZE
+
+    @staticmethod
+    def get_file_key(file: File) -> Optional[str]:
+        """
+        Key for files whose content never changes for a given id, so the content does not have to be
+        downloaded to look the text up. Remote files return None and are keyed by content instead.
+        """
+        if file.transfer_method == FileTransferMethod.REMOTE_URL or not file.related_id:
+            return None
+        return _hash(f"{file.transfer_method.value}:{file.related_id}:{file.extension}:{file.mime_type}".encode())
+
+    @staticmethod
+    def get_content_key(file: File, content: IO[bytes]) -> str:
+        """
+        Key derived from the file content, read in chunks then rewound.
+        """
+        content_hash = hashlib.sha256(f"{file.extension}:{file.mime_type}:".encode())
+        while chunk := content.read(CHUNK_SIZE):
+            content_hash.update(chunk)
+        content.seek(0)
+        return content_hash.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled or not self.local_max_size:
+            return None
+
+        local_path = self._get_local_path(key)
+        try:
+            written_at = os.stat(local_path).st_mtime
+            if time.time() - written_at > dify_config.DOCUMENT_EXTRACTOR_CACHE_TTL:
+                os.remove(local_path)
+                return None
+            text = Path(local_path).read_text(encoding="utf-8")
+            os.utime(local_path, (time.time(), written_at))
+            return text
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.exception(f"Failed to read extracted text cache {local_path}")
+            return None
+
+    def set(self, key: str, text: str) -> None:
+        if not self.enabled:
+            return
+
+        max_size = self.local_max_size
+        data = text.encode("utf-8")
+        if not max_size or len(data) > max_size:
+            return
+
+        try:
+            os.makedirs(self.local_dir, exist_ok=True)
+            # write then rename, so concurrent readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.local_dir, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._get_local_path(key))
+            with self._lock:
+                if self._local_size is None or self._local_size + len(data) > max_size:
+                    self._local_size = self._evict(max_size)
+                else:
+                    self._local_size += len(data)
+        except Exception:
+            logger.exception(f"Failed to save extracted text cache {key} to local disk")
+
+    def _get_local_path(self, key: str) -> str:
+        return os.path.join(self.local_dir, key)
+
+    def _evict(self, max_size: int) -> int:
+        """
+        Remove the expired entries, then the least recently read ones until the total size fits.
+
+        :return: total size of the remaining entries
+        """
+        expired_before = time.time() - dify_config.DOCUMENT_EXTRACTOR_CACHE_TTL
+        entries = []
+        total_size = 0
+        with os.scandir(self.local_dir) as it:
+            for entry in it:
+                if not entry.is_file() or entry.name.startswith(".tmp-"):
+                    continue
+                stat = entry.stat()
+                if stat.st_mtime < expired_before:
+                    _remove(entry.path)
+                    continue
+                entries.append((stat.st_atime, stat.st_size, entry.path))
+                total_size += stat.st_size
+
+        if total_size <= max_size:
+            return total_size
+
+        entries.sort()
+        for _, size, path in entries:
+            _remove(path)
+            total_size -= size
+            if total_size <= max_size:
+                break
+        return total_size
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+extracted_text_cache = ExtractedTextCache()
@@ -2,22 +2,20 @@ import csv
 import io
 import json
 import os
+import shutil
 import tempfile
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import IO
 
-import docx
-import pandas as pd
-import pypdfium2  # type: ignore
 import yaml  # type: ignore
-from unstructured.partition.api import partition_via_api
-from unstructured.partition.email import partition_email
-from unstructured.partition.epub import partition_epub
-from unstructured.partition.msg import partition_msg
-from unstructured.partition.ppt import partition_ppt
-from unstructured.partition.pptx import partition_pptx
+from flask import Flask, current_app
 
 from configs import dify_config
 from core.file import File, FileTransferMethod, file_manager
-from core.helper import ssrf_proxy
+from core.rag.extractor.blob.blob import Blob
+from core.rag.extractor.pdf_extractor import PdfExtractor
 from core.variables import ArrayFileSegment
 from core.variables.segments import FileSegment
 from core.workflow.entities.node_entities import NodeRunResult
@@ -25,6 +23,7 @@ from core.workflow.nodes.base import BaseNode
 from core.workflow.nodes.enums import NodeType
 from models.workflow import WorkflowNodeExecutionStatus
 
+from .cache import extracted_text_cache
 from .entities import DocumentExtractorNodeData
 from .exc import DocumentExtractorError, FileDownloadError, TextExtractionError, UnsupportedFileTypeError
 
@@ -55,7 +54,7 @@ class DocumentExtractorNode(BaseNode[DocumentExtractorNodeData]):
 
         try:
             if isinstance(value, list):
-                extracted_text_list = list(map(_extract_text_from_file, value))
+                extracted_text_list = _extract_text_from_files(value)
                 return NodeRunResult(
                     status=WorkflowNodeExecutionStatus.SUCCEEDED,
                     inputs=inputs,
@@ -81,145 +80,170 @@ class DocumentExtractorNode(BaseNode[DocumentExtractorNodeData]):
             )
 
 
-def _extract_text_by_mime_type(*, file_content: bytes, mime_type: str) -> str:
+def _extract_text_by_mime_type(*, content: IO[bytes], mime_type: str) -> str:
     """Extract text from a file based on its MIME type."""
     match mime_type:
         case "text/plain" | "text/html" | "text/htm" | "text/markdown" | "text/xml":
-            return _extract_text_from_plain_text(file_content)
+            return _extract_text_from_plain_text(content)
         case "application/pdf":
-            return _extract_text_from_pdf(file_content)
+            return _extract_text_from_pdf(content)
         case "application/vnd.openxmlformats-officedocument.wordprocessingml.document" | "application/msword":
-            return _extract_text_from_doc(file_content)
+            return _extract_text_from_doc(content)
         case "text/csv":
-            return _extract_text_from_csv(file_content)
+            return _extract_text_from_csv(content)
         case "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" | "application/vnd.ms-excel":
-            return _extract_text_from_excel(file_content)
+            return _extract_text_from_excel(content)
         case "application/vnd.ms-powerpoint":
-            return _extract_text_from_ppt(file_content)
+            return _extract_text_from_ppt(content)
         case "application/vnd.openxmlformats-officedocument.presentationml.presentation":
-            return _extract_text_from_pptx(file_content)
+            return _extract_text_from_pptx(content)
         case "application/epub+zip":
-            return _extract_text_from_epub(file_content)
+            return _extract_text_from_epub(content)
         case "message/rfc822":
-            return _extract_text_from_eml(file_content)
+            return _extract_text_from_eml(content)
         case "application/vnd.ms-outlook":
-            return _extract_text_from_msg(file_content)
+            return _extract_text_from_msg(content)
         case "application/json":
-            return _extract_text_from_json(file_content)
+            return _extract_text_from_json(content)
         case "application/x-yaml" | "text/yaml":
-            return _extract_text_from_yaml(file_content)
+            return _extract_text_from_yaml(content)
         case _:
             raise UnsupportedFileTypeError(f"Unsupported MIME type: {mime_type}")
 
 
-def _extract_text_by_file_extension(*, file_content: bytes, file_extension: str) -> str:
+def _extract_text_by_file_extension(*, content: IO[bytes], file_extension: str) -> str:
     """Extract text from a file based on its file extension."""
     match file_extension:
         case ".txt" | ".markdown" | ".md" | ".html" | ".htm" | ".xml" | ".vtt":
-            return _extract_text_from_plain_text(file_content)
+            return _extract_text_from_plain_text(content)
         case ".json":
-            return _extract_text_from_json(file_content)
+            return _extract_text_from_json(content)
         case ".yaml" | ".yml":
-            return _extract_text_from_yaml(file_content)
+            return _extract_text_from_yaml(content)
         case ".pdf":
-            return _extract_text_from_pdf(file_content)
+            return _extract_text_from_pdf(content)
         case ".doc" | ".docx":
-            return _extract_text_from_doc(file_content)
+            return _extract_text_from_doc(content)
         case ".csv":
-            return _extract_text_from_csv(file_content)
+            return _extract_text_from_csv(content)
         case ".xls" | ".xlsx":
-            return _extract_text_from_excel(file_content)
+            return _extract_text_from_excel(content)
         case ".ppt":
-            return _extract_text_from_ppt(file_content)
+            return _extract_text_from_ppt(content)
         case ".pptx":
-            return _extract_text_from_pptx(file_content)
+            return _extract_text_from_pptx(content)
         case ".epub":
-            return _extract_text_from_epub(file_content)
+            return _extract_text_from_epub(content)
         case ".eml":
-            return _extract_text_from_eml(file_content)
+            return _extract_text_from_eml(content)
         case ".msg":
-            return _extract_text_from_msg(file_content)
+            return _extract_text_from_msg(content)
         case _:
             raise UnsupportedFileTypeError(f"Unsupported Extension Type: {file_extension}")
 
 
-def _extract_text_from_plain_text(file_content: bytes) -> str:
+def _extract_text_from_plain_text(content: IO[bytes]) -> str:
     try:
-        return file_content.decode("utf-8", "ignore")
+        return content.read().decode("utf-8", "ignore")
     except UnicodeDecodeError as e:
         raise TextExtractionError("Failed to decode plain text file") from e
 
 
-def _extract_text_from_json(file_content: bytes) -> str:
+def _extract_text_from_json(content: IO[bytes]) -> str:
     try:
-        json_data = json.loads(file_content.decode("utf-8", "ignore"))
+        json_data = json.loads(content.read().decode("utf-8", "ignore"))
         return json.dumps(json_data, indent=2, ensure_ascii=False)
     except (UnicodeDecodeError, json.JSONDecodeError) as e:
         raise TextExtractionError(f"Failed to decode or parse JSON file: {e}") from e
 
 
-def _extract_text_from_yaml(file_content: bytes) -> str:
+def _extract_text_from_yaml(content: IO[bytes]) -> str:
     """Extract the content from yaml file"""
     try:
-        yaml_data = yaml.safe_load_all(file_content.decode("utf-8", "ignore"))
+        yaml_data = yaml.safe_load_all(content.read().decode("utf-8", "ignore"))
         return yaml.dump_all(yaml_data, allow_unicode=True, sort_keys=False)
     except (UnicodeDecodeError, yaml.YAMLError) as e:
         raise TextExtractionError(f"Failed to decode or parse YAML file: {e}") from e
 
 
-def _extract_text_from_pdf(file_content: bytes) -> str:
+def _extract_text_from_pdf(content: IO[bytes]) -> str:
     try:
-        pdf_file = io.BytesIO(file_content)
-        pdf_document = pypdfium2.PdfDocument(pdf_file, autoclose=True)
-        text = ""
-        for page in pdf_document:
-            text_page = page.get_textpage()
-            text += text_page.get_text_range()
-            text_page.close()
-            page.close()
-        return text
+        # copied to a named file, so pdfium and the parallel page extraction read it from disk instead of memory
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf_file:
+            shutil.copyfileobj(content, pdf_file)
+            pdf_file.flush()
+            # the extracted text is cached by the node, not in the plaintext cache of dataset indexing
+            return "".join(document.page_content for document in PdfExtractor.parse(Blob.from_path(pdf_file.name)))
     except Exception as e:
         raise TextExtractionError(f"Failed to extract text from PDF: {str(e)}") from e
 
 
-def _extract_text_from_doc(file_content: bytes) -> str:
+def _extract_text_from_doc(content: IO[bytes]) -> str:
+    import docx
+
     try:
-        doc_file = io.BytesIO(file_content)
-        doc = docx.Document(doc_file)
+        doc = docx.Document(content)
         return "\n".join([paragraph.text for paragraph in doc.paragraphs])
     except Exception as e:
         raise TextExtractionError(f"Failed to extract text from DOC/DOCX: {str(e)}") from e
 
 
-def _download_file_content(file: File) -> bytes:
-    """Download the content of a file based on its transfer method."""
+def _download_file_content(file: File) -> IO[bytes]:
+    """Download the content of a file into a spooled temporary file, which the caller must close."""
     try:
-        if file.transfer_method == FileTransferMethod.REMOTE_URL:
-            if file.remote_url is None:
-                raise FileDownloadError("Missing URL for remote file")
-            response = ssrf_proxy.get(file.remote_url)
-            response.raise_for_status()
-            return response.content
-        else:
-            return file_manager.download(file)
+        if file.transfer_method == FileTransferMethod.REMOTE_URL and file.remote_url is None:
+            raise FileDownloadError("Missing URL for remote file")
+        return file_manager.download_to_file(file)
     except Exception as e:
         raise FileDownloadError(f"Error downloading file: {str(e)}") from e
 
 
+def _extract_text_from_files(files: Sequence[File]) -> list[str]:
+    """Extract text from every file, concurrently when configured, keeping the order of the input."""
+    max_workers = min(dify_config.DOCUMENT_EXTRACTOR_MAX_WORKERS, len(files))
+    if max_workers <= 1:
+        return list(map(_extract_text_from_file, files))
+
+    flask_app = current_app._get_current_object()  # type: ignore[attr-defined]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(partial(_extract_text_from_file_in_app_context, flask_app), files))
+
+
+def _extract_text_from_file_in_app_context(flask_app: Flask, file: File) -> str:
+    with flask_app.app_context():
+        return _extract_text_from_file(file)
+
+
 def _extract_text_from_file(file: File):
-    file_content = _download_file_content(file)
-    if file.extension:
-        extracted_text = _extract_text_by_file_extension(file_content=file_content, file_extension=file.extension)
-    elif file.mime_type:
-        extracted_text = _extract_text_by_mime_type(file_content=file_content, mime_type=file.mime_type)
-    else:
+    if not file.extension and not file.mime_type:
         raise UnsupportedFileTypeError("Unable to determine file type: MIME type or file extension is missing")
+
+    # uploaded and tool files are immutable, so they can be looked up before downloading
+    cache_key = extracted_text_cache.get_file_key(file)
+    if cache_key:
+        extracted_text = extracted_text_cache.get(cache_key)
+        if extracted_text is not None:
+            return extracted_text
+
+    with _download_file_content(file) as content:
+        if not cache_key:
+            cache_key = extracted_text_cache.get_content_key(file, content)
+            extracted_text = extracted_text_cache.get(cache_key)
+            if extracted_text is not None:
+                return extracted_text
+
+        if file.extension:
+            extracted_text = _extract_text_by_file_extension(content=content, file_extension=file.extension)
+        else:
+            extracted_text = _extract_text_by_mime_type(content=content, mime_type=file.mime_type)
+
+    extracted_text_cache.set(cache_key, extracted_text)
     return extracted_text
 
 
-def _extract_text_from_csv(file_content: bytes) -> str:
+def _extract_text_from_csv(content: IO[bytes]) -> str:
     try:
-        csv_file = io.StringIO(file_content.decode("utf-8", "ignore"))
+        csv_file = io.StringIO(content.read().decode("utf-8", "ignore"))
         csv_reader = csv.reader(csv_file)
         rows = list(csv_reader)
 
@@ -237,10 +261,12 @@ def _extract_text_from_csv(file_content: bytes) -> str:
         raise TextExtractionError(f"Failed to extract text from CSV: {str(e)}") from e
 
 
-def _extract_text_from_excel(file_content: bytes) -> str:
+def _extract_text_from_excel(content: IO[bytes]) -> str:
     """Extract text from an Excel file using pandas."""
+    import pandas as pd
+
     try:
-        excel_file = pd.ExcelFile(io.BytesIO(file_content))
+        excel_file = pd.ExcelFile(content)
         markdown_table = ""
         for sheet_name in excel_file.sheet_names:
             try:
@@ -255,20 +281,24 @@ def _extract_text_from_excel(file_content: bytes) -> str:
         raise TextExtractionError(f"Failed to extract text from Excel file: {str(e)}") from e
 
 
-def _extract_text_from_ppt(file_content: bytes) -> str:
+def _extract_text_from_ppt(content: IO[bytes]) -> str:
+    from unstructured.partition.ppt import partition_ppt
+
     try:
-        with io.BytesIO(file_content) as file:
-            elements = partition_ppt(file=file)
+        elements = partition_ppt(file=content)
         return "\n".join([getattr(element, "text", "") for element in elements])
     except Exception as e:
         raise TextExtractionError(f"Failed to extract text from PPT: {str(e)}") from e
 
 
-def _extract_text_from_pptx(file_content: bytes) -> str:
+def _extract_text_from_pptx(content: IO[bytes]) -> str:
+    from unstructured.partition.api import partition_via_api
+    from unstructured.partition.pptx import partition_pptx
+
     try:
         if dify_config.UNSTRUCTURED_API_URL and dify_config.UNSTRUCTURED_API_KEY:
             with tempfile.NamedTemporaryFile(suffix=".pptx", delete=False) as temp_file:
-                temp_file.write(file_content)
+                shutil.copyfileobj(content, temp_file)
                 temp_file.flush()
                 with open(temp_file.name, "rb") as file:
                     elements = partition_via_api(
@@ -279,35 +309,37 @@ def _extract_text_from_pptx(file_content: bytes) -> str:
                     )
                 os.unlink(temp_file.name)
         else:
-            with io.BytesIO(file_content) as file:
-                elements = partition_pptx(file=file)
+            elements = partition_pptx(file=content)
         return "\n".join([getattr(element, "text", "") for element in elements])
     except Exception as e:
         raise TextExtractionError(f"Failed to extract text from PPTX: {str(e)}") from e
 
 
-def _extract_text_from_epub(file_content: bytes) -> str:
+def _extract_text_from_epub(content: IO[bytes]) -> str:
+    from unstructured.partition.epub import partition_epub
+
     try:
-        with io.BytesIO(file_content) as file:
-            elements = partition_epub(file=file)
+        elements = partition_epub(file=content)
         return "\n".join([str(element) for element in elements])
     except Exception as e:
         raise TextExtractionError(f"Failed to extract text from EPUB: {str(e)}") from e
 
 
-def _extract_text_from_eml(file_content: bytes) -> str:
+def _extract_text_from_eml(content: IO[bytes]) -> str:
+    from unstructured.partition.email import partition_email
+
     try:
-        with io.BytesIO(file_content) as file:
-            elements = partition_email(file=file)
+        elements = partition_email(file=content)
         return "\n".join([str(element) for element in elements])
     except Exception as e:
         raise TextExtractionError(f"Failed to extract text from EML: {str(e)}") from e
 
 
-def _extract_text_from_msg(file_content: bytes) -> str:
+def _extract_text_from_msg(content: IO[bytes]) -> str:
+    from unstructured.partition.msg import partition_msg
+
     try:
-        with io.BytesIO(file_content) as file:
-            elements = partition_msg(file=file)
+        elements = partition_msg(file=content)
         return "\n".join([str(element) for element in elements])
     except Exception as e:
         raise TextExtractionError(f"Failed to extract text from MSG: {str(e)}") from e
@@ -57,8 +57,9 @@ from core.workflow.nodes.event import (
 from core.workflow.utils.variable_template_parser import VariableTemplateParser
 from extensions.ext_database import db
 from models.model import Conversation
-from models.provider import Provider, ProviderType
+from models.provider import ProviderType
 from models.workflow import WorkflowNodeExecutionStatus
+from services.provider_usage_service import ProviderUsageService
 
 from .entities import (
     LLMNodeChatModelMessage,
@@ -728,7 +729,7 @@ class LLMNode(BaseNode[LLMNodeData]):
             if quota_configuration.quota_type == system_configuration.current_quota_type:
                 quota_unit = quota_configuration.quota_unit
 
-                if quota_configuration.quota_limit == -1:
+                if quota_configuration.quota_limit == -1 or not quota_configuration.is_valid:
                     return
 
                 break
@@ -746,14 +747,12 @@ class LLMNode(BaseNode[LLMNodeData]):
                 used_quota = 1
 
         if used_quota is not None and system_configuration.current_quota_type is not None:
-            db.session.query(Provider).filter(
-                Provider.tenant_id == tenant_id,
-                Provider.provider_name == model_instance.provider,
-                Provider.provider_type == ProviderType.SYSTEM.value,
-                Provider.quota_type == system_configuration.current_quota_type.value,
-                Provider.quota_limit > Provider.quota_used,
-            ).update({"quota_used": Provider.quota_used + used_quota})
-            db.session.commit()
+            ProviderUsageService.deduct_quota(
+                tenant_id=tenant_id,
+                provider_name=model_instance.provider,
+                quota_type=system_configuration.current_quota_type.value,
+                used_quota=used_quota,
+            )
 
     @classmethod
     def _extract_variable_selector_to_variable_mapping(
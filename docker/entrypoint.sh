@@ -8,6 +8,7 @@ if [[ "${MIGRATION_ENABLED}" == "true" ]]; then
 fi
 
 if [[ "${MODE}" == "worker" ]]; then
+  export PROCESS_ROLE=${PROCESS_ROLE:-worker}
 
   # Get the number of available CPU cores
   if [ "${CELERY_AUTO_SCALE,,}" = "true" ]; then
@@ -24,8 +25,10 @@ if [[ "${MODE}" == "worker" ]]; then
     -Q ${CELERY_QUEUES:-dataset,mail,ops_trace,app_deletion}
 
 elif [[ "${MODE}" == "beat" ]]; then
+  export PROCESS_ROLE=${PROCESS_ROLE:-beat}
   exec celery -A app.celery beat --loglevel ${LOG_LEVEL}
 else
+  export PROCESS_ROLE=${PROCESS_ROLE:-api}
   if [[ "${DEBUG}" == "true" ]]; then
     exec flask run --host=${DIFY_BIND_ADDRESS:-0.0.0.0} --port=${DIFY_PORT:-5001} --debug
   else
@@ -1,8 +1,8 @@
 from core.app.entities.app_invoke_entities import AgentChatAppGenerateEntity, ChatAppGenerateEntity
 from core.entities.provider_entities import QuotaUnit
 from events.message_event import message_was_created
-from extensions.ext_database import db
-from models.provider import Provider, ProviderType
+from models.provider import ProviderType
+from services.provider_usage_service import ProviderUsageService
 
 
 @message_was_created.connect
@@ -27,7 +27,7 @@ def handle(sender, **kwargs):
         if quota_configuration.quota_type == system_configuration.current_quota_type:
             quota_unit = quota_configuration.quota_unit
 
-            if quota_configuration.quota_limit == -1:
+            if quota_configuration.quota_limit == -1 or not quota_configuration.is_valid:
                 return
 
             break
@@ -45,11 +45,9 @@ def handle(sender, **kwargs):
             used_quota = 1
 
     if used_quota is not None:
-        db.session.query(Provider).filter(
-            Provider.tenant_id == application_generate_entity.app_config.tenant_id,
-            Provider.provider_name == model_config.provider,
-            Provider.provider_type == ProviderType.SYSTEM.value,
-            Provider.quota_type == system_configuration.current_quota_type.value,
-            Provider.quota_limit > Provider.quota_used,
-        ).update({"quota_used": Provider.quota_used + used_quota})
-        db.session.commit()
+        ProviderUsageService.deduct_quota(
+            tenant_id=application_generate_entity.app_config.tenant_id,
+            provider_name=model_config.provider,
+            quota_type=system_configuration.current_quota_type.value,
+            used_quota=used_quota,
+        )
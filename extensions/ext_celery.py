@@ -69,6 +69,8 @@ def init_app(app: DifyApp) -> Celery:
         "schedule.create_tidb_serverless_task",
         "schedule.update_tidb_serverless_status_task",
         "schedule.clean_messages",
+        "schedule.update_api_token_last_used_task",
+        "schedule.flush_provider_usage_task",
     ]
     day = dify_config.CELERY_BEAT_SCHEDULER_TIME
     beat_schedule = {
@@ -92,6 +94,14 @@ def init_app(app: DifyApp) -> Celery:
             "task": "schedule.clean_messages.clean_messages",
             "schedule": timedelta(days=day),
         },
+        "update_api_token_last_used_task": {
+            "task": "schedule.update_api_token_last_used_task.update_api_token_last_used_task",
+            "schedule": timedelta(seconds=dify_config.API_TOKEN_LAST_USED_UPDATE_INTERVAL),
+        },
+        "flush_provider_usage_task": {
+            "task": "schedule.flush_provider_usage_task.flush_provider_usage_task",
+            "schedule": timedelta(seconds=dify_config.PROVIDER_USAGE_FLUSH_INTERVAL),
+        },
     }
     celery_app.conf.update(beat_schedule=beat_schedule, imports=imports)
 
@@ -4,9 +4,12 @@ from dify_app import DifyApp
 def init_app(app: DifyApp):
     from commands import (
         add_qdrant_doc_id_index,
+        benchmark_import_time,
+        benchmark_streaming,
         convert_to_agent_apps,
         create_tenant,
         fix_app_site_missing,
+        offload_workflow_payloads,
         reset_email,
         reset_encrypt_key_pair,
         reset_password,
@@ -24,6 +27,9 @@ def init_app(app: DifyApp):
         create_tenant,
         upgrade_db,
         fix_app_site_missing,
+        offload_workflow_payloads,
+        benchmark_import_time,
+        benchmark_streaming,
     ]
     for cmd in cmds_to_register:
         app.cli.add_command(cmd)
@@ -1,6 +1,8 @@
 import logging
-from collections.abc import Callable, Generator, Mapping
-from typing import Union
+import os
+import tempfile
+from collections.abc import Callable, Generator, Mapping, Sequence
+from typing import IO, Union
 
 from flask import Flask
 
@@ -18,6 +20,17 @@ class Storage:
         storage_factory = self.get_storage_factory(dify_config.STORAGE_TYPE)
         with app.app_context():
             self.storage_runner = storage_factory()
+        if dify_config.STORAGE_LOCAL_CACHE_ENABLED:
+            from extensions.storage.cached_storage import CachedStorage
+
+            self.storage_runner = CachedStorage(
+                self.storage_runner,
+                cache_dir=dify_config.STORAGE_LOCAL_CACHE_DIR
+                or os.path.join(tempfile.gettempdir(), "dify_storage_cache"),
+                max_size=dify_config.STORAGE_LOCAL_CACHE_MAX_SIZE,
+                immutable_prefixes=dify_config.STORAGE_LOCAL_CACHE_IMMUTABLE_PREFIX_LIST,
+                ttl=dify_config.STORAGE_LOCAL_CACHE_TTL,
+            )
 
     @staticmethod
     def get_storage_factory(storage_type: str) -> Callable[[], BaseStorage]:
@@ -29,6 +42,7 @@ class Storage:
                 return lambda: OpenDALStorage(scheme=OpenDALScheme.S3, **kwargs)
             case StorageType.MINIO:
                 from extensions.storage.minio_storage import MinIOStorage
+
                 return lambda: MinIOStorage()
             case StorageType.OPENDAL:
                 from extensions.storage.opendal_storage import OpenDALStorage
@@ -87,6 +101,13 @@ class Storage:
             logger.exception(f"Failed to save file {filename}")
             raise e
 
+    def save_stream(self, filename: str, file: IO[bytes]) -> None:
+        try:
+            self.storage_runner.save_stream(filename, file)
+        except Exception as e:
+            logger.exception(f"Failed to save file {filename}")
+            raise e
+
     def load(self, filename: str, /, *, stream: bool = False) -> Union[bytes, Generator]:
         try:
             if stream:
@@ -132,6 +153,24 @@ class Storage:
             logger.exception(f"Failed to delete file {filename}")
             raise e
 
+    def delete_many(self, filenames: Sequence[str]) -> None:
+        if not filenames:
+            return
+        try:
+            self.storage_runner.delete_many(filenames)
+        except Exception as e:
+            logger.exception(f"Failed to delete {len(filenames)} files")
+            raise e
+
+    def load_many(self, filenames: Sequence[str]) -> dict[str, bytes]:
+        if not filenames:
+            return {}
+        try:
+            return self.storage_runner.load_many(filenames)
+        except Exception as e:
+            logger.exception(f"Failed to load {len(filenames)} files")
+            raise e
+
 
 def _load_s3_storage_kwargs() -> Mapping[str, str]:
     """
@@ -1,5 +1,5 @@
 import posixpath
-from collections.abc import Generator
+from collections.abc import Generator, Sequence
 
 import oss2 as aliyun_s3
 
@@ -50,5 +50,11 @@ class AliyunOssStorage(BaseStorage):
     def delete(self, filename):
         self.client.delete_object(self.__wrapper_folder_filename(filename))
 
+    def delete_many(self, filenames: Sequence[str]) -> None:
+        keys = [self.__wrapper_folder_filename(filename) for filename in dict.fromkeys(filenames)]
+        # at most 1000 keys per request
+        for i in range(0, len(keys), 1000):
+            self.client.batch_delete_objects(keys[i : i + 1000])
+
     def __wrapper_folder_filename(self, filename) -> str:
         return posixpath.join(self.folder, filename) if self.folder else filename
@@ -1,5 +1,6 @@
 import logging
-from collections.abc import Generator
+from collections.abc import Generator, Sequence
+from typing import IO
 
 import boto3
 from botocore.client import Config
@@ -10,6 +11,9 @@ from extensions.storage.base_storage import BaseStorage
 
 logger = logging.getLogger(__name__)
 
+# maximum number of keys of a DeleteObjects request
+S3_DELETE_BATCH_SIZE = 1000
+
 
 class AwsS3Storage(BaseStorage):
     """Implementation for Amazon Web Services S3 storage."""
@@ -51,6 +55,10 @@ class AwsS3Storage(BaseStorage):
     def save(self, filename, data):
         self.client.put_object(Bucket=self.bucket_name, Key=filename, Body=data)
 
+    def save_stream(self, filename: str, file: IO[bytes]) -> None:
+        # uploaded in parts above the multipart threshold
+        self.client.upload_fileobj(file, self.bucket_name, filename)
+
     def load_once(self, filename: str) -> bytes:
         try:
             data = self.client.get_object(Bucket=self.bucket_name, Key=filename)["Body"].read()
@@ -83,3 +91,15 @@ class AwsS3Storage(BaseStorage):
 
     def delete(self, filename):
         self.client.delete_object(Bucket=self.bucket_name, Key=filename)
+
+    def delete_many(self, filenames: Sequence[str]) -> None:
+        filenames = list(dict.fromkeys(filenames))
+        errors = []
+        for i in range(0, len(filenames), S3_DELETE_BATCH_SIZE):
+            response = self.client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in filenames[i : i + S3_DELETE_BATCH_SIZE]], "Quiet": True},
+            )
+            errors.extend(response.get("Errors", []))
+        if errors:
+            raise Exception(f"Failed to delete {len(errors)} files, first error: {errors[0]}")
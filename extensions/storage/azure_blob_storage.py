@@ -1,5 +1,6 @@
-from collections.abc import Generator
+from collections.abc import Generator, Sequence
 from datetime import UTC, datetime, timedelta
+from typing import IO
 
 from azure.storage.blob import AccountSasPermissions, BlobServiceClient, ResourceTypes, generate_account_sas
 
@@ -21,7 +22,10 @@ class AzureBlobStorage(BaseStorage):
     def save(self, filename, data):
         client = self._sync_client()
         blob_container = client.get_container_client(container=self.bucket_name)
-        blob_container.upload_blob(filename, data)
+        blob_container.upload_blob(filename, data, overwrite=True)
+
+    def save_stream(self, filename: str, file: IO[bytes]) -> None:
+        self.save(filename, file)
 
     def load_once(self, filename: str) -> bytes:
         client = self._sync_client()
@@ -56,6 +60,15 @@ class AzureBlobStorage(BaseStorage):
         blob_container = client.get_container_client(container=self.bucket_name)
         blob_container.delete_blob(filename)
 
+    def delete_many(self, filenames: Sequence[str]) -> None:
+        client = self._sync_client()
+
+        blob_container = client.get_container_client(container=self.bucket_name)
+        filenames = list(dict.fromkeys(filenames))
+        # at most 256 blobs per batch request
+        for i in range(0, len(filenames), 256):
+            blob_container.delete_blobs(*filenames[i : i + 256])
+
     def _sync_client(self):
         cache_key = "azure_blob_sas_token_{}_{}".format(self.account_name, self.account_key)
         cache_result = redis_client.get(cache_key)
@@ -1,7 +1,14 @@
 """Abstract interface for file storage implementations."""
 
+import logging
 from abc import ABC, abstractmethod
-from collections.abc import Generator
+from collections.abc import Callable, Generator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any
+
+from configs import dify_config
+
+logger = logging.getLogger(__name__)
 
 
 class BaseStorage(ABC):
@@ -9,8 +16,19 @@ class BaseStorage(ABC):
 
     @abstractmethod
     def save(self, filename, data):
+        """
+        Save data to a file, overwriting the file if it exists.
+        """
         raise NotImplementedError
 
+    def save_stream(self, filename: str, file: IO[bytes]) -> None:
+        """
+        Save the content of a file object, read from its current position.
+
+        Backends whose client uploads file objects override it, the default reads the content into bytes.
+        """
+        self.save(filename, file.read())
+
     @abstractmethod
     def load_once(self, filename: str) -> bytes:
         raise NotImplementedError
@@ -30,3 +48,49 @@ class BaseStorage(ABC):
     @abstractmethod
     def delete(self, filename):
         raise NotImplementedError
+
+    def delete_many(self, filenames: Sequence[str]) -> None:
+        """
+        Delete files. Every file is attempted, the first error is raised once all are done.
+
+        Backends with a batch delete API override it, the default deletes concurrently.
+        """
+        map_concurrently(self.delete, list(dict.fromkeys(filenames)))
+
+    def load_many(self, filenames: Sequence[str]) -> dict[str, bytes]:
+        """
+        Load files concurrently.
+
+        :return: the content of each file by file name
+        :raises FileNotFoundError: if a file does not exist
+        """
+        filenames = list(dict.fromkeys(filenames))
+        return dict(zip(filenames, map_concurrently(self.load_once, filenames)))
+
+
+def map_concurrently(func: Callable[[str], Any], filenames: Sequence[str]) -> list[Any]:
+    """
+    Call func for every file name on up to STORAGE_BULK_OPERATION_MAX_WORKERS threads.
+
+    :return: the results in the order of the file names
+    :raises Exception: the first error, once all calls are done
+    """
+    if len(filenames) <= 1:
+        return [func(filename) for filename in filenames]
+
+    max_workers = min(dify_config.STORAGE_BULK_OPERATION_MAX_WORKERS, len(filenames))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="storage_bulk") as executor:
+        futures = [executor.submit(func, filename) for filename in filenames]
+
+    results = []
+    error = None
+    for filename, future in zip(filenames, futures):
+        try:
+            results.append(future.result())
+        except Exception as e:
+            logger.warning(f"Storage operation on {filename} failed: {e}")
+            error = error or e
+            results.append(None)
+    if error:
+        raise error
+    return results
@@ -0,0 +1,307 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections.abc import Generator, Sequence
+from pathlib import Path
+from typing import IO, Optional
+
+from extensions.storage.base_storage import BaseStorage
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+STATS_LOG_INTERVAL = 1000
+TMP_PREFIX = ".tmp-"
+
+
+class CachedStorage(BaseStorage):
+    """
+    Read-through local disk cache in front of another storage.
+
+    Objects whose key starts with one of the immutable prefixes are never overwritten, so they are cached
+    until evicted. Other objects are cached for ttl seconds, or not at all if ttl is 0, since they may be
+    overwritten by other nodes. save and delete invalidate the local copy of the object.
+
+    The cache directory can be shared by the processes of a node. Entries are written atomically, access
+    times track their use, and the least recently used ones are evicted once the total size exceeds max_size.
+    """
+
+    def __init__(
+        self,
+        storage: BaseStorage,
+        cache_dir: str,
+        max_size: int,
+        immutable_prefixes: Sequence[str] = (),
+        ttl: int = 0,
+    ):
+        super().__init__()
+        self.storage = storage
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.immutable_prefixes = tuple(immutable_prefixes)
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._size = self._scan()[1]
+
+    def save(self, filename, data):
+        self.storage.save(filename, data)
+        self._invalidate(filename)
+        # immutable objects are usually read soon after they are written
+        if isinstance(data, bytes) and self._is_immutable(filename):
+            self._save_local(filename, data)
+
+    def save_stream(self, filename: str, file: IO[bytes]) -> None:
+        self.storage.save_stream(filename, file)
+        self._invalidate(filename)
+
+    def load_once(self, filename: str) -> bytes:
+        if not self._is_cacheable(filename):
+            return self.storage.load_once(filename)
+
+        data = self._load_local(filename)
+        if data is None:
+            data = self.storage.load_once(filename)
+            self._save_local(filename, data)
+        return data
+
+    def load_stream(self, filename: str) -> Generator:
+        if not self._is_cacheable(filename):
+            return self.storage.load_stream(filename)
+
+        path = self._get_valid_path(filename)
+        if path:
+            try:
+                f = open(path, "rb")  # noqa: SIM115
+            except FileNotFoundError:
+                pass
+            else:
+                self._record_hit(path)
+                return _read_chunks(f)
+
+        self._record_miss()
+        return self._load_stream_through(filename)
+
+    def download(self, filename, target_filepath):
+        if self._is_cacheable(filename):
+            path = self._get_valid_path(filename)
+            if path:
+                try:
+                    shutil.copyfile(path, target_filepath)
+                    self._record_hit(path)
+                    return
+                except FileNotFoundError:
+                    pass
+            self._record_miss()
+
+        self.storage.download(filename, target_filepath)
+        if self._is_cacheable(filename) and os.path.getsize(target_filepath) <= self.max_size:
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=TMP_PREFIX)
+                os.close(fd)
+                shutil.copyfile(target_filepath, tmp_path)
+                self._commit_local(filename, tmp_path)
+            except Exception:
+                logger.exception(f"Failed to cache storage file {filename} on local disk")
+
+    def exists(self, filename):
+        if self._is_cacheable(filename) and self._get_valid_path(filename):
+            return True
+        return self.storage.exists(filename)
+
+    def delete(self, filename):
+        try:
+            return self.storage.delete(filename)
+        finally:
+            self._invalidate(filename)
+
+    def delete_many(self, filenames: Sequence[str]) -> None:
+        try:
+            self.storage.delete_many(filenames)
+        finally:
+            for filename in filenames:
+                self._invalidate(filename)
+
+    def load_many(self, filenames: Sequence[str]) -> dict[str, bytes]:
+        result: dict[str, Optional[bytes]] = {}
+        for filename in filenames:
+            result[filename] = self._load_local(filename) if self._is_cacheable(filename) else None
+
+        missing = [filename for filename, data in result.items() if data is None]
+        if missing:
+            for filename, data in self.storage.load_many(missing).items():
+                result[filename] = data
+                if self._is_cacheable(filename):
+                    self._save_local(filename, data)
+        return result  # type: ignore
+
+    def get_stats(self) -> dict:
+        """
+        :return: hit and miss counts of this process and the estimated size of the cache
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "size": self._size,
+            }
+
+    def _is_immutable(self, filename: str) -> bool:
+        return filename.startswith(self.immutable_prefixes)
+
+    def _is_cacheable(self, filename: str) -> bool:
+        return bool(self.max_size) and (self.ttl > 0 or self._is_immutable(filename))
+
+    def _get_local_path(self, filename: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(filename.encode()).hexdigest())
+
+    def _get_valid_path(self, filename: str) -> Optional[str]:
+        path = self._get_local_path(filename)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        # the modification time is the time the entry was written, access times are bumped on hits
+        if not self._is_immutable(filename) and time.time() - stat.st_mtime > self.ttl:
+            return None
+        return path
+
+    def _load_local(self, filename: str) -> Optional[bytes]:
+        path = self._get_valid_path(filename)
+        if path:
+            try:
+                data = Path(path).read_bytes()
+                self._record_hit(path)
+                return data
+            except FileNotFoundError:
+                pass
+        self._record_miss()
+        return None
+
+    def _record_hit(self, path: str) -> None:
+        try:
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+        except FileNotFoundError:
+            pass
+        self._record_lookup(hit=True)
+
+    def _record_miss(self) -> None:
+        self._record_lookup(hit=False)
+
+    def _record_lookup(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+            lookups = self._hits + self._misses
+            hits = self._hits
+        if lookups % STATS_LOG_INTERVAL == 0:
+            logger.info(f"Storage local cache hit rate {hits / lookups:.1%} of {lookups} lookups")
+
+    def _invalidate(self, filename: str) -> None:
+        try:
+            os.remove(self._get_local_path(filename))
+        except FileNotFoundError:
+            pass
+        except Exception:
+            logger.exception(f"Failed to invalidate local cache of storage file {filename}")
+
+    def _save_local(self, filename: str, data: bytes) -> None:
+        if len(data) > self.max_size:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=TMP_PREFIX)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            self._commit_local(filename, tmp_path)
+        except Exception:
+            logger.exception(f"Failed to cache storage file {filename} on local disk")
+
+    def _load_stream_through(self, filename: str) -> Generator:
+        # chunks go to the caller and to a temp file, which becomes the entry once the stream is complete
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=TMP_PREFIX)
+        tmp_file = os.fdopen(fd, "wb")
+        size = 0
+        completed = False
+        try:
+            for chunk in self.storage.load_stream(filename):
+                if tmp_file is not None:
+                    size += len(chunk)
+                    if size > self.max_size:
+                        tmp_file.close()
+                        tmp_file = None
+                    else:
+                        tmp_file.write(chunk)
+                yield chunk
+            completed = True
+        finally:
+            if tmp_file is not None:
+                tmp_file.close()
+            if completed and tmp_file is not None:
+                try:
+                    self._commit_local(filename, tmp_path)
+                except Exception:
+                    logger.exception(f"Failed to cache storage file {filename} on local disk")
+            _remove(tmp_path)
+
+    def _commit_local(self, filename: str, tmp_path: str) -> None:
+        # rename, so concurrent readers never see a partial entry
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, self._get_local_path(filename))
+        with self._lock:
+            self._size += size
+            evict = self._size > self.max_size
+        if evict:
+            self._evict()
+
+    def _scan(self) -> tuple[list[tuple[float, int, str]], int]:
+        entries = []
+        total_size = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.is_file() or entry.name.startswith(TMP_PREFIX):
+                    continue
+                stat = entry.stat()
+                entries.append((stat.st_atime, stat.st_size, entry.path))
+                total_size += stat.st_size
+        return entries, total_size
+
+    def _evict(self) -> None:
+        try:
+            entries, total_size = self._scan()
+            if total_size > self.max_size:
+                # evict down to 90% of the limit, so that the next writes do not rescan right away
+                target_size = self.max_size * 0.9
+                entries.sort()
+                for _, size, path in entries:
+                    _remove(path)
+                    total_size -= size
+                    if total_size <= target_size:
+                        break
+            with self._lock:
+                self._size = total_size
+        except Exception:
+            logger.exception("Failed to evict storage local cache entries")
+
+
+def _read_chunks(f) -> Generator:
+    with f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -2,6 +2,7 @@ import base64
 import io
 import json
 from collections.abc import Generator
+from typing import IO
 
 from google.cloud import storage as google_cloud_storage
 
@@ -32,6 +33,11 @@ class GoogleCloudStorage(BaseStorage):
         with io.BytesIO(data) as stream:
             blob.upload_from_file(stream)
 
+    def save_stream(self, filename: str, file: IO[bytes]) -> None:
+        bucket = self.client.get_bucket(self.bucket_name)
+        blob = bucket.blob(filename)
+        blob.upload_from_file(file)
+
     def load_once(self, filename: str) -> bytes:
         bucket = self.client.get_bucket(self.bucket_name)
         blob = bucket.get_blob(filename)
@@ -1,11 +1,15 @@
-from collections.abc import Generator
+import shutil
+from collections.abc import Generator, Sequence
 from pathlib import Path
+from typing import IO
 from urllib.parse import urlparse
 
 import opendal
 
 from configs.middleware.storage.opendal_storage_config import OpenDALScheme
-from extensions.storage.base_storage import BaseStorage
+from extensions.storage.base_storage import BaseStorage, map_concurrently
+
+CHUNK_SIZE = 64 * 1024
 
 S3_R2_HOSTNAME = "r2.cloudflarestorage.com"
 S3_R2_COMPATIBLE_KWARGS = {
@@ -36,6 +40,10 @@ class OpenDALStorage(BaseStorage):
     def save(self, filename: str, data: bytes) -> None:
         self.op.write(path=filename, bs=data)
 
+    def save_stream(self, filename: str, file: IO[bytes]) -> None:
+        with self.op.open(path=filename, mode="wb") as f:
+            shutil.copyfileobj(file, f, CHUNK_SIZE)
+
     def load_once(self, filename: str) -> bytes:
         if not self.exists(filename):
             raise FileNotFoundError("File not found")
@@ -55,8 +63,9 @@ class OpenDALStorage(BaseStorage):
         if not self.exists(filename):
             raise FileNotFoundError("File not found")
 
-        with Path(target_filepath).open("wb") as f:
-            f.write(self.op.read(path=filename))
+        # copied in chunks, so large files are not read into memory
+        with self.op.open(path=filename, mode="rb") as src, Path(target_filepath).open("wb") as f:
+            shutil.copyfileobj(src, f, CHUNK_SIZE)
 
     def exists(self, filename: str) -> bool:
         # FIXME this is a workaround for opendal python-binding do not have a exists method and no better
@@ -70,3 +79,7 @@ class OpenDALStorage(BaseStorage):
     def delete(self, filename: str):
         if self.exists(filename):
             self.op.delete(path=filename)
+
+    def delete_many(self, filenames: Sequence[str]) -> None:
+        # the python binding has no batch delete, deleting a missing path succeeds so the stat is skipped
+        map_concurrently(lambda filename: self.op.delete(path=filename), list(dict.fromkeys(filenames)))
@@ -1,5 +1,5 @@
 import io
-from collections.abc import Generator
+from collections.abc import Generator, Sequence
 from pathlib import Path
 
 from supabase import Client
@@ -29,7 +29,7 @@ class SupabaseStorage(BaseStorage):
             self.client.storage.create_bucket(id=id, name=bucket_name)
 
     def save(self, filename, data):
-        self.client.storage.from_(self.bucket_name).upload(filename, data)
+        self.client.storage.from_(self.bucket_name).upload(filename, data, file_options={"x-upsert": "true"})
 
     def load_once(self, filename: str) -> bytes:
         content = self.client.storage.from_(self.bucket_name).download(filename)
@@ -54,6 +54,11 @@ class SupabaseStorage(BaseStorage):
     def delete(self, filename):
         self.client.storage.from_(self.bucket_name).remove(filename)
 
+    def delete_many(self, filenames: Sequence[str]) -> None:
+        filenames = list(dict.fromkeys(filenames))
+        for i in range(0, len(filenames), 1000):
+            self.client.storage.from_(self.bucket_name).remove(filenames[i : i + 1000])
+
     def bucket_exists(self):
         buckets = self.client.storage.list_buckets()
         return any(bucket.name == self.bucket_name for bucket in buckets)
@@ -1,4 +1,4 @@
-from collections.abc import Generator
+from collections.abc import Generator, Sequence
 
 from qcloud_cos import CosConfig, CosS3Client
 
@@ -41,3 +41,16 @@ class TencentCosStorage(BaseStorage):
 
     def delete(self, filename):
         self.client.delete_object(Bucket=self.bucket_name, Key=filename)
+
+    def delete_many(self, filenames: Sequence[str]) -> None:
+        filenames = list(dict.fromkeys(filenames))
+        errors = []
+        # at most 1000 keys per request
+        for i in range(0, len(filenames), 1000):
+            response = self.client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Object": [{"Key": key} for key in filenames[i : i + 1000]], "Quiet": "true"},
+            )
+            errors.extend(response.get("Error", []))
+        if errors:
+            raise Exception(f"Failed to delete {len(errors)} files, first error: {errors[0]}")
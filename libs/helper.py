@@ -187,15 +187,58 @@ def generate_text_hash(text: str) -> str:
     return sha256(hash_text.encode()).hexdigest()
 
 
+class StreamLatency:
+    """
+    Time to first byte and time between the chunks of a streamed response.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.first_chunk_at: Optional[float] = None
+        self.last_chunk_at: Optional[float] = None
+        self.gaps: list[float] = []
+
+    def record_chunk(self) -> None:
+        now = time.perf_counter()
+        if self.last_chunk_at is None:
+            self.first_chunk_at = now
+        else:
+            self.gaps.append(now - self.last_chunk_at)
+        self.last_chunk_at = now
+
+    def get_summary(self) -> dict[str, Any]:
+        """
+        Get the number of chunks and the latencies in milliseconds.
+        """
+        summary: dict[str, Any] = {"chunks": len(self.gaps) + 1 if self.first_chunk_at is not None else 0}
+        if self.first_chunk_at is not None:
+            summary["time_to_first_byte_ms"] = round((self.first_chunk_at - self.started_at) * 1000, 2)
+        if self.gaps:
+            gaps = sorted(self.gaps)
+            summary["inter_chunk_mean_ms"] = round(sum(gaps) / len(gaps) * 1000, 2)
+            summary["inter_chunk_p95_ms"] = round(gaps[min(len(gaps) - 1, int(len(gaps) * 0.95))] * 1000, 2)
+            summary["inter_chunk_max_ms"] = round(gaps[-1] * 1000, 2)
+        return summary
+
+
 def compact_generate_response(
     response: Union[Mapping[str, Any], RateLimitGenerator, Generator[str, None, None]],
 ) -> Response:
     if isinstance(response, dict):
         return Response(response=json.dumps(response), status=200, mimetype="application/json")
     else:
+        latency = StreamLatency()
 
         def generate() -> Generator:
-            yield from response
+            try:
+                for chunk in response:
+                    latency.record_chunk()
+                    yield chunk
+            finally:
+                # closed as `yield from` would, which releases the rate limit of the request
+                if hasattr(response, "close"):
+                    response.close()
+                logging.debug("Streamed response latency: %s", latency.get_summary())
 
         return Response(stream_with_context(generate()), status=200, mimetype="text/event-stream")
 
@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import NamedTuple, Optional
+
+
+class ModuleImportTime(NamedTuple):
+    module: str
+    # nesting level of the import, 0 for the modules imported by the measured statement
+    level: int
+    self_us: int
+    cumulative_us: int
+
+
+def measure_import_time(statement: str, env: Optional[dict[str, str]] = None) -> list[ModuleImportTime]:
+    """
+    Run a statement in a new interpreter with `-X importtime` and parse the import times it reports.
+
+    :param statement: statement to run, e.g. "import app"
+    :param env: environment variables of the interpreter, the current ones by default
+    :return: import time of every imported module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env if env is not None else dict(os.environ),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to run {statement!r}: {result.stderr[-2000:]}")
+    return parse_import_time(result.stderr)
+
+
+def parse_import_time(output: str) -> list[ModuleImportTime]:
+    """
+    Parse the `import time: self [us] | cumulative | imported package` lines of `-X importtime`.
+    """
+    import_times = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        if not self_us.strip().isdigit():
+            # header line
+            continue
+        # the name is indented by two spaces per nesting level, after the separator space
+        module = name[1:]
+        level = (len(module) - len(module.lstrip(" "))) // 2
+        import_times.append(ModuleImportTime(module.strip(), level, int(self_us), int(cumulative_us)))
+    return import_times
+
+
+def get_total_us(import_times: list[ModuleImportTime]) -> int:
+    return sum(import_time.cumulative_us for import_time in import_times if import_time.level == 0)
+
+
+def get_self_us_by_package(import_times: list[ModuleImportTime]) -> dict[str, int]:
+    """
+    Sum the time spent importing the modules of each top level package, sorted from the slowest.
+    """
+    self_us_by_package: defaultdict[str, int] = defaultdict(int)
+    for import_time in import_times:
+        self_us_by_package[import_time.module.split(".")[0]] += import_time.self_us
+    return dict(sorted(self_us_by_package.items(), key=lambda item: item[1], reverse=True))
@@ -1,5 +1,53 @@
+from collections.abc import Sequence
+from typing import Any, Optional
+
+import sqlalchemy as sa
+from sqlalchemy.orm import InstrumentedAttribute, Query
+
+
 class InfiniteScrollPagination:
     def __init__(self, data, limit, has_more):
         self.data = data
         self.limit = limit
         self.has_more = has_more
+
+
+def paginate_by_keyset(
+    query: Query,
+    sort_columns: Sequence[InstrumentedAttribute],
+    limit: int,
+    after: Optional[Sequence[Any]] = None,
+    descending: bool = True,
+) -> InfiniteScrollPagination:
+    """
+    Keyset pagination for infinite scroll lists.
+
+    Rows are ordered by sort_columns, which must end with a unique column (usually the id) so that rows
+    sharing a timestamp are neither skipped nor repeated. limit + 1 rows are fetched to tell whether there
+    is a next page, instead of counting the rest of the rows.
+
+    :param query: filtered query, without order_by and limit
+    :param sort_columns: columns to order by, e.g. (Message.created_at, Message.id)
+    :param limit: page size
+    :param after: sort column values of the row the page starts after, see get_keyset
+    :param descending: order direction of all sort columns
+    :return: pagination
+    """
+    if after is not None:
+        keyset = sa.tuple_(*sort_columns)
+        after_keyset = sa.tuple_(*[sa.literal(value, column.type) for value, column in zip(after, sort_columns)])
+        query = query.filter(keyset < after_keyset if descending else keyset > after_keyset)
+
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in sort_columns])
+    rows = query.limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    return InfiniteScrollPagination(data=rows[:limit], limit=limit, has_more=has_more)
+
+
+def get_keyset(row: Any, sort_columns: Sequence[InstrumentedAttribute]) -> list[Any]:
+    """
+    Get the sort column values of a row, to start a page after it.
+    """
+    return [getattr(row, column.key) for column in sort_columns]
+
@@ -0,0 +1,359 @@
+"""
+Batch loaders for the relation properties of messages and conversations.
+
+The marshalling fields of the list APIs read properties such as `Message.user_feedback` or
+`Conversation.message_count` for every row, each running its own queries. List APIs call
+`prefetch_messages` / `prefetch_conversations` on a page before marshalling it, which load each
+requested relation for the whole page in one query and set it on the rows, the properties then
+return the prefetched values. The prefetched values live on the instances, so they are scoped to
+the request that loaded the rows.
+"""
+
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Sequence
+
+import sqlalchemy as sa
+
+from extensions.ext_database import db
+
+from .account import Account
+from .model import (
+    App,
+    AppAnnotationHitHistory,
+    AppModelConfig,
+    Conversation,
+    DatasetRetrieverResource,
+    EndUser,
+    Message,
+    MessageAgentThought,
+    MessageAnnotation,
+    MessageFeedback,
+    MessageFile,
+    set_prefetched,
+)
+
+# relations read by message_fields / message_detail_fields
+MESSAGE_LIST_RELATIONS = ("user_feedback", "retriever_resources", "agent_thoughts", "message_files")
+MESSAGE_DETAIL_LIST_RELATIONS = ("feedbacks", "annotation", "annotation_hit_history", "agent_thoughts", "message_files")
+# relations read by conversation_fields / conversation_with_summary_fields
+CONVERSATION_LIST_RELATIONS = (
+    "annotation",
+    "app_model_config",
+    "user_feedback_stats",
+    "admin_feedback_stats",
+    "first_message",
+    "from_end_user_session_id",
+    "from_account_name",
+)
+CONVERSATION_WITH_SUMMARY_LIST_RELATIONS = (
+    "annotated",
+    "app_model_config",
+    "message_count",
+    "user_feedback_stats",
+    "admin_feedback_stats",
+    "first_message",
+    "from_end_user_session_id",
+    "from_account_name",
+)
+
+
+def prefetch_messages(messages: Sequence[Message], relations: Iterable[str]) -> None:
+    """
+    Prefetch the given relation properties of the messages, one query per relation.
+
+    :param messages: messages of a page
+    :param relations: names of the relation properties, see MESSAGE_LIST_RELATIONS
+    """
+    if not messages:
+        return
+
+    for loader in dict.fromkeys(_get_loader(_MESSAGE_LOADERS, "Message", relation) for relation in relations):
+        loader(messages)
+
+
+def prefetch_conversations(conversations: Sequence[Conversation], relations: Iterable[str]) -> None:
+    """
+    Prefetch the given relation properties of the conversations, one query per relation.
+
+    :param conversations: conversations of a page
+    :param relations: names of the relation properties, see CONVERSATION_LIST_RELATIONS
+    """
+    if not conversations:
+        return
+
+    for loader in dict.fromkeys(_get_loader(_CONVERSATION_LOADERS, "Conversation", relation) for relation in relations):
+        loader(conversations)
+
+
+def _get_loader(loaders: dict[str, Callable], model_name: str, relation: str) -> Callable:
+    if relation not in loaders:
+        raise ValueError(f"{model_name} relation {relation} can not be prefetched")
+    return loaders[relation]
+
+
+def _group_by(rows: Iterable, key: Callable) -> dict[str, list]:
+    groups = defaultdict(list)
+    for row in rows:
+        groups[key(row)].append(row)
+    return groups
+
+
+def _load_accounts(account_ids: Iterable[str]) -> dict[str, Account]:
+    account_ids = {account_id for account_id in account_ids if account_id}
+    if not account_ids:
+        return {}
+    return {account.id: account for account in db.session.query(Account).filter(Account.id.in_(account_ids)).all()}
+
+
+def _load_message_feedbacks(messages: Sequence[Message]) -> None:
+    feedbacks = _group_by(
+        db.session.query(MessageFeedback).filter(MessageFeedback.message_id.in_([m.id for m in messages])).all(),
+        lambda feedback: feedback.message_id,
+    )
+    for message in messages:
+        message_feedbacks = feedbacks.get(message.id, [])
+        set_prefetched(message, "feedbacks", message_feedbacks)
+        set_prefetched(message, "user_feedback", next((f for f in message_feedbacks if f.from_source == "user"), None))
+        set_prefetched(
+            message, "admin_feedback", next((f for f in message_feedbacks if f.from_source == "admin"), None)
+        )
+
+    all_feedbacks = [feedback for message_feedbacks in feedbacks.values() for feedback in message_feedbacks]
+    accounts = _load_accounts(feedback.from_account_id for feedback in all_feedbacks)
+    for feedback in all_feedbacks:
+        set_prefetched(feedback, "from_account", accounts.get(feedback.from_account_id))
+
+
+def _set_annotation_accounts(annotations: Iterable[MessageAnnotation]) -> None:
+    annotations = list(annotations)
+    accounts = _load_accounts(annotation.account_id for annotation in annotations)
+    for annotation in annotations:
+        set_prefetched(annotation, "account", accounts.get(annotation.account_id))
+        set_prefetched(annotation, "annotation_create_account", accounts.get(annotation.account_id))
+
+
+def _load_message_annotations(messages: Sequence[Message]) -> None:
+    annotations = {
+        annotation.message_id: annotation
+        for annotation in db.session.query(MessageAnnotation)
+        .filter(MessageAnnotation.message_id.in_([m.id for m in messages]))
+        .all()
+    }
+    for message in messages:
+        set_prefetched(message, "annotation", annotations.get(message.id))
+    _set_annotation_accounts(annotations.values())
+
+
+def _load_message_annotation_hit_histories(messages: Sequence[Message]) -> None:
+    annotation_ids = {
+        history.message_id: history.annotation_id
+        for history in db.session.query(AppAnnotationHitHistory.message_id, AppAnnotationHitHistory.annotation_id)
+        .filter(AppAnnotationHitHistory.message_id.in_([m.id for m in messages]))
+        .all()
+    }
+    annotations = {}
+    if annotation_ids:
+        annotations = {
+            annotation.id: annotation
+            for annotation in db.session.query(MessageAnnotation)
+            .filter(MessageAnnotation.id.in_(set(annotation_ids.values())))
+            .all()
+        }
+    for message in messages:
+        set_prefetched(message, "annotation_hit_history", annotations.get(annotation_ids.get(message.id)))
+    _set_annotation_accounts(annotations.values())
+
+
+def _load_message_agent_thoughts(messages: Sequence[Message]) -> None:
+    agent_thoughts = _group_by(
+        db.session.query(MessageAgentThought)
+        .filter(MessageAgentThought.message_id.in_([m.id for m in messages]))
+        .order_by(MessageAgentThought.position.asc())
+        .all(),
+        lambda agent_thought: agent_thought.message_id,
+    )
+    for message in messages:
+        set_prefetched(message, "agent_thoughts", agent_thoughts.get(message.id, []))
+
+
+def _load_message_retriever_resources(messages: Sequence[Message]) -> None:
+    retriever_resources = _group_by(
+        db.session.query(DatasetRetrieverResource)
+        .filter(DatasetRetrieverResource.message_id.in_([m.id for m in messages]))
+        .order_by(DatasetRetrieverResource.position.asc())
+        .all(),
+        lambda retriever_resource: retriever_resource.message_id,
+    )
+    for message in messages:
+        set_prefetched(message, "retriever_resources", retriever_resources.get(message.id, []))
+
+
+def _load_message_files(messages: Sequence[Message]) -> None:
+    message_files = _group_by(
+        db.session.query(MessageFile).filter(MessageFile.message_id.in_([m.id for m in messages])).all(),
+        lambda message_file: message_file.message_id,
+    )
+    app_ids = {message.app_id for message in messages if message.id in message_files}
+    tenant_ids = {}
+    if app_ids:
+        tenant_ids = dict(db.session.query(App.id, App.tenant_id).filter(App.id.in_(app_ids)).all())
+
+    for message in messages:
+        files = message_files.get(message.id)
+        if not files:
+            set_prefetched(message, "message_files", [])
+            continue
+        if message.app_id not in tenant_ids:
+            raise ValueError(f"App {message.app_id} not found")
+        set_prefetched(message, "message_files", Message.build_message_files(files, tenant_ids[message.app_id]))
+
+
+def _load_conversation_annotations(conversations: Sequence[Conversation]) -> None:
+    annotations = _group_by(
+        db.session.query(MessageAnnotation)
+        .filter(MessageAnnotation.conversation_id.in_([c.id for c in conversations]))
+        .all(),
+        lambda annotation: annotation.conversation_id,
+    )
+    for conversation in conversations:
+        conversation_annotations = annotations.get(conversation.id, [])
+        set_prefetched(conversation, "annotation", conversation_annotations[0] if conversation_annotations else None)
+        set_prefetched(conversation, "annotated", bool(conversation_annotations))
+    _set_annotation_accounts(conversation_annotations[0] for conversation_annotations in annotations.values())
+
+
+def _load_conversation_annotated(conversations: Sequence[Conversation]) -> None:
+    annotated_ids = {
+        conversation_id
+        for (conversation_id,) in db.session.query(MessageAnnotation.conversation_id)
+        .filter(MessageAnnotation.conversation_id.in_([c.id for c in conversations]))
+        .distinct()
+        .all()
+    }
+    for conversation in conversations:
+        set_prefetched(conversation, "annotated", conversation.id in annotated_ids)
+
+
+def _load_conversation_app_model_configs(conversations: Sequence[Conversation]) -> None:
+    app_model_config_ids = {c.app_model_config_id for c in conversations if c.app_model_config_id}
+    app_model_configs = {}
+    if app_model_config_ids:
+        app_model_configs = {
+            app_model_config.id: app_model_config
+            for app_model_config in db.session.query(AppModelConfig)
+            .filter(AppModelConfig.id.in_(app_model_config_ids))
+            .all()
+        }
+    for conversation in conversations:
+        set_prefetched(conversation, "app_model_config", app_model_configs.get(conversation.app_model_config_id))
+
+
+def _load_conversation_message_counts(conversations: Sequence[Conversation]) -> None:
+    message_counts = dict(
+        db.session.query(Message.conversation_id, sa.func.count(Message.id))
+        .filter(Message.conversation_id.in_([c.id for c in conversations]))
+        .group_by(Message.conversation_id)
+        .all()
+    )
+    for conversation in conversations:
+        set_prefetched(conversation, "message_count", message_counts.get(conversation.id, 0))
+
+
+def _load_conversation_feedback_stats(conversations: Sequence[Conversation], from_source: str) -> None:
+    conversation_ids = [c.id for c in conversations]
+    rating_counts = {
+        (conversation_id, rating): count
+        for conversation_id, rating, count in db.session.query(
+            MessageFeedback.conversation_id, MessageFeedback.rating, sa.func.count(MessageFeedback.id)
+        )
+        .filter(MessageFeedback.conversation_id.in_(conversation_ids), MessageFeedback.from_source == from_source)
+        .group_by(MessageFeedback.conversation_id, MessageFeedback.rating)
+        .all()
+    }
+
+    contents = {}
+    if from_source == "user":
+        contents = _group_by(
+            db.session.query(MessageFeedback.conversation_id, MessageFeedback.content)
+            .filter(
+                MessageFeedback.conversation_id.in_(conversation_ids),
+                MessageFeedback.from_source == "user",
+                MessageFeedback.content.isnot(None),
+            )
+            .all(),
+            lambda row: row.conversation_id,
+        )
+
+    for conversation in conversations:
+        stats = {
+            "like": rating_counts.get((conversation.id, "like"), 0),
+            "dislike": rating_counts.get((conversation.id, "dislike"), 0),
+        }
+        if from_source == "user":
+            # same shape as the rows of Conversation.user_feedback_stats
+            stats["contents"] = [(row.content,) for row in contents.get(conversation.id, [])]
+            set_prefetched(conversation, "user_feedback_stats", stats)
+        else:
+            set_prefetched(conversation, "admin_feedback_stats", stats)
+
+
+def _load_conversation_first_messages(conversations: Sequence[Conversation]) -> None:
+    ranked_messages = (
+        db.session.query(
+            Message.id,
+            sa.func.row_number()
+            .over(partition_by=Message.conversation_id, order_by=Message.created_at.asc())
+            .label("rank"),
+        )
+        .filter(Message.conversation_id.in_([c.id for c in conversations]))
+        .subquery()
+    )
+    first_messages = {
+        message.conversation_id: message
+        for message in db.session.query(Message)
+        .join(ranked_messages, ranked_messages.c.id == Message.id)
+        .filter(ranked_messages.c.rank == 1)
+        .all()
+    }
+    for conversation in conversations:
+        set_prefetched(conversation, "first_message", first_messages.get(conversation.id))
+
+
+def _load_conversation_end_user_session_ids(conversations: Sequence[Conversation]) -> None:
+    end_user_ids = {c.from_end_user_id for c in conversations if c.from_end_user_id}
+    session_ids = {}
+    if end_user_ids:
+        session_ids = dict(db.session.query(EndUser.id, EndUser.session_id).filter(EndUser.id.in_(end_user_ids)).all())
+    for conversation in conversations:
+        set_prefetched(conversation, "from_end_user_session_id", session_ids.get(conversation.from_end_user_id))
+
+
+def _load_conversation_account_names(conversations: Sequence[Conversation]) -> None:
+    accounts = _load_accounts(c.from_account_id for c in conversations)
+    for conversation in conversations:
+        account = accounts.get(conversation.from_account_id)
+        set_prefetched(conversation, "from_account_name", account.name if account else None)
+
+
+_MESSAGE_LOADERS: dict[str, Callable[[Sequence[Message]], None]] = {
+    "user_feedback": _load_message_feedbacks,
+    "admin_feedback": _load_message_feedbacks,
+    "feedbacks": _load_message_feedbacks,
+    "annotation": _load_message_annotations,
+    "annotation_hit_history": _load_message_annotation_hit_histories,
+    "agent_thoughts": _load_message_agent_thoughts,
+    "retriever_resources": _load_message_retriever_resources,
+    "message_files": _load_message_files,
+}
+
+_CONVERSATION_LOADERS: dict[str, Callable[[Sequence[Conversation]], None]] = {
+    "annotation": _load_conversation_annotations,
+    "annotated": _load_conversation_annotated,
+    "app_model_config": _load_conversation_app_model_configs,
+    "message_count": _load_conversation_message_counts,
+    "user_feedback_stats": lambda conversations: _load_conversation_feedback_stats(conversations, "user"),
+    "admin_feedback_stats": lambda conversations: _load_conversation_feedback_stats(conversations, "admin"),
+    "first_message": _load_conversation_first_messages,
+    "from_end_user_session_id": _load_conversation_end_user_session_ids,
+    "from_account_name": _load_conversation_account_names,
+}
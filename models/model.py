@@ -1,3 +1,4 @@
+import functools
 import json
 import re
 import uuid
@@ -24,6 +25,27 @@ from .account import Account, Tenant
 from .types import StringUUID
 
 
+def prefetchable(func):
+    """
+    Property that returns the value a batch loader prefetched for the instance, see models/loaders.py,
+    and runs its own query otherwise.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def getter(self):
+        prefetched = self.__dict__.get("_prefetched")
+        if prefetched is not None and name in prefetched:
+            return prefetched[name]
+        return func(self)
+
+    return property(getter)
+
+
+def set_prefetched(instance: Any, name: str, value: Any) -> None:
+    instance.__dict__.setdefault("_prefetched", {})[name] = value
+
+
 class DifySetup(db.Model):
     __tablename__ = "dify_setups"
     __table_args__ = (db.PrimaryKeyConstraint("version", name="dify_setup_pkey"),)
@@ -598,9 +620,7 @@ class Conversation(db.Model):
                 else:
                     model_config["configs"] = override_model_configs
             else:
-                app_model_config = (
-                    db.session.query(AppModelConfig).filter(AppModelConfig.id == self.app_model_config_id).first()
-                )
+                app_model_config = self.app_model_config
                 if app_model_config:
                     model_config = app_model_config.to_dict()
 
@@ -609,6 +629,10 @@ class Conversation(db.Model):
 
         return model_config
 
+    @prefetchable
+    def app_model_config(self):
+        return db.session.query(AppModelConfig).filter(AppModelConfig.id == self.app_model_config_id).first()
+
     @property
     def summary_or_query(self):
         if self.summary:
@@ -620,19 +644,19 @@ class Conversation(db.Model):
             else:
                 return ""
 
-    @property
+    @prefetchable
     def annotated(self):
         return db.session.query(MessageAnnotation).filter(MessageAnnotation.conversation_id == self.id).count() > 0
 
-    @property
+    @prefetchable
     def annotation(self):
         return db.session.query(MessageAnnotation).filter(MessageAnnotation.conversation_id == self.id).first()
 
-    @property
+    @prefetchable
     def message_count(self):
         return db.session.query(Message).filter(Message.conversation_id == self.id).count()
 
-    @property
+    @prefetchable
     def user_feedback_stats(self):
         like = (
             db.session.query(MessageFeedback)
@@ -664,7 +688,7 @@ class Conversation(db.Model):
 
         return {"like": like, "dislike": dislike, "contents": contents}
 
-    @property
+    @prefetchable
     def admin_feedback_stats(self):
         like = (
             db.session.query(MessageFeedback)
@@ -688,7 +712,7 @@ class Conversation(db.Model):
 
         return {"like": like, "dislike": dislike}
 
-    @property
+    @prefetchable
     def first_message(self):
         return db.session.query(Message).filter(Message.conversation_id == self.id).first()
 
@@ -696,7 +720,7 @@ class Conversation(db.Model):
     def app(self):
         return db.session.query(App).filter(App.id == self.app_id).first()
 
-    @property
+    @prefetchable
     def from_end_user_session_id(self):
         if self.from_end_user_id:
             end_user = db.session.query(EndUser).filter(EndUser.id == self.from_end_user_id).first()
@@ -705,7 +729,7 @@ class Conversation(db.Model):
 
         return None
 
-    @property
+    @prefetchable
     def from_account_name(self):
         if self.from_account_id:
             account = db.session.query(Account).filter(Account.id == self.from_account_id).first()
@@ -861,7 +885,7 @@ class Message(db.Model):
 
         return re_sign_file_url_answer
 
-    @property
+    @prefetchable
     def user_feedback(self):
         feedback = (
             db.session.query(MessageFeedback)
@@ -870,7 +894,7 @@ class Message(db.Model):
         )
         return feedback
 
-    @property
+    @prefetchable
     def admin_feedback(self):
         feedback = (
             db.session.query(MessageFeedback)
@@ -879,17 +903,17 @@ class Message(db.Model):
         )
         return feedback
 
-    @property
+    @prefetchable
     def feedbacks(self):
         feedbacks = db.session.query(MessageFeedback).filter(MessageFeedback.message_id == self.id).all()
         return feedbacks
 
-    @property
+    @prefetchable
     def annotation(self):
         annotation = db.session.query(MessageAnnotation).filter(MessageAnnotation.message_id == self.id).first()
         return annotation
 
-    @property
+    @prefetchable
     def annotation_hit_history(self):
         annotation_history = (
             db.session.query(AppAnnotationHitHistory).filter(AppAnnotationHitHistory.message_id == self.id).first()
@@ -921,7 +945,7 @@ class Message(db.Model):
     def message_metadata_dict(self) -> dict:
         return json.loads(self.message_metadata) if self.message_metadata else {}
 
-    @property
+    @prefetchable
     def agent_thoughts(self):
         return (
             db.session.query(MessageAgentThought)
@@ -930,7 +954,7 @@ class Message(db.Model):
             .all()
         )
 
-    @property
+    @prefetchable
     def retriever_resources(self):
         return (
             db.session.query(DatasetRetrieverResource)
@@ -939,16 +963,21 @@ class Message(db.Model):
             .all()
         )
 
-    @property
+    @prefetchable
     def message_files(self):
-        from factories import file_factory
-
         message_files = db.session.query(MessageFile).filter(MessageFile.message_id == self.id).all()
         current_app = db.session.query(App).filter(App.id == self.app_id).first()
         if not current_app:
             raise ValueError(f"App {self.app_id} not found")
 
+        return self.build_message_files(message_files, current_app.tenant_id)
+
+    @staticmethod
+    def build_message_files(message_files: list["MessageFile"], tenant_id: str) -> list[dict]:
+        from factories import file_factory
+
         files: list[File] = []
+        backfilled = False
         for message_file in message_files:
             if message_file.transfer_method == "local_file":
                 if message_file.upload_file_id is None:
@@ -960,7 +989,7 @@ class Message(db.Model):
                         "transfer_method": message_file.transfer_method,
                         "type": message_file.type,
                     },
-                    tenant_id=current_app.tenant_id,
+                    tenant_id=tenant_id,
                 )
             elif message_file.transfer_method == "remote_url":
                 if message_file.url is None:
@@ -972,12 +1001,13 @@ class Message(db.Model):
                         "transfer_method": message_file.transfer_method,
                         "url": message_file.url,
                     },
-                    tenant_id=current_app.tenant_id,
+                    tenant_id=tenant_id,
                 )
             elif message_file.transfer_method == "tool_file":
                 if message_file.upload_file_id is None:
                     assert message_file.url is not None
                     message_file.upload_file_id = message_file.url.split("/")[-1].split(".")[0]
+                    backfilled = True
                 mapping = {
                     "id": message_file.id,
                     "type": message_file.type,
@@ -986,7 +1016,7 @@ class Message(db.Model):
                 }
                 file = file_factory.build_from_mapping(
                     mapping=mapping,
-                    tenant_id=current_app.tenant_id,
+                    tenant_id=tenant_id,
                 )
             else:
                 raise ValueError(
@@ -999,7 +1029,9 @@ class Message(db.Model):
             for (file, message_file) in zip(files, message_files)
         ]
 
-        db.session.commit()
+        # committing expires every instance in the session, only do it when there is something to save
+        if backfilled:
+            db.session.commit()
         return result
 
     @property
@@ -1076,7 +1108,7 @@ class MessageFeedback(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
     updated_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
 
-    @property
+    @prefetchable
     def from_account(self):
         account = db.session.query(Account).filter(Account.id == self.from_account_id).first()
         return account
@@ -1145,12 +1177,12 @@ class MessageAnnotation(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
     updated_at = db.Column(db.DateTime, nullable=False, server_default=db.text("CURRENT_TIMESTAMP(0)"))
 
-    @property
+    @prefetchable
     def account(self):
         account = db.session.query(Account).filter(Account.id == self.account_id).first()
         return account
 
-    @property
+    @prefetchable
     def annotation_create_account(self):
         account = db.session.query(Account).filter(Account.id == self.account_id).first()
         return account
@@ -10,7 +10,7 @@ from sqlalchemy.orm import Mapped, mapped_column
 
 import contexts
 from constants import HIDDEN_VALUE
-from core.helper import encrypter
+from core.helper import encrypter, workflow_payload_storage
 from core.variables import SecretVariable, Variable
 from extensions.ext_database import db
 from factories import variable_factory
@@ -343,6 +343,53 @@ class WorkflowRunStatus(StrEnum):
         raise ValueError(f"invalid workflow run status value {value}")
 
 
+def set_payload(instance: Any, name: str, payload: Optional[str]) -> None:
+    """
+    Set a payload column of a workflow run or node execution, offloading it to the storage if it is large.
+    """
+    stored = workflow_payload_storage.offload(instance.tenant_id, payload)
+    setattr(instance, name, stored)
+    if stored is not payload:
+        # keep the parsed payload, so reading it back does not fetch it from the storage
+        instance.__dict__.setdefault("_payloads", {})[name] = (stored, json.loads(payload))  # type: ignore
+
+
+def get_payload(instance: Any, name: str) -> Any:
+    """
+    Get a parsed payload column of a workflow run or node execution, fetching it from the storage if it was
+    offloaded. The parsed payload is kept on the instance until the column changes.
+    """
+    stored = getattr(instance, name)
+    if not stored:
+        return None
+
+    payloads = instance.__dict__.setdefault("_payloads", {})
+    if name in payloads and payloads[name][0] == stored:
+        return payloads[name][1]
+
+    payload = json.loads(workflow_payload_storage.load(stored))  # type: ignore
+    payloads[name] = (stored, payload)
+    return payload
+
+
+def load_payloads(instances: Sequence[Any], names: Sequence[str]) -> None:
+    """
+    Fetch the payload columns of workflow runs or node executions from the storage in one bulk call, and keep
+    them parsed on the instances, so listing them does not fetch each offloaded payload one after another.
+    """
+    columns = []
+    for instance in instances:
+        payloads = instance.__dict__.setdefault("_payloads", {})
+        for name in names:
+            stored = getattr(instance, name)
+            if stored and not (name in payloads and payloads[name][0] == stored):
+                columns.append((payloads, name, stored))
+
+    loaded = workflow_payload_storage.load_many([stored for _, _, stored in columns])
+    for (payloads, name, stored), payload in zip(columns, loaded):
+        payloads[name] = (stored, json.loads(payload))  # type: ignore
+
+
 class WorkflowRun(db.Model):
     """
     Workflow Run
@@ -432,7 +479,7 @@ class WorkflowRun(db.Model):
 
     @property
     def outputs_dict(self) -> Mapping[str, Any]:
-        return json.loads(self.outputs) if self.outputs else {}
+        return get_payload(self, "outputs") or {}
 
     @property
     def message(self) -> Optional["Message"]:
@@ -654,15 +701,15 @@ class WorkflowNodeExecution(db.Model):
 
     @property
     def inputs_dict(self):
-        return json.loads(self.inputs) if self.inputs else None
+        return get_payload(self, "inputs")
 
     @property
     def outputs_dict(self):
-        return json.loads(self.outputs) if self.outputs else None
+        return get_payload(self, "outputs")
 
     @property
     def process_data_dict(self):
-        return json.loads(self.process_data) if self.process_data else None
+        return get_payload(self, "process_data")
 
     @property
     def execution_metadata_dict(self):
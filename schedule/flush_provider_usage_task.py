@@ -0,0 +1,30 @@
+import time
+
+import click
+
+import app
+from configs import dify_config
+from services.provider_usage_service import ProviderUsageService
+
+
+@app.celery.task(queue="dataset")
+def flush_provider_usage_task():
+    if not dify_config.PROVIDER_USAGE_WRITE_BEHIND_ENABLED:
+        return
+
+    start_at = time.perf_counter()
+    try:
+        quota_count, last_used_count = ProviderUsageService.flush()
+    except Exception as e:
+        click.echo(click.style(f"Error: {e}", fg="red"))
+        return
+
+    end_at = time.perf_counter()
+    if quota_count or last_used_count:
+        click.echo(
+            click.style(
+                f"Flushed provider usage, {quota_count} quota and {last_used_count} last used updates,"
+                f" latency: {end_at - start_at}",
+                fg="green",
+            )
+        )
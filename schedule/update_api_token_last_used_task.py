@@ -0,0 +1,22 @@
+import time
+
+import click
+
+import app
+from services.api_token_service import ApiTokenService
+
+
+@app.celery.task(queue="dataset")
+def update_api_token_last_used_task():
+    start_at = time.perf_counter()
+    try:
+        count = ApiTokenService.update_last_used_at()
+    except Exception as e:
+        click.echo(click.style(f"Error: {e}", fg="red"))
+        return
+
+    end_at = time.perf_counter()
+    if count:
+        click.echo(
+            click.style(f"Updated last used time of {count} API tokens, latency: {end_at - start_at}", fg="green")
+        )
@@ -1,7 +1,6 @@
 import datetime
 import uuid
 
-import pandas as pd
 from flask_login import current_user
 from sqlalchemy import or_
 from werkzeug.datastructures import FileStorage
@@ -282,6 +281,8 @@ class AppAnnotationService:
         if not app:
             raise NotFound("App not found")
 
+        import pandas as pd
+
         try:
             # Skip the first row
             df = pd.read_csv(file)
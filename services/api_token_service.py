@@ -0,0 +1,153 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import UTC, datetime
+from typing import Optional
+
+from cachetools import TTLCache
+from sqlalchemy import bindparam, update
+
+from configs import dify_config
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.model import ApiToken
+
+logger = logging.getLogger(__name__)
+
+LOCAL_CACHE_MAX_SIZE = 10000
+LAST_USED_AT_KEY = "api_token_last_used_at"
+
+_CACHED_FIELDS = ("id", "app_id", "tenant_id", "type", "token")
+_MISSING = object()
+
+
+class ApiTokenService:
+    """
+    Resolution of service API tokens, cached in process for API_TOKEN_CACHE_LOCAL_TTL seconds and in redis
+    for API_TOKEN_CACHE_TTL seconds. Invalid tokens are cached as well, so that requests with a wrong token
+    do not reach the database either, in redis only for API_TOKEN_CACHE_MISS_TTL seconds, so that clients
+    sending many distinct wrong tokens cannot grow redis.
+
+    last_used_at is not written by the requests. They record the time in redis, at most once per token per
+    API_TOKEN_LAST_USED_UPDATE_INTERVAL seconds and process, and a scheduled task writes the recorded times
+    in one batch.
+    """
+
+    _lock = threading.Lock()
+    _local_cache: TTLCache = TTLCache(maxsize=LOCAL_CACHE_MAX_SIZE, ttl=dify_config.API_TOKEN_CACHE_LOCAL_TTL or 1)
+    _recently_used: TTLCache = TTLCache(
+        maxsize=LOCAL_CACHE_MAX_SIZE, ttl=dify_config.API_TOKEN_LAST_USED_UPDATE_INTERVAL
+    )
+
+    @classmethod
+    def get_api_token(cls, scope: Optional[str], token: str) -> Optional[ApiToken]:
+        """
+        Get the API token of a scope, from the caches or the database.
+
+        The returned token is not attached to the session, only its identity fields are loaded.
+
+        :return: the token, or None if it does not exist
+        """
+        if not dify_config.API_TOKEN_CACHE_TTL:
+            return cls._query_api_token(scope, token)
+
+        cache_key = cls._get_cache_key(scope, token)
+        if dify_config.API_TOKEN_CACHE_LOCAL_TTL:
+            with cls._lock:
+                fields = cls._local_cache.get(cache_key, _MISSING)
+            if fields is not _MISSING:
+                return cls._to_api_token(fields)
+
+        cached = redis_client.get(cache_key)
+        if cached is not None:
+            fields = json.loads(cached)
+        else:
+            api_token = cls._query_api_token(scope, token)
+            if api_token:
+                fields = {field: getattr(api_token, field) for field in _CACHED_FIELDS}
+                redis_client.setex(cache_key, dify_config.API_TOKEN_CACHE_TTL, json.dumps(fields))
+            else:
+                fields = None
+                if dify_config.API_TOKEN_CACHE_MISS_TTL:
+                    redis_client.setex(cache_key, dify_config.API_TOKEN_CACHE_MISS_TTL, json.dumps(fields))
+
+        if dify_config.API_TOKEN_CACHE_LOCAL_TTL:
+            with cls._lock:
+                cls._local_cache[cache_key] = fields
+        return cls._to_api_token(fields)
+
+    @classmethod
+    def delete_cache(cls, scope: Optional[str], token: str) -> None:
+        """
+        Delete a token from the caches, when it is deleted.
+        The in process caches of other processes keep it for up to API_TOKEN_CACHE_LOCAL_TTL seconds.
+        """
+        cache_key = cls._get_cache_key(scope, token)
+        redis_client.delete(cache_key)
+        with cls._lock:
+            cls._local_cache.pop(cache_key, None)
+
+    @classmethod
+    def record_usage(cls, api_token: ApiToken) -> None:
+        """
+        Record that a token was used, last_used_at is updated by update_last_used_at.
+        """
+        with cls._lock:
+            if api_token.id in cls._recently_used:
+                return
+            cls._recently_used[api_token.id] = True
+
+        try:
+            redis_client.hset(LAST_USED_AT_KEY, api_token.id, time.time())
+        except Exception:
+            logger.exception(f"Failed to record usage of API token {api_token.id}")
+
+    @classmethod
+    def update_last_used_at(cls) -> int:
+        """
+        Write the recorded usage times of the tokens to the database.
+
+        :return: number of updated tokens
+        """
+        with redis_client.pipeline() as pipe:
+            pipe.hgetall(LAST_USED_AT_KEY)
+            pipe.delete(LAST_USED_AT_KEY)
+            last_used_times, _ = pipe.execute()
+        if not last_used_times:
+            return 0
+
+        table = ApiToken.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("token_id"))
+            .values(last_used_at=bindparam("token_last_used_at"))
+        )
+        db.session.execute(
+            stmt,
+            [
+                {
+                    "token_id": token_id.decode(),
+                    "token_last_used_at": datetime.fromtimestamp(float(last_used_at), UTC).replace(tzinfo=None),
+                }
+                for token_id, last_used_at in last_used_times.items()
+            ],
+        )
+        db.session.commit()
+        return len(last_used_times)
+
+    @staticmethod
+    def _query_api_token(scope: Optional[str], token: str) -> Optional[ApiToken]:
+        return db.session.query(ApiToken).filter(ApiToken.token == token, ApiToken.type == scope).first()
+
+    @staticmethod
+    def _get_cache_key(scope: Optional[str], token: str) -> str:
+        # keep the tokens themselves out of the key names
+        return f"api_token:{scope}:{hashlib.sha256(token.encode()).hexdigest()}"
+
+    @staticmethod
+    def _to_api_token(fields: Optional[dict]) -> Optional[ApiToken]:
+        if fields is None:
+            return None
+        return ApiToken(**fields)
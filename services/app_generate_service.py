@@ -109,7 +109,9 @@ class AppGenerateService:
         except RateLimitError as e:
             raise InvokeRateLimitError(str(e))
         except Exception:
-            rate_limit.exit(request_id)
+            # no stream was returned to exit the rate limit once consumed
+            if streaming:
+                rate_limit.exit(request_id)
             raise
         finally:
             if not streaming:
@@ -1,7 +1,9 @@
 import os
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from configs import dify_config
 from extensions.ext_database import db
 from models.account import TenantAccountJoin, TenantAccountRole
 
@@ -10,6 +12,17 @@ class BillingService:
     base_url = os.environ.get("BILLING_API_URL", "BILLING_API_URL")
     secret_key = os.environ.get("BILLING_API_SECRET_KEY", "BILLING_API_SECRET_KEY")
 
+    # connections to the billing API are kept alive and shared by the threads of the process
+    session = requests.Session()
+    session.mount(
+        "http://",
+        HTTPAdapter(pool_connections=1, pool_maxsize=dify_config.BILLING_API_POOL_SIZE),
+    )
+    session.mount(
+        "https://",
+        HTTPAdapter(pool_connections=1, pool_maxsize=dify_config.BILLING_API_POOL_SIZE),
+    )
+
     @classmethod
     def get_info(cls, tenant_id: str):
         params = {"tenant_id": tenant_id}
@@ -43,7 +56,9 @@ class BillingService:
         headers = {"Content-Type": "application/json", "Billing-Api-Secret-Key": cls.secret_key}
 
         url = f"{cls.base_url}{endpoint}"
-        response = requests.request(method, url, json=json, params=params, headers=headers)
+        response = cls.session.request(
+            method, url, json=json, params=params, headers=headers, timeout=dify_config.BILLING_API_TIMEOUT
+        )
 
         return response.json()
 
@@ -1,13 +1,13 @@
-from collections.abc import Callable
 from datetime import UTC, datetime
 from typing import Optional, Union
 
 from sqlalchemy import asc, desc, or_
 
+from core.agent.agent_history_cache import AgentHistoryCache
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.llm_generator.llm_generator import LLMGenerator
 from extensions.ext_database import db
-from libs.infinite_scroll_pagination import InfiniteScrollPagination
+from libs.infinite_scroll_pagination import InfiniteScrollPagination, get_keyset, paginate_by_keyset
 from models.account import Account
 from models.model import App, Conversation, EndUser, Message
 from services.errors.conversation import ConversationNotExistsError, LastConversationNotExistsError
@@ -45,34 +45,19 @@ class ConversationService:
         if exclude_ids is not None:
             base_query = base_query.filter(~Conversation.id.in_(exclude_ids))
 
-        # define sort fields and directions
+        # define sort fields and directions, the id breaks ties between rows with the same sort field value
         sort_field, sort_direction = cls._get_sort_params(sort_by)
+        sort_columns = (getattr(Conversation, sort_field), Conversation.id)
 
+        after = None
         if last_id:
             last_conversation = base_query.filter(Conversation.id == last_id).first()
             if not last_conversation:
                 raise LastConversationNotExistsError()
 
-            # build filters based on sorting
-            filter_condition = cls._build_filter_condition(sort_field, sort_direction, last_conversation)
-            base_query = base_query.filter(filter_condition)
+            after = get_keyset(last_conversation, sort_columns)
 
-        base_query = base_query.order_by(sort_direction(getattr(Conversation, sort_field)))
-
-        conversations = base_query.limit(limit).all()
-
-        has_more = False
-        if len(conversations) == limit:
-            current_page_last_conversation = conversations[-1]
-            rest_filter_condition = cls._build_filter_condition(
-                sort_field, sort_direction, current_page_last_conversation, is_next_page=True
-            )
-            rest_count = base_query.filter(rest_filter_condition).count()
-
-            if rest_count > 0:
-                has_more = True
-
-        return InfiniteScrollPagination(data=conversations, limit=limit, has_more=has_more)
+        return paginate_by_keyset(base_query, sort_columns, limit, after=after, descending=sort_direction == desc)
 
     @classmethod
     def _get_sort_params(cls, sort_by: str):
@@ -80,16 +65,6 @@ class ConversationService:
             return sort_by[1:], desc
         return sort_by, asc
 
-    @classmethod
-    def _build_filter_condition(
-        cls, sort_field: str, sort_direction: Callable, reference_conversation: Conversation, is_next_page: bool = False
-    ):
-        field_value = getattr(reference_conversation, sort_field)
-        if (sort_direction == desc and not is_next_page) or (sort_direction == asc and is_next_page):
-            return getattr(Conversation, sort_field) < field_value
-        else:
-            return getattr(Conversation, sort_field) > field_value
-
     @classmethod
     def rename(
         cls,
@@ -163,3 +138,5 @@ class ConversationService:
         conversation.is_deleted = True
         conversation.updated_at = datetime.now(UTC).replace(tzinfo=None)
         db.session.commit()
+
+        AgentHistoryCache(conversation.id).delete()
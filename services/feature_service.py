@@ -1,8 +1,14 @@
+import json
+import logging
+import threading
+from concurrent.futures import Future
 from enum import StrEnum
 
 from pydantic import BaseModel, ConfigDict
+from redis.exceptions import LockError
 
 from configs import dify_config
+from extensions.ext_redis import redis_client
 from services.billing_service import BillingService
 from services.enterprise.enterprise_service import EnterpriseService
 
@@ -67,18 +73,39 @@ class SystemFeatureModel(BaseModel):
     license: LicenseModel = LicenseModel()
 
 
+logger = logging.getLogger(__name__)
+
+BILLING_INFO_CACHE_KEY_PREFIX = "feature_service:billing_info:"
+# concurrent misses of a tenant in a process wait for the billing info loaded by the first one
+_billing_info_loads_lock = threading.Lock()
+_billing_info_loads: dict[str, Future] = {}
+
+
 class FeatureService:
     @classmethod
-    def get_features(cls, tenant_id: str) -> FeatureModel:
+    def get_features(cls, tenant_id: str, refresh: bool = False) -> FeatureModel:
+        """
+        Get the features of a workspace.
+
+        :param refresh: get the billing info from the billing API even if it is cached, for checks of
+            resource limits whose sizes change without invalidating the cache
+        """
         features = FeatureModel()
 
         cls._fulfill_params_from_env(features)
 
         if dify_config.BILLING_ENABLED:
-            cls._fulfill_params_from_billing_api(features, tenant_id)
+            cls._fulfill_params_from_billing_api(features, tenant_id, refresh)
 
         return features
 
+    @classmethod
+    def invalidate_features(cls, tenant_id: str) -> None:
+        """
+        Delete the cached billing info of a workspace, when its plan changes.
+        """
+        redis_client.delete(f"{BILLING_INFO_CACHE_KEY_PREFIX}{tenant_id}")
+
     @classmethod
     def get_system_features(cls) -> SystemFeatureModel:
         system_features = SystemFeatureModel()
@@ -107,8 +134,67 @@ class FeatureService:
         features.dataset_operator_enabled = dify_config.DATASET_OPERATOR_ENABLED
 
     @classmethod
-    def _fulfill_params_from_billing_api(cls, features: FeatureModel, tenant_id: str):
+    def _get_billing_info(cls, tenant_id: str, refresh: bool = False) -> dict:
+        if not dify_config.BILLING_FEATURES_CACHE_TTL:
+            return BillingService.get_info(tenant_id)
+
+        cache_key = f"{BILLING_INFO_CACHE_KEY_PREFIX}{tenant_id}"
+        if refresh:
+            # concurrent refreshes cannot share a cached result, so they are not serialized by the locks
+            return cls._load_billing_info(tenant_id, cache_key)
+
+        cached_billing_info = redis_client.get(cache_key)
+        if cached_billing_info:
+            return json.loads(cached_billing_info)
+
+        with _billing_info_loads_lock:
+            load = _billing_info_loads.get(tenant_id)
+            is_loading = load is None
+            if is_loading:
+                load = _billing_info_loads[tenant_id] = Future()
+        if not is_loading:
+            return load.result()
+
+        try:
+            billing_info = cls._load_billing_info_locked(tenant_id, cache_key)
+            load.set_result(billing_info)
+            return billing_info
+        except Exception as e:
+            load.set_exception(e)
+            raise
+        finally:
+            with _billing_info_loads_lock:
+                del _billing_info_loads[tenant_id]
+
+    @classmethod
+    def _load_billing_info_locked(cls, tenant_id: str, cache_key: str) -> dict:
+        try:
+            # and across processes, waiting at most for the duration of a request
+            with redis_client.lock(
+                f"{cache_key}:lock",
+                timeout=dify_config.BILLING_API_TIMEOUT * 2,
+                blocking_timeout=dify_config.BILLING_API_TIMEOUT,
+            ):
+                # the request that held the lock may have cached it already
+                cached_billing_info = redis_client.get(cache_key)
+                if cached_billing_info:
+                    return json.loads(cached_billing_info)
+                return cls._load_billing_info(tenant_id, cache_key)
+        except LockError:
+            logger.warning(f"Failed to lock the billing info cache of tenant {tenant_id}")
+            return BillingService.get_info(tenant_id)
+
+    @classmethod
+    def _load_billing_info(cls, tenant_id: str, cache_key: str) -> dict:
         billing_info = BillingService.get_info(tenant_id)
+        # error responses are not cached
+        if isinstance(billing_info, dict) and "enabled" in billing_info:
+            redis_client.setex(cache_key, dify_config.BILLING_FEATURES_CACHE_TTL, json.dumps(billing_info))
+        return billing_info
+
+    @classmethod
+    def _fulfill_params_from_billing_api(cls, features: FeatureModel, tenant_id: str, refresh: bool = False):
+        billing_info = cls._get_billing_info(tenant_id, refresh)
 
         features.billing.enabled = billing_info["enabled"]
         features.billing.subscription.plan = billing_info["subscription"]["plan"]
@@ -11,8 +11,9 @@ from core.ops.entities.trace_entity import TraceTaskName
 from core.ops.ops_trace_manager import TraceQueueManager, TraceTask
 from core.ops.utils import measure_time
 from extensions.ext_database import db
-from libs.infinite_scroll_pagination import InfiniteScrollPagination
+from libs.infinite_scroll_pagination import InfiniteScrollPagination, get_keyset, paginate_by_keyset
 from models.account import Account
+from models.loaders import MESSAGE_LIST_RELATIONS, prefetch_messages
 from models.model import App, AppMode, AppModelConfig, EndUser, Message, MessageFeedback
 from services.conversation_service import ConversationService
 from services.errors.conversation import ConversationCompletedError, ConversationNotExistsError
@@ -46,56 +47,28 @@ class MessageService:
             app_model=app_model, user=user, conversation_id=conversation_id
         )
 
+        base_query = db.session.query(Message).filter(Message.conversation_id == conversation.id)
+        sort_columns = (Message.created_at, Message.id)
+
+        after = None
         if first_id:
-            first_message = (
-                db.session.query(Message)
-                .filter(Message.conversation_id == conversation.id, Message.id == first_id)
-                .first()
-            )
+            first_message = base_query.filter(Message.id == first_id).first()
 
             if not first_message:
                 raise FirstMessageNotExistsError()
 
-            history_messages = (
-                db.session.query(Message)
-                .filter(
-                    Message.conversation_id == conversation.id,
-                    Message.created_at < first_message.created_at,
-                    Message.id != first_message.id,
-                )
-                .order_by(Message.created_at.desc())
-                .limit(limit)
-                .all()
-            )
-        else:
-            history_messages = (
-                db.session.query(Message)
-                .filter(Message.conversation_id == conversation.id)
-                .order_by(Message.created_at.desc())
-                .limit(limit)
-                .all()
-            )
+            after = get_keyset(first_message, sort_columns)
 
-        has_more = False
-        if len(history_messages) == limit:
-            current_page_first_message = history_messages[-1]
-            rest_count = (
-                db.session.query(Message)
-                .filter(
-                    Message.conversation_id == conversation.id,
-                    Message.created_at < current_page_first_message.created_at,
-                    Message.id != current_page_first_message.id,
-                )
-                .count()
-            )
-
-            if rest_count > 0:
-                has_more = True
+        pagination = paginate_by_keyset(base_query, sort_columns, limit, after=after)
+        history_messages = pagination.data
 
         if order == "asc":
             history_messages = list(reversed(history_messages))
 
-        return InfiniteScrollPagination(data=history_messages, limit=limit, has_more=has_more)
+        prefetch_messages(history_messages, MESSAGE_LIST_RELATIONS)
+
+        pagination.data = history_messages
+        return pagination
 
     @classmethod
     def pagination_by_last_id(
@@ -122,32 +95,18 @@ class MessageService:
         if include_ids is not None:
             base_query = base_query.filter(Message.id.in_(include_ids))
 
+        sort_columns = (Message.created_at, Message.id)
+
+        after = None
         if last_id:
             last_message = base_query.filter(Message.id == last_id).first()
 
             if not last_message:
                 raise LastMessageNotExistsError()
 
-            history_messages = (
-                base_query.filter(Message.created_at < last_message.created_at, Message.id != last_message.id)
-                .order_by(Message.created_at.desc())
-                .limit(limit)
-                .all()
-            )
-        else:
-            history_messages = base_query.order_by(Message.created_at.desc()).limit(limit).all()
-
-        has_more = False
-        if len(history_messages) == limit:
-            current_page_first_message = history_messages[-1]
-            rest_count = base_query.filter(
-                Message.created_at < current_page_first_message.created_at, Message.id != current_page_first_message.id
-            ).count()
-
-            if rest_count > 0:
-                has_more = True
+            after = get_keyset(last_message, sort_columns)
 
-        return InfiniteScrollPagination(data=history_messages, limit=limit, has_more=has_more)
+        return paginate_by_keyset(base_query, sort_columns, limit, after=after)
 
     @classmethod
     def create_feedback(
@@ -0,0 +1,237 @@
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime
+from typing import Any
+
+from cachetools import TTLCache
+from redis.exceptions import ResponseError
+from sqlalchemy import bindparam, update
+
+from configs import dify_config
+from extensions.ext_database import db
+from extensions.ext_redis import redis_client
+from models.provider import Provider, ProviderType
+
+logger = logging.getLogger(__name__)
+
+LOCAL_CACHE_MAX_SIZE = 10000
+QUOTA_USED_KEY = "provider_quota_used_deltas"
+LAST_USED_KEY = "provider_last_used"
+FLUSHING_KEY_SUFFIX = ":flushing"
+FLUSH_LOCK_KEY = "provider_usage_flush_lock"
+
+
+class ProviderUsageService:
+    """
+    Accounting of the quota used on hosted providers and of the last time providers were used.
+
+    By default both are written to the provider records right away, which makes every message and LLM node
+    update one of a few hot rows. With PROVIDER_USAGE_WRITE_BEHIND_ENABLED, usage is accumulated in redis
+    and the flush task writes the aggregated deltas every PROVIDER_USAGE_FLUSH_INTERVAL seconds. Quota
+    configurations add the deltas not written yet, so exhausted quotas are still detected right away.
+
+    Deltas are renamed to a flushing key before they are written, so a flush interrupted before the commit
+    is completed by the next one. The flushing key is deleted right before the commit and its values are
+    restored if the commit fails, so deltas left in redis were never committed and are never written twice.
+    """
+
+    _lock = threading.Lock()
+    _recently_used: TTLCache = TTLCache(maxsize=LOCAL_CACHE_MAX_SIZE, ttl=dify_config.PROVIDER_USAGE_FLUSH_INTERVAL)
+
+    @classmethod
+    def deduct_quota(cls, tenant_id: str, provider_name: str, quota_type: str, used_quota: int) -> None:
+        """
+        Deduct quota of a hosted provider.
+
+        :param quota_type: current quota type of the system provider
+        :param used_quota: quota to deduct
+        """
+        if not dify_config.PROVIDER_USAGE_WRITE_BEHIND_ENABLED:
+            db.session.query(Provider).filter(
+                Provider.tenant_id == tenant_id,
+                Provider.provider_name == provider_name,
+                Provider.provider_type == ProviderType.SYSTEM.value,
+                Provider.quota_type == quota_type,
+                Provider.quota_limit > Provider.quota_used,
+            ).update({"quota_used": Provider.quota_used + used_quota})
+            db.session.commit()
+            return
+
+        redis_client.hincrby(QUOTA_USED_KEY, cls._get_quota_field(tenant_id, provider_name, quota_type), used_quota)
+
+    @classmethod
+    def update_last_used(cls, tenant_id: str, provider_name: str) -> None:
+        """
+        Record that the providers of a name were used, at most once per flush interval per process when
+        the usage is written behind.
+        """
+        if not dify_config.PROVIDER_USAGE_WRITE_BEHIND_ENABLED:
+            db.session.query(Provider).filter(
+                Provider.tenant_id == tenant_id,
+                Provider.provider_name == provider_name,
+            ).update({"last_used": datetime.now(UTC).replace(tzinfo=None)})
+            db.session.commit()
+            return
+
+        field = json.dumps([tenant_id, provider_name])
+        with cls._lock:
+            if field in cls._recently_used:
+                return
+            cls._recently_used[field] = True
+        redis_client.hset(LAST_USED_KEY, field, time.time())
+
+    @classmethod
+    def get_pending_quota_used(cls, tenant_id: str, quotas: Iterable[tuple[str, str]]) -> dict[tuple[str, str], int]:
+        """
+        Get the quota used and not written to the provider records yet.
+
+        :param quotas: provider names and quota types
+        :return: quota used by provider name and quota type, for the quotas with pending usage
+        """
+        quotas = list(quotas)
+        if not dify_config.PROVIDER_USAGE_WRITE_BEHIND_ENABLED or not quotas:
+            return {}
+
+        fields = [cls._get_quota_field(tenant_id, provider_name, quota_type) for provider_name, quota_type in quotas]
+        with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hmget(QUOTA_USED_KEY, fields)
+            pipe.hmget(QUOTA_USED_KEY + FLUSHING_KEY_SUFFIX, fields)
+            pending, flushing = pipe.execute()
+
+        result = {}
+        for quota, pending_used, flushing_used in zip(quotas, pending, flushing):
+            used = int(pending_used or 0) + int(flushing_used or 0)
+            if used:
+                result[quota] = used
+        return result
+
+    @classmethod
+    def flush(cls) -> tuple[int, int]:
+        """
+        Write the accumulated usage to the provider records.
+
+        :return: numbers of quota and last used updates
+        """
+        lock = redis_client.lock(FLUSH_LOCK_KEY, timeout=600)
+        if not lock.acquire(blocking=False):
+            return 0, 0
+        try:
+            return cls._flush_quota_used(), cls._flush_last_used()
+        finally:
+            lock.release()
+
+    @classmethod
+    def _flush_quota_used(cls) -> int:
+        deltas = cls._take(QUOTA_USED_KEY)
+        if deltas:
+            table = Provider.__table__
+            stmt = (
+                update(table)
+                .where(
+                    table.c.tenant_id == bindparam("p_tenant_id"),
+                    table.c.provider_name == bindparam("p_provider_name"),
+                    table.c.provider_type == ProviderType.SYSTEM.value,
+                    table.c.quota_type == bindparam("p_quota_type"),
+                    table.c.quota_limit > table.c.quota_used,
+                )
+                .values(quota_used=table.c.quota_used + bindparam("p_used_quota"))
+            )
+            params = []
+            for field, used_quota in deltas.items():
+                tenant_id, provider_name, quota_type = json.loads(field)
+                params.append(
+                    {
+                        "p_tenant_id": tenant_id,
+                        "p_provider_name": provider_name,
+                        "p_quota_type": quota_type,
+                        "p_used_quota": int(used_quota),
+                    }
+                )
+            db.session.execute(stmt, params)
+            cls._commit(
+                QUOTA_USED_KEY,
+                deltas,
+                restore=lambda pipe, field, used_quota: pipe.hincrby(QUOTA_USED_KEY, field, int(used_quota)),
+            )
+        return len(deltas)
+
+    @classmethod
+    def _flush_last_used(cls) -> int:
+        last_used_times = cls._take(LAST_USED_KEY)
+        if last_used_times:
+            table = Provider.__table__
+            stmt = (
+                update(table)
+                .where(
+                    table.c.tenant_id == bindparam("p_tenant_id"),
+                    table.c.provider_name == bindparam("p_provider_name"),
+                )
+                .values(last_used=bindparam("p_last_used"))
+            )
+            params = []
+            for field, last_used in last_used_times.items():
+                tenant_id, provider_name = json.loads(field)
+                params.append(
+                    {
+                        "p_tenant_id": tenant_id,
+                        "p_provider_name": provider_name,
+                        "p_last_used": datetime.fromtimestamp(float(last_used), UTC).replace(tzinfo=None),
+                    }
+                )
+            db.session.execute(stmt, params)
+            cls._commit(
+                LAST_USED_KEY,
+                last_used_times,
+                # times recorded since the flush started are more recent
+                restore=lambda pipe, field, last_used: pipe.hsetnx(LAST_USED_KEY, field, last_used),
+            )
+        return len(last_used_times)
+
+    @staticmethod
+    def _take(key: str) -> dict:
+        """
+        Move the accumulated values to the flushing key, unless values of an interrupted flush are left.
+        """
+        flushing_key = key + FLUSHING_KEY_SUFFIX
+        if not redis_client.exists(flushing_key):
+            try:
+                redis_client.rename(key, flushing_key)
+            except ResponseError:
+                # nothing accumulated
+                return {}
+        else:
+            logger.warning(f"Writing provider usage left by an interrupted flush, key: {flushing_key}")
+        return redis_client.hgetall(flushing_key)
+
+    @staticmethod
+    def _commit(key: str, values: dict, restore: Callable[[Any, bytes, bytes], Any]) -> None:
+        """
+        Delete the flushing key and commit the values written from it, restoring them if the commit fails.
+
+        A process dying between the two steps loses the values instead of writing them twice.
+
+        :param restore: adds a value back to the accumulated values in a pipeline
+        """
+        try:
+            redis_client.delete(key + FLUSHING_KEY_SUFFIX)
+        except Exception:
+            # the values are still in the flushing key, and are written by the next flush
+            db.session.rollback()
+            raise
+
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with redis_client.pipeline(transaction=False) as pipe:
+                for field, value in values.items():
+                    restore(pipe, field, value)
+                pipe.execute()
+            raise
+
+    @staticmethod
+    def _get_quota_field(tenant_id: str, provider_name: str, quota_type: str) -> str:
+        return json.dumps([tenant_id, provider_name, quota_type])
@@ -3,6 +3,7 @@ from typing import Optional, Union
 from extensions.ext_database import db
 from libs.infinite_scroll_pagination import InfiniteScrollPagination
 from models.account import Account
+from models.loaders import prefetch_messages
 from models.model import App, EndUser
 from models.web import SavedMessage
 from services.message_service import MessageService
@@ -25,9 +26,12 @@ class SavedMessageService:
         )
         message_ids = [sm.message_id for sm in saved_messages]
 
-        return MessageService.pagination_by_last_id(
+        pagination = MessageService.pagination_by_last_id(
             app_model=app_model, user=user, last_id=last_id, limit=limit, include_ids=message_ids
         )
+        prefetch_messages(pagination.data, ["user_feedback", "message_files"])
+
+        return pagination
 
     @classmethod
     def save(cls, app_model: App, user: Optional[Union[Account, EndUser]], message_id: str):
@@ -1,11 +1,12 @@
 from extensions.ext_database import db
-from libs.infinite_scroll_pagination import InfiniteScrollPagination
+from libs.infinite_scroll_pagination import InfiniteScrollPagination, get_keyset, paginate_by_keyset
 from models.enums import WorkflowRunTriggeredFrom
 from models.model import App
 from models.workflow import (
     WorkflowNodeExecution,
     WorkflowNodeExecutionTriggeredFrom,
     WorkflowRun,
+    load_payloads,
 )
 
 
@@ -60,6 +61,9 @@ class WorkflowRunService:
             WorkflowRun.triggered_from == WorkflowRunTriggeredFrom.DEBUGGING.value,
         )
 
+        sort_columns = (WorkflowRun.created_at, WorkflowRun.id)
+
+        after = None
         if args.get("last_id"):
             last_workflow_run = base_query.filter(
                 WorkflowRun.id == args.get("last_id"),
@@ -68,29 +72,9 @@ class WorkflowRunService:
             if not last_workflow_run:
                 raise ValueError("Last workflow run not exists")
 
-            workflow_runs = (
-                base_query.filter(
-                    WorkflowRun.created_at < last_workflow_run.created_at, WorkflowRun.id != last_workflow_run.id
-                )
-                .order_by(WorkflowRun.created_at.desc())
-                .limit(limit)
-                .all()
-            )
-        else:
-            workflow_runs = base_query.order_by(WorkflowRun.created_at.desc()).limit(limit).all()
-
-        has_more = False
-        if len(workflow_runs) == limit:
-            current_page_first_workflow_run = workflow_runs[-1]
-            rest_count = base_query.filter(
-                WorkflowRun.created_at < current_page_first_workflow_run.created_at,
-                WorkflowRun.id != current_page_first_workflow_run.id,
-            ).count()
-
-            if rest_count > 0:
-                has_more = True
+            after = get_keyset(last_workflow_run, sort_columns)
 
-        return InfiniteScrollPagination(data=workflow_runs, limit=limit, has_more=has_more)
+        return paginate_by_keyset(base_query, sort_columns, limit, after=after)
 
     def get_workflow_run(self, app_model: App, run_id: str) -> WorkflowRun:
         """
@@ -132,5 +116,7 @@ class WorkflowRunService:
             .order_by(WorkflowNodeExecution.index.desc())
             .all()
         )
+        # the list response has the payloads of every node execution
+        load_payloads(node_executions, ("inputs", "process_data", "outputs"))
 
         return node_executions
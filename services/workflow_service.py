@@ -28,6 +28,7 @@ from models.workflow import (
     WorkflowNodeExecutionStatus,
     WorkflowNodeExecutionTriggeredFrom,
     WorkflowType,
+    set_payload,
 )
 from services.errors.app import WorkflowHashNotEqualError
 from services.workflow.workflow_converter import WorkflowConverter
@@ -300,9 +301,9 @@ class WorkflowService:
             )
             outputs = WorkflowEntry.handle_special_values(node_run_result.outputs) if node_run_result.outputs else None
 
-            workflow_node_execution.inputs = json.dumps(inputs)
-            workflow_node_execution.process_data = json.dumps(process_data)
-            workflow_node_execution.outputs = json.dumps(outputs)
+            set_payload(workflow_node_execution, "inputs", json.dumps(inputs))
+            set_payload(workflow_node_execution, "process_data", json.dumps(process_data))
+            set_payload(workflow_node_execution, "outputs", json.dumps(outputs))
             workflow_node_execution.execution_metadata = (
                 json.dumps(jsonable_encoder(node_run_result.metadata)) if node_run_result.metadata else None
             )
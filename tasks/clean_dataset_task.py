@@ -4,8 +4,9 @@ import time
 import click
 from celery import shared_task
 
+from core.rag.extractor.pdf_extractor import PdfExtractor
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
-from core.tools.utils.web_reader_tool import get_image_upload_file_ids
+from core.tools.utils.web_reader_tool import delete_image_upload_files, get_image_upload_file_ids
 from extensions.ext_database import db
 from extensions.ext_storage import storage
 from models.dataset import (
@@ -67,19 +68,11 @@ def clean_dataset_task(
             for document in documents:
                 db.session.delete(document)
 
+            image_upload_file_ids = []
             for segment in segments:
-                image_upload_file_ids = get_image_upload_file_ids(segment.content)
-                for upload_file_id in image_upload_file_ids:
-                    image_file = db.session.query(UploadFile).filter(UploadFile.id == upload_file_id).first()
-                    try:
-                        storage.delete(image_file.key)
-                    except Exception:
-                        logging.exception(
-                            "Delete image_files failed when storage deleted, \
-                                          image_upload_file_is: {}".format(upload_file_id)
-                        )
-                    db.session.delete(image_file)
+                image_upload_file_ids.extend(get_image_upload_file_ids(segment.content))
                 db.session.delete(segment)
+            delete_image_upload_files(image_upload_file_ids)
 
         db.session.query(DatasetProcessRule).filter(DatasetProcessRule.dataset_id == dataset_id).delete()
         db.session.query(DatasetQuery).filter(DatasetQuery.dataset_id == dataset_id).delete()
@@ -87,24 +80,30 @@ def clean_dataset_task(
 
         # delete files
         if documents:
+            file_ids = []
             for document in documents:
                 try:
                     if document.data_source_type == "upload_file":
                         if document.data_source_info:
                             data_source_info = document.data_source_info_dict
                             if data_source_info and "upload_file_id" in data_source_info:
-                                file_id = data_source_info["upload_file_id"]
-                                file = (
-                                    db.session.query(UploadFile)
-                                    .filter(UploadFile.tenant_id == document.tenant_id, UploadFile.id == file_id)
-                                    .first()
-                                )
-                                if not file:
-                                    continue
-                                storage.delete(file.key)
-                                db.session.delete(file)
+                                file_ids.append(data_source_info["upload_file_id"])
                 except Exception:
                     continue
+            files = (
+                db.session.query(UploadFile)
+                .filter(UploadFile.tenant_id == dataset.tenant_id, UploadFile.id.in_(file_ids))
+                .all()
+                if file_ids
+                else []
+            )
+            try:
+                storage.delete_many([file.key for file in files])
+                for file in files:
+                    db.session.delete(file)
+            except Exception:
+                logging.exception("Delete files failed when dataset deleted, dataset_id: {}".format(dataset_id))
+            PdfExtractor.delete_plaintext_caches([file.id for file in files if file.extension == "pdf"])
 
         db.session.commit()
         end_at = time.perf_counter()
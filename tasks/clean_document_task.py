@@ -5,8 +5,9 @@ from typing import Optional
 import click
 from celery import shared_task
 
+from core.rag.extractor.pdf_extractor import PdfExtractor
 from core.rag.index_processor.index_processor_factory import IndexProcessorFactory
-from core.tools.utils.web_reader_tool import get_image_upload_file_ids
+from core.tools.utils.web_reader_tool import delete_image_upload_files, get_image_upload_file_ids
 from extensions.ext_database import db
 from extensions.ext_storage import storage
 from models.dataset import Dataset, DocumentSegment
@@ -40,19 +41,11 @@ def clean_document_task(document_id: str, dataset_id: str, doc_form: str, file_i
             index_processor = IndexProcessorFactory(doc_form).init_index_processor()
             index_processor.clean(dataset, index_node_ids)
 
+            image_upload_file_ids = []
             for segment in segments:
-                image_upload_file_ids = get_image_upload_file_ids(segment.content)
-                for upload_file_id in image_upload_file_ids:
-                    image_file = db.session.query(UploadFile).filter(UploadFile.id == upload_file_id).first()
-                    try:
-                        storage.delete(image_file.key)
-                    except Exception:
-                        logging.exception(
-                            "Delete image_files failed when storage deleted, \
-                                          image_upload_file_is: {}".format(upload_file_id)
-                        )
-                    db.session.delete(image_file)
+                image_upload_file_ids.extend(get_image_upload_file_ids(segment.content))
                 db.session.delete(segment)
+            delete_image_upload_files(image_upload_file_ids)
 
             db.session.commit()
         if file_id:
@@ -62,6 +55,8 @@ def clean_document_task(document_id: str, dataset_id: str, doc_form: str, file_i
                     storage.delete(file.key)
                 except Exception:
                     logging.exception("Delete file failed when document deleted, file_id: {}".format(file_id))
+                if file.extension == "pdf":
+                    PdfExtractor.delete_plaintext_caches([file.id])
                 db.session.delete(file)
                 db.session.commit()
 
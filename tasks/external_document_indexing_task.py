@@ -56,14 +56,19 @@ def external_document_indexing_task(
     files = {}
     if data_source["type"] == "upload_file":
         upload_file_list = data_source["info_list"]["file_info_list"]["file_ids"]
+        upload_files = (
+            db.session.query(UploadFile)
+            .filter(UploadFile.tenant_id == dataset.tenant_id, UploadFile.id.in_(upload_file_list))
+            .all()
+            if upload_file_list
+            else []
+        )
+        contents = storage.load_many([file.key for file in upload_files])
+        upload_files_by_id = {file.id: file for file in upload_files}
         for file_id in upload_file_list:
-            file = (
-                db.session.query(UploadFile)
-                .filter(UploadFile.tenant_id == dataset.tenant_id, UploadFile.id == file_id)
-                .first()
-            )
+            file = upload_files_by_id.get(file_id)
             if file:
-                files[file.id] = (file.name, storage.load_once(file.key), file.mime_type)
+                files[file.id] = (file.name, contents[file.key], file.mime_type)
     try:
         settings = ExternalDatasetService.get_external_knowledge_api_settings(
             json.loads(external_knowledge_api.settings)
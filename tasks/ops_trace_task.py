@@ -1,11 +1,12 @@
 import json
 import logging
+import time
 
 from celery import shared_task
 from flask import current_app
 
 from core.ops.entities.config_entity import OPS_FILE_PATH, OPS_TRACE_FAILED_KEY
-from core.ops.entities.trace_entity import trace_info_info_map
+from core.ops.entities.trace_entity import TaskBatchData, trace_info_info_map
 from core.rag.models.document import Document
 from extensions.ext_redis import redis_client
 from extensions.ext_storage import storage
@@ -13,13 +14,27 @@ from models.model import Message
 from models.workflow import WorkflowRun
 
 
+def _load_trace_info(trace_info_type: str, trace_info: dict):
+    if trace_info.get("message_data"):
+        trace_info["message_data"] = Message.from_dict(data=trace_info["message_data"])
+    if trace_info.get("workflow_data"):
+        trace_info["workflow_data"] = WorkflowRun.from_dict(data=trace_info["workflow_data"])
+    if trace_info.get("documents"):
+        trace_info["documents"] = [Document(**doc) for doc in trace_info["documents"]]
+
+    trace_type = trace_info_info_map.get(trace_info_type)
+    if trace_type:
+        return trace_type(**trace_info)
+    return trace_info
+
+
 @shared_task(queue="ops_trace")
 def process_trace_tasks(file_info):
     """
-    Async process trace tasks
-    :param tasks_data: List of dictionaries containing task data
+    Async process a trace task stored in a file, kept for the tasks enqueued before trace batches
+    :param file_info: app_id and file_id of the stored task
 
-    Usage: process_trace_tasks.delay(tasks_data)
+    Usage: process_trace_tasks.delay(file_info)
     """
     from core.ops.ops_trace_manager import OpsTraceManager
 
@@ -31,20 +46,11 @@ def process_trace_tasks(file_info):
     trace_info_type = file_data.get("trace_info_type")
     trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
 
-    if trace_info.get("message_data"):
-        trace_info["message_data"] = Message.from_dict(data=trace_info["message_data"])
-    if trace_info.get("workflow_data"):
-        trace_info["workflow_data"] = WorkflowRun.from_dict(data=trace_info["workflow_data"])
-    if trace_info.get("documents"):
-        trace_info["documents"] = [Document(**doc) for doc in trace_info["documents"]]
-
     try:
         if trace_instance:
             with current_app.app_context():
-                trace_type = trace_info_info_map.get(trace_info_type)
-                if trace_type:
-                    trace_info = trace_type(**trace_info)
-                trace_instance.trace(trace_info)
+                trace_instance.trace(_load_trace_info(trace_info_type, trace_info))
+                trace_instance.flush()
         logging.info(f"Processing trace tasks success, app_id: {app_id}")
     except Exception:
         failed_key = f"{OPS_TRACE_FAILED_KEY}_{app_id}"
@@ -52,3 +58,54 @@ def process_trace_tasks(file_info):
         logging.info(f"Processing trace tasks failed, app_id: {app_id}")
     finally:
         storage.delete(file_path)
+
+
+@shared_task(queue="ops_trace")
+def process_trace_batch(batch_info):
+    """
+    Async process a batch of trace tasks of an app with one trace client
+    :param batch_info: app_id, redis key of the batch and the time it was created
+
+    Usage: process_trace_batch.delay(batch_info)
+    """
+    from core.ops.ops_trace_manager import OpsTraceManager
+
+    app_id = batch_info.get("app_id")
+    batch_key = batch_info.get("batch_key")
+    start_at = time.perf_counter()
+    lag = time.time() - batch_info.get("created_at", time.time())
+
+    with redis_client.pipeline() as pipe:
+        pipe.get(batch_key)
+        pipe.delete(batch_key)
+        batch_data, _ = pipe.execute()
+    if not batch_data:
+        logging.warning(f"Trace batch {batch_key} not found, it may have expired, app_id: {app_id}")
+        return
+
+    tasks = TaskBatchData.model_validate_json(batch_data).tasks
+    failed = 0
+    trace_instance = OpsTraceManager.get_ops_trace_instance(app_id)
+    if trace_instance:
+        with current_app.app_context():
+            for task_data in tasks:
+                try:
+                    trace_instance.trace(_load_trace_info(task_data.trace_info_type, task_data.trace_info))
+                except Exception:
+                    logging.exception(f"Processing trace task failed, app_id: {app_id}")
+                    failed += 1
+            try:
+                trace_instance.flush()
+            except Exception:
+                # the traces still buffered by the client are lost
+                logging.exception(f"Flushing traces failed, app_id: {app_id}")
+                failed = len(tasks)
+
+    if failed:
+        redis_client.incrby(f"{OPS_TRACE_FAILED_KEY}_{app_id}", failed)
+
+    elapsed = time.perf_counter() - start_at
+    logging.info(
+        f"Processed trace batch of {len(tasks)} tasks, {failed} failed, in {elapsed:.3f}s "
+        f"({len(tasks) / elapsed if elapsed else 0:.1f} tasks/s), lag {lag:.3f}s, app_id: {app_id}"
+    )
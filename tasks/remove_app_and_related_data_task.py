@@ -4,9 +4,10 @@ from collections.abc import Callable
 
 import click
 from celery import shared_task
-from sqlalchemy import delete
+from sqlalchemy import delete, or_
 from sqlalchemy.exc import SQLAlchemyError
 
+from core.helper import workflow_payload_storage
 from extensions.ext_database import db
 from models.dataset import AppDatasetJoin
 from models.model import (
@@ -31,6 +32,7 @@ from models.model import (
 from models.tools import WorkflowToolProvider
 from models.web import PinnedConversation, SavedMessage
 from models.workflow import ConversationVariable, Workflow, WorkflowAppLog, WorkflowNodeExecution, WorkflowRun
+from services.api_token_service import ApiTokenService
 
 
 @shared_task(queue="app_deletion", bind=True, max_retries=3)
@@ -47,6 +49,7 @@ def remove_app_and_related_data_task(self, tenant_id: str, app_id: str):
         _delete_app_annotation_data(tenant_id, app_id)
         _delete_app_dataset_joins(tenant_id, app_id)
         _delete_app_workflows(tenant_id, app_id)
+        _delete_app_offloaded_workflow_payloads(tenant_id, app_id)
         _delete_app_workflow_runs(tenant_id, app_id)
         _delete_app_workflow_node_executions(tenant_id, app_id)
         _delete_app_workflow_app_logs(tenant_id, app_id)
@@ -91,7 +94,10 @@ def _delete_app_site(tenant_id: str, app_id: str):
 
 def _delete_app_api_tokens(tenant_id: str, app_id: str):
     def del_api_token(api_token_id: str):
-        db.session.query(ApiToken).filter(ApiToken.id == api_token_id).delete(synchronize_session=False)
+        api_token = db.session.query(ApiToken).filter(ApiToken.id == api_token_id).first()
+        if api_token:
+            db.session.delete(api_token)
+            ApiTokenService.delete_cache(api_token.type, api_token.token)
 
     _delete_records(
         """select id from api_tokens where app_id=:app_id limit 1000""", {"app_id": app_id}, del_api_token, "api token"
@@ -174,6 +180,39 @@ def _delete_app_workflows(tenant_id: str, app_id: str):
     )
 
 
+def _delete_app_offloaded_workflow_payloads(tenant_id: str, app_id: str):
+    """
+    Delete the workflow run and node execution payloads offloaded to the storage, a page of rows per bulk call,
+    before the rows referencing them are deleted.
+    """
+    reference_prefix = workflow_payload_storage.REFERENCE_PREFIX
+    payload_queries = [
+        (
+            WorkflowRun.id,
+            [WorkflowRun.outputs],
+            [WorkflowRun.tenant_id == tenant_id, WorkflowRun.app_id == app_id],
+        ),
+        (
+            WorkflowNodeExecution.id,
+            [WorkflowNodeExecution.inputs, WorkflowNodeExecution.process_data, WorkflowNodeExecution.outputs],
+            [WorkflowNodeExecution.tenant_id == tenant_id, WorkflowNodeExecution.app_id == app_id],
+        ),
+    ]
+    for id_column, payload_columns, filters in payload_queries:
+        last_id = None
+        while True:
+            query = db.session.query(id_column, *payload_columns).filter(
+                *filters, or_(*[column.startswith(reference_prefix, autoescape=True) for column in payload_columns])
+            )
+            if last_id is not None:
+                query = query.filter(id_column > last_id)
+            rows = query.order_by(id_column).limit(1000).all()
+            if not rows:
+                break
+            workflow_payload_storage.delete(*[payload for row in rows for payload in row[1:]])
+            last_id = rows[-1][0]
+
+
 def _delete_app_workflow_runs(tenant_id: str, app_id: str):
     def del_workflow_run(workflow_run_id: str):
         db.session.query(WorkflowRun).filter(WorkflowRun.id == workflow_run_id).delete(synchronize_session=False)
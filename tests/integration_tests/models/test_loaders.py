@@ -0,0 +1,286 @@
+"""
+Query count regression tests of the message and conversation list APIs, against the database
+configured by DB_HOST / DB_PORT / DB_USERNAME / DB_PASSWORD / DB_DATABASE.
+
+The number of queries run to build and marshal a page must not grow with the page size.
+"""
+
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+import sqlalchemy as sa
+from flask_restful import marshal
+from sqlalchemy.exc import OperationalError
+
+from app_factory import create_app
+from controllers.console.app.message import ChatMessageListApi
+from extensions.ext_database import db
+from fields.conversation_fields import conversation_fields, conversation_with_summary_fields
+from fields.message_fields import message_fields
+from models.account import Account
+from models.loaders import (
+    CONVERSATION_LIST_RELATIONS,
+    CONVERSATION_WITH_SUMMARY_LIST_RELATIONS,
+    MESSAGE_DETAIL_LIST_RELATIONS,
+    prefetch_conversations,
+    prefetch_messages,
+)
+from models.model import (
+    App,
+    AppAnnotationHitHistory,
+    Conversation,
+    DatasetRetrieverResource,
+    EndUser,
+    Message,
+    MessageAgentThought,
+    MessageAnnotation,
+    MessageFeedback,
+)
+from services.message_service import MessageService
+
+PAGE_SIZES = (5, 20)
+CREATED_AT = datetime(2024, 1, 1)
+message_detail_fields = ChatMessageListApi.message_infinite_scroll_pagination_fields["data"].container.nested
+
+
+@pytest.fixture(scope="module")
+def flask_app():
+    app = create_app()
+    with app.app_context():
+        try:
+            db.session.execute(sa.text("SELECT 1"))
+        except OperationalError:
+            pytest.skip("Database is not available")
+        yield app
+
+
+@pytest.fixture(scope="module")
+def app_data(flask_app):
+    app_model = App(tenant_id=str(uuid.uuid4()), name="loader test", mode="chat", enable_site=True, enable_api=True)
+    account = Account(name="annotator", email=f"{uuid.uuid4()}@example.com")
+    db.session.add_all([app_model, account])
+    db.session.flush()
+    end_user = EndUser(tenant_id=app_model.tenant_id, app_id=app_model.id, type="service_api", session_id="session")
+    db.session.add(end_user)
+    db.session.flush()
+
+    conversations = []
+    for conversation_index in range(max(PAGE_SIZES)):
+        conversation = Conversation(
+            app_id=app_model.id,
+            mode="chat",
+            name=f"conversation {conversation_index}",
+            status="normal",
+            from_source="api",
+            from_end_user_id=end_user.id,
+            inputs={},
+            created_at=CREATED_AT + timedelta(minutes=conversation_index),
+        )
+        db.session.add(conversation)
+        db.session.flush()
+        conversations.append(conversation)
+        message_count = max(PAGE_SIZES) if conversation_index == 0 else 2
+        for message_index in range(message_count):
+            _add_message(app_model, conversation, end_user, account, message_index)
+
+    db.session.commit()
+    app_id, end_user_id, account_id = app_model.id, end_user.id, account.id
+    conversation_ids = [conversation.id for conversation in conversations]
+    yield app_id, end_user_id, conversation_ids[0]
+
+    db.session.rollback()
+    message_ids = [message_id for (message_id,) in db.session.query(Message.id).filter(Message.app_id == app_id).all()]
+    for model in (MessageFeedback, MessageAgentThought, DatasetRetrieverResource):
+        db.session.query(model).filter(model.message_id.in_(message_ids)).delete(synchronize_session=False)
+    db.session.query(AppAnnotationHitHistory).filter(AppAnnotationHitHistory.app_id == app_id).delete()
+    db.session.query(MessageAnnotation).filter(MessageAnnotation.app_id == app_id).delete()
+    db.session.query(Message).filter(Message.app_id == app_id).delete()
+    db.session.query(Conversation).filter(Conversation.id.in_(conversation_ids)).delete(synchronize_session=False)
+    db.session.query(EndUser).filter(EndUser.id == end_user_id).delete()
+    db.session.query(Account).filter(Account.id == account_id).delete()
+    db.session.query(App).filter(App.id == app_id).delete()
+    db.session.commit()
+
+
+def _add_message(app_model: App, conversation: Conversation, end_user: EndUser, account: Account, index: int):
+    message = Message(
+        app_id=app_model.id,
+        conversation_id=conversation.id,
+        inputs={},
+        query=f"question {index}",
+        message=[{"role": "user", "text": f"question {index}"}],
+        network_message=[],
+        message_unit_price=0,
+        answer=f"answer {index}",
+        answer_unit_price=0,
+        currency="USD",
+        from_source="api",
+        from_end_user_id=end_user.id,
+        # rows added in one transaction would otherwise share the created_at default
+        created_at=CREATED_AT + timedelta(seconds=index),
+    )
+    db.session.add(message)
+    db.session.flush()
+
+    for from_source, rating in (("user", "like"), ("admin", "dislike")):
+        db.session.add(
+            MessageFeedback(
+                app_id=app_model.id,
+                conversation_id=conversation.id,
+                message_id=message.id,
+                rating=rating,
+                content=f"{from_source} feedback {index}",
+                from_source=from_source,
+                from_end_user_id=end_user.id if from_source == "user" else None,
+                from_account_id=account.id if from_source == "admin" else None,
+            )
+        )
+    db.session.add(
+        MessageAgentThought(
+            message_id=message.id,
+            position=1,
+            thought=f"thought {index}",
+            tool="search",
+            tool_input="{}",
+            observation="{}",
+            created_by_role="end_user",
+            created_by=end_user.id,
+        )
+    )
+    db.session.add(
+        DatasetRetrieverResource(
+            message_id=message.id,
+            position=1,
+            dataset_id=str(uuid.uuid4()),
+            dataset_name="dataset",
+            document_id=str(uuid.uuid4()),
+            document_name="document",
+            data_source_type="upload_file",
+            segment_id=str(uuid.uuid4()),
+            content="content",
+            retriever_from="api",
+            created_by=end_user.id,
+        )
+    )
+    annotation = MessageAnnotation(
+        app_id=app_model.id,
+        conversation_id=conversation.id,
+        message_id=message.id,
+        question=f"question {index}",
+        content=f"annotated answer {index}",
+        account_id=account.id,
+    )
+    db.session.add(annotation)
+    db.session.flush()
+    db.session.add(
+        AppAnnotationHitHistory(
+            app_id=app_model.id,
+            annotation_id=annotation.id,
+            source="api",
+            question=f"question {index}",
+            account_id=account.id,
+            message_id=message.id,
+            annotation_question=annotation.question,
+            annotation_content=annotation.content,
+        )
+    )
+
+
+@contextmanager
+def _count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sa.event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        sa.event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _fresh_session():
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def test_message_list_query_count(app_data):
+    app_id, end_user_id, conversation_id = app_data
+
+    query_counts = []
+    for page_size in PAGE_SIZES:
+        _fresh_session()
+        app_model = db.session.get(App, app_id)
+        end_user = db.session.get(EndUser, end_user_id)
+        with _count_queries() as statements:
+            pagination = MessageService.pagination_by_first_id(app_model, end_user, conversation_id, None, page_size)
+            result = marshal(pagination.data, message_fields)
+        query_counts.append(len(statements))
+        assert len(result) == page_size
+
+    assert query_counts[0] == query_counts[1]
+    assert result[0]["feedback"] == {"rating": "like"}
+    assert [thought["thought"] for thought in result[0]["agent_thoughts"]] == ["thought 0"]
+    assert len(result[0]["retriever_resources"]) == 1
+
+
+def test_message_detail_list_query_count(app_data):
+    _, _, conversation_id = app_data
+
+    query_counts = []
+    for page_size in PAGE_SIZES:
+        _fresh_session()
+        with _count_queries() as statements:
+            messages = (
+                db.session.query(Message)
+                .filter(Message.conversation_id == conversation_id)
+                .order_by(Message.created_at.desc())
+                .limit(page_size)
+                .all()
+            )
+            prefetch_messages(messages, MESSAGE_DETAIL_LIST_RELATIONS)
+            result = marshal(messages, message_detail_fields)
+        query_counts.append(len(statements))
+
+    assert query_counts[0] == query_counts[1]
+
+    _fresh_session()
+    messages = db.session.query(Message).filter(Message.id.in_([item["id"] for item in result])).all()
+    expected = {message.id: marshal(message, message_detail_fields) for message in messages}
+    assert {item["id"]: item for item in result} == expected
+
+
+@pytest.mark.parametrize(
+    ("fields", "relations"),
+    [
+        (conversation_fields, CONVERSATION_LIST_RELATIONS),
+        (conversation_with_summary_fields, CONVERSATION_WITH_SUMMARY_LIST_RELATIONS),
+    ],
+)
+def test_conversation_list_query_count(app_data, fields, relations):
+    app_id, _, _ = app_data
+
+    query_counts = []
+    for page_size in PAGE_SIZES:
+        _fresh_session()
+        with _count_queries() as statements:
+            conversations = (
+                db.session.query(Conversation)
+                .filter(Conversation.app_id == app_id)
+                .order_by(Conversation.created_at.desc())
+                .limit(page_size)
+                .all()
+            )
+            prefetch_conversations(conversations, relations)
+            result = marshal(conversations, fields)
+        query_counts.append(len(statements))
+
+    assert query_counts[0] == query_counts[1]
+
+    _fresh_session()
+    conversations = db.session.query(Conversation).filter(Conversation.id.in_([item["id"] for item in result])).all()
+    expected = {conversation.id: marshal(conversation, fields) for conversation in conversations}
+    assert {item["id"]: item for item in result} == expected
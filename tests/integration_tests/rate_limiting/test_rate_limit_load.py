@@ -0,0 +1,119 @@
+"""
+Load test of RateLimit against a real Redis, configured by REDIS_HOST / REDIS_PORT / REDIS_PASSWORD / REDIS_DB.
+
+Many threads enter and exit concurrently, and the test checks that the number of requests
+inside the limit never exceeds max_active_requests. Throughput is printed, run with `-s` to see it.
+"""
+
+import threading
+import time
+import uuid
+
+import pytest
+import redis
+
+from configs import dify_config
+from core.app.features.rate_limiting import RateLimit
+from core.errors.error import AppInvokeQuotaExceededError
+from extensions.ext_redis import redis_client
+
+THREAD_COUNT = 32
+REQUESTS_PER_THREAD = 200
+
+
+@pytest.fixture(autouse=True)
+def _init_redis_client():
+    client = redis.Redis(
+        host=dify_config.REDIS_HOST,
+        port=dify_config.REDIS_PORT,
+        password=dify_config.REDIS_PASSWORD,
+        db=dify_config.REDIS_DB,
+    )
+    try:
+        client.ping()
+    except redis.ConnectionError:
+        pytest.skip("Redis is not available")
+    redis_client.initialize(client)
+    yield
+    RateLimit._instance_dict.clear()
+
+
+def _run_load(rate_limit: RateLimit, max_active_requests: int) -> dict[str, float]:
+    lock = threading.Lock()
+    stats = {"active": 0, "peak": 0, "accepted": 0, "rejected": 0}
+
+    def worker():
+        for _ in range(REQUESTS_PER_THREAD):
+            try:
+                request_id = rate_limit.enter(RateLimit.gen_request_key())
+            except AppInvokeQuotaExceededError:
+                with lock:
+                    stats["rejected"] += 1
+                continue
+            with lock:
+                stats["active"] += 1
+                stats["accepted"] += 1
+                stats["peak"] = max(stats["peak"], stats["active"])
+            time.sleep(0.001)
+            with lock:
+                stats["active"] -= 1
+            rate_limit.exit(request_id)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREAD_COUNT)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = THREAD_COUNT * REQUESTS_PER_THREAD
+    print(
+        f"max_active_requests={max_active_requests} requests={total} elapsed={elapsed:.2f}s "
+        f"throughput={total / elapsed:.0f}/s accepted={stats['accepted']} rejected={stats['rejected']} "
+        f"peak={stats['peak']}"
+    )
+    return stats
+
+
+def test_concurrency_never_exceeds_limit():
+    max_active_requests = 8
+    rate_limit = RateLimit(f"load-test-{uuid.uuid4()}", max_active_requests)
+
+    stats = _run_load(rate_limit, max_active_requests)
+
+    assert stats["peak"] <= max_active_requests
+    assert stats["accepted"] > 0
+    assert redis_client.zcard(rate_limit.active_requests_key) == 0
+
+
+def test_local_token_cache_never_exceeds_limit(monkeypatch):
+    monkeypatch.setattr(dify_config, "APP_RATE_LIMIT_LOCAL_TOKEN_THRESHOLD", 16)
+    monkeypatch.setattr(dify_config, "APP_RATE_LIMIT_LOCAL_TOKEN_BATCH_SIZE", 4)
+    max_active_requests = 16
+    rate_limit = RateLimit(f"load-test-{uuid.uuid4()}", max_active_requests)
+
+    stats = _run_load(rate_limit, max_active_requests)
+
+    assert stats["peak"] <= max_active_requests
+    assert stats["accepted"] > 0
+    # only the idle slots kept by this process remain reserved
+    assert redis_client.zcard(rate_limit.active_requests_key) <= dify_config.APP_RATE_LIMIT_LOCAL_TOKEN_BATCH_SIZE
+
+
+def test_repeated_exit_keeps_local_tokens_counted(monkeypatch):
+    monkeypatch.setattr(dify_config, "APP_RATE_LIMIT_LOCAL_TOKEN_THRESHOLD", 4)
+    monkeypatch.setattr(dify_config, "APP_RATE_LIMIT_LOCAL_TOKEN_BATCH_SIZE", 2)
+    rate_limit = RateLimit(f"load-test-{uuid.uuid4()}", 4)
+
+    request_id = rate_limit.enter()
+    rate_limit.exit(request_id)
+    # the slot may already be handed out again when a failed request exits twice
+    other_request_id = rate_limit.enter()
+    rate_limit.exit(request_id)
+
+    reserved = redis_client.zcard(rate_limit.active_requests_key)
+    assert reserved == len(rate_limit._local_free_tokens) + len(rate_limit._local_leased_tokens) == 2
+
+    rate_limit.exit(other_request_id)
+    assert redis_client.zcard(rate_limit.active_requests_key) == len(rate_limit._local_free_tokens) == 2
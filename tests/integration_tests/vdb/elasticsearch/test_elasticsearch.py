@@ -15,6 +15,14 @@ class ElasticSearchVectorTest(AbstractVectorTest):
             attributes=self.attributes,
         )
 
+    def texts_exist_without_index(self):
+        # ids are checked before the first texts are added to a new index
+        assert self.vector.texts_exist([self.example_doc_id]) == set()
+
+    def run_all_tests(self):
+        self.texts_exist_without_index()
+        super().run_all_tests()
+
 
 def test_elasticsearch_vector(setup_mock_redis):
     ElasticSearchVectorTest().run_all_tests()
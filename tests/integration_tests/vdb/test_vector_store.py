@@ -80,6 +80,10 @@ class AbstractVectorTest:
     def text_exists(self):
         assert self.vector.text_exists(self.example_doc_id)
 
+    def texts_exist(self):
+        missing_doc_id = str(uuid.uuid4())
+        assert self.vector.texts_exist([self.example_doc_id, missing_doc_id]) == {self.example_doc_id}
+
     def get_ids_by_metadata_field(self):
         with pytest.raises(NotImplementedError):
             self.vector.get_ids_by_metadata_field(key="key", value="value")
@@ -89,6 +93,7 @@ class AbstractVectorTest:
         self.search_by_vector()
         self.search_by_full_text()
         self.text_exists()
+        self.texts_exist()
         self.get_ids_by_metadata_field()
         added_doc_ids = self.add_texts()
         self.delete_by_ids(added_doc_ids)
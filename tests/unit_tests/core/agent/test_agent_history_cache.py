@@ -0,0 +1,67 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from configs import dify_config
+from core.agent.agent_history_cache import AgentHistoryCache
+from core.model_runtime.entities import AssistantPromptMessage, ToolPromptMessage
+
+
+@pytest.fixture
+def fake_redis():
+    data = {}
+    with patch("core.agent.agent_history_cache.redis_client", new=MagicMock()) as redis_client:
+        redis_client.get.side_effect = data.get
+        redis_client.setex.side_effect = lambda key, ttl, value: data.__setitem__(key, value.encode())
+        redis_client.delete.side_effect = lambda key: data.pop(key, None)
+        yield data
+
+
+def test_cache_round_trip(fake_redis):
+    history = {
+        "message-1": [
+            AssistantPromptMessage(
+                content="let me search",
+                tool_calls=[
+                    AssistantPromptMessage.ToolCall(
+                        id="call-1",
+                        type="function",
+                        function=AssistantPromptMessage.ToolCall.ToolCallFunction(name="search", arguments="{}"),
+                    )
+                ],
+            ),
+            ToolPromptMessage(content="result", name="search", tool_call_id="call-1"),
+        ],
+        "message-2": [AssistantPromptMessage(content="answer")],
+    }
+
+    AgentHistoryCache("conversation").set(history)
+
+    assert AgentHistoryCache("conversation").get() == history
+    assert AgentHistoryCache("another-conversation").get() == {}
+
+
+def test_delete(fake_redis):
+    AgentHistoryCache("conversation").set({"message-1": [AssistantPromptMessage(content="answer")]})
+    AgentHistoryCache("another-conversation").set({"message-2": [AssistantPromptMessage(content="answer")]})
+
+    AgentHistoryCache("conversation").delete()
+
+    assert AgentHistoryCache("conversation").get() == {}
+    assert AgentHistoryCache("another-conversation").get() != {}
+
+
+def test_cache_disabled(fake_redis, monkeypatch):
+    monkeypatch.setattr(dify_config, "AGENT_HISTORY_CACHE_TTL", 0)
+
+    AgentHistoryCache("conversation").set({"message-1": [AssistantPromptMessage(content="answer")]})
+
+    assert fake_redis == {}
+    assert AgentHistoryCache("conversation").get() == {}
+
+
+def test_invalid_cache_is_ignored(fake_redis):
+    cache = AgentHistoryCache("conversation")
+    fake_redis[cache.cache_key] = b'{"message-1": [{"role": "user", "content": "hi"}]}'
+
+    assert cache.get() == {}
@@ -0,0 +1,142 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.agent.entities import AgentEntity
+from core.agent.fc_agent_runner import FunctionCallAgentRunner
+from core.app.apps.agent_chat.app_config_manager import AgentChatAppConfigManager
+from core.tools.entities.tool_entities import ToolInvokeMeta
+from models.model import Message, MessageFile
+
+
+def _make_runner(**agent_config) -> FunctionCallAgentRunner:
+    runner = FunctionCallAgentRunner.__new__(FunctionCallAgentRunner)
+    runner.app_config = SimpleNamespace(
+        agent=AgentEntity(
+            provider="openai", model="gpt-4o", strategy=AgentEntity.Strategy.FUNCTION_CALLING, **agent_config
+        )
+    )
+    runner.user_id = "user"
+    runner.tenant_id = "tenant"
+    runner.message = MagicMock()
+    runner.application_generate_entity = MagicMock()
+    runner.agent_callback = MagicMock()
+    return runner
+
+
+def _tool(name: str) -> MagicMock:
+    tool = MagicMock()
+    tool.identity.name = name
+    return tool
+
+
+def _fake_agent_invoke(delays: dict[str, float], tracker: dict):
+    lock = threading.Lock()
+
+    def agent_invoke(tool, tool_parameters, **kwargs):
+        with lock:
+            tracker["active"] += 1
+            tracker["peak"] = max(tracker["peak"], tracker["active"])
+        time.sleep(delays[tool.identity.name])
+        with lock:
+            tracker["active"] -= 1
+        return (
+            f"{tool.identity.name}: {tool_parameters['q']}",
+            [(f"file-{tool.identity.name}", "")],
+            ToolInvokeMeta.empty(),
+        )
+
+    return agent_invoke
+
+
+def test_parallel_tool_calls_keep_order_and_respect_cap():
+    runner = _make_runner(parallel_tool_calls=True, max_parallel_tool_calls=2)
+    tool_instances = {name: _tool(name) for name in ["search", "weather", "calendar"]}
+    tool_calls = [("1", "search", {"q": "a"}), ("2", "weather", {"q": "b"}), ("3", "calendar", {"q": "c"})]
+    tracker = {"active": 0, "peak": 0}
+    delays = {"search": 0.2, "weather": 0.05, "calendar": 0.1}
+
+    with (
+        patch("core.agent.fc_agent_runner.db") as mock_db,
+        patch(
+            "core.agent.fc_agent_runner.ToolEngine.agent_invoke", side_effect=_fake_agent_invoke(delays, tracker)
+        ) as agent_invoke,
+    ):
+        results = runner._invoke_tools(tool_instances, tool_calls)
+
+    # workers get the message loaded in their own session, and their own callback handler
+    for call in agent_invoke.call_args_list:
+        assert call.kwargs["message"] is mock_db.session.get.return_value
+        assert call.kwargs["agent_tool_callback"] is not runner.agent_callback
+    mock_db.session.get.assert_called_with(Message, runner.message.id)
+
+    assert [response["tool_call_id"] for response, _ in results] == ["1", "2", "3"]
+    assert [response["tool_response"] for response, _ in results] == ["search: a", "weather: b", "calendar: c"]
+    assert [message_files for _, message_files in results] == [
+        [("file-search", "")],
+        [("file-weather", "")],
+        [("file-calendar", "")],
+    ]
+    assert tracker["peak"] == 2
+
+
+def test_parallel_tool_call_timeout():
+    runner = _make_runner(parallel_tool_calls=True, tool_call_timeout=0.1)
+    tool_instances = {name: _tool(name) for name in ["slow", "fast"]}
+    tool_calls = [("1", "slow", {"q": "a"}), ("2", "fast", {"q": "b"}), ("3", "missing", {})]
+    tracker = {"active": 0, "peak": 0}
+
+    with (
+        patch("core.agent.fc_agent_runner.db") as mock_db,
+        patch(
+            "core.agent.fc_agent_runner.ToolEngine.agent_invoke",
+            side_effect=_fake_agent_invoke({"slow": 0.3, "fast": 0}, tracker),
+        ),
+    ):
+        start = time.monotonic()
+        results = runner._invoke_tools(tool_instances, tool_calls)
+        assert time.monotonic() - start < 0.25
+        mock_db.session.query.assert_not_called()
+
+        # the message files created by the timed out call once it finishes are deleted
+        time.sleep(0.5)
+        mock_db.session.query.assert_called_once_with(MessageFile)
+        mock_db.session.commit.assert_called_once()
+
+    (slow, slow_files), (fast, _), (missing, _) = results
+    assert slow["tool_response"] == "tool invoke error: tool call timed out after 0.1 seconds"
+    assert slow["meta"]["error"] == slow["tool_response"]
+    assert slow_files == []
+    assert fast["tool_response"] == "fast: b"
+    assert missing["tool_response"] == "there is not a tool named missing"
+
+
+def test_tool_calls_run_serially_by_default():
+    runner = _make_runner()
+    tool_instances = {name: _tool(name) for name in ["search", "weather"]}
+    tool_calls = [("1", "search", {"q": "a"}), ("2", "weather", {"q": "b"})]
+    tracker = {"active": 0, "peak": 0}
+
+    with patch(
+        "core.agent.fc_agent_runner.ToolEngine.agent_invoke",
+        side_effect=_fake_agent_invoke({"search": 0.01, "weather": 0.01}, tracker),
+    ) as agent_invoke:
+        results = runner._invoke_tools(tool_instances, tool_calls)
+
+    assert [response["tool_response"] for response, _ in results] == ["search: a", "weather: b"]
+    assert agent_invoke.call_args.kwargs["message"] is runner.message
+    assert tracker["peak"] == 1
+
+
+@pytest.mark.parametrize(
+    ("key", "value"),
+    [("max_parallel_tool_calls", True), ("max_parallel_tool_calls", 0), ("tool_call_timeout", True)],
+)
+def test_agent_mode_rejects_invalid_parallel_tool_call_options(key, value):
+    config = {"agent_mode": {"enabled": True, "strategy": "function_call", "parallel_tool_calls": True, key: value}}
+
+    with pytest.raises(ValueError, match=key):
+        AgentChatAppConfigManager.validate_agent_mode_and_set_defaults("tenant", config)
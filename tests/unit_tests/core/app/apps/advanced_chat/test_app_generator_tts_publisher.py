@@ -0,0 +1,92 @@
+import base64
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from core.app.apps.advanced_chat import app_generator_tts_publisher
+from core.app.apps.advanced_chat.app_generator_tts_publisher import AppGeneratorTTSPublisher
+from core.app.entities.queue_entities import QueueTextChunkEvent
+
+
+def _create_publisher(invoke_tts) -> AppGeneratorTTSPublisher:
+    model_instance = MagicMock()
+    model_instance.get_tts_voices.return_value = [{"value": "alloy"}]
+    model_instance.invoke_tts.side_effect = invoke_tts
+    with patch.object(app_generator_tts_publisher, "ModelManager") as model_manager:
+        model_manager.return_value.get_default_model_instance.return_value = model_instance
+        return AppGeneratorTTSPublisher("tenant_id", "alloy")
+
+
+def _publish_text(publisher: AppGeneratorTTSPublisher, text: str):
+    publisher.publish(SimpleNamespace(event=QueueTextChunkEvent(text=text)))
+
+
+def _collect_audio(publisher: AppGeneratorTTSPublisher, timeout: float = 5) -> list[bytes]:
+    audio = []
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        trunk = publisher.check_and_get_audio()
+        if trunk is None:
+            time.sleep(0.01)
+            continue
+        if trunk.status == "finish":
+            return audio
+        audio.append(base64.b64decode(trunk.audio))
+    raise TimeoutError("audio not finished")
+
+
+def test_audio_is_returned_in_text_order():
+    def invoke_tts(content_text, **kwargs):
+        # the first segments are the slowest to synthesize
+        time.sleep(0.1 / len(content_text))
+        yield content_text.encode()
+
+    publisher = _create_publisher(invoke_tts)
+    for text in ["One. Two.", " Three. Four. Five.", " Six", " seven. Eight"]:
+        _publish_text(publisher, text)
+    publisher.publish(None)
+
+    audio = _collect_audio(publisher)
+
+    # segments are stripped before synthesis
+    assert audio == [b"One. Two.", b"Three. Four. Five.", b"Six seven. Eight"]
+
+
+def test_pending_segments_are_bounded():
+    release = threading.Event()
+    texts = []
+
+    def invoke_tts(content_text, **kwargs):
+        texts.append(content_text)
+        release.wait(5)
+        yield content_text.encode()
+
+    publisher = _create_publisher(invoke_tts)
+    with patch.object(app_generator_tts_publisher.dify_config, "TTS_AUTO_PLAY_MAX_PENDING_SEGMENTS", 1):
+        for i in range(20):
+            _publish_text(publisher, f"Sentence {i}.")
+        publisher.publish(None)
+
+        assert len(publisher._segments) == 1
+        assert publisher.msg_text
+
+        release.set()
+        audio = _collect_audio(publisher)
+
+    assert b"".join(audio) == "".join(f"Sentence {i}." for i in range(20)).encode()
+    assert len(texts) == 2
+
+
+def test_failed_segment_does_not_block_following_ones():
+    def invoke_tts(content_text, **kwargs):
+        if content_text.startswith("Bad"):
+            raise ValueError("tts failed")
+        yield content_text.encode()
+
+    publisher = _create_publisher(invoke_tts)
+    _publish_text(publisher, "Bad one. Bad two.")
+    _publish_text(publisher, " Good")
+    publisher.publish(None)
+
+    assert _collect_audio(publisher) == [b"Good"]
@@ -0,0 +1,92 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from configs import dify_config
+from core.app.apps.base_app_queue_manager import PublishFrom, merge_text_chunk_events
+from core.app.apps.message_based_app_queue_manager import MessageBasedAppQueueManager
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.app.entities.queue_entities import QueueLLMChunkEvent, QueuePingEvent, QueueTextChunkEvent
+from core.model_runtime.entities.llm_entities import LLMResultChunk, LLMResultChunkDelta, LLMUsage
+from core.model_runtime.entities.message_entities import AssistantPromptMessage
+
+
+def _llm_chunk_event(content: str, index: int = 0, finish_reason=None) -> QueueLLMChunkEvent:
+    return QueueLLMChunkEvent(
+        chunk=LLMResultChunk(
+            model="fake",
+            prompt_messages=[],
+            delta=LLMResultChunkDelta(
+                index=index, message=AssistantPromptMessage(content=content), finish_reason=finish_reason
+            ),
+        )
+    )
+
+
+@pytest.fixture
+def queue_manager():
+    with patch("core.app.apps.base_app_queue_manager.redis_client", new=MagicMock()) as redis_client:
+        redis_client.get.return_value = None
+        yield MessageBasedAppQueueManager(
+            task_id="task",
+            user_id="user",
+            invoke_from=InvokeFrom.SERVICE_API,
+            conversation_id="conversation",
+            app_mode="chat",
+            message_id="message",
+        )
+
+
+def test_merge_text_chunk_events():
+    merged = merge_text_chunk_events(
+        QueueTextChunkEvent(text="Hello", from_variable_selector=["llm", "text"]),
+        QueueTextChunkEvent(text=" world", from_variable_selector=["llm", "text"]),
+    )
+    assert isinstance(merged, QueueTextChunkEvent)
+    assert merged.text == "Hello world"
+    assert merged.from_variable_selector == ["llm", "text"]
+
+    assert (
+        merge_text_chunk_events(
+            QueueTextChunkEvent(text="a", from_variable_selector=["llm", "text"]),
+            QueueTextChunkEvent(text="b", from_variable_selector=["answer", "text"]),
+        )
+        is None
+    )
+    assert merge_text_chunk_events(QueueTextChunkEvent(text="a"), QueuePingEvent()) is None
+
+
+def test_merge_llm_chunk_events():
+    merged = merge_text_chunk_events(_llm_chunk_event("Hello", 0), _llm_chunk_event(" world", 1, "stop"))
+    assert isinstance(merged, QueueLLMChunkEvent)
+    assert merged.chunk.delta.message.content == "Hello world"
+    assert merged.chunk.delta.index == 1
+    assert merged.chunk.delta.finish_reason == "stop"
+
+    # the last chunk of a generation is not merged with the next one
+    assert merge_text_chunk_events(_llm_chunk_event("a", 0, "stop"), _llm_chunk_event("b")) is None
+
+    with_usage = _llm_chunk_event("a")
+    with_usage.chunk.delta.usage = LLMUsage.empty_usage()
+    assert merge_text_chunk_events(with_usage, _llm_chunk_event("b")) is None
+
+
+def test_listen_coalesces_queued_chunks(queue_manager):
+    for text in ("Hel", "lo", " world"):
+        queue_manager.publish(QueueTextChunkEvent(text=text), PublishFrom.TASK_PIPELINE)
+    queue_manager.publish(QueueTextChunkEvent(text="!", in_iteration_id="iteration"), PublishFrom.TASK_PIPELINE)
+    queue_manager.stop_listen()
+
+    events = [message.event for message in queue_manager.listen()]
+
+    assert [event.text for event in events] == ["Hello world", "!"]
+    assert events[1].in_iteration_id == "iteration"
+
+
+def test_listen_without_coalescing(queue_manager, monkeypatch):
+    monkeypatch.setattr(dify_config, "APP_STREAM_COALESCE_ENABLED", False)
+    for text in ("Hel", "lo"):
+        queue_manager.publish(QueueTextChunkEvent(text=text), PublishFrom.TASK_PIPELINE)
+    queue_manager.stop_listen()
+
+    assert [message.event.text for message in queue_manager.listen()] == ["Hel", "lo"]
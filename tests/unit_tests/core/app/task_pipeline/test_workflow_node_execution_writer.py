@@ -0,0 +1,114 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from core.app.task_pipeline.workflow_node_execution_writer import WorkflowNodeExecutionWriter
+from models.workflow import WorkflowNodeExecution, WorkflowNodeExecutionStatus
+
+
+def _node_execution(node_execution_id: str) -> WorkflowNodeExecution:
+    workflow_node_execution = WorkflowNodeExecution()
+    workflow_node_execution.id = node_execution_id
+    workflow_node_execution.node_id = node_execution_id
+    workflow_node_execution.status = WorkflowNodeExecutionStatus.RUNNING.value
+    workflow_node_execution.created_at = datetime(2024, 1, 1)
+    return workflow_node_execution
+
+
+def _finish(workflow_node_execution: WorkflowNodeExecution) -> None:
+    workflow_node_execution.status = WorkflowNodeExecutionStatus.SUCCEEDED.value
+    workflow_node_execution.outputs = '{"text": "done"}'
+    workflow_node_execution.finished_at = datetime(2024, 1, 1, 0, 0, 1)
+    workflow_node_execution.elapsed_time = 1.0
+
+
+def test_batches_and_coalesces_writes():
+    writes = []
+    with patch(
+        "core.app.task_pipeline.workflow_node_execution_writer._write",
+        side_effect=lambda flask_app, inserts, updates: writes.append((inserts, updates)),
+    ):
+        writer = WorkflowNodeExecutionWriter(batch_size=3, flush_interval=3600)
+
+        first, second, third = _node_execution("1"), _node_execution("2"), _node_execution("3")
+        writer.add(first)
+        writer.add(second)
+        _finish(first)
+        writer.update(first)
+        assert writes == []
+
+        # a node finished before its start was written is inserted once, with its final state
+        writer.add(third)
+        writer.flush(wait=True)
+        assert len(writes) == 1
+        inserts, updates = writes[0]
+        assert [row["id"] for row in inserts] == ["1", "2", "3"]
+        assert inserts[0]["status"] == WorkflowNodeExecutionStatus.SUCCEEDED.value
+        assert inserts[0]["elapsed_time"] == 1.0
+        assert "elapsed_time" not in inserts[1]
+        assert updates == []
+
+        _finish(second)
+        writer.update(second)
+        writer.close()
+        assert len(writes) == 2
+        inserts, updates = writes[1]
+        assert inserts == []
+        assert [(row["id"], row["status"], row["outputs"]) for row in updates] == [
+            ("2", WorkflowNodeExecutionStatus.SUCCEEDED.value, '{"text": "done"}')
+        ]
+
+
+def test_flushes_after_interval():
+    writes = []
+    with patch(
+        "core.app.task_pipeline.workflow_node_execution_writer._write",
+        side_effect=lambda flask_app, inserts, updates: writes.append((inserts, updates)),
+    ):
+        writer = WorkflowNodeExecutionWriter(batch_size=100, flush_interval=60)
+        writer.add(_node_execution("1"))
+        writer.flush_if_due()
+        assert writes == []
+
+        with patch("core.app.task_pipeline.workflow_node_execution_writer.time.monotonic", return_value=1e12):
+            writer.flush_if_due()
+        writer.flush(wait=True)
+        assert len(writes) == 1
+        writer.close()
+
+    assert [[row["id"] for row in inserts] for inserts, _ in writes] == [["1"]]
+
+
+def test_failed_write_is_raised_on_wait():
+    writes = []
+
+    def write(flask_app, inserts, updates):
+        if [row["id"] for row in inserts] == ["1"]:
+            raise Exception("database is down")
+        writes.append((inserts, updates))
+
+    with patch("core.app.task_pipeline.workflow_node_execution_writer._write", side_effect=write):
+        writer = WorkflowNodeExecutionWriter(batch_size=1, flush_interval=3600)
+        writer.add(_node_execution("1"))
+        writer.add(_node_execution("2"))
+        with pytest.raises(Exception, match="database is down"):
+            writer.flush(wait=True)
+        # the batches after the failed one are still written
+        assert [[row["id"] for row in inserts] for inserts, _ in writes] == [["2"]]
+
+        # a failure is raised once
+        writer.add(_node_execution("3"))
+        writer.close()
+        assert [[row["id"] for row in inserts] for inserts, _ in writes] == [["2"], ["3"]]
+
+
+def test_failed_write_is_raised_on_close():
+    with patch(
+        "core.app.task_pipeline.workflow_node_execution_writer._write", side_effect=Exception("database is down")
+    ):
+        writer = WorkflowNodeExecutionWriter(batch_size=1, flush_interval=3600)
+        writer.add(_node_execution("1"))
+        with pytest.raises(Exception, match="database is down"):
+            writer.close()
+        assert writer._executor is None
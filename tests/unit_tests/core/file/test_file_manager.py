@@ -0,0 +1,115 @@
+import base64
+import io
+from unittest.mock import MagicMock, patch
+
+import pytest
+from PIL import Image
+
+from configs import dify_config
+from core.file import File, FileTransferMethod, FileType, file_manager
+from core.file.encoded_file_cache import EncodedFileCache, encoded_file_cache
+from core.model_runtime.entities import ImagePromptMessageContent
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    encoded_file_cache.clear()
+    yield
+    encoded_file_cache.clear()
+
+
+def _local_file(file_type: FileType = FileType.IMAGE) -> File:
+    return File(
+        id="file1",
+        tenant_id="tenant1",
+        type=file_type,
+        transfer_method=FileTransferMethod.LOCAL_FILE,
+        related_id="upload-file-1",
+        mime_type="image/png",
+    )
+
+
+def _png(width: int, height: int) -> bytes:
+    output = io.BytesIO()
+    Image.effect_noise((width, height), 64).convert("RGB").save(output, format="PNG")
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("chunks", [[], [b"a"], [b"ab", b"c", b"defg"], [b"x" * 7, b"y" * 5, b"z"]])
+def test_b64encode_stream(chunks):
+    assert file_manager._b64encode_stream(chunks) == base64.b64encode(b"".join(chunks)).decode()
+
+
+def test_encoded_string_is_cached_per_tenant():
+    storage = MagicMock()
+    storage.load.side_effect = lambda key, stream: iter([b"hello ", b"world"])
+
+    with (
+        patch("core.file.file_manager.storage", new=storage),
+        patch("core.file.file_manager.file_repository.get_upload_file", return_value=MagicMock(key="upload/1")),
+    ):
+        file = _local_file(FileType.DOCUMENT)
+        assert file_manager._get_encoded_string(file) == base64.b64encode(b"hello world").decode()
+        assert file_manager._get_encoded_string(file) == base64.b64encode(b"hello world").decode()
+        assert storage.load.call_count == 1
+
+        file.tenant_id = "tenant2"
+        file_manager._get_encoded_string(file)
+        assert storage.load.call_count == 2
+
+
+def test_remote_files_are_not_cached():
+    file = File(
+        id="file1",
+        tenant_id="tenant1",
+        type=FileType.IMAGE,
+        transfer_method=FileTransferMethod.REMOTE_URL,
+        remote_url="https://example.com/image.png",
+    )
+
+    with patch("core.file.file_manager.ssrf_proxy.get", return_value=MagicMock(content=b"image")) as get:
+        file_manager._get_encoded_string(file)
+        file_manager._get_encoded_string(file)
+
+    assert get.call_count == 2
+
+
+def test_cache_evicts_least_recently_used():
+    cache = EncodedFileCache(max_size=10)
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    assert cache.get("a") == "aaaa"
+
+    cache.set("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.get("c") == "cccc"
+
+    cache.set("d", "d" * 11)
+    assert cache.get("d") is None
+
+
+def test_images_are_downscaled_per_detail(monkeypatch):
+    monkeypatch.setattr(dify_config, "MULTIMODAL_IMAGE_DOWNSCALE_ENABLED", True)
+    data = _png(3000, 1500)
+    storage = MagicMock()
+    storage.load.side_effect = lambda key, stream: iter([data])
+
+    with (
+        patch("core.file.file_manager.storage", new=storage),
+        patch("core.file.file_manager.file_repository.get_upload_file", return_value=MagicMock(key="upload/1")),
+    ):
+        file = _local_file()
+        low = file_manager._get_encoded_string(file, image_detail=ImagePromptMessageContent.DETAIL.LOW)
+        high = file_manager._get_encoded_string(file, image_detail=ImagePromptMessageContent.DETAIL.HIGH)
+
+    assert Image.open(io.BytesIO(base64.b64decode(low))).size == (512, 256)
+    assert Image.open(io.BytesIO(base64.b64decode(high))).size == (1536, 768)
+    assert storage.load.call_count == 2
+
+
+def test_small_images_are_kept():
+    data = _png(100, 100)
+
+    assert file_manager._downscale_image(data, ImagePromptMessageContent.DETAIL.LOW) is data
+    assert file_manager._downscale_image(b"not an image", ImagePromptMessageContent.DETAIL.LOW) == b"not an image"
@@ -0,0 +1,79 @@
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from configs import dify_config
+from core.helper import file_stream, ssrf_proxy
+from core.helper.file_stream import FileTooLargeError
+
+
+@pytest.fixture(autouse=True)
+def small_spool(monkeypatch):
+    monkeypatch.setattr(dify_config, "FILE_DOWNLOAD_SPOOL_MAX_MEMORY_SIZE", 4)
+
+
+def test_spool_rolls_over_to_disk():
+    with file_stream.spool([b"abc", b"def", b"g"]) as file:
+        assert file._rolled
+        assert file_stream.get_size(file) == 7
+        assert file.read() == b"abcdefg"
+
+
+def test_spool_stops_reading_over_max_size():
+    consumed = []
+
+    def chunks():
+        for chunk in [b"abc", b"def", b"ghi"]:
+            consumed.append(chunk)
+            yield chunk
+
+    with pytest.raises(FileTooLargeError):
+        file_stream.spool(chunks(), max_size=5)
+    assert consumed == [b"abc", b"def"]
+
+
+def test_spool_uses_configured_max_size(monkeypatch):
+    monkeypatch.setattr(dify_config, "FILE_DOWNLOAD_MAX_SIZE", 2)
+    with pytest.raises(FileTooLargeError):
+        file_stream.spool([b"abc"])
+
+    monkeypatch.setattr(dify_config, "FILE_DOWNLOAD_MAX_SIZE", 0)
+    with file_stream.spool([b"abc"]) as file:
+        assert file.read() == b"abc"
+
+
+def test_read_stops_reading_over_max_size():
+    assert file_stream.read([b"abc", b"def"], max_size=6) == b"abcdef"
+    with pytest.raises(FileTooLargeError):
+        file_stream.read([b"abc", b"def"], max_size=5)
+
+
+def _mock_client(handler):
+    return patch.object(ssrf_proxy, "_create_client", lambda: httpx.Client(transport=httpx.MockTransport(handler)))
+
+
+def test_download_streams_response_body():
+    with _mock_client(lambda request: httpx.Response(200, content=b"hello world")):
+        with ssrf_proxy.download("http://example.com/file", max_size=100) as file:
+            assert file.read() == b"hello world"
+
+
+def test_download_bytes():
+    with _mock_client(lambda request: httpx.Response(200, content=b"hello world")):
+        assert ssrf_proxy.download_bytes("http://example.com/file", max_size=100) == b"hello world"
+        with pytest.raises(FileTooLargeError):
+            ssrf_proxy.download_bytes("http://example.com/file", max_size=5)
+
+
+def test_download_rejects_announced_length():
+    def handler(request):
+        return httpx.Response(200, headers={"Content-Length": "1000"}, stream=httpx.ByteStream(b""))
+
+    with _mock_client(handler), pytest.raises(FileTooLargeError):
+        ssrf_proxy.download("http://example.com/file", max_size=100)
+
+
+def test_download_raises_on_error_status():
+    with _mock_client(lambda request: httpx.Response(404)), pytest.raises(httpx.HTTPStatusError):
+        ssrf_proxy.download("http://example.com/file")
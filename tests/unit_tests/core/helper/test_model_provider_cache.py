@@ -0,0 +1,95 @@
+import pytest
+
+from core.helper.model_provider_cache import ProviderCredentialsCache, ProviderCredentialsCacheType
+from core.model_runtime.model_providers import model_provider_factory
+from core.provider_manager import ProviderManager
+from models.provider import LoadBalancingModelConfig, ProviderModelSetting
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    ProviderCredentialsCache._cache.clear()
+    yield
+    ProviderCredentialsCache._cache.clear()
+
+
+def _create_cache(encrypted_config: str) -> ProviderCredentialsCache:
+    return ProviderCredentialsCache(
+        tenant_id="tenant_id",
+        identity_id="id",
+        cache_type=ProviderCredentialsCacheType.MODEL,
+        encrypted_config=encrypted_config,
+    )
+
+
+def test_credentials_are_cached_per_encrypted_config():
+    _create_cache('{"api_key": "encrypted"}').set({"api_key": "decrypted"})
+
+    assert _create_cache('{"api_key": "encrypted"}').get() == {"api_key": "decrypted"}
+    assert _create_cache('{"api_key": "changed"}').get() is None
+
+
+def test_deleted_credentials_are_not_returned():
+    _create_cache('{"api_key": "encrypted"}').set({"api_key": "decrypted"})
+
+    _create_cache("").delete()
+
+    assert _create_cache('{"api_key": "encrypted"}').get() is None
+
+
+def test_credentials_are_not_written_to_redis(mocker):
+    redis_client = mocker.patch("extensions.ext_redis.redis_client")
+
+    _create_cache('{"api_key": "encrypted"}').set({"api_key": "decrypted"})
+
+    assert not redis_client.method_calls
+
+
+def test_cached_credentials_are_not_decrypted_again(mocker):
+    provider_entity = next(p for p in model_provider_factory.get_providers() if p.provider == "openai")
+    provider_model_settings = [
+        ProviderModelSetting(
+            id="id",
+            tenant_id="tenant_id",
+            provider_name="openai",
+            model_name="gpt-4",
+            model_type="text-generation",
+            enabled=True,
+            load_balancing_enabled=True,
+        )
+    ]
+    load_balancing_model_configs = [
+        LoadBalancingModelConfig(
+            id="id1",
+            tenant_id="tenant_id",
+            provider_name="openai",
+            model_name="gpt-4",
+            model_type="text-generation",
+            name="first",
+            encrypted_config='{"openai_api_key": "encrypted_key"}',
+            enabled=True,
+        ),
+        LoadBalancingModelConfig(
+            id="id2",
+            tenant_id="tenant_id",
+            provider_name="openai",
+            model_name="gpt-4",
+            model_type="text-generation",
+            name="second",
+            encrypted_config='{"openai_api_key": "encrypted_key"}',
+            enabled=True,
+        ),
+    ]
+    mocker.patch("core.helper.encrypter.get_decrypt_decoding", return_value=(None, None))
+    decrypt = mocker.patch("core.helper.encrypter.decrypt_token_with_decoding", return_value="fake_key")
+
+    for _ in range(3):
+        result = ProviderManager()._to_model_settings(
+            provider_entity, provider_model_settings, load_balancing_model_configs
+        )
+
+    assert decrypt.call_count == 2
+    assert [config.credentials for config in result[0].load_balancing_configs] == [
+        {"openai_api_key": "fake_key"},
+        {"openai_api_key": "fake_key"},
+    ]
@@ -0,0 +1,64 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from core.helper import schema_snapshot
+from core.tools.utils.yaml_utils import load_yaml_file
+
+PROVIDER_YAML_PATH = os.path.join(schema_snapshot.ROOT_PATH, "core/model_runtime/model_providers/openai/openai.yaml")
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    snapshot_path = str(tmp_path / "schema_snapshot.json")
+    with patch.multiple(
+        "core.helper.schema_snapshot.dify_config",
+        SCHEMA_SNAPSHOT_ENABLED=True,
+        SCHEMA_SNAPSHOT_PATH=snapshot_path,
+        DEBUG=False,
+    ):
+        schema_snapshot.reset()
+        yield snapshot_path
+    schema_snapshot.reset()
+
+
+def test_schemas_are_loaded_from_snapshot(snapshot_path):
+    content = load_yaml_file(PROVIDER_YAML_PATH)
+
+    assert os.path.exists(snapshot_path)
+    assert content["provider"] == "openai"
+
+    schema_snapshot.reset()
+    with patch("core.helper.schema_snapshot.build") as build:
+        assert load_yaml_file(PROVIDER_YAML_PATH) == content
+    build.assert_not_called()
+
+
+def test_loaded_schemas_can_be_modified(snapshot_path):
+    load_yaml_file(PROVIDER_YAML_PATH)["provider"] = "modified"
+
+    assert load_yaml_file(PROVIDER_YAML_PATH)["provider"] == "openai"
+
+
+def test_stale_snapshot_is_rebuilt(snapshot_path):
+    snapshot = schema_snapshot.build()
+    snapshot["fingerprint"] = "stale"
+    snapshot["files"][os.path.relpath(PROVIDER_YAML_PATH, schema_snapshot.ROOT_PATH)] = '{"provider": "stale"}'
+    schema_snapshot.save(snapshot, snapshot_path)
+
+    assert load_yaml_file(PROVIDER_YAML_PATH)["provider"] == "openai"
+
+
+def test_files_outside_snapshot_are_parsed(snapshot_path, tmp_path):
+    yaml_path = tmp_path / "other.yaml"
+    yaml_path.write_text("provider: other")
+
+    assert load_yaml_file(str(yaml_path)) == {"provider": "other"}
+
+
+def test_snapshot_is_not_used_in_debug_mode(snapshot_path):
+    with patch("core.helper.schema_snapshot.dify_config.DEBUG", True):
+        assert load_yaml_file(PROVIDER_YAML_PATH)["provider"] == "openai"
+
+    assert not os.path.exists(snapshot_path)
@@ -0,0 +1,107 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from configs import dify_config
+from core.helper import workflow_payload_storage
+from models.workflow import WorkflowNodeExecution, get_payload, load_payloads, set_payload
+
+LARGE_PAYLOAD = json.dumps({"text": "x" * 2000})
+
+
+@pytest.fixture
+def storage():
+    files: dict[str, bytes] = {}
+    storage = MagicMock()
+    storage.save.side_effect = files.__setitem__
+    storage.load_once.side_effect = files.__getitem__
+    storage.load_many.side_effect = lambda keys: {key: files[key] for key in keys}
+    storage.delete_many.side_effect = lambda keys: [files.pop(key) for key in keys]
+    with patch("core.helper.workflow_payload_storage.storage", new=storage):
+        yield files
+
+
+@pytest.fixture(autouse=True)
+def _offload_config(monkeypatch):
+    monkeypatch.setattr(dify_config, "WORKFLOW_PAYLOAD_OFFLOAD_THRESHOLD", 1024)
+    monkeypatch.setattr(dify_config, "WORKFLOW_PAYLOAD_PREVIEW_LENGTH", 16)
+
+
+def test_small_payload_stays_in_database(storage):
+    payload = json.dumps({"text": "hello"})
+
+    assert workflow_payload_storage.offload("tenant", payload) == payload
+    assert workflow_payload_storage.offload("tenant", None) is None
+    assert storage == {}
+
+
+def test_offload_and_load(storage):
+    stored = workflow_payload_storage.offload("tenant", LARGE_PAYLOAD)
+
+    reference = workflow_payload_storage.get_reference(stored)
+    assert reference["size"] == len(LARGE_PAYLOAD)
+    assert reference["preview"] == LARGE_PAYLOAD[:16]
+    assert reference["key"].startswith("workflow_payloads/tenant/")
+    assert len(storage[reference["key"]]) < len(LARGE_PAYLOAD)
+    assert workflow_payload_storage.load(stored) == LARGE_PAYLOAD
+    # offloading again is a no-op
+    assert workflow_payload_storage.offload("tenant", stored) == stored
+
+    workflow_payload_storage.delete(stored, None, LARGE_PAYLOAD)
+    assert storage == {}
+
+
+def test_disabled(storage, monkeypatch):
+    monkeypatch.setattr(dify_config, "WORKFLOW_PAYLOAD_OFFLOAD_THRESHOLD", 0)
+
+    assert workflow_payload_storage.offload("tenant", LARGE_PAYLOAD) == LARGE_PAYLOAD
+
+
+def test_storage_failure_keeps_payload(storage):
+    with patch("core.helper.workflow_payload_storage.storage.save", side_effect=Exception("storage is down")):
+        assert workflow_payload_storage.offload("tenant", LARGE_PAYLOAD) == LARGE_PAYLOAD
+
+
+def test_model_payload_is_loaded_lazily_once(storage):
+    workflow_node_execution = WorkflowNodeExecution()
+    workflow_node_execution.tenant_id = "tenant"
+    set_payload(workflow_node_execution, "outputs", LARGE_PAYLOAD)
+    assert workflow_payload_storage.is_offloaded(workflow_node_execution.outputs)
+
+    # as read back from the database
+    loaded_node_execution = WorkflowNodeExecution()
+    loaded_node_execution.outputs = workflow_node_execution.outputs
+    with patch("core.helper.workflow_payload_storage.storage.load_once", wraps=storage.__getitem__) as load_once:
+        assert loaded_node_execution.outputs_dict == json.loads(LARGE_PAYLOAD)
+        assert get_payload(loaded_node_execution, "outputs") == json.loads(LARGE_PAYLOAD)
+        assert load_once.call_count == 1
+
+    # the instance that offloaded the payload does not fetch it back
+    with patch("core.helper.workflow_payload_storage.storage.load_once") as load_once:
+        assert workflow_node_execution.outputs_dict == json.loads(LARGE_PAYLOAD)
+        load_once.assert_not_called()
+
+    assert loaded_node_execution.inputs_dict is None
+
+
+def test_load_payloads_in_one_bulk_call(storage):
+    node_executions = []
+    for i in range(3):
+        node_execution = WorkflowNodeExecution()
+        node_execution.tenant_id = "tenant"
+        node_execution.inputs = json.dumps({"index": i})
+        node_execution.outputs = workflow_payload_storage.offload("tenant", LARGE_PAYLOAD)
+        node_executions.append(node_execution)
+
+    load_many = workflow_payload_storage.storage.load_many
+    with patch("core.helper.workflow_payload_storage.storage.load_once") as load_once:
+        load_payloads(node_executions, ("inputs", "process_data", "outputs"))
+        load_many.assert_called_once()
+        assert len(load_many.call_args.args[0]) == 3
+
+        for i, node_execution in enumerate(node_executions):
+            assert node_execution.inputs_dict == {"index": i}
+            assert node_execution.process_data_dict is None
+            assert node_execution.outputs_dict == json.loads(LARGE_PAYLOAD)
+        load_once.assert_not_called()
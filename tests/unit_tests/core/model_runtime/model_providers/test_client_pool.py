@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+import pytest
+
+from core.model_runtime.model_providers.__base.client_pool import ProviderClientPool
+
+
+class _Client:
+    def __init__(self, api_key: str, base_url: str = ""):
+        self.api_key = api_key
+        self.base_url = base_url
+
+
+@pytest.fixture
+def pool():
+    with patch.multiple(
+        "core.model_runtime.model_providers.__base.client_pool.dify_config",
+        MODEL_PROVIDER_CLIENT_POOL_MAX_SIZE=2,
+        MODEL_PROVIDER_CLIENT_POOL_IDLE_TIMEOUT=300,
+    ):
+        yield ProviderClientPool()
+
+
+def test_clients_are_reused_per_credentials(pool):
+    client = pool.get_client("openai", _Client, api_key="key1")
+
+    assert pool.get_client("openai", _Client, api_key="key1") is client
+    assert pool.get_client("openai", _Client, api_key="key2") is not client
+    assert pool.get_client("openai", _Client, api_key="key1", base_url="https://proxy") is not client
+    assert pool.get_stats() == {"openai": {"created": 3, "reused": 1, "evicted": 1}}
+
+
+def test_least_recently_used_client_is_evicted(pool):
+    client1 = pool.get_client("openai", _Client, api_key="key1")
+    client2 = pool.get_client("cohere", _Client, api_key="key2")
+    pool.get_client("openai", _Client, api_key="key1")
+    pool.get_client("openai", _Client, api_key="key3")
+
+    assert pool.get_client("openai", _Client, api_key="key1") is client1
+    assert pool.get_client("cohere", _Client, api_key="key2") is not client2
+    assert pool.get_stats()["cohere"]["evicted"] == 1
+
+
+def test_idle_clients_are_evicted(pool):
+    with patch("core.model_runtime.model_providers.__base.client_pool.time.monotonic", return_value=1000):
+        client = pool.get_client("openai", _Client, api_key="key1")
+    with patch("core.model_runtime.model_providers.__base.client_pool.time.monotonic", return_value=1301):
+        assert pool.get_client("openai", _Client, api_key="key1") is not client
+
+
+def test_pool_can_be_disabled():
+    pool = ProviderClientPool()
+    with patch(
+        "core.model_runtime.model_providers.__base.client_pool.dify_config.MODEL_PROVIDER_CLIENT_POOL_MAX_SIZE", 0
+    ):
+        client = pool.get_client("openai", _Client, api_key="key1")
+        assert pool.get_client("openai", _Client, api_key="key1") is not client
+    assert pool.get_stats() == {}
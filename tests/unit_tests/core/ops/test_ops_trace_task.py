@@ -0,0 +1,77 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+from core.ops.entities.config_entity import OPS_TRACE_FAILED_KEY
+from core.ops.entities.trace_entity import GenerateNameTraceInfo
+from core.ops.ops_trace_manager import TraceQueueManager
+from tasks.ops_trace_task import process_trace_batch
+
+
+def _trace_task(app_id: str, name: str):
+    task = MagicMock()
+    task.app_id = app_id
+    task.execute.return_value = GenerateNameTraceInfo(tenant_id=name, metadata={})
+    return task
+
+
+@pytest.fixture
+def redis_client():
+    store = {}
+    client = MagicMock()
+    client.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+    pipe = client.pipeline.return_value.__enter__.return_value
+    keys = []
+    pipe.get.side_effect = keys.append
+    pipe.execute.side_effect = lambda: [store.pop(keys.pop(), None), 1]
+    with (
+        patch("core.ops.ops_trace_manager.redis_client", client),
+        patch("tasks.ops_trace_task.redis_client", client),
+    ):
+        yield client
+
+
+def test_send_to_celery_sends_one_batch_per_app(redis_client):
+    manager = TraceQueueManager.__new__(TraceQueueManager)
+    manager.flask_app = Flask(__name__)
+    tasks = [_trace_task("app-1", "a"), _trace_task("app-2", "b"), _trace_task("app-1", "c")]
+
+    with patch("core.ops.ops_trace_manager.process_trace_batch") as mock_task:
+        manager.send_to_celery(tasks)
+
+    assert redis_client.setex.call_count == 2
+    assert mock_task.delay.call_count == 2
+    batches = {call.args[0]["app_id"]: call.args[0] for call in mock_task.delay.call_args_list}
+    payloads = {call.args[0]: json.loads(call.args[2]) for call in redis_client.setex.call_args_list}
+    app_1_tasks = payloads[batches["app-1"]["batch_key"]]["tasks"]
+    assert [task["trace_info"]["tenant_id"] for task in app_1_tasks] == ["a", "c"]
+
+
+def test_process_trace_batch_traces_with_one_instance_and_flushes(redis_client):
+    manager = TraceQueueManager.__new__(TraceQueueManager)
+    manager.flask_app = Flask(__name__)
+    tasks = [_trace_task("app-1", "a"), _trace_task("app-1", "b"), _trace_task("app-1", "c")]
+    with patch("core.ops.ops_trace_manager.process_trace_batch") as mock_task:
+        manager.send_to_celery(tasks)
+    batch_info = mock_task.delay.call_args.args[0]
+
+    trace_instance = MagicMock()
+    trace_instance.trace.side_effect = [None, Exception("failed"), None]
+    with (
+        Flask(__name__).app_context(),
+        patch(
+            "core.ops.ops_trace_manager.OpsTraceManager.get_ops_trace_instance", return_value=trace_instance
+        ) as mock_get_instance,
+    ):
+        process_trace_batch(batch_info)
+        # the batch is removed once processed
+        process_trace_batch(batch_info)
+
+    mock_get_instance.assert_called_once_with("app-1")
+    traced = [call.args[0] for call in trace_instance.trace.call_args_list]
+    assert [trace_info.tenant_id for trace_info in traced] == ["a", "b", "c"]
+    assert all(isinstance(trace_info, GenerateNameTraceInfo) for trace_info in traced)
+    trace_instance.flush.assert_called_once()
+    redis_client.incrby.assert_called_once_with(f"{OPS_TRACE_FAILED_KEY}_app-1", 1)
@@ -0,0 +1,86 @@
+from unittest.mock import MagicMock
+
+from core.rag.datasource.vdb.vector_base import BaseVector
+from core.rag.datasource.vdb.vector_factory import Vector
+from core.rag.models.document import Document
+
+
+def _make_documents(*doc_ids: str) -> list[Document]:
+    return [Document(page_content=f"text of {doc_id}", metadata={"doc_id": doc_id}) for doc_id in doc_ids]
+
+
+class _InMemoryVector(BaseVector):
+    def __init__(self, existing_ids: set[str]):
+        super().__init__("test_collection")
+        self.existing_ids = existing_ids
+        self.text_exists_calls = 0
+
+    def get_type(self) -> str:
+        return "in_memory"
+
+    def create(self, texts, embeddings, **kwargs):
+        pass
+
+    def add_texts(self, documents, embeddings, **kwargs):
+        pass
+
+    def text_exists(self, id: str) -> bool:
+        self.text_exists_calls += 1
+        return id in self.existing_ids
+
+    def delete_by_ids(self, ids):
+        pass
+
+    def delete_by_metadata_field(self, key, value):
+        pass
+
+    def search_by_vector(self, query_vector, **kwargs):
+        return []
+
+    def search_by_full_text(self, query, **kwargs):
+        return []
+
+    def delete(self):
+        pass
+
+
+def test_texts_exist_falls_back_to_text_exists():
+    vector = _InMemoryVector(existing_ids={"a", "c"})
+
+    assert vector.texts_exist(["a", "b", "c"]) == {"a", "c"}
+    assert vector.text_exists_calls == 3
+
+
+def test_filter_duplicate_texts_keeps_order():
+    vector = _InMemoryVector(existing_ids={"b"})
+
+    filtered = vector._filter_duplicate_texts(_make_documents("a", "b", "c"))
+
+    assert [doc.metadata["doc_id"] for doc in filtered] == ["a", "c"]
+
+
+def test_vector_add_texts_checks_duplicates_in_one_call():
+    vector = Vector.__new__(Vector)
+    vector._vector_processor = MagicMock()
+    vector._vector_processor.texts_exist.return_value = {"b"}
+    vector._embeddings = MagicMock()
+    vector._embeddings.embed_documents.return_value = [[0.1], [0.2]]
+
+    vector.add_texts(_make_documents("a", "b", "c"), duplicate_check=True)
+
+    vector._vector_processor.texts_exist.assert_called_once_with(["a", "b", "c"])
+    vector._vector_processor.text_exists.assert_not_called()
+    created = vector._vector_processor.create.call_args.kwargs["texts"]
+    assert [doc.metadata["doc_id"] for doc in created] == ["a", "c"]
+
+
+def test_vector_add_texts_skips_embedding_when_all_duplicates():
+    vector = Vector.__new__(Vector)
+    vector._vector_processor = MagicMock()
+    vector._vector_processor.texts_exist.return_value = {"a"}
+    vector._embeddings = MagicMock()
+
+    vector.add_texts(_make_documents("a"), duplicate_check=True)
+
+    vector._embeddings.embed_documents.assert_not_called()
+    vector._vector_processor.create.assert_not_called()
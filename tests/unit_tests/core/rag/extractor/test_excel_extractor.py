@@ -0,0 +1,90 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from core.rag.extractor.excel_extractor import ExcelExtractor
+
+
+@pytest.fixture
+def xlsx_file(tmp_path):
+    wb = Workbook()
+    sheet = wb.active
+    sheet.title = "first"
+    sheet.append(["name", "site", "score"])
+    sheet.append(["dify", "homepage", 1])
+    sheet["B2"].hyperlink = "https://dify.ai"
+    sheet.append([None, None, None])
+    sheet.append(["langgenius", None, 2.5])
+
+    second = wb.create_sheet("second")
+    second.append(["key"])
+    second.append(["value"])
+
+    wb.create_sheet("empty")
+
+    file_path = tmp_path / "test.xlsx"
+    wb.save(file_path)
+    return str(file_path)
+
+
+def test_extract_xlsx(xlsx_file):
+    documents = ExcelExtractor(xlsx_file).extract()
+
+    assert [document.page_content for document in documents] == [
+        '"name":"dify";"site":"[homepage](https://dify.ai)";"score":"1"',
+        '"name":"langgenius";"score":"2.5"',
+        '"key":"value"',
+    ]
+    assert all(document.metadata == {"source": xlsx_file} for document in documents)
+
+
+def _save_workbook(tmp_path, rows) -> str:
+    wb = Workbook()
+    for row in rows:
+        wb.active.append(row)
+    file_path = tmp_path / "rows.xlsx"
+    wb.save(file_path)
+    return str(file_path)
+
+
+def test_extract_xlsx_with_blank_first_row(tmp_path):
+    file_path = _save_workbook(tmp_path, [[], ["a", "b"], ["c", None, "d"]])
+
+    assert [document.page_content for document in ExcelExtractor(file_path).extract()] == [
+        '"None":"a";"None":"b"',
+        '"None":"c";"None":"d"',
+    ]
+
+
+def test_extract_xlsx_with_short_header(tmp_path):
+    file_path = _save_workbook(tmp_path, [["name"], ["dify", "homepage", 1]])
+
+    assert [document.page_content for document in ExcelExtractor(file_path).extract()] == [
+        '"name":"dify";"None":"homepage";"None":"1"',
+    ]
+
+
+def test_extract_xlsx_without_hyperlinks_on_error(xlsx_file):
+    with patch.object(ExcelExtractor, "_parse_hyperlinks", side_effect=AttributeError("_archive")):
+        documents = ExcelExtractor(xlsx_file).extract()
+
+    assert documents[0].page_content == '"name":"dify";"site":"homepage";"score":"1"'
+
+
+def test_load_xlsx_is_lazy(xlsx_file):
+    documents = ExcelExtractor(xlsx_file).load()
+
+    assert next(documents).page_content.startswith('"name":"dify"')
+
+
+def test_format_rows_skips_missing_values():
+    df = pd.DataFrame({"a": [1.0, None], "b": ["x", "y"]})
+
+    assert list(ExcelExtractor._format_rows(df)) == ['"a":"1.0";"b":"x"', '"b":"y"']
+
+
+def test_extract_unsupported_extension():
+    with pytest.raises(ValueError, match="Unsupported file extension"):
+        ExcelExtractor("test.csv").extract()
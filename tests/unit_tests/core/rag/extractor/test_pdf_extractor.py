@@ -0,0 +1,116 @@
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from configs import dify_config
+from core.rag.extractor import pdf_extractor
+from core.rag.extractor.blob.blob import Blob
+from core.rag.extractor.pdf_extractor import PdfExtractor
+
+
+def _make_pdf(texts: list[str]) -> bytes:
+    """Build a minimal PDF with one line of text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", "", "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objects)} 0 R"
+            " /Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(texts)} >>"
+
+    content = b"%PDF-1.4\n"
+    offsets = []
+    for index, obj in enumerate(objects, start=1):
+        offsets.append(len(content))
+        content += f"{index} 0 obj\n{obj}\nendobj\n".encode()
+    xref_offset = len(content)
+    content += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        content += f"{offset:010d} 00000 n \n".encode()
+    content += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return content
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    file_path = tmp_path / "test.pdf"
+    file_path.write_bytes(_make_pdf(["Page one", "Page two", "Page three"]))
+    return str(file_path)
+
+
+@pytest.fixture
+def mock_storage():
+    with patch("core.rag.extractor.pdf_extractor.storage") as storage:
+        yield storage
+
+
+def test_extract_saves_plaintext_cache(pdf_file, mock_storage):
+    mock_storage.exists.return_value = False
+    cache_key = PdfExtractor.get_plaintext_cache_key("upload_file_id")
+
+    documents = PdfExtractor(pdf_file, cache_key).extract()
+
+    assert [document.page_content for document in documents] == ["Page one", "Page two", "Page three"]
+    assert [document.metadata["page"] for document in documents] == [0, 1, 2]
+    saved_key, data = mock_storage.save.call_args.args
+    assert saved_key == cache_key
+    assert json.loads(data) == ["Page one", "Page two", "Page three"]
+
+
+def test_extract_uses_plaintext_cache(pdf_file, mock_storage):
+    mock_storage.exists.return_value = True
+    mock_storage.load_once.return_value = json.dumps(["cached one", "cached two"]).encode()
+
+    documents = PdfExtractor(pdf_file, PdfExtractor.get_plaintext_cache_key("upload_file_id")).extract()
+
+    assert [document.page_content for document in documents] == ["cached one", "cached two"]
+    assert documents[1].metadata == {"source": pdf_file, "page": 1}
+    mock_storage.save.assert_not_called()
+
+
+def test_extract_without_cache_key(pdf_file, mock_storage):
+    documents = PdfExtractor(pdf_file).extract()
+
+    assert [document.page_content for document in documents] == ["Page one", "Page two", "Page three"]
+    mock_storage.exists.assert_not_called()
+    mock_storage.save.assert_not_called()
+
+
+def test_delete_plaintext_caches(mock_storage):
+    mock_storage.exists.side_effect = lambda key: key == PdfExtractor.get_plaintext_cache_key("cached")
+
+    PdfExtractor.delete_plaintext_caches(["cached", "not_cached"])
+
+    mock_storage.delete.assert_called_once_with(PdfExtractor.get_plaintext_cache_key("cached"))
+
+
+def test_parse_in_parallel_keeps_page_order(pdf_file, monkeypatch):
+    monkeypatch.setattr(dify_config, "PDF_PARALLEL_EXTRACT_PAGE_THRESHOLD", 2)
+    monkeypatch.setattr(dify_config, "PDF_PARALLEL_EXTRACT_MAX_WORKERS", 2)
+
+    documents = list(PdfExtractor.parse(Blob.from_path(pdf_file)))
+
+    assert [document.page_content for document in documents] == ["Page one", "Page two", "Page three"]
+    assert [document.metadata for document in documents] == [
+        {"source": pdf_file, "page": page_number} for page_number in range(3)
+    ]
+
+
+def test_parse_in_parallel_from_data_reuses_pool(pdf_file, monkeypatch):
+    monkeypatch.setattr(dify_config, "PDF_PARALLEL_EXTRACT_PAGE_THRESHOLD", 2)
+    monkeypatch.setattr(dify_config, "PDF_PARALLEL_EXTRACT_MAX_WORKERS", 2)
+    blob = Blob.from_data(Path(pdf_file).read_bytes())
+
+    first = [document.page_content for document in PdfExtractor.parse(blob)]
+    executor = pdf_extractor._executor
+    second = [document.page_content for document in PdfExtractor.parse(blob)]
+
+    assert first == second == ["Page one", "Page two", "Page three"]
+    assert executor is not None
+    assert pdf_extractor._executor is executor
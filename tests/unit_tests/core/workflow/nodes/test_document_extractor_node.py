@@ -1,14 +1,18 @@
+import io
 from unittest.mock import Mock, patch
 
 import pytest
 
-from core.file import File, FileTransferMethod
+from configs import dify_config
+from core.file import File, FileTransferMethod, FileType
 from core.variables import ArrayFileSegment
 from core.variables.variables import StringVariable
 from core.workflow.entities.node_entities import NodeRunResult
 from core.workflow.nodes.document_extractor import DocumentExtractorNode, DocumentExtractorNodeData
 from core.workflow.nodes.document_extractor.node import (
     _extract_text_from_doc,
+    _extract_text_from_file,
+    _extract_text_from_files,
     _extract_text_from_pdf,
     _extract_text_from_plain_text,
 )
@@ -16,6 +20,11 @@ from core.workflow.nodes.enums import NodeType
 from models.workflow import WorkflowNodeExecutionStatus
 
 
+@pytest.fixture(autouse=True)
+def _disable_extracted_text_cache(monkeypatch):
+    monkeypatch.setattr(dify_config, "DOCUMENT_EXTRACTOR_CACHE_ENABLED", False)
+
+
 @pytest.fixture
 def document_extractor_node():
     node_data = DocumentExtractorNodeData(
@@ -107,13 +116,9 @@ def test_run_extract_text(
 
     mock_graph_runtime_state.variable_pool.get.return_value = mock_array_file_segment
 
-    mock_download = Mock(return_value=file_content)
-    mock_ssrf_proxy_get = Mock()
-    mock_ssrf_proxy_get.return_value.content = file_content
-    mock_ssrf_proxy_get.return_value.raise_for_status = Mock()
+    mock_download = Mock(side_effect=lambda file: io.BytesIO(file_content))
 
-    monkeypatch.setattr("core.file.file_manager.download", mock_download)
-    monkeypatch.setattr("core.helper.ssrf_proxy.get", mock_ssrf_proxy_get)
+    monkeypatch.setattr("core.file.file_manager.download_to_file", mock_download)
 
     if mime_type == "application/pdf":
         mock_pdf_extract = Mock(return_value=expected_text[0])
@@ -129,14 +134,11 @@ def test_run_extract_text(
     assert result.outputs is not None
     assert result.outputs["text"] == expected_text
 
-    if transfer_method == FileTransferMethod.REMOTE_URL:
-        mock_ssrf_proxy_get.assert_called_once_with("https://example.com/file.txt")
-    elif transfer_method == FileTransferMethod.LOCAL_FILE:
-        mock_download.assert_called_once_with(mock_file)
+    mock_download.assert_called_once_with(mock_file)
 
 
 def test_extract_text_from_plain_text():
-    text = _extract_text_from_plain_text(b"Hello, world!")
+    text = _extract_text_from_plain_text(io.BytesIO(b"Hello, world!"))
     assert text == "Hello, world!"
 
 
@@ -147,19 +149,23 @@ def test_extract_text_from_plain_text_non_utf8():
     with tempfile.NamedTemporaryFile(delete=True) as temp_file:
         temp_file.write(non_utf8_content)
         temp_file.seek(0)
-        text = _extract_text_from_plain_text(temp_file.read())
+        text = _extract_text_from_plain_text(temp_file)
     assert text == "Hello, world."
 
 
+@patch("core.rag.extractor.pdf_extractor.storage")
 @patch("pypdfium2.PdfDocument")
-def test_extract_text_from_pdf(mock_pdf_document):
+def test_extract_text_from_pdf(mock_pdf_document, mock_storage):
     mock_page = Mock()
     mock_text_page = Mock()
     mock_text_page.get_text_range.return_value = "PDF content"
     mock_page.get_textpage.return_value = mock_text_page
-    mock_pdf_document.return_value = [mock_page]
-    text = _extract_text_from_pdf(b"%PDF-1.5\n%Test PDF content")
+    mock_pdf_document.return_value.__iter__.return_value = [mock_page]
+    mock_pdf_document.return_value.__len__.return_value = 1
+    text = _extract_text_from_pdf(io.BytesIO(b"%PDF-1.5\n%Test PDF content"))
     assert text == "PDF content"
+    # cached by the node only
+    mock_storage.save.assert_not_called()
 
 
 @patch("docx.Document")
@@ -170,9 +176,94 @@ def test_extract_text_from_doc(mock_document):
     mock_paragraph2.text = "Paragraph 2"
     mock_document.return_value.paragraphs = [mock_paragraph1, mock_paragraph2]
 
-    text = _extract_text_from_doc(b"PK\x03\x04")
+    text = _extract_text_from_doc(io.BytesIO(b"PK\x03\x04"))
     assert text == "Paragraph 1\nParagraph 2"
 
 
 def test_node_type(document_extractor_node):
     assert document_extractor_node._node_type == NodeType.DOCUMENT_EXTRACTOR
+
+
+def test_extract_text_from_files_keeps_order(monkeypatch, app):
+    monkeypatch.setattr(dify_config, "DOCUMENT_EXTRACTOR_MAX_WORKERS", 3)
+    files = []
+    for index in range(5):
+        mock_file = Mock(spec=File)
+        mock_file.content = f"content {index}".encode()
+        files.append(mock_file)
+    monkeypatch.setattr(
+        "core.workflow.nodes.document_extractor.node._extract_text_from_file",
+        lambda file: file.content.decode(),
+    )
+
+    assert _extract_text_from_files(files) == [f"content {index}" for index in range(5)]
+
+
+def test_extract_text_from_file_uses_cache(monkeypatch, tmp_path):
+    from core.workflow.nodes.document_extractor.cache import extracted_text_cache
+
+    monkeypatch.setattr(dify_config, "DOCUMENT_EXTRACTOR_CACHE_ENABLED", True)
+    monkeypatch.setattr(dify_config, "DOCUMENT_EXTRACTOR_LOCAL_CACHE_DIR", str(tmp_path))
+    content = io.BytesIO(b"Hello, cache!")
+    mock_download = Mock(return_value=content)
+    monkeypatch.setattr("core.file.file_manager.download_to_file", mock_download)
+
+    file = File(
+        tenant_id="tenant_id",
+        type=FileType.DOCUMENT,
+        transfer_method=FileTransferMethod.LOCAL_FILE,
+        related_id="upload_file_id",
+        extension=".txt",
+        mime_type="text/plain",
+    )
+
+    assert _extract_text_from_file(file) == "Hello, cache!"
+    assert _extract_text_from_file(file) == "Hello, cache!"
+    mock_download.assert_called_once()
+    assert content.closed
+    assert extracted_text_cache.get(extracted_text_cache.get_file_key(file)) == "Hello, cache!"
+
+
+def test_extracted_text_cache_evicts_least_recently_used(monkeypatch, tmp_path):
+    import os
+    import time
+
+    from core.workflow.nodes.document_extractor.cache import ExtractedTextCache
+
+    monkeypatch.setattr(dify_config, "DOCUMENT_EXTRACTOR_CACHE_ENABLED", True)
+    cache = ExtractedTextCache(local_dir=str(tmp_path), local_max_size=25)
+
+    cache.set("first", "a" * 10)
+    cache.set("second", "b" * 10)
+    now = time.time()
+    os.utime(tmp_path / "first", (now - 20, now))
+    os.utime(tmp_path / "second", (now - 10, now))
+    cache.set("third", "c" * 10)
+
+    assert sorted(os.listdir(tmp_path)) == ["second", "third"]
+    assert cache.get("first") is None
+    assert cache.get("third") == "c" * 10
+
+
+def test_extracted_text_cache_expires(monkeypatch, tmp_path):
+    import os
+    import time
+
+    from core.workflow.nodes.document_extractor.cache import ExtractedTextCache
+
+    monkeypatch.setattr(dify_config, "DOCUMENT_EXTRACTOR_CACHE_ENABLED", True)
+    monkeypatch.setattr(dify_config, "DOCUMENT_EXTRACTOR_CACHE_TTL", 60)
+    cache = ExtractedTextCache(local_dir=str(tmp_path), local_max_size=25)
+
+    cache.set("first", "a" * 10)
+    cache.set("second", "b" * 10)
+    written_at = time.time() - 120
+    os.utime(tmp_path / "first", (written_at, written_at))
+    assert cache.get("first") is None
+    assert not (tmp_path / "first").exists()
+
+    # expired entries are removed before the least recently read ones
+    os.utime(tmp_path / "second", (written_at, written_at))
+    cache.set("third", "c" * 10)
+    cache.set("fourth", "d" * 10)
+    assert sorted(os.listdir(tmp_path)) == ["fourth", "third"]
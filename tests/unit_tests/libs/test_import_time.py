@@ -0,0 +1,24 @@
+from libs.import_time import ModuleImportTime, get_self_us_by_package, get_total_us, parse_import_time
+
+OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   pandas._libs
+import time:        80 |        200 | pandas
+import time:        30 |         30 |     yaml.error
+import time:        10 |         40 |   yaml.reader
+import time:        50 |         90 | yaml
+Traceback: not an import time line
+"""
+
+
+def test_parse_import_time():
+    import_times = parse_import_time(OUTPUT)
+
+    assert import_times == [
+        ModuleImportTime("pandas._libs", 1, 120, 120),
+        ModuleImportTime("pandas", 0, 80, 200),
+        ModuleImportTime("yaml.error", 2, 30, 30),
+        ModuleImportTime("yaml.reader", 1, 10, 40),
+        ModuleImportTime("yaml", 0, 50, 90),
+    ]
+    assert get_total_us(import_times) == 290
+    assert get_self_us_by_package(import_times) == {"pandas": 200, "yaml": 90}
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from libs.infinite_scroll_pagination import get_keyset, paginate_by_keyset
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id: Mapped[str] = mapped_column(sa.String(36), primary_key=True)
+    created_at: Mapped[datetime] = mapped_column(sa.DateTime)
+
+
+SORT_COLUMNS = (Item.created_at, Item.id)
+
+
+@pytest.fixture
+def session():
+    engine = sa.create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        # pairs of rows share a timestamp, so the id has to break the tie
+        session.add_all(Item(id=f"{i:02d}", created_at=datetime(2024, 1, 1, 0, i // 2)) for i in range(7))
+        session.commit()
+        yield session
+
+
+def _scroll(session: Session, limit: int, descending: bool) -> list[list[str]]:
+    pages = []
+    after = None
+    while True:
+        pagination = paginate_by_keyset(session.query(Item), SORT_COLUMNS, limit, after=after, descending=descending)
+        pages.append([item.id for item in pagination.data])
+        if not pagination.has_more:
+            return pages
+        after = get_keyset(pagination.data[-1], SORT_COLUMNS)
+
+
+def test_scroll_visits_every_row_once(session):
+    assert _scroll(session, 3, descending=True) == [
+        ["06", "05", "04"],
+        ["03", "02", "01"],
+        ["00"],
+    ]
+    assert _scroll(session, 3, descending=False) == [
+        ["00", "01", "02"],
+        ["03", "04", "05"],
+        ["06"],
+    ]
+
+
+def test_has_more_on_exact_page(session):
+    pagination = paginate_by_keyset(session.query(Item), SORT_COLUMNS, 7)
+
+    assert len(pagination.data) == 7
+    assert pagination.has_more is False
+
@@ -0,0 +1,92 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from configs.middleware.storage.opendal_storage_config import OpenDALScheme
+from extensions.storage.aws_s3_storage import S3_DELETE_BATCH_SIZE, AwsS3Storage
+from extensions.storage.base_storage import map_concurrently
+from extensions.storage.cached_storage import CachedStorage
+from extensions.storage.opendal_storage import OpenDALStorage
+
+
+@pytest.fixture
+def opendal_storage(tmp_path):
+    return OpenDALStorage(scheme=OpenDALScheme.FS, root=str(tmp_path / "storage"))
+
+
+def test_load_many_and_delete_many(opendal_storage):
+    for i in range(5):
+        opendal_storage.save(f"files/{i}.txt", f"content {i}".encode())
+
+    assert opendal_storage.load_many(["files/3.txt", "files/1.txt", "files/3.txt"]) == {
+        "files/3.txt": b"content 3",
+        "files/1.txt": b"content 1",
+    }
+
+    opendal_storage.delete_many([f"files/{i}.txt" for i in range(5)] + ["files/missing.txt"])
+    assert not any(opendal_storage.exists(f"files/{i}.txt") for i in range(5))
+
+
+def test_load_many_missing_file(opendal_storage):
+    opendal_storage.save("files/a.txt", b"a")
+
+    with pytest.raises(FileNotFoundError):
+        opendal_storage.load_many(["files/a.txt", "files/missing.txt"])
+
+
+def test_map_concurrently_attempts_every_file():
+    attempted = []
+
+    def delete(filename):
+        attempted.append(filename)
+        if filename == "b":
+            raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        map_concurrently(delete, ["a", "b", "c", "d"])
+    assert sorted(attempted) == ["a", "b", "c", "d"]
+
+
+def test_save_overwrites(opendal_storage):
+    opendal_storage.save("files/a.txt", b"v1")
+    opendal_storage.save("files/a.txt", b"v2")
+
+    assert opendal_storage.load_once("files/a.txt") == b"v2"
+
+
+def test_cached_storage_bulk_operations(opendal_storage, tmp_path):
+    storage = CachedStorage(
+        opendal_storage, cache_dir=str(tmp_path / "cache"), max_size=1024, immutable_prefixes=["files/"]
+    )
+    opendal_storage.save("files/a.txt", b"a")
+    opendal_storage.save("files/b.txt", b"b")
+    storage.load_once("files/a.txt")
+
+    assert storage.load_many(["files/a.txt", "files/b.txt"]) == {"files/a.txt": b"a", "files/b.txt": b"b"}
+    assert storage.get_stats()["hits"] == 1
+
+    storage.delete_many(["files/a.txt", "files/b.txt"])
+    assert not storage.exists("files/a.txt")
+    assert not storage.exists("files/b.txt")
+
+
+def test_s3_delete_many_batches_keys():
+    storage = AwsS3Storage.__new__(AwsS3Storage)
+    storage.bucket_name = "bucket"
+    storage.client = MagicMock()
+    storage.client.delete_objects.return_value = {}
+
+    storage.delete_many([f"files/{i}" for i in range(S3_DELETE_BATCH_SIZE + 1)])
+
+    batches = [call.kwargs["Delete"]["Objects"] for call in storage.client.delete_objects.call_args_list]
+    assert [len(batch) for batch in batches] == [S3_DELETE_BATCH_SIZE, 1]
+
+
+def test_s3_delete_many_raises_on_errors():
+    storage = AwsS3Storage.__new__(AwsS3Storage)
+    storage.bucket_name = "bucket"
+    storage.client = MagicMock()
+    storage.client.delete_objects.return_value = {"Errors": [{"Key": "files/a", "Code": "AccessDenied"}]}
+
+    with pytest.raises(Exception, match="Failed to delete 1 files"):
+        storage.delete_many(["files/a"])
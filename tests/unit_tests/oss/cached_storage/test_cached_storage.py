@@ -0,0 +1,93 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from configs.middleware.storage.opendal_storage_config import OpenDALScheme
+from extensions.storage.cached_storage import CachedStorage
+from extensions.storage.opendal_storage import OpenDALStorage
+
+
+class TestCachedStorage:
+    @pytest.fixture(autouse=True)
+    def setup_method(self, tmp_path):
+        self.backend = OpenDALStorage(scheme=OpenDALScheme.FS, root=str(tmp_path / "storage"))
+        self.cache_dir = str(tmp_path / "cache")
+        self.storage = CachedStorage(
+            self.backend, cache_dir=self.cache_dir, max_size=100, immutable_prefixes=["upload_files/"]
+        )
+
+    def test_load_once_reads_through(self):
+        self.backend.save("upload_files/a.txt", b"hello")
+
+        with patch.object(self.backend, "load_once", wraps=self.backend.load_once) as load_once:
+            assert self.storage.load_once("upload_files/a.txt") == b"hello"
+            assert self.storage.load_once("upload_files/a.txt") == b"hello"
+
+        assert load_once.call_count == 1
+        assert self.storage.get_stats()["hits"] == 1
+        assert self.storage.get_stats()["misses"] == 1
+
+    def test_load_stream_reads_through(self):
+        self.backend.save("upload_files/a.txt", b"hello")
+
+        assert b"".join(self.storage.load_stream("upload_files/a.txt")) == b"hello"
+        with patch.object(self.backend, "load_stream") as load_stream:
+            assert b"".join(self.storage.load_stream("upload_files/a.txt")) == b"hello"
+        load_stream.assert_not_called()
+
+    def test_mutable_objects_are_not_cached_without_ttl(self):
+        self.storage.save("keyword_files/a.txt", b"v1")
+        self.storage.load_once("keyword_files/a.txt")
+        self.backend.save("keyword_files/a.txt", b"v2")
+
+        assert self.storage.load_once("keyword_files/a.txt") == b"v2"
+        assert os.listdir(self.cache_dir) == []
+
+    def test_mutable_objects_expire_after_ttl(self):
+        self.storage.ttl = 60
+        self.backend.save("keyword_files/a.txt", b"v1")
+        self.storage.load_once("keyword_files/a.txt")
+        self.backend.save("keyword_files/a.txt", b"v2")
+        assert self.storage.load_once("keyword_files/a.txt") == b"v1"
+
+        with patch("extensions.storage.cached_storage.time.time", return_value=os.path.getmtime(self._path()) + 61):
+            assert self.storage.load_once("keyword_files/a.txt") == b"v2"
+
+    def test_save_and_delete_invalidate(self):
+        self.storage.save("upload_files/a.txt", b"v1")
+        assert self.storage.load_once("upload_files/a.txt") == b"v1"
+
+        self.storage.save("upload_files/a.txt", b"v2")
+        assert self.storage.load_once("upload_files/a.txt") == b"v2"
+
+        self.storage.delete("upload_files/a.txt")
+        assert not self.storage.exists("upload_files/a.txt")
+        with pytest.raises(FileNotFoundError):
+            self.storage.load_once("upload_files/a.txt")
+
+    def test_least_recently_used_entries_are_evicted(self):
+        for i, name in enumerate(("a", "b", "c"), start=1):
+            self.backend.save(f"upload_files/{name}", bytes(30))
+            self.storage.load_once(f"upload_files/{name}")
+            # entries are ordered by access time, make them distinct
+            os.utime(self._path(f"upload_files/{name}"), (i, i))
+        self.storage.load_once("upload_files/a")
+
+        self.backend.save("upload_files/d", bytes(30))
+        self.storage.load_once("upload_files/d")
+
+        assert not os.path.exists(self._path("upload_files/b"))
+        for name in ("a", "c", "d"):
+            assert os.path.exists(self._path(f"upload_files/{name}"))
+        assert self.storage.get_stats()["size"] == 90
+
+    def test_objects_over_max_size_are_not_cached(self):
+        self.backend.save("upload_files/big", bytes(101))
+
+        assert len(b"".join(self.storage.load_stream("upload_files/big"))) == 101
+        assert len(self.storage.load_once("upload_files/big")) == 101
+        assert os.listdir(self.cache_dir) == []
+
+    def _path(self, filename: str = "keyword_files/a.txt") -> str:
+        return self.storage._get_local_path(filename)
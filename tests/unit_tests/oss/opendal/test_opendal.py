@@ -1,3 +1,4 @@
+import io
 import os
 from collections.abc import Generator
 from pathlib import Path
@@ -67,6 +68,14 @@ class TestOpenDAL:
         assert isinstance(generator, Generator)
         assert next(generator) == data
 
+    def test_save_stream(self):
+        """Test saving the content of a file object."""
+        filename = get_example_filename()
+        data = get_example_data()
+
+        self.storage.save_stream(filename, io.BytesIO(data))
+        assert self.storage.load_once(filename) == data
+
     def test_download(self):
         """Test downloading data to a file."""
         filename = get_example_filename()
@@ -75,6 +84,7 @@ class TestOpenDAL:
 
         self.storage.save(filename, data)
         self.storage.download(filename, filepath)
+        assert Path(filepath).read_bytes() == data
 
     def test_delete(self):
         """Test deleting a file."""
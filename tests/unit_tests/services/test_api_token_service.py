@@ -0,0 +1,125 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from configs import dify_config
+from models.model import ApiToken
+from services.api_token_service import LAST_USED_AT_KEY, ApiTokenService
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value.encode()
+        self.ttls[key] = ttl
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field.encode()] = str(value).encode()
+
+    def pipeline(self):
+        pipe = MagicMock()
+        pipe.__enter__.return_value = pipe
+        pipe.execute.side_effect = lambda: [self.data.pop(LAST_USED_AT_KEY, {}), 1]
+        return pipe
+
+
+@pytest.fixture
+def redis_client():
+    fake_redis = FakeRedis()
+    with patch("services.api_token_service.redis_client", fake_redis):
+        ApiTokenService._local_cache.clear()
+        ApiTokenService._recently_used.clear()
+        yield fake_redis
+
+
+@pytest.fixture
+def mock_query():
+    api_token = ApiToken(id="token-id", app_id="app-id", tenant_id="tenant-id", type="app", token="app-secret")
+    with patch.object(
+        ApiTokenService,
+        "_query_api_token",
+        side_effect=lambda scope, token: api_token if (scope, token) == ("app", "app-secret") else None,
+    ) as mock_query:
+        yield mock_query
+
+
+def test_get_api_token_is_cached(redis_client, mock_query):
+    for _ in range(3):
+        api_token = ApiTokenService.get_api_token("app", "app-secret")
+        assert api_token.app_id == "app-id"
+        assert api_token.tenant_id == "tenant-id"
+    mock_query.assert_called_once()
+
+    # another process only finds it in redis
+    ApiTokenService._local_cache.clear()
+    assert ApiTokenService.get_api_token("app", "app-secret").id == "token-id"
+    mock_query.assert_called_once()
+    assert not any(b"app-secret" in key.encode() for key in redis_client.data)
+
+
+def test_invalid_tokens_are_cached(redis_client, mock_query, monkeypatch):
+    monkeypatch.setattr(dify_config, "API_TOKEN_CACHE_TTL", 600)
+    monkeypatch.setattr(dify_config, "API_TOKEN_CACHE_MISS_TTL", 10)
+    assert ApiTokenService.get_api_token("app", "wrong-secret") is None
+    assert ApiTokenService.get_api_token("app", "wrong-secret") is None
+    ApiTokenService._local_cache.clear()
+    assert ApiTokenService.get_api_token("app", "wrong-secret") is None
+    mock_query.assert_called_once()
+
+    # tokens are resolved per scope
+    assert ApiTokenService.get_api_token("dataset", "app-secret") is None
+
+    # invalid tokens expire from redis sooner than valid ones
+    ApiTokenService.get_api_token("app", "app-secret")
+    assert redis_client.ttls[ApiTokenService._get_cache_key("app", "wrong-secret")] == 10
+    assert redis_client.ttls[ApiTokenService._get_cache_key("app", "app-secret")] == 600
+
+
+def test_invalid_tokens_cached_in_process_only(redis_client, mock_query, monkeypatch):
+    monkeypatch.setattr(dify_config, "API_TOKEN_CACHE_MISS_TTL", 0)
+    assert ApiTokenService.get_api_token("app", "wrong-secret") is None
+    assert ApiTokenService.get_api_token("app", "wrong-secret") is None
+    mock_query.assert_called_once()
+    assert redis_client.data == {}
+
+
+def test_delete_cache(redis_client, mock_query):
+    ApiTokenService.get_api_token("app", "app-secret")
+    ApiTokenService.delete_cache("app", "app-secret")
+    ApiTokenService.get_api_token("app", "app-secret")
+    assert mock_query.call_count == 2
+
+
+def test_get_api_token_without_cache(redis_client, mock_query, monkeypatch):
+    monkeypatch.setattr(dify_config, "API_TOKEN_CACHE_TTL", 0)
+    ApiTokenService.get_api_token("app", "app-secret")
+    ApiTokenService.get_api_token("app", "app-secret")
+    assert mock_query.call_count == 2
+    assert redis_client.data == {}
+
+
+def test_record_usage_and_update_last_used_at(redis_client):
+    api_token = ApiToken(id="token-id")
+    with patch.object(redis_client, "hset", wraps=redis_client.hset) as mock_hset:
+        for _ in range(5):
+            ApiTokenService.record_usage(api_token)
+    mock_hset.assert_called_once()
+
+    with patch("services.api_token_service.db") as mock_db:
+        assert ApiTokenService.update_last_used_at() == 1
+        params = mock_db.session.execute.call_args.args[1]
+        assert [param["token_id"] for param in params] == ["token-id"]
+        mock_db.session.commit.assert_called_once()
+
+        # nothing recorded since the last update
+        assert ApiTokenService.update_last_used_at() == 0
+        mock_db.session.execute.assert_called_once()
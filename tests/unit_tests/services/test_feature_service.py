@@ -0,0 +1,145 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from configs import dify_config
+from services.feature_service import FeatureService
+
+BILLING_INFO = {
+    "enabled": True,
+    "subscription": {"plan": "professional", "interval": "month"},
+    "apps": {"size": 3, "limit": 50},
+}
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self._locks: dict[str, threading.Lock] = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value.encode()
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def lock(self, name, timeout=None, blocking_timeout=None):
+        return self._locks.setdefault(name, threading.Lock())
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    monkeypatch.setattr(dify_config, "BILLING_ENABLED", True)
+    monkeypatch.setattr(dify_config, "BILLING_FEATURES_CACHE_TTL", 300)
+    fake_redis = FakeRedis()
+    with patch("services.feature_service.redis_client", fake_redis):
+        yield fake_redis
+
+
+@pytest.fixture
+def mock_get_info():
+    with patch("services.feature_service.BillingService.get_info", return_value=BILLING_INFO) as mock_get_info:
+        yield mock_get_info
+
+
+def test_get_features_is_cached(redis_client, mock_get_info):
+    for _ in range(3):
+        features = FeatureService.get_features("tenant")
+        assert features.billing.subscription.plan == "professional"
+        assert features.apps.limit == 50
+    mock_get_info.assert_called_once_with("tenant")
+
+    FeatureService.get_features("tenant", refresh=True)
+    assert mock_get_info.call_count == 2
+
+    FeatureService.invalidate_features("tenant")
+    FeatureService.get_features("tenant")
+    assert mock_get_info.call_count == 3
+
+
+def test_concurrent_misses_are_coalesced(redis_client, mock_get_info):
+    def get_info(tenant_id):
+        time.sleep(0.1)
+        return BILLING_INFO
+
+    mock_get_info.side_effect = get_info
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        plans = list(
+            executor.map(
+                lambda _: FeatureService.get_features("tenant").billing.subscription.plan,
+                range(8),
+            )
+        )
+
+    assert plans == ["professional"] * 8
+    mock_get_info.assert_called_once()
+
+
+def test_slow_billing_api_does_not_block_other_tenants(redis_client, mock_get_info):
+    slow_tenant_released = threading.Event()
+
+    def get_info(tenant_id):
+        if tenant_id == "slow-tenant":
+            assert slow_tenant_released.wait(timeout=5)
+        return BILLING_INFO
+
+    mock_get_info.side_effect = get_info
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        slow_features = executor.submit(FeatureService.get_features, "slow-tenant")
+        # every other tenant, whatever it hashes to, is served while the slow request is in flight
+        for index in range(100):
+            assert FeatureService.get_features(f"tenant-{index}").billing.subscription.plan == "professional"
+        slow_tenant_released.set()
+        assert slow_features.result().billing.subscription.plan == "professional"
+
+
+def test_concurrent_refreshes_are_not_serialized(redis_client, mock_get_info):
+    # every refresh waits for the others, so it fails if they are serialized by a lock
+    barrier = threading.Barrier(4, timeout=5)
+
+    def get_info(tenant_id):
+        barrier.wait()
+        return BILLING_INFO
+
+    mock_get_info.side_effect = get_info
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        plans = list(
+            executor.map(
+                lambda _: FeatureService.get_features("tenant", refresh=True).billing.subscription.plan,
+                range(4),
+            )
+        )
+
+    assert plans == ["professional"] * 4
+    assert mock_get_info.call_count == 4
+    assert redis_client.data
+
+
+def test_error_responses_are_not_cached(redis_client, mock_get_info):
+    mock_get_info.return_value = {"message": "internal error"}
+    with pytest.raises(KeyError):
+        FeatureService.get_features("tenant")
+    assert redis_client.data == {}
+
+
+def test_get_features_without_cache(redis_client, mock_get_info, monkeypatch):
+    monkeypatch.setattr(dify_config, "BILLING_FEATURES_CACHE_TTL", 0)
+    FeatureService.get_features("tenant")
+    FeatureService.get_features("tenant")
+    assert mock_get_info.call_count == 2
+    assert redis_client.data == {}
+
+
+def test_billing_requests_share_a_session():
+    from services.billing_service import BillingService
+
+    with patch.object(BillingService, "session", MagicMock()) as mock_session:
+        mock_session.request.return_value.json.return_value = BILLING_INFO
+        assert BillingService.get_info("tenant") == BILLING_INFO
+        assert mock_session.request.call_args.kwargs["timeout"] == dify_config.BILLING_API_TIMEOUT
@@ -0,0 +1,165 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from redis.exceptions import ResponseError
+
+from configs import dify_config
+from services.provider_usage_service import (
+    FLUSHING_KEY_SUFFIX,
+    QUOTA_USED_KEY,
+    ProviderUsageService,
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def hincrby(self, key, field, amount):
+        if isinstance(field, str):
+            field = field.encode()
+        fields = self.data.setdefault(key, {})
+        fields[field] = str(int(fields.get(field, 0)) + amount).encode()
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field.encode()] = str(value).encode()
+
+    def hsetnx(self, key, field, value):
+        self.data.setdefault(key, {}).setdefault(field.encode(), str(value).encode())
+
+    def hmget(self, key, fields):
+        return [self.data.get(key, {}).get(field.encode()) for field in fields]
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def rename(self, key, new_key):
+        if key not in self.data:
+            raise ResponseError("no such key")
+        self.data[new_key] = self.data.pop(key)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def lock(self, name, timeout=None):
+        return MagicMock()
+
+    def pipeline(self, transaction=True):
+        commands = []
+        pipe = MagicMock()
+        pipe.__enter__.return_value = pipe
+        pipe.hmget.side_effect = lambda *args: commands.append(self.hmget(*args))
+        pipe.hincrby.side_effect = lambda *args: commands.append(self.hincrby(*args))
+        pipe.execute.side_effect = lambda: commands
+        return pipe
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    monkeypatch.setattr(dify_config, "PROVIDER_USAGE_WRITE_BEHIND_ENABLED", True)
+    fake_redis = FakeRedis()
+    with patch("services.provider_usage_service.redis_client", fake_redis):
+        ProviderUsageService._recently_used.clear()
+        yield fake_redis
+
+
+def test_deduct_quota_accumulates_in_redis(redis_client):
+    with patch("services.provider_usage_service.db") as mock_db:
+        ProviderUsageService.deduct_quota("tenant", "openai", "trial", 10)
+        ProviderUsageService.deduct_quota("tenant", "openai", "trial", 5)
+        ProviderUsageService.deduct_quota("tenant", "anthropic", "trial", 1)
+    mock_db.session.commit.assert_not_called()
+
+    pending = ProviderUsageService.get_pending_quota_used(
+        "tenant", [("openai", "trial"), ("openai", "paid"), ("anthropic", "trial")]
+    )
+    assert pending == {("openai", "trial"): 15, ("anthropic", "trial"): 1}
+
+
+def test_flush(redis_client):
+    ProviderUsageService.deduct_quota("tenant", "openai", "trial", 10)
+    ProviderUsageService.deduct_quota("tenant", "openai", "trial", 5)
+    for _ in range(3):
+        ProviderUsageService.update_last_used("tenant", "openai")
+
+    with patch("services.provider_usage_service.db") as mock_db:
+        assert ProviderUsageService.flush() == (1, 1)
+        quota_params = mock_db.session.execute.call_args_list[0].args[1]
+        assert quota_params == [
+            {"p_tenant_id": "tenant", "p_provider_name": "openai", "p_quota_type": "trial", "p_used_quota": 15}
+        ]
+        assert ProviderUsageService.get_pending_quota_used("tenant", [("openai", "trial")]) == {}
+
+        assert ProviderUsageService.flush() == (0, 0)
+        assert mock_db.session.execute.call_count == 2
+
+
+def test_flush_restores_deltas_when_commit_fails(redis_client):
+    ProviderUsageService.deduct_quota("tenant", "openai", "trial", 10)
+    with patch("services.provider_usage_service.db") as mock_db:
+        mock_db.session.commit.side_effect = ConnectionError("database unavailable")
+        with pytest.raises(ConnectionError):
+            ProviderUsageService.flush()
+        mock_db.session.rollback.assert_called_once()
+
+    # usage of the failed flush still counts, and is written by the next flush
+    ProviderUsageService.deduct_quota("tenant", "openai", "trial", 1)
+    assert ProviderUsageService.get_pending_quota_used("tenant", [("openai", "trial")]) == {("openai", "trial"): 11}
+
+    with patch("services.provider_usage_service.db") as mock_db:
+        assert ProviderUsageService.flush() == (1, 0)
+        assert mock_db.session.execute.call_args_list[0].args[1][0]["p_used_quota"] == 11
+
+
+def test_flush_completes_interrupted_flush(redis_client):
+    ProviderUsageService.deduct_quota("tenant", "openai", "trial", 10)
+    with (
+        patch("services.provider_usage_service.db") as mock_db,
+        patch.object(redis_client, "delete", side_effect=ConnectionError("redis unavailable")),
+    ):
+        with pytest.raises(ConnectionError):
+            ProviderUsageService.flush()
+        mock_db.session.commit.assert_not_called()
+        mock_db.session.rollback.assert_called_once()
+
+    ProviderUsageService.deduct_quota("tenant", "openai", "trial", 1)
+    assert ProviderUsageService.get_pending_quota_used("tenant", [("openai", "trial")]) == {("openai", "trial"): 11}
+    assert QUOTA_USED_KEY + FLUSHING_KEY_SUFFIX in redis_client.data
+
+    with patch("services.provider_usage_service.db") as mock_db:
+        ProviderUsageService.flush()
+        assert mock_db.session.execute.call_args_list[0].args[1][0]["p_used_quota"] == 10
+        ProviderUsageService.flush()
+        assert mock_db.session.execute.call_args_list[1].args[1][0]["p_used_quota"] == 1
+
+
+def test_flush_does_not_write_deltas_twice_when_interrupted_after_commit(redis_client):
+    ProviderUsageService.deduct_quota("tenant", "openai", "trial", 10)
+
+    class ProcessKilled(BaseException):
+        pass
+
+    with patch("services.provider_usage_service.db") as mock_db:
+        # the process dies right after the deltas are committed
+        mock_db.session.commit.side_effect = ProcessKilled
+        with pytest.raises(ProcessKilled):
+            ProviderUsageService.flush()
+
+    assert QUOTA_USED_KEY + FLUSHING_KEY_SUFFIX not in redis_client.data
+    assert ProviderUsageService.get_pending_quota_used("tenant", [("openai", "trial")]) == {}
+
+    with patch("services.provider_usage_service.db") as mock_db:
+        assert ProviderUsageService.flush() == (0, 0)
+        mock_db.session.execute.assert_not_called()
+
+
+def test_deduct_quota_without_write_behind(redis_client, monkeypatch):
+    monkeypatch.setattr(dify_config, "PROVIDER_USAGE_WRITE_BEHIND_ENABLED", False)
+    with patch("services.provider_usage_service.db") as mock_db:
+        ProviderUsageService.deduct_quota("tenant", "openai", "trial", 10)
+    mock_db.session.commit.assert_called_once()
+    assert redis_client.data == {}
+    assert ProviderUsageService.get_pending_quota_used("tenant", [("openai", "trial")]) == {}